@@ -0,0 +1,86 @@
+# scripts/benchmark_auto_save.py
+"""
+Auto Save Benchmark Script
+入力中の自動保存を集約する保存エンジンと、入力毎に書き込む従来方式の書き込み回数・時間の比較
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.save_engine import SaveEngine
+
+
+async def legacy_save(path: Path, data: bytes):
+    """従来の保存（入力毎にその場で書き込み）"""
+    with open(path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+async def measure(keystrokes: int, interval: float, base: bytes, save) -> float:
+    """入力を再現し、保存にかかった時間の合計（ms）"""
+    elapsed = 0.0
+    text = base
+    for index in range(keystrokes):
+        text += b"x"
+        start = time.perf_counter()
+        await save(text)
+        elapsed += time.perf_counter() - start
+        await asyncio.sleep(interval)
+    return elapsed * 1000
+
+
+async def run_benchmark(keystrokes: int, interval_ms: float, size_kb: int, debounce: float):
+    """ベンチマークを実行"""
+    root = Path(tempfile.mkdtemp(prefix="auto_save_bench_"))
+    try:
+        base = b"# source\n" * (size_kb * 1024 // 10)
+        interval = interval_ms / 1000
+        print(f"{keystrokes} keystrokes every {interval_ms:.0f} ms on a {size_kb} KB file, "
+              f"debounce={debounce}s, max_delay={debounce * 4}s")
+
+        legacy_path = root / "legacy.py"
+        legacy_ms = await measure(keystrokes, interval, base, lambda data: legacy_save(legacy_path, data))
+
+        engine = SaveEngine(debounce=debounce, max_delay=debounce * 4)
+        engine_path = root / "engine.py"
+
+        async def schedule(data: bytes):
+            engine.schedule(engine_path, data)
+
+        engine_ms = await measure(keystrokes, interval, base, schedule)
+        await engine.close()
+        assert engine_path.read_bytes() == legacy_path.read_bytes()
+
+        print(f"{'mode':>8}{'writes':>8}{'ms in save':>12}")
+        print(f"{'legacy':>8}{keystrokes:>8}{legacy_ms:>12.1f}")
+        print(f"{'engine':>8}{engine.statistics['writes']:>8}{engine_ms:>12.1f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Auto save benchmark")
+    parser.add_argument('--keystrokes', type=int, default=200)
+    parser.add_argument('--interval-ms', type=float, default=20)
+    parser.add_argument('--size-kb', type=int, default=256)
+    parser.add_argument('--debounce', type=float, default=0.5)
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(args.keystrokes, args.interval_ms, args.size_kb, args.debounce))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# scripts/benchmark_backup_compression.py
+"""
+Backup Compression Benchmark Script
+並列圧縮パイプラインと従来の逐次ZIP作成＋チェックサム再読み込みの所要時間の比較
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Any, Callable
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.parallel_compress import ParallelZipWriter, resolve_workers
+
+
+def create_tree(root: Path, files: int, file_kb: int, seed: int = 0):
+    """ベンチマーク用のソースツリーを作成"""
+    rng = random.Random(seed)
+    words = [f"token{i}" for i in range(500)]
+    for i in range(files):
+        directory = root / f"pkg{i % 20}"
+        directory.mkdir(parents=True, exist_ok=True)
+        text = " ".join(rng.choice(words) for _ in range(file_kb * 128))
+        (directory / f"file_{i}.txt").write_text(text, encoding='utf-8')
+
+
+def legacy_zip(files, source: Path, backup_path: Path) -> str:
+    """従来の_create_zip_backup相当（逐次圧縮後にアーカイブを再読み込みしてハッシュ）"""
+    with zipfile.ZipFile(backup_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        for file_path in files:
+            relative_path = None
+            for source_path in [str(source)]:
+                candidate = Path(source_path)
+                if candidate.is_dir() and file_path.is_relative_to(candidate):
+                    relative_path = file_path.relative_to(candidate)
+            zipf.write(file_path, str(relative_path))
+            file_path.stat()
+    digest = hashlib.md5()
+    with open(backup_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(4096), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parallel_zip(files, source: Path, backup_path: Path, level: int, workers: int) -> str:
+    """並列圧縮パイプライン"""
+    with ParallelZipWriter(backup_path, level, workers) as writer:
+        for file_path in files:
+            writer.add_file(file_path, str(file_path.relative_to(source)))
+    return writer.close()[1]
+
+
+def measure(func: Callable[[], Any]) -> float:
+    """所要時間（ms）"""
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def run_benchmark(files: int, file_kb: int, level: int):
+    """ベンチマークを実行"""
+    root = Path(tempfile.mkdtemp(prefix="compress_bench_"))
+    try:
+        source = root / "source"
+        create_tree(source, files, file_kb)
+        paths = sorted(source.rglob("*.txt"))
+        total = sum(path.stat().st_size for path in paths)
+        print(f"source: {files} files, {total / 1024 / 1024:.1f} MB, cpu: {os.cpu_count()}")
+
+        legacy_ms = measure(lambda: legacy_zip(paths, source, root / "legacy.zip"))
+        print(f"{'case':28}{'ms':>10}{'MB':>8}")
+        print(f"{'legacy (zipfile + rehash)':28}{legacy_ms:>10.0f}{(root / 'legacy.zip').stat().st_size / 1024 / 1024:>8.1f}")
+
+        for workers in sorted({1, resolve_workers()}):
+            name = f"parallel ({workers} threads)"
+            elapsed = measure(lambda: parallel_zip(paths, source, root / "parallel.zip", level, workers))
+            print(f"{name:28}{elapsed:>10.0f}{(root / 'parallel.zip').stat().st_size / 1024 / 1024:>8.1f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Backup compression benchmark")
+    parser.add_argument('--files', type=int, default=400)
+    parser.add_argument('--file-kb', type=int, default=256)
+    parser.add_argument('--level', type=int, default=6)
+    args = parser.parse_args()
+
+    run_benchmark(args.files, args.file_kb, args.level)
+
+
+if __name__ == "__main__":
+    main()
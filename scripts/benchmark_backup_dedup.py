@@ -0,0 +1,104 @@
+# scripts/benchmark_backup_dedup.py
+"""
+Backup Dedup Benchmark Script
+重複排除スナップショットと従来のZIPバックアップの定期バックアップ毎の時間・容量の比較
+"""
+
+import argparse
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.backup_utils import BackupConfig, BackupUtils, CompressionType
+
+
+def create_tree(root: Path, files: int, file_kb: int, seed: int = 0):
+    """ベンチマーク用のソースツリーを作成"""
+    rng = random.Random(seed)
+    for i in range(files):
+        directory = root / f"pkg{i % 20}"
+        directory.mkdir(parents=True, exist_ok=True)
+        lines = [f"line {j}: {rng.randrange(1 << 30)} {'x' * rng.randrange(40)}\n"
+                 for j in range(file_kb * 20)]
+        (directory / f"file_{i}.txt").write_text("".join(lines), encoding='utf-8')
+
+
+def modify_tree(root: Path, count: int, rng: random.Random):
+    """いくつかのファイルの途中に追記"""
+    paths = sorted(root.rglob("*.txt"))
+    for path in rng.sample(paths, count):
+        content = path.read_text(encoding='utf-8')
+        middle = len(content) // 2
+        path.write_text(content[:middle] + f"edited {rng.random()}\n" + content[middle:], encoding='utf-8')
+
+
+def directory_size(path: Path) -> int:
+    """ディレクトリ以下の合計サイズ"""
+    return sum(entry.stat().st_size for entry in path.rglob("*") if entry.is_file())
+
+
+def measure(utils: BackupUtils, config: BackupConfig) -> float:
+    """バックアップ1回の所要時間（ms）"""
+    start = time.perf_counter()
+    utils.create_backup(config)
+    return (time.perf_counter() - start) * 1000
+
+
+def run_benchmark(files: int, file_kb: int, snapshots: int, changed: int):
+    """ベンチマークを実行"""
+    root = Path(tempfile.mkdtemp(prefix="dedup_bench_"))
+    try:
+        source = root / "source"
+        create_tree(source, files, file_kb)
+        print(f"source: {files} files, {directory_size(source) / 1024 / 1024:.1f} MB, "
+              f"{changed} files edited per snapshot")
+
+        utils = BackupUtils()
+        configs = {
+            name: BackupConfig(source_paths=[str(source)], backup_directory=str(root / name),
+                               compression_type=compression, max_backups=snapshots + 1,
+                               verify_backup=False)
+            for name, compression in (("zip", CompressionType.ZIP), ("dedup", CompressionType.DEDUP))
+        }
+
+        rng = random.Random(1)
+        print(f"{'snapshot':>9}{'zip ms':>10}{'dedup ms':>10}{'zip MB':>10}{'dedup MB':>10}")
+        for index in range(snapshots):
+            if index:
+                modify_tree(source, changed, rng)
+            zip_ms = measure(utils, configs["zip"])
+            dedup_ms = measure(utils, configs["dedup"])
+            print(f"{index + 1:>9}{zip_ms:>10.0f}{dedup_ms:>10.0f}"
+                  f"{directory_size(root / 'zip') / 1024 / 1024:>10.1f}"
+                  f"{directory_size(root / 'dedup') / 1024 / 1024:>10.1f}")
+
+        start = time.perf_counter()
+        latest = utils.list_backups(str(root / "dedup"))[-1]
+        utils.restore_backup(latest, str(root / "restored"))
+        print(f"restore latest dedup snapshot: {(time.perf_counter() - start) * 1000:.0f} ms")
+        utils.get_chunk_store(str(root / "dedup")).close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Backup dedup benchmark")
+    parser.add_argument('--files', type=int, default=500)
+    parser.add_argument('--file-kb', type=int, default=64)
+    parser.add_argument('--snapshots', type=int, default=6)
+    parser.add_argument('--changed', type=int, default=5)
+    args = parser.parse_args()
+
+    run_benchmark(args.files, args.file_kb, args.snapshots, args.changed)
+
+
+if __name__ == "__main__":
+    main()
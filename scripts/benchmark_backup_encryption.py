@@ -0,0 +1,85 @@
+# scripts/benchmark_backup_encryption.py
+"""
+Backup Encryption Benchmark Script
+ストリーム暗号化と従来のファイル全体の暗号化（JSON形式）の所要時間・ピークメモリの比較
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Tuple
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.encryption_utils import EncryptionMethod, EncryptionUtils, STREAM_SEGMENT_SIZE
+
+
+def measure(func: Callable[[], Any]) -> Tuple[float, float]:
+    """所要時間（ms）とPythonヒープのピーク（MB）"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1000, peak / 1024 / 1024
+
+
+def stream_read(utils: EncryptionUtils, path: Path):
+    """復号済みの内容を一時ファイルなしで読み切る（検証・展開時の読み込みに相当）"""
+    with utils.open_encrypted_reader(path, "password") as reader:
+        while reader.read(STREAM_SEGMENT_SIZE):
+            pass
+
+
+def run_benchmark(size_mb: int):
+    """ベンチマークを実行"""
+    root = Path(tempfile.mkdtemp(prefix="encrypt_bench_"))
+    try:
+        utils = EncryptionUtils()
+        source = root / "backup.zip"
+        with open(source, 'wb') as f:
+            for _ in range(size_mb):
+                f.write(os.urandom(1024 * 1024))
+
+        cases = [
+            ("encrypt",
+             lambda: utils.encrypt_file(source, "password", root / "legacy.encrypted"),
+             lambda: utils.encrypt_file(source, "password", root / "stream.encrypted",
+                                        method=EncryptionMethod.AES_256_GCM_STREAM)),
+            ("decrypt to file",
+             lambda: utils.decrypt_file(root / "legacy.encrypted", "password", root / "legacy.out"),
+             lambda: utils.decrypt_file(root / "stream.encrypted", "password", root / "stream.out")),
+            ("read (no temp file)",
+             None,
+             lambda: stream_read(utils, root / "stream.encrypted")),
+        ]
+
+        print(f"file: {size_mb} MB")
+        print(f"{'case':22}{'legacy ms':>11}{'stream ms':>11}{'legacy MB':>11}{'stream MB':>11}")
+        for name, legacy, current in cases:
+            legacy_ms, legacy_mb = measure(legacy) if legacy else (float('nan'), float('nan'))
+            current_ms, current_mb = measure(current)
+            print(f"{name:22}{legacy_ms:>11.0f}{current_ms:>11.0f}{legacy_mb:>11.1f}{current_mb:>11.1f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Backup encryption benchmark")
+    parser.add_argument('--size-mb', type=int, default=100)
+    args = parser.parse_args()
+
+    run_benchmark(args.size_mb)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# scripts/benchmark_backup_sync.py
+"""
+Backup Sync Benchmark Script
+差分同期と従来の全量コピーによるバックアップ同期の時間・書き込み量の比較
+"""
+
+import argparse
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.backup_utils import BackupConfig, BackupUtils, CompressionType
+from src.utils.delta_sync import DeltaSync
+
+
+def create_tree(root: Path, files: int, file_kb: int, seed: int = 0):
+    """ベンチマーク用のソースツリーを作成"""
+    rng = random.Random(seed)
+    for i in range(files):
+        directory = root / f"pkg{i % 20}"
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"file_{i}.bin").write_bytes(rng.randbytes(file_kb * 1024))
+
+
+def modify_tree(root: Path, count: int, rng: random.Random):
+    """いくつかのファイルを書き換え"""
+    paths = sorted(root.rglob("*.bin"))
+    for path in rng.sample(paths, count):
+        content = path.read_bytes()
+        middle = len(content) // 2
+        path.write_bytes(content[:middle] + rng.randbytes(256) + content[middle:])
+
+
+def legacy_copy(source: Path, target: Path):
+    """従来の同期（存在しないバックアップを丸ごとコピー）"""
+    target.mkdir(parents=True, exist_ok=True)
+    for path in source.iterdir():
+        if path.is_file() and not (target / path.name).exists():
+            shutil.copy2(path, target / path.name)
+
+
+def measure(func, *args):
+    """所要時間（ms）と戻り値"""
+    start = time.perf_counter()
+    result = func(*args)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def run_benchmark(files: int, file_kb: int, rounds: int, changed: int, workers: int):
+    """ベンチマークを実行"""
+    root = Path(tempfile.mkdtemp(prefix="sync_bench_"))
+    try:
+        source = root / "source"
+        create_tree(source, files, file_kb)
+        utils = BackupUtils()
+        config = BackupConfig(source_paths=[str(source)], backup_directory=str(root / "backups"),
+                              compression_type=CompressionType.ZIP, compression_level=1,
+                              max_backups=rounds + 1, verify_backup=False)
+        print(f"source: {files} files x {file_kb} KB, {changed} files edited per backup, workers={workers}")
+
+        rng = random.Random(1)
+        sync = DeltaSync(root / "delta", workers=workers)
+        print(f"{'round':>6}{'backup MB':>11}{'copy ms':>10}{'delta ms':>10}{'copy MB':>9}{'delta MB':>10}")
+        for index in range(rounds):
+            if index:
+                modify_tree(source, changed, rng)
+            info = utils.create_backup(config)
+            backup = Path(info.backup_path)
+
+            copy_ms, _ = measure(legacy_copy, backup.parent, root / "copy")
+            delta_ms, stats = measure(sync.sync_files, [(backup, backup.name)])
+            print(f"{index + 1:>6}{backup.stat().st_size / 1024 / 1024:>11.1f}{copy_ms:>10.0f}{delta_ms:>10.0f}"
+                  f"{backup.stat().st_size / 1024 / 1024:>9.1f}{stats.written_bytes / 1024 / 1024:>10.2f}")
+        sync.close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Backup sync benchmark")
+    parser.add_argument('--files', type=int, default=200)
+    parser.add_argument('--file-kb', type=int, default=256)
+    parser.add_argument('--rounds', type=int, default=4)
+    parser.add_argument('--changed', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    run_benchmark(args.files, args.file_kb, args.rounds, args.changed, args.workers)
+
+
+if __name__ == "__main__":
+    main()
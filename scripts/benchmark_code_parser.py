@@ -0,0 +1,181 @@
+# scripts/benchmark_code_parser.py
+"""
+Code Parser Benchmark Script
+Pythonチャンク分割のベンチマーク（従来の2回走査との比較）
+JavaScriptチャンク分割のベンチマーク（正規表現とtree-sitterの比較）
+"""
+
+import argparse
+import ast
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.code_parser import CodeParser
+
+
+def legacy_parse_python(parser: CodeParser, content: str, file_path: str) -> List[Dict[str, Any]]:
+    """従来の_parse_python（ast.walkを2回 + 関数毎にクラス配下を再走査）"""
+    chunks = []
+    tree = ast.parse(content)
+
+    imports = []
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            segment = ast.get_source_segment(content, node)
+            if segment:
+                imports.append(segment)
+    if imports:
+        chunks.append({'content': '\n'.join(imports), 'type': 'imports'})
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ClassDef):
+            chunks.append({'content': ast.get_source_segment(content, node), 'type': 'class'})
+        elif isinstance(node, ast.FunctionDef):
+            if parser._is_top_level_function(tree, node):
+                chunks.append({'content': ast.get_source_segment(content, node), 'type': 'function'})
+    return chunks
+
+
+def generate_module(target_lines: int) -> str:
+    """クラス・メソッド・関数を含む大きなモジュールを生成"""
+    parts = ["import os", "import sys", "from typing import Any, Dict, List", ""]
+    index = 0
+    while len(parts) < target_lines:
+        parts.extend([
+            "@dataclass",
+            f"class Model{index}:",
+            f'    """Model {index}"""',
+            "    value: int = 0",
+            "",
+            "    def compute(self, x: int, y: int = 1) -> int:",
+            "        total = 0",
+            "        for i in range(x):",
+            "            total += i * y + self.value",
+            "        return total",
+            "",
+            "    async def fetch(self, key: str) -> Dict[str, Any]:",
+            "        return {'key': key, 'value': self.value}",
+            "",
+            f"def helper_{index}(items: List[int]) -> int:",
+            "    def inner(v):",
+            "        return v * 2",
+            "    return sum(inner(v) for v in items)",
+            "",
+        ])
+        index += 1
+    return "\n".join(parts)
+
+
+def generate_js_module(target_lines: int) -> str:
+    """クラス・メソッド・アロー関数を含む大きなJSモジュールを生成"""
+    parts = ["import fs from 'fs';", "const path = require('path');", ""]
+    index = 0
+    while len(parts) < target_lines:
+        parts.extend([
+            f"export class Service{index} {{",
+            "  constructor(options) {",
+            "    this.options = options;",
+            "  }",
+            "",
+            "  async fetch(key) {",
+            "    const value = await this.options.load(key);",
+            "    return value || null;",
+            "  }",
+            "}",
+            "",
+            f"export const transform{index} = (items) => items.map((v) => v * 2);",
+            "",
+            f"function helper{index}(value) {{",
+            "  return value + 1;",
+            "}",
+            "",
+        ])
+        index += 1
+    return "\n".join(parts)
+
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    """最良の所要時間（ms）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run_benchmark(lines: int, repeat: int, legacy_max_lines: int):
+    """ベンチマークを実行"""
+    parser = CodeParser(max_chunk_size=10 ** 9)
+    inputs = {
+        'demo_code.py': (project_root / "data" / "examples" / "demo_code.py").read_text(encoding='utf-8'),
+        f'generated_{lines // 1000}k': generate_module(lines),
+    }
+
+    print(f"{'input':20}{'lines':>8}{'legacy ms':>12}{'single-pass ms':>16}{'speedup':>10}")
+    for name, content in inputs.items():
+        line_count = content.count('\n') + 1
+        single_ms = measure(lambda: parser._parse_python(content, name), repeat)
+        # 従来方式は関数数×クラス配下のノード数で増えるため、大きな入力では省略可能
+        if line_count > legacy_max_lines:
+            print(f"{name:20}{line_count:>8}{'skipped':>12}{single_ms:>16.1f}{'-':>10}")
+            continue
+        legacy_ms = measure(lambda: legacy_parse_python(parser, content, name), repeat)
+        print(f"{name:20}{line_count:>8}{legacy_ms:>12.1f}{single_ms:>16.1f}"
+              f"{legacy_ms / single_ms:>9.1f}x")
+
+
+def run_js_benchmark(lines: int, repeat: int):
+    """JavaScriptのベンチマークを実行"""
+    regex_parser = CodeParser(max_chunk_size=10 ** 9, use_tree_sitter=False)
+    tree_parser = CodeParser(max_chunk_size=10 ** 9)
+    if tree_parser.tree_sitter is None or not tree_parser.tree_sitter.supports('javascript'):
+        print("tree-sitter（tree_sitter_javascript）が未インストールのためJSの計測を省略")
+        return
+
+    content = generate_js_module(lines)
+    file_path = f"generated_{lines // 1000}k.js"
+    line_count = content.count('\n') + 1
+    regex_ms = measure(lambda: regex_parser._parse_javascript(content, file_path), repeat)
+
+    def full_parse():
+        tree_parser.tree_sitter.forget(file_path)
+        tree_parser.tree_sitter.parse_chunks(content, file_path, 'javascript')
+    full_ms = measure(full_parse, repeat)
+
+    # 1行だけ変更した内容の差分再解析
+    edited = content.replace("return value + 1;", "return value + 2;", 1)
+    def incremental_parse():
+        tree_parser.tree_sitter.parse_chunks(content, file_path, 'javascript')
+        start = time.perf_counter()
+        tree_parser.tree_sitter.parse_chunks(edited, file_path, 'javascript')
+        return time.perf_counter() - start
+    incremental_ms = min(incremental_parse() for _ in range(repeat)) * 1000
+
+    print()
+    print(f"{'input':20}{'lines':>8}{'regex ms':>12}{'tree-sitter ms':>16}{'reparse ms':>12}")
+    print(f"{file_path:20}{line_count:>8}{regex_ms:>12.1f}{full_ms:>16.1f}{incremental_ms:>12.1f}")
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Code parser benchmark")
+    parser.add_argument('--lines', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--legacy-max-lines', type=int, default=5000,
+                        help="従来方式を計測する最大行数（50k行では数時間かかる）")
+    parser.add_argument('--js-lines', type=int, default=5000)
+    args = parser.parse_args()
+
+    run_benchmark(args.lines, args.repeat, args.legacy_max_lines)
+    run_js_benchmark(args.js_lines, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# scripts/benchmark_content_search.py
+"""
+Content Search Benchmark Script
+トライグラムインデックスによる内容検索と従来の全ファイル読み込みによる検索の比較
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, List
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.content_index import ContentIndex
+from src.utils.dir_scanner import DirectoryScanner
+
+WORDS = [
+    "value", "result", "config", "handler", "request", "response", "session", "manager",
+    "buffer", "stream", "parser", "token", "context", "message", "service", "update",
+]
+
+
+def create_tree(root: Path, files: int, lines_per_file: int, seed: int = 0):
+    """ベンチマーク用のソースツリーを作成"""
+    rng = random.Random(seed)
+    for i in range(files):
+        directory = root / f"pkg{i % 50}" / f"mod{i % 7}"
+        directory.mkdir(parents=True, exist_ok=True)
+        lines = []
+        for j in range(lines_per_file):
+            a, b, c = rng.sample(WORDS, 3)
+            lines.append(f"    {a}_{j % 97} = {b}.{c}_{rng.randrange(10000)}({a})\n")
+        if i % 500 == 0:
+            lines.append("    rare_identifier_marker = True\n")
+        (directory / f"file_{i}.py").write_text(f"def func_{i}():\n" + "".join(lines), encoding='utf-8')
+
+
+def legacy_search(root: Path, term: str) -> List[str]:
+    """従来のFileService._search_in_file_content相当（全ファイルを読み込んで小文字化）"""
+    matches = []
+    for entry in DirectoryScanner().scan(root):
+        with open(entry.path, 'r', encoding='utf-8', errors='ignore') as f:
+            if term.lower() in f.read().lower():
+                matches.append(entry.path)
+    return matches
+
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    """最良の所要時間（ms）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run_benchmark(files: int, lines_per_file: int, repeat: int):
+    """ベンチマークを実行"""
+    root = Path(tempfile.mkdtemp(prefix="content_bench_"))
+    try:
+        create_tree(root / "tree", files, lines_per_file)
+        total = DirectoryScanner().total_size(root / "tree")
+
+        index = ContentIndex(str(root / "index.db"), exclude_dirs=())
+        start = time.perf_counter()
+        index.sync(str(root / "tree"))
+        build_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        index.sync(str(root / "tree"))
+        resync_ms = (time.perf_counter() - start) * 1000
+
+        print(f"tree: {files} files, {total / 1024 / 1024:.1f} MB, "
+              f"index: {os.path.getsize(root / 'index.db') / 1024 / 1024:.1f} MB")
+        print(f"build: {build_ms:.0f} ms, resync (unchanged): {resync_ms:.0f} ms")
+
+        cases = [
+            ("rare literal", "rare_identifier_marker", False),
+            ("regex", r"rare_\w+_marker = True", True),
+        ]
+        print(f"{'case':20}{'legacy ms':>12}{'indexed ms':>12}{'speedup':>10}{'hits':>8}")
+        for name, query, regex in cases:
+            legacy_ms = measure(lambda: legacy_search(root / "tree", "rare_identifier_marker"), repeat)
+            indexed_ms = measure(lambda: index.search(query, regex=regex), repeat)
+            hits = len(index.search(query, regex=regex))
+            print(f"{name:20}{legacy_ms:>12.1f}{indexed_ms:>12.1f}{legacy_ms / indexed_ms:>9.1f}x{hits:>8}")
+        index.close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Content search benchmark")
+    parser.add_argument('--files', type=int, default=5000)
+    parser.add_argument('--lines-per-file', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    run_benchmark(args.files, args.lines_per_file, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
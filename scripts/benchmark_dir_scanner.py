@@ -0,0 +1,133 @@
+# scripts/benchmark_dir_scanner.py
+"""
+Directory Scanner Benchmark Script
+os.scandirによる走査と従来のrglob/os.walkによる走査の比較
+"""
+
+import argparse
+import hashlib
+import mimetypes
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, List
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.dir_scanner import DirectoryScanner
+
+
+def create_tree(root: Path, directories: int, files_per_directory: int, depth: int):
+    """ベンチマーク用のディレクトリツリーを作成"""
+    for i in range(directories):
+        directory = root.joinpath(*[f"level{d}_{i % (d + 3)}" for d in range(depth)], f"dir{i}")
+        directory.mkdir(parents=True, exist_ok=True)
+        for j in range(files_per_directory):
+            (directory / f"module_{j}.py").write_text(f"def func_{j}():\n    return {j}\n" * 20)
+    # 除外対象のディレクトリ
+    vendor = root / "node_modules" / "pkg"
+    vendor.mkdir(parents=True, exist_ok=True)
+    for j in range(files_per_directory * 10):
+        (vendor / f"index_{j}.js").write_text("module.exports = {};\n")
+
+
+def legacy_search(root: Path, pattern: str) -> List[Any]:
+    """従来のFileService.search_files相当（rglob + 全項目のget_file_info）"""
+    results = []
+    for path in root.rglob(pattern):
+        stat = path.stat()
+        mimetypes.guess_type(str(path))
+        if not path.is_dir() and stat.st_size < 10 * 1024 * 1024:
+            digest = hashlib.md5()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(4096), b""):
+                    digest.update(chunk)
+        with open(path, 'r', encoding='utf-8') as f:
+            preview = [line for _, line in zip(range(10), f)]
+        results.append((str(path.absolute()), stat.st_size, path.is_dir(), preview))
+    return results
+
+
+def legacy_list_files(root: Path) -> List[str]:
+    """従来のFileUtils.list_files(recursive=True)相当"""
+    files = []
+    for current, dirs, filenames in os.walk(root):
+        files.extend(os.path.join(current, d) for d in dirs)
+        files.extend(os.path.join(current, f) for f in filenames)
+    return sorted(files)
+
+
+def legacy_directory_size(root: Path) -> int:
+    """従来のFileUtils.get_directory_size相当"""
+    total = 0
+    for current, _, filenames in os.walk(root):
+        for filename in filenames:
+            total += os.path.getsize(os.path.join(current, filename))
+    return total
+
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    """最良の所要時間（ms）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run_benchmark(directories: int, files_per_directory: int, depth: int, repeat: int, workers: int):
+    """ベンチマークを実行"""
+    root = Path(tempfile.mkdtemp(prefix="scanner_bench_"))
+    try:
+        create_tree(root, directories, files_per_directory, depth)
+        scanner = DirectoryScanner()
+        pruning = DirectoryScanner(exclude_dirs={'node_modules'})
+        parallel = DirectoryScanner(exclude_dirs={'node_modules'}, max_workers=workers)
+
+        cases = [
+            ("search *.py (names only)",
+             lambda: legacy_search(root, "*.py"),
+             lambda: [(e.path, e.stat().st_size) for e in pruning.scan(root, pattern="*.py")]),
+            ("list_files recursive",
+             lambda: legacy_list_files(root),
+             lambda: sorted(e.path for e in scanner.scan(root, include_dirs=True))),
+            ("directory size",
+             lambda: legacy_directory_size(root),
+             lambda: scanner.total_size(root)),
+            (f"list (parallel x{workers})",
+             lambda: legacy_list_files(root),
+             lambda: [e.path for e in parallel.scan(root, include_dirs=True)]),
+        ]
+
+        file_count = sum(1 for _ in scanner.scan(root))
+        print(f"tree: {file_count} files, {directories} directories (cpu: {os.cpu_count()})")
+        print(f"{'case':30}{'legacy ms':>12}{'scandir ms':>12}{'speedup':>10}")
+        for name, legacy, current in cases:
+            legacy_ms = measure(legacy, repeat)
+            current_ms = measure(current, repeat)
+            print(f"{name:30}{legacy_ms:>12.1f}{current_ms:>12.1f}{legacy_ms / current_ms:>9.1f}x")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Directory scanner benchmark")
+    parser.add_argument('--directories', type=int, default=500)
+    parser.add_argument('--files-per-directory', type=int, default=20)
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    run_benchmark(args.directories, args.files_per_directory, args.depth, args.repeat, args.workers)
+
+
+if __name__ == "__main__":
+    main()
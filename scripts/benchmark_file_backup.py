@@ -0,0 +1,125 @@
+# scripts/benchmark_file_backup.py
+"""
+File Backup Benchmark Script
+保存時バックアップ（版管理ストア）と従来の全量コピーの時間・容量の比較
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils import version_store
+from src.utils.version_store import VersionStore
+
+
+def legacy_backup(source: Path, backup_dir: Path, max_backups: int, index: int):
+    """従来のバックアップ（全量コピー・再読み込みでMD5・ディレクトリ全体のglob）"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    backup = backup_dir / f"{source.stem}_{timestamp}_{index}{source.suffix}"
+    shutil.copy2(source, backup)
+    hashlib.md5(backup.read_bytes()).hexdigest()
+    backups = sorted(backup_dir.glob(f"{source.stem}_*"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in backups[max_backups:]:
+        old.unlink()
+
+
+def save(path: Path, content: bytes):
+    """エディタの保存（一時ファイルに書き込んで置き換え）"""
+    temp = path.with_name(path.name + ".tmp")
+    temp.write_bytes(content)
+    os.replace(temp, path)
+
+
+def edit(content: bytes, rng: random.Random) -> bytes:
+    """途中に1行挿入"""
+    position = content.find(b"\n", rng.randrange(len(content))) + 1
+    return content[:position] + f"# edited {rng.random()}\n".encode() + content[position:]
+
+
+def directory_size(path: Path) -> int:
+    """ディレクトリ以下の合計サイズ"""
+    return sum(entry.stat().st_size for entry in path.rglob("*") if entry.is_file())
+
+
+def measure(path: Path, content: bytes, saves: int, backup) -> float:
+    """保存前のバックアップの平均時間（ms）"""
+    rng = random.Random(1)
+    elapsed = 0.0
+    for _ in range(saves):
+        start = time.perf_counter()
+        backup()
+        elapsed += time.perf_counter() - start
+        content = edit(content, rng)
+        save(path, content)
+    return elapsed / saves * 1000
+
+
+def run_benchmark(size_mb: int, saves: int, max_backups: int):
+    """ベンチマークを実行"""
+    root = Path(tempfile.mkdtemp(prefix="file_backup_bench_"))
+    try:
+        rng = random.Random(0)
+        line_count = size_mb * 1024 * 1024 // 40
+        content = "".join(f"value_{i} = {rng.randrange(1 << 40)}\n" for i in range(line_count)).encode()
+        print(f"file: {len(content) / 1024 / 1024:.1f} MB, {saves} saves, max_backups={max_backups}")
+
+        results = {}
+        for name in ("legacy", "link", "delta"):
+            work = root / name
+            work.mkdir()
+            source = work / "large.py"
+            source.write_bytes(content)
+            backup_dir = work / "backups"
+            backup_dir.mkdir()
+
+            if name == "legacy":
+                counter = iter(range(saves))
+                ms = measure(source, content, saves,
+                             lambda: legacy_backup(source, backup_dir, max_backups, next(counter)))
+            else:
+                original_reflink = version_store._reflink
+                if name == "delta":
+                    # reflink非対応のファイルシステムを想定
+                    version_store._reflink = lambda source, target: False
+                store = VersionStore(backup_dir)
+
+                def backup(store=store, replacing=(name == "link")):
+                    store.save_version(source, replacing=replacing)
+                    store.prune(source, max_backups)
+
+                ms = measure(source, content, saves, backup)
+                store.close()
+                version_store._reflink = original_reflink
+            results[name] = (ms, directory_size(backup_dir))
+
+        print(f"{'mode':>8}{'ms/save':>10}{'store MB':>10}")
+        for name, (ms, size) in results.items():
+            print(f"{name:>8}{ms:>10.1f}{size / 1024 / 1024:>10.1f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="File backup benchmark")
+    parser.add_argument('--size-mb', type=int, default=20)
+    parser.add_argument('--saves', type=int, default=10)
+    parser.add_argument('--max-backups', type=int, default=20)
+    args = parser.parse_args()
+
+    run_benchmark(args.size_mb, args.saves, args.max_backups)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# scripts/benchmark_file_reader.py
+"""
+File Reader Benchmark Script
+ストリーミング・mmap読み込みと従来の全体読み込みの時間・ピークメモリの比較
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Tuple
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils import file_reader
+
+
+def create_log(path: Path, size_mb: int):
+    """ベンチマーク用のログファイルを作成"""
+    line = "2024-01-01 00:00:00,000 INFO  [worker-3] request handled in 12ms status=200 path=/api/v1/items\n"
+    block = line * (1024 * 1024 // len(line))
+    with open(path, 'w', encoding='utf-8') as f:
+        for _ in range(size_mb):
+            f.write(block)
+
+
+def legacy_hash(path: Path) -> str:
+    """従来のハッシュ計算（4KB単位の読み込み）"""
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(4096), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def legacy_preview(path: Path) -> str:
+    """従来のFileUtils.read_file経由のプレビュー（全体を読み込んでから先頭10行）"""
+    with open(path, 'rb') as f:
+        f.read(10000)
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return '\n'.join(f.read().splitlines()[:10])
+
+
+def legacy_chunks(path: Path, max_chars: int) -> int:
+    """従来の全体読み込みによる行単位のチャンク分割"""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        lines = f.read().splitlines(keepends=True)
+    count, size = 0, 0
+    for line in lines:
+        if size + len(line) > max_chars:
+            count, size = count + 1, 0
+        size += len(line)
+    return count + 1
+
+
+def measure(func: Callable[[], Any]) -> Tuple[float, float]:
+    """所要時間（ms）とPythonヒープのピーク（MB）"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1000, peak / 1024 / 1024
+
+
+def run_benchmark(size_mb: int, max_chars: int):
+    """ベンチマークを実行"""
+    root = Path(tempfile.mkdtemp(prefix="reader_bench_"))
+    try:
+        path = root / "app.log"
+        create_log(path, size_mb)
+
+        cases = [
+            ("md5 hash",
+             lambda: legacy_hash(path),
+             lambda: file_reader.hash_file(path, hashlib.md5()).hexdigest()),
+            ("preview (10 lines)",
+             lambda: legacy_preview(path),
+             lambda: '\n'.join(line for _, line in zip(range(10), file_reader.iter_lines(path)))),
+            (f"line chunks ({max_chars})",
+             lambda: legacy_chunks(path, max_chars),
+             lambda: sum(1 for _ in file_reader.iter_line_chunks(path, max_chars))),
+        ]
+
+        print(f"file: {os.path.getsize(path) / 1024 / 1024:.0f} MB")
+        print(f"{'case':24}{'legacy ms':>11}{'new ms':>10}{'legacy MB':>11}{'new MB':>9}")
+        for name, legacy, current in cases:
+            legacy_ms, legacy_mb = measure(legacy)
+            current_ms, current_mb = measure(current)
+            print(f"{name:24}{legacy_ms:>11.0f}{current_ms:>10.0f}{legacy_mb:>11.1f}{current_mb:>9.1f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="File reader benchmark")
+    parser.add_argument('--size-mb', type=int, default=200)
+    parser.add_argument('--max-chars', type=int, default=100000)
+    args = parser.parse_args()
+
+    run_benchmark(args.size_mb, args.max_chars)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# scripts/benchmark_project_analysis.py
+"""
+Project Analysis Benchmark Script
+ヘルパー毎に走査・読み込みを行う従来の解析と、1回の走査によるシグナル収集（キャッシュなし・あり）の比較
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.file_service import FileService, FileType
+from src.services.project_analyzer import ProjectScanner
+
+
+def file_type(name):
+    """FileService.get_file_type（インスタンスの状態は使わない）"""
+    return FileService.get_file_type(None, name)
+
+
+def legacy_analyze(root: Path) -> dict:
+    """従来の解析（ファイル一覧の後、各ヘルパーがマニフェストやCSSを個別に読み込む）"""
+    files = []
+    for current, dirs, names in os.walk(root):
+        dirs[:] = [name for name in dirs if not name.startswith('.')]
+        for name in names:
+            if not name.startswith('.'):
+                path = os.path.join(current, name)
+                files.append((name, os.path.getsize(path), file_type(name)))
+
+    file_types = {}
+    for _, _, ft in files:
+        file_types[ft] = file_types.get(ft, 0) + 1
+
+    frameworks = set()
+    requirements = root / 'requirements.txt'
+    if file_types.get(FileType.PYTHON) and requirements.exists():
+        content = requirements.read_text(encoding='utf-8').lower()
+        frameworks.update(name for name in ('django', 'flask', 'pandas', 'numpy') if name in content)
+    if file_types.get(FileType.HTML):
+        for css_file in root.rglob('*.css'):
+            if 'bootstrap' in css_file.read_text(encoding='utf-8', errors='ignore').lower():
+                frameworks.add('bootstrap')
+
+    dependencies = []
+    if requirements.exists():
+        for line in requirements.read_text(encoding='utf-8').split('\n'):
+            if line.strip():
+                dependencies.append(line.split('==')[0])
+    package_json = root / 'package.json'
+    if package_json.exists():
+        dependencies.extend(json.loads(package_json.read_text(encoding='utf-8')).get('dependencies', {}))
+
+    # スコア毎にファイル一覧を走査
+    large = sum(1 for _, size, _ in files if size > 50000)
+    tests = sum(1 for name, _, _ in files if 'test' in name.lower())
+    docs = sum(1 for _, _, ft in files if ft == FileType.MARKDOWN)
+    readme = any(name.lower() == 'readme.md' for name, _, _ in files)
+    return {'files': len(files), 'frameworks': frameworks, 'large': large, 'tests': tests,
+            'docs': docs, 'readme': readme, 'dependencies': dependencies}
+
+
+def create_project(root: Path, files: int, vendored: int):
+    """ベンチマーク用のプロジェクトを作成（node_modules配下に依存パッケージのファイルを置く）"""
+    (root / 'static').mkdir(parents=True)
+    (root / 'requirements.txt').write_text("flask==3.0\npandas>=2\nrequests\n", encoding='utf-8')
+    (root / 'README.md').write_text("# bench\n", encoding='utf-8')
+    (root / 'index.html').write_text("<html></html>\n", encoding='utf-8')
+    (root / 'static' / 'site.css').write_text("/* bootstrap */\n" + "a{color:red}\n" * 5000, encoding='utf-8')
+    source = "import os\nfrom flask import Flask\n\n" + "def handler(x):\n    return x\n" * 200
+    for i in range(files):
+        path = root / f"pkg_{i % 40}" / (f"test_{i}.py" if i % 5 == 0 else f"module_{i}.py")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source, encoding='utf-8')
+    for i in range(vendored):
+        path = root / 'node_modules' / f"lib_{i % 100}" / f"index_{i}.js"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("module.exports = {};\n", encoding='utf-8')
+    # 更新直後のファイルはキャッシュされないため更新時刻を過去にする
+    for current, _, names in os.walk(root):
+        for name in names:
+            os.utime(os.path.join(current, name), (1_000_000_000, 1_000_000_000))
+
+
+def measure(func, *args):
+    """所要時間（ms）"""
+    start = time.perf_counter()
+    func(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def run_benchmark(files: int, vendored: int, workers: int):
+    """ベンチマークを実行"""
+    root = Path(tempfile.mkdtemp(prefix="analysis_bench_"))
+    try:
+        project = root / "project"
+        create_project(project, files, vendored)
+        print(f"{files} source files + {vendored} vendored files, workers={workers}")
+
+        cache_path = root / "cache.db"
+        first_update = []
+
+        def single_scan():
+            start = time.perf_counter()
+            scanner = ProjectScanner(file_type, cache_path=cache_path, workers=workers)
+            scanner.scan(project, lambda stage, signals: first_update.append(time.perf_counter() - start))
+            scanner.close()
+
+        results = [
+            ("legacy", measure(legacy_analyze, project)),
+            ("single scan cold", measure(single_scan)),
+            ("single scan warm", measure(single_scan)),
+        ]
+
+        print(f"{'mode':<20}{'time ms':>10}")
+        for name, elapsed in results:
+            print(f"{name:<20}{elapsed:>10.0f}")
+        print(f"first partial result after {first_update[0] * 1000:.1f} ms")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Project analysis benchmark")
+    parser.add_argument('--files', type=int, default=3000)
+    parser.add_argument('--vendored', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    run_benchmark(args.files, args.vendored, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# scripts/benchmark_project_export.py
+"""
+Project Export Benchmark Script
+逐次エクスポートと、ファイル一覧・文書全体をメモリ上に作る従来方式の所要時間・ピークメモリの比較
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.plugins.export_tools.export_formats import HTMLExporter, ZipExporter
+
+
+def iter_file_infos(root: Path):
+    """エクスポートプラグインと同じ形式のファイル情報を走査順に返す"""
+    for current, dirs, files in os.walk(root):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(current, name)
+            yield {
+                'path': path,
+                'relative_path': os.path.relpath(path, root),
+                'name': name,
+                'size': os.path.getsize(path),
+                'language': 'python',
+            }
+
+
+def legacy_html(project_data: dict, output: Path):
+    """従来のHTMLエクスポート（内容を含む文書全体を文字列で作成してから書き込む）"""
+    html = f"<html><body><h1>{project_data['name']}</h1>\n"
+    for file_info in project_data['files']:
+        with open(file_info['path'], 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read().replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+        html += f'<div class="file-item">{file_info["relative_path"]}</div>\n<pre>{content}</pre>\n'
+    html += '</body></html>'
+    output.write_text(html, encoding='utf-8')
+
+
+def legacy_zip(project_data: dict, output: Path):
+    """従来のZIPエクスポート（1スレッドで圧縮）"""
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        for file_info in project_data['files']:
+            zipf.write(file_info['path'], file_info['relative_path'])
+
+
+def create_project(root: Path, files: int, file_kb: int):
+    """ベンチマーク用のプロジェクトを作成"""
+    line = b"def handler(request): return render(request, '<index.html>')\n"
+    content = line * max(1, file_kb * 1024 // len(line))
+    for i in range(files):
+        path = root / f"pkg_{i % 50}" / f"module_{i}.py"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+
+
+def measure(func, *args):
+    """所要時間（ms）とピークメモリ（MB）"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1000, peak / (1024 * 1024)
+
+
+def run_benchmark(files: int, file_kb: int, workers: int):
+    """ベンチマークを実行"""
+    root = Path(tempfile.mkdtemp(prefix="export_bench_"))
+    try:
+        project = root / "project"
+        create_project(project, files, file_kb)
+        print(f"{files} files x {file_kb} KB, workers={workers}")
+
+        info = {
+            'name': 'project',
+            'path': str(project),
+            'metadata': {'export_time': 'now', 'total_files': files, 'total_size': 0},
+        }
+        options = {'include_content': True, 'workers': workers}
+
+        def legacy(export):
+            project_data = dict(info, files=list(iter_file_infos(project)))
+            export(project_data, root / "legacy.out")
+
+        def streaming(exporter):
+            exporter.export_project_stream(info, iter_file_infos(project), str(root / "stream.out"), options)
+
+        results = [
+            ("html legacy", measure(legacy, legacy_html)),
+            ("html streaming", measure(streaming, HTMLExporter())),
+            ("zip legacy", measure(legacy, legacy_zip)),
+            ("zip streaming", measure(streaming, ZipExporter())),
+        ]
+
+        print(f"{'mode':<16}{'time ms':>10}{'peak MB':>10}")
+        for name, (elapsed, peak) in results:
+            print(f"{name:<16}{elapsed:>10.0f}{peak:>10.1f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Project export benchmark")
+    parser.add_argument('--files', type=int, default=10000)
+    parser.add_argument('--file-kb', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    run_benchmark(args.files, args.file_kb, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# scripts/benchmark_repository_indexer.py
+"""
+Repository Indexer Benchmark Script
+ワーカー数毎のリポジトリインデックス作成時間と、数ファイル変更後の再インデックス時間を計測
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.repository_indexer import RepositoryIndexer
+from src.core.vector_store import VectorStore
+
+
+def generate_repository(root: Path, files: int, functions_per_file: int):
+    """Pythonファイルを含むリポジトリを生成"""
+    for i in range(files):
+        package = root / f"pkg_{i // 100}"
+        package.mkdir(parents=True, exist_ok=True)
+        parts = ["import os", "from typing import List", ""]
+        for j in range(functions_per_file):
+            parts.extend([
+                f"class Model{j}:",
+                "    def compute(self, items: List[int]) -> int:",
+                "        total = 0",
+                "        for item in items:",
+                f"            total += item * {j}",
+                "        return total",
+                "",
+                f"def helper_{i}_{j}(value):",
+                f"    return value + {j}",
+                "",
+            ])
+        (package / f"module_{i}.py").write_text("\n".join(parts), encoding='utf-8')
+
+
+def run_benchmark(files: int, functions_per_file: int, workers_list):
+    """ベンチマークを実行"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        repo = Path(temp_dir) / "repo"
+        generate_repository(repo, files, functions_per_file)
+
+        print(f"{'workers':>8}{'mode':>10}{'seconds':>10}{'files/s':>10}{'chunks':>10}{'reindex s':>11}")
+        for workers in workers_list:
+            store = VectorStore(store_path=str(Path(temp_dir) / f"store_{workers}.db"))
+            indexer = RepositoryIndexer(store, max_workers=workers, use_processes=workers > 1)
+            start = time.perf_counter()
+            progress = indexer.index_repository(str(repo), retrain=False)
+            elapsed = time.perf_counter() - start
+
+            # 数ファイルだけ変更して再インデックス
+            for changed in sorted(repo.rglob("module_*.py"))[:5]:
+                changed.write_text(changed.read_text(encoding='utf-8') + "\n# changed\n", encoding='utf-8')
+            start = time.perf_counter()
+            indexer.index_repository(str(repo), retrain=False)
+            reindex_elapsed = time.perf_counter() - start
+            store.close()
+
+            mode = "process" if workers > 1 else "thread"
+            print(f"{workers:>8}{mode:>10}{elapsed:>10.2f}{progress.files_parsed / elapsed:>10.0f}"
+                  f"{progress.chunks_written:>10}{reindex_elapsed:>11.2f}")
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Repository indexer benchmark")
+    parser.add_argument('--files', type=int, default=2000)
+    parser.add_argument('--functions', type=int, default=20)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+
+    run_benchmark(args.files, args.functions, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,659 @@
+# src/core/content_index.py
+"""
+コンテンツ検索インデックスモジュール
+トライグラム転置インデックスで候補ファイルを絞り込み、行単位の走査で一致箇所を確定する
+"""
+
+import io
+import os
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .file_watcher import CHANGE_DELETED, FILE_CHANGES_EVENT, FileChange, iter_changes
+from .logger import get_logger
+from ..utils.dir_scanner import DirectoryScanner
+
+try:
+    import re._parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+logger = get_logger(__name__)
+
+# 転置リストのファイルIDの型（SQLiteにはバイト列で保存）
+POSTING_DTYPE = np.dtype('<u4')
+
+
+@dataclass
+class ContentMatch:
+    """コンテンツ検索の一致箇所"""
+    file_path: str
+    line: int
+    column: int
+    line_text: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書形式に変換"""
+        return asdict(self)
+
+
+def extract_trigrams(data: bytes) -> np.ndarray:
+    """
+    バイト列に含まれるトライグラムを抽出
+
+    ASCII文字のみ小文字化し、連続する3バイトを24ビット整数として扱う。
+
+    Args:
+        data: ファイル内容
+
+    Returns:
+        np.ndarray: 重複を除いたトライグラム（昇順）
+    """
+    if len(data) < 3:
+        return np.empty(0, dtype=np.uint32)
+    values = np.frombuffer(data.lower(), dtype=np.uint8).astype(np.uint32)
+    return np.unique((values[:-2] << 16) | (values[1:-1] << 8) | values[2:])
+
+
+def query_trigrams(literals: Iterable[str], case_sensitive: bool = False) -> Set[int]:
+    """
+    検索語に必ず含まれるトライグラムを求める
+
+    大文字小文字を区別しない検索では、インデックス側の小文字化はASCIIのみのため、
+    大文字小文字を持つ非ASCII文字を含む3バイトは条件から外す（取りこぼし防止）。
+
+    Args:
+        literals: 一致箇所に必ず現れる文字列
+        case_sensitive: 大文字小文字を区別する検索か
+
+    Returns:
+        Set[int]: トライグラム
+    """
+    trigrams: Set[int] = set()
+    for literal in literals:
+        data = literal.encode('utf-8').lower()
+        if len(data) < 3:
+            continue
+        caseless = case_sensitive or all(c.isascii() or c.lower() == c.upper() for c in literal)
+        for i in range(len(data) - 2):
+            window = data[i:i + 3]
+            if caseless or window.isascii():
+                trigrams.add((window[0] << 16) | (window[1] << 8) | window[2])
+    return trigrams
+
+
+def required_literals(pattern: str, flags: int = 0) -> List[str]:
+    """
+    正規表現の一致箇所に必ず現れるリテラル文字列を抽出
+
+    連続するリテラルと、1回以上繰り返されるグループ内のリテラルを拾う。
+    選択・文字クラス・省略可能な要素は区切りとして扱う。
+
+    Args:
+        pattern: 正規表現
+        flags: reモジュールのフラグ
+
+    Returns:
+        List[str]: リテラル文字列（解析できない場合は空）
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except (re.error, TypeError, ValueError):
+        return []
+
+    literals: List[str] = []
+    current: List[str] = []
+
+    def flush():
+        if current:
+            literals.append(''.join(current))
+            current.clear()
+
+    def walk(items):
+        for op, av in items:
+            if op is sre_parse.LITERAL:
+                current.append(chr(av))
+            elif op is sre_parse.SUBPATTERN:
+                walk(av[-1])
+            elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+                flush()
+                if av[0] >= 1:
+                    walk(av[2])
+                    flush()
+            elif op is sre_parse.AT:
+                # アンカーは文字を消費しない
+                continue
+            else:
+                flush()
+
+    walk(parsed)
+    flush()
+    return literals
+
+
+class ContentIndex:
+    """
+    トライグラム転置インデックスによるコンテンツ検索クラス
+
+    ファイルIDは単調増加で採番し、変更されたファイルは新しいIDで登録し直すため、
+    転置リストは末尾への追記だけで昇順を保つ。古いIDは検索時に除外し、
+    無効なIDが増えた時点でcompactで転置リストから取り除く。
+    """
+
+    DEFAULT_MAX_FILE_SIZE = 4 * 1024 * 1024
+    BINARY_CHECK_SIZE = 8192
+    COMPACT_RATIO = 0.5
+    # 未書き込みのトライグラム数がこれを超えたら途中で書き込む（メモリ上限）
+    PENDING_FLUSH_SIZE = 4_000_000
+
+    def __init__(self,
+                 db_path: str = "./data/content_index.db",
+                 exclude_dirs: Optional[Iterable[str]] = None,
+                 max_file_size: int = DEFAULT_MAX_FILE_SIZE):
+        """
+        初期化
+
+        Args:
+            db_path: インデックスのデータベースパス
+            exclude_dirs: 索引しないディレクトリ名（Noneの場合はProjectManagerの除外設定）
+            max_file_size: 索引する最大ファイルサイズ
+        """
+        if exclude_dirs is None:
+            from .project_manager import ProjectManager
+            exclude_dirs = ProjectManager.EXCLUDE_DIRS
+
+        self.db_path = db_path
+        self.max_file_size = max_file_size
+        self.scanner = DirectoryScanner(exclude_dirs=exclude_dirs)
+
+        # パス -> (ファイルID, サイズ, 更新時刻ns) と 検索対象のファイルID -> パス
+        # （バイナリ・サイズ超過のファイルは再読み込みを避けるため前者のみに記録）
+        self._files: Dict[str, Tuple[int, int, int]] = {}
+        self._paths: Dict[int, str] = {}
+        # 未書き込みの (トライグラム配列, ファイルID)
+        self._pending: List[Tuple[np.ndarray, int]] = []
+        self._pending_size = 0
+        self._dead_count = 0
+        self._lock = threading.RLock()
+        self._event_system = None
+        self._subscriber_id = f"content_index_{id(self)}"
+
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._init_database()
+        self._load_files()
+
+    def _init_database(self):
+        """データベースを初期化"""
+        with self.connection:
+            self.connection.execute('''
+                CREATE TABLE IF NOT EXISTS files (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    file_path TEXT UNIQUE NOT NULL,
+                    size INTEGER,
+                    mtime_ns INTEGER,
+                    searchable INTEGER DEFAULT 1
+                )
+            ''')
+            self.connection.execute('''
+                CREATE TABLE IF NOT EXISTS postings (
+                    trigram INTEGER PRIMARY KEY,
+                    file_ids BLOB NOT NULL
+                )
+            ''')
+            self.connection.execute('''
+                CREATE TABLE IF NOT EXISTS metadata (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER
+                )
+            ''')
+
+    def _load_files(self):
+        """索引済みファイルの一覧を読み込む"""
+        for file_id, file_path, size, mtime_ns, searchable in self.connection.execute(
+                'SELECT id, file_path, size, mtime_ns, searchable FROM files'):
+            self._files[file_path] = (file_id, size, mtime_ns)
+            if searchable:
+                self._paths[file_id] = file_path
+        row = self.connection.execute("SELECT value FROM metadata WHERE key = 'dead_count'").fetchone()
+        self._dead_count = row[0] if row else 0
+
+    @property
+    def file_count(self) -> int:
+        """検索対象のファイル数"""
+        return len(self._paths)
+
+    def sync(self, root_path: str) -> Dict[str, int]:
+        """
+        ディレクトリ配下とインデックスを同期（サイズ・更新時刻が同じファイルは読まない）
+
+        Args:
+            root_path: 対象ディレクトリ
+
+        Returns:
+            Dict[str, int]: indexed/unchanged/removedの件数
+        """
+        root = os.path.abspath(root_path)
+        stats = {'indexed': 0, 'unchanged': 0, 'removed': 0}
+        seen: Set[str] = set()
+
+        with self._lock:
+            for entry in self.scanner.scan(root):
+                path = entry.path
+                seen.add(path)
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                known = self._files.get(path)
+                if known and known[1] == stat.st_size and known[2] == stat.st_mtime_ns:
+                    stats['unchanged'] += 1
+                elif self._index_file(path, stat):
+                    stats['indexed'] += 1
+
+            prefix = root.rstrip(os.sep) + os.sep
+            for path in [p for p in self._files if p.startswith(prefix) and p not in seen]:
+                self._remove_file(path)
+                stats['removed'] += 1
+
+            self.flush()
+
+        logger.info(f"コンテンツインデックス同期: {root} {stats}")
+        return stats
+
+    def update_file(self, file_path: str) -> bool:
+        """
+        1ファイルを再索引（存在しない・対象外のファイルは索引から削除）
+
+        Args:
+            file_path: ファイルパス
+
+        Returns:
+            bool: 索引した場合True
+        """
+        path = os.path.abspath(file_path)
+        with self._lock:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                self._remove_file(path)
+                return False
+            indexed = self._index_file(path, stat)
+            self.flush()
+            return indexed
+
+    def remove_file(self, file_path: str) -> bool:
+        """
+        ファイルを索引から削除
+
+        Args:
+            file_path: ファイルパス
+
+        Returns:
+            bool: 削除した場合True
+        """
+        with self._lock:
+            removed = self._remove_file(os.path.abspath(file_path))
+            self.flush()
+            return removed
+
+    def apply_file_changes(self, changes: Iterable[FileChange]) -> int:
+        """
+        ファイル監視の変更バッチを反映
+
+        Args:
+            changes: 変更リスト
+
+        Returns:
+            int: 再索引したファイル数
+        """
+        indexed = 0
+        with self._lock:
+            for change in changes:
+                if change.old_path:
+                    self._remove_path(os.path.abspath(change.old_path))
+                path = os.path.abspath(change.file_path)
+                if change.change_type == CHANGE_DELETED:
+                    self._remove_path(path)
+                elif change.is_directory:
+                    for entry in self.scanner.scan(path):
+                        try:
+                            indexed += self._index_file(entry.path, entry.stat())
+                        except OSError:
+                            continue
+                else:
+                    try:
+                        indexed += self._index_file(path, os.stat(path))
+                    except OSError:
+                        self._remove_file(path)
+            self.flush()
+        return indexed
+
+    def attach_event_system(self, event_system: Any, root_path: Optional[str] = None):
+        """
+        ファイル変更バッチを購読してインデックスを更新する
+
+        Args:
+            event_system: subscribe/unsubscribe_allを持つイベントシステム
+            root_path: 指定した場合はこのディレクトリ配下の変更のみ反映
+        """
+        self.detach_event_system()
+
+        def on_file_changes(event):
+            try:
+                changes = iter_changes(event, root_path)
+                if changes:
+                    self.apply_file_changes(changes)
+            except Exception as e:
+                logger.error(f"コンテンツインデックス更新エラー: {e}")
+
+        event_system.subscribe(FILE_CHANGES_EVENT, on_file_changes, subscriber_id=self._subscriber_id)
+        self._event_system = event_system
+
+    def detach_event_system(self):
+        """ファイル変更バッチの購読を解除"""
+        if self._event_system is not None:
+            self._event_system.unsubscribe_all(self._subscriber_id)
+            self._event_system = None
+
+    def is_current(self, file_path: str, stat: os.stat_result) -> bool:
+        """
+        索引済みの検索対象ファイルで、サイズ・更新時刻が一致するか
+
+        Falseのファイル（未索引・変更後未反映・サイズ超過やNULを含むため索引外）は
+        candidatesに現れないため、呼び出し側で直接走査する。
+
+        Args:
+            file_path: ファイルパス
+            stat: ファイルのstat
+
+        Returns:
+            bool: インデックスの候補だけで判定できる場合True
+        """
+        with self._lock:
+            known = self._files.get(os.path.abspath(file_path))
+            return (known is not None and known[0] in self._paths
+                    and known[1] == stat.st_size and known[2] == stat.st_mtime_ns)
+
+    def unindexed_paths(self, root_path: str) -> List[str]:
+        """
+        ディレクトリ配下でインデックスの候補だけでは判定できないファイル
+
+        Args:
+            root_path: 対象ディレクトリ
+
+        Returns:
+            List[str]: is_currentがFalseのファイルパス
+        """
+        paths = []
+        for entry in self.scanner.scan(os.path.abspath(root_path)):
+            try:
+                if not self.is_current(entry.path, entry.stat()):
+                    paths.append(entry.path)
+            except OSError:
+                continue
+        return paths
+
+    def candidates(self,
+                   query: str,
+                   regex: bool = False,
+                   case_sensitive: bool = False,
+                   root_path: Optional[str] = None) -> List[str]:
+        """
+        検索語を含み得るファイルを絞り込む
+
+        Args:
+            query: 検索語または正規表現
+            regex: 正規表現として扱うか
+            case_sensitive: 大文字小文字を区別するか
+            root_path: 指定した場合はこのディレクトリ配下のみ
+
+        Returns:
+            List[str]: 候補ファイルパス（昇順）
+        """
+        if regex and re.compile(query).flags & re.IGNORECASE:
+            # パターン内の(?i)指定
+            case_sensitive = False
+        flags = 0 if case_sensitive else re.IGNORECASE
+        literals = required_literals(query, flags) if regex else [query]
+        trigrams = query_trigrams(literals, case_sensitive)
+
+        with self._lock:
+            self.flush()
+            if trigrams:
+                file_ids = self._intersect(trigrams)
+                paths = [self._paths[i] for i in file_ids.tolist() if i in self._paths]
+            else:
+                # 絞り込みに使えるリテラルがない場合は全ファイルを走査する
+                paths = list(self._paths.values())
+
+        if root_path:
+            prefix = os.path.abspath(root_path).rstrip(os.sep) + os.sep
+            paths = [path for path in paths if path.startswith(prefix)]
+        return sorted(paths)
+
+    def search(self,
+               query: str,
+               regex: bool = False,
+               case_sensitive: bool = False,
+               root_path: Optional[str] = None,
+               max_results: int = 1000) -> List[ContentMatch]:
+        """
+        インデックスで絞り込んだファイルを走査して一致箇所を返す
+
+        Args:
+            query: 検索語または正規表現
+            regex: 正規表現として扱うか
+            case_sensitive: 大文字小文字を区別するか
+            root_path: 指定した場合はこのディレクトリ配下のみ
+            max_results: 最大件数
+
+        Returns:
+            List[ContentMatch]: 一致箇所（ファイル・行・列の順）
+        """
+        if not query:
+            return []
+        pattern = compile_query(query, regex, case_sensitive)
+
+        results: List[ContentMatch] = []
+        for path in self.candidates(query, regex, case_sensitive, root_path):
+            for match in scan_file(path, pattern):
+                results.append(match)
+                if len(results) >= max_results:
+                    return results
+        return results
+
+    def flush(self):
+        """未書き込みの転置リストをデータベースに追記してコミット"""
+        with self._lock:
+            if not self._pending:
+                self._save_dead_count()
+                return
+
+            trigrams = np.concatenate([t for t, _ in self._pending])
+            file_ids = np.concatenate([
+                np.full(len(t), file_id, dtype=POSTING_DTYPE) for t, file_id in self._pending
+            ])
+            self._pending = []
+            self._pending_size = 0
+
+            # トライグラム毎にまとめる（安定ソートでファイルIDの昇順を保つ）
+            order = np.argsort(trigrams, kind='stable')
+            trigrams = trigrams[order]
+            file_ids = file_ids[order]
+            unique, starts = np.unique(trigrams, return_index=True)
+            groups = np.split(file_ids, starts[1:])
+
+            existing = self._load_postings(unique.tolist())
+            rows = []
+            for trigram, ids in zip(unique.tolist(), groups):
+                previous = existing.get(trigram)
+                if previous is not None:
+                    ids = np.concatenate((previous, ids))
+                rows.append((trigram, ids.astype(POSTING_DTYPE).tobytes()))
+
+            with self.connection:
+                self.connection.executemany(
+                    'INSERT OR REPLACE INTO postings (trigram, file_ids) VALUES (?, ?)', rows
+                )
+            self._save_dead_count()
+
+            live = len(self._paths)
+            if self._dead_count and self._dead_count > max(live, 1) * self.COMPACT_RATIO:
+                self.compact()
+
+    def compact(self):
+        """削除・更新済みのファイルIDを転置リストから取り除く"""
+        with self._lock:
+            live = np.fromiter(self._paths, dtype=POSTING_DTYPE, count=len(self._paths))
+            live.sort()
+            updates = []
+            deletes = []
+            for trigram, blob in self.connection.execute('SELECT trigram, file_ids FROM postings'):
+                ids = np.frombuffer(blob, dtype=POSTING_DTYPE)
+                kept = ids[np.isin(ids, live, assume_unique=True)]
+                if len(kept) == 0:
+                    deletes.append((trigram,))
+                elif len(kept) != len(ids):
+                    updates.append((kept.tobytes(), trigram))
+
+            with self.connection:
+                self.connection.executemany('UPDATE postings SET file_ids = ? WHERE trigram = ?', updates)
+                self.connection.executemany('DELETE FROM postings WHERE trigram = ?', deletes)
+            self._dead_count = 0
+            self._save_dead_count()
+            logger.info(f"コンテンツインデックス圧縮: 更新 {len(updates)} / 削除 {len(deletes)}")
+
+    def close(self):
+        """インデックスを書き込んで接続を閉じる"""
+        self.detach_event_system()
+        with self._lock:
+            self.flush()
+            self.connection.close()
+
+    def _index_file(self, path: str, stat: os.stat_result) -> bool:
+        """ファイルを読み込んで転置リストに追加（書き込みはflushで行う）"""
+        data = None
+        if stat.st_size <= self.max_file_size:
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            except OSError as e:
+                logger.debug(f"コンテンツインデックス読み込みスキップ {path}: {e}")
+                self._remove_file(path)
+                return False
+            if b'\x00' in data[:self.BINARY_CHECK_SIZE]:
+                data = None
+
+        self._remove_file(path)
+        cursor = self.connection.execute(
+            'INSERT INTO files (file_path, size, mtime_ns, searchable) VALUES (?, ?, ?, ?)',
+            (path, stat.st_size, stat.st_mtime_ns, data is not None)
+        )
+        file_id = cursor.lastrowid
+        self._files[path] = (file_id, stat.st_size, stat.st_mtime_ns)
+        if data is None:
+            return False
+        self._paths[file_id] = path
+
+        trigrams = extract_trigrams(data)
+        self._pending.append((trigrams, file_id))
+        self._pending_size += len(trigrams)
+        if self._pending_size >= self.PENDING_FLUSH_SIZE:
+            self.flush()
+        return True
+
+    def _remove_file(self, path: str) -> bool:
+        """ファイルを索引から外す（転置リストのIDは検索時に除外）"""
+        known = self._files.pop(path, None)
+        if known is None:
+            return False
+        self.connection.execute('DELETE FROM files WHERE id = ?', (known[0],))
+        if self._paths.pop(known[0], None) is not None:
+            self._dead_count += 1
+        return True
+
+    def _remove_path(self, path: str):
+        """ファイルまたはディレクトリ配下のファイルを索引から外す"""
+        if not self._remove_file(path):
+            prefix = path.rstrip(os.sep) + os.sep
+            for file_path in [p for p in self._files if p.startswith(prefix)]:
+                self._remove_file(file_path)
+
+    def _intersect(self, trigrams: Set[int]) -> np.ndarray:
+        """転置リストを短い順に積集合をとる"""
+        postings = self._load_postings(list(trigrams))
+        if len(postings) < len(trigrams):
+            return np.empty(0, dtype=POSTING_DTYPE)
+
+        result = None
+        for ids in sorted(postings.values(), key=len):
+            result = ids if result is None else np.intersect1d(result, ids, assume_unique=True)
+            if len(result) == 0:
+                break
+        return result
+
+    def _load_postings(self, trigrams: List[int]) -> Dict[int, np.ndarray]:
+        """転置リストを読み込む"""
+        postings: Dict[int, np.ndarray] = {}
+        # SQLiteのパラメータ数上限に収まるよう分割
+        for start in range(0, len(trigrams), 500):
+            batch = trigrams[start:start + 500]
+            placeholders = ','.join('?' * len(batch))
+            for trigram, blob in self.connection.execute(
+                    f'SELECT trigram, file_ids FROM postings WHERE trigram IN ({placeholders})', batch):
+                postings[trigram] = np.frombuffer(blob, dtype=POSTING_DTYPE)
+        return postings
+
+    def _save_dead_count(self):
+        """無効なファイルID数を保存"""
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO metadata (key, value) VALUES ('dead_count', ?)", (self._dead_count,)
+            )
+
+
+def compile_query(query: str, regex: bool = False, case_sensitive: bool = False) -> re.Pattern:
+    """
+    検索語を正規表現にコンパイル
+
+    Args:
+        query: 検索語または正規表現
+        regex: 正規表現として扱うか
+        case_sensitive: 大文字小文字を区別するか
+
+    Returns:
+        re.Pattern: コンパイル済みパターン
+    """
+    flags = 0 if case_sensitive else re.IGNORECASE
+    return re.compile(query if regex else re.escape(query), flags)
+
+
+def scan_file(file_path: str, pattern: re.Pattern) -> Iterator[ContentMatch]:
+    """
+    ファイルを1行ずつ読み込んで一致箇所を返す（バイナリファイルは対象外）
+
+    Args:
+        file_path: ファイルパス
+        pattern: コンパイル済みパターン
+
+    Yields:
+        ContentMatch: 一致箇所（行・列は1始まり）
+    """
+    try:
+        with open(file_path, 'rb') as raw:
+            if b'\x00' in raw.read(ContentIndex.BINARY_CHECK_SIZE):
+                return
+            raw.seek(0)
+            f = io.TextIOWrapper(raw, encoding='utf-8', errors='replace')
+            for line_number, line in enumerate(f, 1):
+                for match in pattern.finditer(line):
+                    yield ContentMatch(file_path, line_number, match.start() + 1, line.rstrip('\r\n'))
+    except OSError as e:
+        logger.debug(f"コンテンツ検索読み込みスキップ {file_path}: {e}")
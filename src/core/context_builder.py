@@ -6,7 +6,10 @@
 import logging
 import json
 import re
-from typing import List, Dict, Any, Optional, Tuple, Set
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, Set, Callable
 from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime
@@ -15,6 +18,9 @@ from pathlib import Path
 
 from .vector_store import SearchResult
 from .conversation_manager import Message, MessageRole
+from .token_counter import get_token_counter
+from .context_packer import ContextPacker, PackingCandidate
+from .file_watcher import FILE_CHANGES_EVENT, iter_changes
 
 class ContextType(Enum):
     """コンテキストの種類"""
@@ -53,7 +59,7 @@ class ContextItem:
     
     def _estimate_tokens(self) -> int:
         """トークン数を推定"""
-        return int(len(self.content.split()) * 1.3)
+        return get_token_counter().count(self.content)
 
 @dataclass
 class ContextBundle:
@@ -76,6 +82,94 @@ class ContextBundle:
         """関連度別にアイテムを取得"""
         return [item for item in self.items if item.relevance == relevance]
 
+# キャッシュを無効化するファイル変更イベント
+FILE_CHANGE_EVENTS = ('file_changed', 'file_created', 'file_deleted', 'file_renamed', 'file_saved')
+
+# プロジェクトルートの指標となるファイル
+ROOT_INDICATORS = [
+    '.git', '.gitignore', 'setup.py', 'requirements.txt', 
+    'package.json', 'Cargo.toml', 'pom.xml', 'build.gradle'
+]
+
+class StageCache:
+    """
+    クエリに依存しないステージ結果のキャッシュ
+    各エントリは対象パス（スコープ）を持ち、配下のファイル変更で無効化される
+    """
+    
+    def __init__(self, ttl: Optional[float] = 300.0):
+        """
+        初期化
+        
+        Args:
+            ttl: 有効期限（秒）。ファイル変更通知がない環境での安全策（Noneで無期限）
+        """
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, Any], Tuple[float, Tuple[str, ...], Any]] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+    
+    def get_or_compute(self, stage: str, key: Any, scopes: Tuple[str, ...], compute: Callable[[], Any]) -> Any:
+        """
+        キャッシュから取得し、なければ計算して保存
+        
+        Args:
+            stage: ステージ名
+            key: キャッシュキー
+            scopes: 無効化の対象となるパス
+            compute: 値を計算する関数
+            
+        Returns:
+            Any: キャッシュ値
+        """
+        cache_key = (stage, key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry and (self.ttl is None or now - entry[0] < self.ttl):
+                self.stats['hits'] += 1
+                return entry[2]
+            self.stats['misses'] += 1
+        
+        value = compute()
+        with self._lock:
+            self._entries[cache_key] = (now, tuple(scopes), value)
+        return value
+    
+    def invalidate(self, path: Optional[str] = None, stage: Optional[str] = None) -> int:
+        """
+        キャッシュを無効化
+        
+        Args:
+            path: 変更されたパス（Noneの場合は全て）
+            stage: 対象ステージ（Noneの場合は全ステージ）
+            
+        Returns:
+            int: 無効化したエントリ数
+        """
+        changed = Path(path).resolve() if path else None
+        with self._lock:
+            targets = []
+            for cache_key, (_, scopes, _) in self._entries.items():
+                if stage and cache_key[0] != stage:
+                    continue
+                if changed is None or any(_paths_related(changed, scope) for scope in scopes):
+                    targets.append(cache_key)
+            for cache_key in targets:
+                del self._entries[cache_key]
+            self.stats['invalidations'] += len(targets)
+        return len(targets)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """統計情報を取得"""
+        with self._lock:
+            return {**self.stats, 'entries': len(self._entries)}
+
+def _paths_related(changed: Path, scope: str) -> bool:
+    """変更パスとスコープが包含関係にあるか"""
+    scope_path = Path(scope).resolve()
+    return changed == scope_path or scope_path in changed.parents or changed in scope_path.parents
+
 class ContextBuilder:
     """
     コンテキスト構築クラス
@@ -87,7 +181,11 @@ class ContextBuilder:
                  max_code_snippets: int = 10,
                  max_conversation_messages: int = 15,
                  include_file_structure: bool = True,
-                 include_related_files: bool = True):
+                 include_related_files: bool = True,
+                 parallel_stages: bool = True,
+                 max_workers: int = 4,
+                 cache_ttl: Optional[float] = 300.0,
+                 event_system: Optional[Any] = None):
         """
         初期化
         
@@ -97,6 +195,10 @@ class ContextBuilder:
             max_conversation_messages: 最大会話メッセージ数
             include_file_structure: ファイル構造を含めるか
             include_related_files: 関連ファイルを含めるか
+            parallel_stages: 独立したステージを並行実行するか
+            max_workers: ステージ実行の最大ワーカー数
+            cache_ttl: ステージキャッシュの有効期限（秒）
+            event_system: ファイル変更通知を購読するイベントシステム
         """
         self.logger = logging.getLogger(__name__)
         self.max_context_tokens = max_context_tokens
@@ -125,8 +227,108 @@ class ContextBuilder:
             RelevanceLevel.REFERENCE: 20
         }
         
+        # トークン予算内で価値を最大化するパッキング
+        self.context_packer = ContextPacker()
+        
+        # パイプライン設定
+        self.parallel_stages = parallel_stages
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        
+        # クエリに依存しないステージのキャッシュとステージ別の計測値
+        self.stage_cache = StageCache(ttl=cache_ttl)
+        self._stage_stats: Dict[str, Dict[str, float]] = {}
+        self._stage_stats_lock = threading.Lock()
+        
+        # ファイル変更通知の購読
+        self._event_system = None
+        self._subscriber_id = f"context_builder_{id(self)}"
+        if event_system is not None:
+            self.attach_event_system(event_system)
+        
         self.logger.info("ContextBuilder初期化完了")
     
+    def attach_event_system(self, event_system: Any):
+        """
+        ファイル変更通知を購読してキャッシュを無効化する
+        
+        Args:
+            event_system: subscribe/unsubscribe_allを持つイベントシステム
+        """
+        self.detach_event_system()
+        for event_name in FILE_CHANGE_EVENTS + (FILE_CHANGES_EVENT,):
+            event_system.subscribe(event_name, self._on_file_event, subscriber_id=self._subscriber_id)
+        self._event_system = event_system
+    
+    def detach_event_system(self):
+        """ファイル変更通知の購読を解除"""
+        if self._event_system is not None:
+            self._event_system.unsubscribe_all(self._subscriber_id)
+            self._event_system = None
+    
+    def _on_file_event(self, event: Any):
+        """ファイル変更イベントを処理"""
+        try:
+            data = getattr(event, 'data', event)
+            if isinstance(data, str):
+                paths = [data]
+            elif isinstance(data, dict) and 'changes' in data:
+                # ファイル監視の変更バッチ
+                paths = [path for change in iter_changes(data) for path in (change.file_path, change.old_path)]
+            elif isinstance(data, dict):
+                paths = [data.get(key) for key in ('file_path', 'path', 'old_path', 'new_path', 'src_path', 'dest_path')]
+            else:
+                paths = []
+            
+            for path in paths:
+                if path:
+                    self.invalidate_cache(path)
+                    
+        except Exception as e:
+            self.logger.error(f"ファイル変更イベント処理エラー: {e}")
+    
+    def invalidate_cache(self, path: Optional[str] = None) -> int:
+        """
+        ステージキャッシュを無効化
+        
+        Args:
+            path: 変更されたパス（Noneの場合は全て）
+            
+        Returns:
+            int: 無効化したエントリ数
+        """
+        count = self.stage_cache.invalidate(path)
+        # ルート指標ファイルの変更はプロジェクトルートの判定を変える
+        if path and Path(path).name in ROOT_INDICATORS:
+            count += self.stage_cache.invalidate(stage='project_root')
+        return count
+    
+    def get_pipeline_stats(self) -> Dict[str, Any]:
+        """
+        パイプラインのステージ別計測値とキャッシュ統計を取得
+        
+        Returns:
+            Dict[str, Any]: 統計情報
+        """
+        with self._stage_stats_lock:
+            stages = {
+                name: {
+                    **stats,
+                    'avg_ms': stats['total_ms'] / stats['calls'] if stats['calls'] else 0.0
+                }
+                for name, stats in self._stage_stats.items()
+            }
+        return {'stages': stages, 'cache': self.stage_cache.get_stats()}
+    
+    def close(self):
+        """リソースを解放"""
+        self.detach_event_system()
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+    
     def build_context(self,
                      query: str,
                      search_results: List[SearchResult] = None,
@@ -149,37 +351,50 @@ class ContextBuilder:
             構築されたコンテキストバンドル
         """
         try:
-            bundle = ContextBundle()
+            pipeline_start = time.perf_counter()
+            
+            # 1-6. 互いに独立したステージ（記載順がバンドル内の順序になる）
+            stages: List[Tuple[str, Callable[[ContextBundle], None]]] = []
             
             # 1. エラーコンテキストの追加（最優先）
             if error_context:
-                self._add_error_context(bundle, error_context, query)
+                stages.append(('error_context', lambda b: self._add_error_context(b, error_context, query)))
             
             # 2. 検索結果からコードコンテキストを追加
             if search_results:
-                self._add_search_results_context(bundle, search_results, query)
+                stages.append(('search_results', lambda b: self._add_search_results_context(b, search_results, query)))
             
             # 3. 会話履歴の追加
             if conversation_history:
-                self._add_conversation_context(bundle, conversation_history, query)
+                stages.append(('conversation', lambda b: self._add_conversation_context(b, conversation_history, query)))
             
             # 4. ファイル構造の追加
             if self.include_file_structure and current_file_path:
-                self._add_file_structure_context(bundle, current_file_path)
+                stages.append(('file_structure', lambda b: self._add_file_structure_context(b, current_file_path)))
             
             # 5. 関連ファイルの追加
             if self.include_related_files and search_results:
-                self._add_related_files_context(bundle, search_results)
+                stages.append(('related_files', lambda b: self._add_related_files_context(b, search_results)))
             
             # 6. 追加コンテキストの処理
             if additional_context:
-                self._add_additional_context(bundle, additional_context)
+                stages.append(('additional_context', lambda b: self._add_additional_context(b, additional_context)))
+            
+            bundle, stage_timings = self._run_stages(stages)
             
             # 7. コンテキストの最適化
+            stage_start = time.perf_counter()
             self._optimize_context(bundle, query)
+            stage_timings['optimize'] = (time.perf_counter() - stage_start) * 1000
+            packing_stats = bundle.metadata.get('packing')
             
             # 8. サマリーの生成
+            stage_start = time.perf_counter()
             bundle.summary = self._generate_context_summary(bundle, query)
+            stage_timings['summary'] = (time.perf_counter() - stage_start) * 1000
+            
+            stage_timings['total'] = (time.perf_counter() - pipeline_start) * 1000
+            self._record_stage_timings(stage_timings)
             
             # 9. メタデータの設定
             bundle.metadata = {
@@ -190,7 +405,9 @@ class ContextBuilder:
                 'conversation_messages_count': len(conversation_history) if conversation_history else 0,
                 'generated_at': datetime.now().isoformat(),
                 'context_types': list(set(item.type.value for item in bundle.items)),
-                'relevance_distribution': self._get_relevance_distribution(bundle)
+                'relevance_distribution': self._get_relevance_distribution(bundle),
+                'packing': packing_stats,
+                'stage_timings_ms': {name: round(ms, 3) for name, ms in stage_timings.items()}
             }
             
             self.logger.info(f"コンテキスト構築完了: {len(bundle.items)} アイテム, {bundle.total_tokens} トークン")
@@ -200,6 +417,59 @@ class ContextBuilder:
             self.logger.error(f"コンテキスト構築エラー: {e}")
             return ContextBundle()
     
+    def _run_stages(self, stages: List[Tuple[str, Callable[[ContextBundle], None]]]) -> Tuple[ContextBundle, Dict[str, float]]:
+        """
+        ステージを実行して結果を1つのバンドルにまとめる
+        
+        各ステージは専用のバンドルに書き込むため並行実行でき、
+        結果はステージの記載順に結合するので実行順序に依存しない
+        
+        Args:
+            stages: (ステージ名, 処理関数) のリスト
+            
+        Returns:
+            Tuple[ContextBundle, Dict[str, float]]: (結合したバンドル, ステージ別の所要時間ms)
+        """
+        def run(func: Callable[[ContextBundle], None]) -> Tuple[ContextBundle, float]:
+            stage_bundle = ContextBundle()
+            start = time.perf_counter()
+            func(stage_bundle)
+            return stage_bundle, (time.perf_counter() - start) * 1000
+        
+        if self.parallel_stages and len(stages) > 1:
+            executor = self._get_executor()
+            futures = [(name, executor.submit(run, func)) for name, func in stages]
+            results = [(name, future.result()) for name, future in futures]
+        else:
+            results = [(name, run(func)) for name, func in stages]
+        
+        bundle = ContextBundle()
+        timings: Dict[str, float] = {}
+        for name, (stage_bundle, elapsed_ms) in results:
+            for item in stage_bundle.items:
+                bundle.add_item(item)
+            timings[name] = elapsed_ms
+        return bundle, timings
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """ステージ実行用のスレッドプールを取得"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="context_stage"
+                )
+            return self._executor
+    
+    def _record_stage_timings(self, timings: Dict[str, float]):
+        """ステージ別の所要時間を集計"""
+        with self._stage_stats_lock:
+            for name, elapsed_ms in timings.items():
+                stats = self._stage_stats.setdefault(name, {'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+                stats['calls'] += 1
+                stats['total_ms'] += elapsed_ms
+                stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+    
     def _add_error_context(self, bundle: ContextBundle, error_context: str, query: str):
         """エラーコンテキストを追加"""
         try:
@@ -516,10 +786,17 @@ class ContextBuilder:
                 return
             
             # プロジェクトルートを推定
-            project_root = self._find_project_root(file_path)
+            project_root = self.stage_cache.get_or_compute(
+                'project_root', str(file_path.parent), (str(file_path.parent),),
+                lambda: self._find_project_root(file_path)
+            )
             
-            # ファイル構造を生成
-            structure = self._generate_file_structure(project_root, current_file_path)
+            # ファイル構造を生成（走査結果はファイル変更まで再利用）
+            entries = self.stage_cache.get_or_compute(
+                'file_structure', str(project_root), (str(project_root),),
+                lambda: self._scan_file_structure(project_root)
+            )
+            structure = self._render_file_structure(project_root, entries, current_file_path)
             
             if structure:
                 item = ContextItem(
@@ -546,14 +823,8 @@ class ContextBuilder:
         """プロジェクトルートを見つける"""
         current = file_path.parent
         
-        # 一般的なプロジェクトルートの指標
-        root_indicators = [
-            '.git', '.gitignore', 'setup.py', 'requirements.txt', 
-            'package.json', 'Cargo.toml', 'pom.xml', 'build.gradle'
-        ]
-        
         while current != current.parent:
-            for indicator in root_indicators:
+            for indicator in ROOT_INDICATORS:
                 if (current / indicator).exists():
                     return current
             current = current.parent
@@ -562,8 +833,28 @@ class ContextBuilder:
     
     def _generate_file_structure(self, project_root: Path, current_file: str, max_depth: int = 3) -> str:
         """ファイル構造を生成"""
+        entries = self._scan_file_structure(project_root, max_depth)
+        return self._render_file_structure(project_root, entries, current_file)
+    
+    def _render_file_structure(self, project_root: Path, entries: List[Tuple[str, str, str]], current_file: str) -> str:
+        """走査結果からファイル構造を生成（現在のファイルを強調）"""
+        structure_lines = [f"# Project Structure (from {project_root.name})"]
+        for line_prefix, name, path in entries:
+            # 現在のファイルをハイライト
+            if path == current_file:
+                name = f"**{name}** (current)"
+            structure_lines.append(f"{line_prefix}{name}")
+        return "\n".join(structure_lines)
+    
+    def _scan_file_structure(self, project_root: Path, max_depth: int = 3) -> List[Tuple[str, str, str]]:
+        """
+        プロジェクトを走査してツリー表示用のエントリを取得
+        
+        Returns:
+            List[Tuple[str, str, str]]: (行頭の罫線, 名前, パス) のリスト
+        """
         try:
-            structure_lines = [f"# Project Structure (from {project_root.name})"]
+            entries: List[Tuple[str, str, str]] = []
             
             def add_directory(path: Path, depth: int = 0, prefix: str = ""):
                 if depth > max_depth:
@@ -589,22 +880,17 @@ class ContextBuilder:
                     current_prefix = "└── " if is_last else "├── "
                     next_prefix = prefix + ("    " if is_last else "│   ")
                     
-                    # 現在のファイルをハイライト
-                    name = item.name
-                    if str(item) == current_file:
-                        name = f"**{name}** (current)"
-                    
-                    structure_lines.append(f"{prefix}{current_prefix}{name}")
+                    entries.append((f"{prefix}{current_prefix}", item.name, str(item)))
                     
                     if item.is_dir() and depth < max_depth:
                         add_directory(item, depth + 1, next_prefix)
             
             add_directory(project_root)
-            return "\n".join(structure_lines)
+            return entries
             
         except Exception as e:
             self.logger.error(f"ファイル構造生成エラー: {e}")
-            return ""
+            return []
     
     def _add_related_files_context(self, bundle: ContextBundle, search_results: List[SearchResult]):
         """関連ファイルコンテキストを追加"""
@@ -615,7 +901,11 @@ class ContextBuilder:
                 file_paths.add(result.file_path)
             
             if file_paths:
-                related_files_content = self._format_related_files(file_paths)
+                sorted_paths = tuple(sorted(file_paths))
+                related_files_content = self.stage_cache.get_or_compute(
+                    'related_files', sorted_paths, sorted_paths,
+                    lambda: self._format_related_files(file_paths)
+                )
                 
                 item = ContextItem(
                     id=f"related_files_{hashlib.md5(str(sorted(file_paths)).encode()).hexdigest()[:8]}",
@@ -670,51 +960,110 @@ class ContextBuilder:
     def _optimize_context(self, bundle: ContextBundle, query: str):
         """コンテキストを最適化"""
         try:
-            # 優先度順にソート
-            bundle.items.sort(key=lambda x: x.priority, reverse=True)
-            
-            # トークン制限内に収める
-            optimized_items = []
-            total_tokens = 0
-            
-            for item in bundle.items:
-                if total_tokens + item.tokens <= self.max_context_tokens:
-                    optimized_items.append(item)
-                    total_tokens += item.tokens
-                else:
-                    # 重要なアイテムは切り詰めて含める
-                    if item.relevance in [RelevanceLevel.CRITICAL, RelevanceLevel.HIGH]:
-                        remaining_tokens = self.max_context_tokens - total_tokens
-                        if remaining_tokens > 100:  # 最小限のトークン数
-                            truncated_item = self._truncate_context_item(item, remaining_tokens)
-                            optimized_items.append(truncated_item)
-                            total_tokens += truncated_item.tokens
-                    break
+            optimized_items, packing_stats = self._pack_items(bundle.items, self.max_context_tokens)
             
             bundle.items = optimized_items
-            bundle.total_tokens = total_tokens
+            bundle.total_tokens = sum(item.tokens for item in optimized_items)
+            bundle.metadata['packing'] = packing_stats
             
         except Exception as e:
             self.logger.error(f"コンテキスト最適化エラー: {e}")
     
+    def _pack_items(self, items: List[ContextItem], max_tokens: int) -> Tuple[List[ContextItem], Dict[str, Any]]:
+        """
+        トークン予算内で関連度に重み付けした価値が最大となるアイテムを選択
+        
+        Args:
+            items: 候補アイテム
+            max_tokens: トークン予算
+            
+        Returns:
+            Tuple[List[ContextItem], Dict[str, Any]]: (優先度順のアイテム, パッキング統計)
+        """
+        candidates = [self._to_packing_candidate(item) for item in items]
+        result = self.context_packer.pack(candidates, max_tokens)
+        
+        packed_items = []
+        for candidate, option in result.selections:
+            item = candidate.item
+            if option.truncated:
+                item = self._truncate_context_item(item, option.tokens)
+            packed_items.append(item)
+        
+        stats = result.get_stats()
+        dropped_critical = [candidate.item.id for candidate in result.dropped if candidate.required]
+        if dropped_critical:
+            self.logger.warning(
+                f"重要なコンテキストがトークン予算({max_tokens})に収まらず除外されました: {dropped_critical}"
+            )
+        
+        # 切り詰め後の実測値が予算を超えた場合は重要でないものを価値密度の低い順に外す
+        total_tokens = sum(item.tokens for item in packed_items)
+        if total_tokens > max_tokens:
+            optional_items = [item for item in packed_items if item.relevance != RelevanceLevel.CRITICAL]
+            for item in sorted(optional_items, key=self._item_density):
+                if total_tokens <= max_tokens:
+                    break
+                packed_items.remove(item)
+                total_tokens -= item.tokens
+            
+            if total_tokens > max_tokens:
+                # 重要なアイテムだけで予算を超える場合は外さずに超過を記録する
+                self.logger.warning(
+                    f"重要なコンテキストだけでトークン予算を超過しています: {total_tokens}/{max_tokens}"
+                )
+                stats['over_budget_tokens'] = total_tokens - max_tokens
+        
+        packed_items.sort(key=lambda x: x.priority, reverse=True)
+        return packed_items, stats
+    
+    def _to_packing_candidate(self, item: ContextItem) -> PackingCandidate:
+        """アイテムをパッキング候補に変換"""
+        span = None
+        file_path = item.metadata.get('file_path')
+        line_start = item.metadata.get('line_start')
+        line_end = item.metadata.get('line_end')
+        if file_path and line_start is not None and line_end is not None:
+            span = (file_path, line_start, line_end)
+        
+        return PackingCandidate(
+            item=item,
+            tokens=item.tokens,
+            value=self._item_value(item),
+            # 重要なアイテムは切り詰めてでも含める
+            truncatable=item.relevance in [RelevanceLevel.CRITICAL, RelevanceLevel.HIGH],
+            required=item.relevance == RelevanceLevel.CRITICAL,
+            content_hash=hashlib.md5(item.content.encode()).hexdigest(),
+            span=span
+        )
+    
+    def _item_value(self, item: ContextItem) -> float:
+        """アイテムの価値（関連度で重み付けした優先度）"""
+        relevance_weight = self.relevance_priorities[item.relevance] / 100
+        similarity = item.metadata.get('similarity_score') or 0.0
+        return max(item.priority, 1) * relevance_weight * (1.0 + similarity)
+    
+    def _item_density(self, item: ContextItem) -> float:
+        """トークンあたりの価値"""
+        return self._item_value(item) / max(item.tokens, 1)
+    
     def _truncate_context_item(self, item: ContextItem, max_tokens: int) -> ContextItem:
         """コンテキストアイテムを切り詰める"""
         try:
-            # 推定文字数を計算（トークン数 / 1.3）
-            max_chars = int(max_tokens / 1.3 * 4)  # 余裕を持たせる
-            
-            if len(item.content) <= max_chars:
+            if item.tokens <= max_tokens:
                 return item
             
-            # 重要な部分を保持して切り詰める
-            truncated_content = item.content[:max_chars]
+            # 省略表記の分を差し引いてトークン数で切り詰める
+            marker = "\n\n... (truncated)"
+            counter = get_token_counter()
+            truncated_content = counter.truncate(item.content, max_tokens - counter.count(marker))
             
             # 行の途中で切れないように調整
             last_newline = truncated_content.rfind('\n')
-            if last_newline > max_chars * 0.8:  # 80%以上の位置にある場合
+            if last_newline > len(truncated_content) * 0.8:  # 80%以上の位置にある場合
                 truncated_content = truncated_content[:last_newline]
             
-            truncated_content += "\n\n... (truncated)"
+            truncated_content += marker
             
             # 新しいアイテムを作成
             truncated_item = ContextItem(
@@ -928,17 +1277,10 @@ class ContextBuilder:
                 if item.type in focus_types:
                     relevant_items.append(item)
             
-            # 優先度順にソート
-            relevant_items.sort(key=lambda x: x.priority, reverse=True)
-            
-            # トークン制限内で追加
-            total_tokens = 0
-            for item in relevant_items:
-                if total_tokens + item.tokens <= max_tokens:
-                    focused_bundle.add_item(item)
-                    total_tokens += item.tokens
-                else:
-                    break
+            # トークン制限内で価値が最大となるように選択
+            packed_items, _ = self._pack_items(relevant_items, max_tokens)
+            for item in packed_items:
+                focused_bundle.add_item(item)
             
             # メタデータを更新
             focused_bundle.metadata = {
@@ -972,17 +1314,10 @@ class ContextBuilder:
                         all_items.append(item)
                         seen_ids.add(item.id)
             
-            # 優先度順にソート
-            all_items.sort(key=lambda x: x.priority, reverse=True)
-            
-            # トークン制限内で追加
-            total_tokens = 0
-            for item in all_items:
-                if total_tokens + item.tokens <= self.max_context_tokens:
-                    merged_bundle.add_item(item)
-                    total_tokens += item.tokens
-                else:
-                    break
+            # トークン制限内で価値が最大となるように選択
+            packed_items, _ = self._pack_items(all_items, self.max_context_tokens)
+            for item in packed_items:
+                merged_bundle.add_item(item)
             
             # メタデータをマージ
             merged_bundle.metadata = {
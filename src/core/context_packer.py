@@ -0,0 +1,313 @@
+# src/core/context_packer.py
+"""
+コンテキストパッキングシステム - トークン予算内で価値を最大化するアイテム選択
+"""
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# 切り詰めレベル（残すトークンの割合, 残る価値の割合）
+# 先頭部分ほど情報密度が高いため、価値はトークンほど減らない
+DEFAULT_TRUNCATION_LEVELS: Tuple[Tuple[float, float], ...] = (
+    (0.5, 0.6),
+    (0.25, 0.35),
+)
+
+
+@dataclass
+class PackingOption:
+    """候補の採用方法（全体 or 切り詰め）"""
+    tokens: int
+    value: float
+    fraction: float = 1.0
+
+    @property
+    def truncated(self) -> bool:
+        """切り詰めて採用するか"""
+        return self.fraction < 1.0
+
+
+@dataclass
+class PackingCandidate:
+    """パッキング対象の候補"""
+    item: Any
+    tokens: int
+    value: float
+    truncatable: bool = False
+    required: bool = False
+    content_hash: Optional[str] = None
+    span: Optional[Tuple[str, int, int]] = None  # (ファイルパス, 開始行, 終了行)
+
+    @property
+    def density(self) -> float:
+        """トークンあたりの価値"""
+        return self.value / max(self.tokens, 1)
+
+
+@dataclass
+class PackingResult:
+    """パッキング結果"""
+    selections: List[Tuple[PackingCandidate, PackingOption]] = field(default_factory=list)
+    dropped: List[PackingCandidate] = field(default_factory=list)
+    duplicates: List[PackingCandidate] = field(default_factory=list)
+    budget: int = 0
+    method: str = "dp"
+    elapsed_ms: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        """採用したトークン数の合計"""
+        return sum(option.tokens for _, option in self.selections)
+
+    @property
+    def total_value(self) -> float:
+        """採用した価値の合計"""
+        return sum(option.value for _, option in self.selections)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """統計情報を取得"""
+        total_tokens = self.total_tokens
+        return {
+            'method': self.method,
+            'budget': self.budget,
+            'selected': len(self.selections),
+            'truncated': sum(1 for _, option in self.selections if option.truncated),
+            'dropped': len(self.dropped),
+            'duplicates': len(self.duplicates),
+            'total_tokens': total_tokens,
+            'total_value': round(self.total_value, 3),
+            'value_per_token': round(self.total_value / total_tokens, 5) if total_tokens else 0.0,
+            'elapsed_ms': round(self.elapsed_ms, 3)
+        }
+
+
+class ContextPacker:
+    """
+    コンテキストパッキングクラス
+
+    各候補について「全体・切り詰め・不採用」から1つを選ぶ多肢選択ナップサック問題として、
+    トークン予算内で価値の合計を最大化する。トークン数は予算に応じた単位に切り上げて
+    離散化するため、解が予算を超えることはない。
+    """
+
+    def __init__(self,
+                 truncation_levels: Tuple[Tuple[float, float], ...] = DEFAULT_TRUNCATION_LEVELS,
+                 min_truncated_tokens: int = 100,
+                 resolution: int = 1000,
+                 max_dp_cells: int = 4_000_000,
+                 overlap_threshold: float = 0.5):
+        """
+        初期化
+
+        Args:
+            truncation_levels: 切り詰めレベル（トークン割合, 価値割合）
+            min_truncated_tokens: 切り詰め後の最小トークン数
+            resolution: DPの容量方向の分割数
+            max_dp_cells: DPを使う計算量の上限（超える場合は近似解法）
+            overlap_threshold: 重複とみなす行範囲の重なり率
+        """
+        self.logger = logger
+        self.truncation_levels = truncation_levels
+        self.min_truncated_tokens = min_truncated_tokens
+        self.resolution = resolution
+        self.max_dp_cells = max_dp_cells
+        self.overlap_threshold = overlap_threshold
+
+    def pack(self, candidates: List[PackingCandidate], budget: int) -> PackingResult:
+        """
+        予算内で価値が最大となる候補の組み合わせを選択
+
+        Args:
+            candidates: 候補リスト
+            budget: トークン予算
+
+        Returns:
+            PackingResult: パッキング結果（selectionsは価値密度順ではなく入力順）
+        """
+        start_time = time.perf_counter()
+        result = PackingResult(budget=budget)
+
+        candidates, result.duplicates = self.deduplicate(candidates)
+        order = {id(candidate): index for index, candidate in enumerate(candidates)}
+
+        # 必須候補を先に確保
+        remaining = budget
+        optional = []
+        for candidate in candidates:
+            if not candidate.required:
+                optional.append(candidate)
+                continue
+            option = self._best_fitting_option(candidate, remaining)
+            if option is None:
+                result.dropped.append(candidate)
+                continue
+            result.selections.append((candidate, option))
+            remaining -= option.tokens
+
+        option_table = [self.options_for(candidate) for candidate in optional]
+        cells = sum(len(options) for options in option_table) * min(remaining, self.resolution)
+        if cells > self.max_dp_cells:
+            result.method = "greedy"
+            chosen = self._pack_greedy(optional, option_table, remaining)
+        else:
+            result.method = "dp"
+            chosen = self._pack_dp(option_table, remaining)
+
+        for candidate, option in zip(optional, chosen):
+            if option is None:
+                result.dropped.append(candidate)
+            else:
+                result.selections.append((candidate, option))
+
+        result.selections.sort(key=lambda selection: order[id(selection[0])])
+        result.elapsed_ms = (time.perf_counter() - start_time) * 1000
+        return result
+
+    def options_for(self, candidate: PackingCandidate) -> List[PackingOption]:
+        """
+        候補の採用方法を列挙
+
+        Args:
+            candidate: 候補
+
+        Returns:
+            List[PackingOption]: 全体と各切り詰めレベルの採用方法
+        """
+        options = [PackingOption(tokens=candidate.tokens, value=candidate.value)]
+        if candidate.truncatable:
+            for token_fraction, value_fraction in self.truncation_levels:
+                tokens = int(candidate.tokens * token_fraction)
+                if tokens < self.min_truncated_tokens:
+                    continue
+                options.append(PackingOption(
+                    tokens=tokens,
+                    value=candidate.value * value_fraction,
+                    fraction=token_fraction
+                ))
+        return options
+
+    def deduplicate(self, candidates: List[PackingCandidate]) -> Tuple[List[PackingCandidate], List[PackingCandidate]]:
+        """
+        重複する候補を除去（同一内容、または同一ファイルで行範囲が大きく重なるもの）
+
+        価値の高い候補を優先して残す
+
+        Args:
+            candidates: 候補リスト
+
+        Returns:
+            Tuple[List[PackingCandidate], List[PackingCandidate]]: (残した候補, 除去した候補)
+        """
+        ranked = sorted(candidates, key=lambda candidate: (candidate.required, candidate.value), reverse=True)
+        kept_ids = set()
+        seen_hashes = set()
+        spans_by_file: Dict[str, List[Tuple[int, int]]] = {}
+        duplicates = []
+
+        for candidate in ranked:
+            if candidate.content_hash and candidate.content_hash in seen_hashes:
+                duplicates.append(candidate)
+                continue
+            if candidate.span and self._overlaps(candidate.span, spans_by_file):
+                duplicates.append(candidate)
+                continue
+
+            kept_ids.add(id(candidate))
+            if candidate.content_hash:
+                seen_hashes.add(candidate.content_hash)
+            if candidate.span:
+                file_path, line_start, line_end = candidate.span
+                spans_by_file.setdefault(file_path, []).append((line_start, line_end))
+
+        kept = [candidate for candidate in candidates if id(candidate) in kept_ids]
+        return kept, duplicates
+
+    def _overlaps(self, span: Tuple[str, int, int], spans_by_file: Dict[str, List[Tuple[int, int]]]) -> bool:
+        """既に採用した行範囲と大きく重なるか"""
+        file_path, line_start, line_end = span
+        length = line_end - line_start + 1
+        for other_start, other_end in spans_by_file.get(file_path, ()):
+            overlap = min(line_end, other_end) - max(line_start, other_start) + 1
+            if overlap <= 0:
+                continue
+            shorter = min(length, other_end - other_start + 1)
+            if overlap / max(shorter, 1) >= self.overlap_threshold:
+                return True
+        return False
+
+    def _best_fitting_option(self, candidate: PackingCandidate, remaining: int) -> Optional[PackingOption]:
+        """予算に収まる最も価値の高い採用方法"""
+        fitting = [option for option in self.options_for(candidate) if option.tokens <= remaining]
+        return max(fitting, key=lambda option: option.value) if fitting else None
+
+    def _pack_dp(self, option_table: List[List[PackingOption]], budget: int) -> List[Optional[PackingOption]]:
+        """多肢選択ナップサックを動的計画法で解く"""
+        if budget <= 0 or not option_table:
+            return [None] * len(option_table)
+
+        # トークン数を単位に切り上げて離散化（解が予算を超えないように）
+        unit = max(1, math.ceil(budget / self.resolution))
+        capacity = budget // unit
+
+        best = [0.0] * (capacity + 1)
+        choices: List[bytearray] = []
+        for options in option_table:
+            weights = [math.ceil(option.tokens / unit) for option in options]
+            previous = best[:]
+            choice = bytearray(capacity + 1)
+            for index, (option, weight) in enumerate(zip(options, weights), start=1):
+                if weight > capacity:
+                    continue
+                for size in range(capacity, weight - 1, -1):
+                    value = previous[size - weight] + option.value
+                    if value > best[size]:
+                        best[size] = value
+                        choice[size] = index
+            choices.append(choice)
+
+        # 選択を復元
+        chosen: List[Optional[PackingOption]] = [None] * len(option_table)
+        size = max(range(capacity + 1), key=lambda s: best[s])
+        for position in range(len(option_table) - 1, -1, -1):
+            index = choices[position][size]
+            if index:
+                option = option_table[position][index - 1]
+                chosen[position] = option
+                size -= math.ceil(option.tokens / unit)
+        return chosen
+
+    def _pack_greedy(self,
+                     candidates: List[PackingCandidate],
+                     option_table: List[List[PackingOption]],
+                     budget: int) -> List[Optional[PackingOption]]:
+        """価値密度順の近似解法（収まらない候補はスキップして続行）"""
+        chosen: List[Optional[PackingOption]] = [None] * len(candidates)
+        remaining = budget
+        ranked = sorted(range(len(candidates)), key=lambda i: candidates[i].density, reverse=True)
+
+        for position in ranked:
+            fitting = [option for option in option_table[position] if option.tokens <= remaining]
+            if not fitting:
+                continue
+            option = max(fitting, key=lambda option: option.value)
+            chosen[position] = option
+            remaining -= option.tokens
+
+        # 単独で最も価値の高い候補の方が良い場合はそちらを採用（近似比の保証）
+        best_single = None
+        for position, options in enumerate(option_table):
+            for option in options:
+                if option.tokens <= budget and (best_single is None or option.value > best_single[1].value):
+                    best_single = (position, option)
+        greedy_value = sum(option.value for option in chosen if option)
+        if best_single and best_single[1].value > greedy_value:
+            chosen = [None] * len(candidates)
+            chosen[best_single[0]] = best_single[1]
+
+        return chosen
@@ -14,6 +14,8 @@ from enum import Enum
 import hashlib
 import uuid
 
+from .token_counter import get_token_counter
+
 class MessageRole(Enum):
     """メッセージの役割"""
     USER = "user"
@@ -840,9 +842,7 @@ class ConversationManager:
     
     def _estimate_tokens(self, text: str) -> int:
         """トークン数を推定"""
-        # 簡易的な推定（実際のトークナイザーを使用することを推奨）
-        words = text.split()
-        return int(len(words) * 1.3)  # 英語の場合の概算
+        return get_token_counter().count(text)
     
     def _get_next_message_order(self, conversation_id: str) -> int:
         """次のメッセージ順序を取得"""
@@ -610,6 +610,68 @@ class EventBus:
         """フィルターを削除"""
         self.filter.remove_filter(filter_func)
 
+class EventEmitter:
+    """
+    イベント発行のmixinクラス
+    
+    インスタンス毎に登録されたリスナーへ同期的に通知する（BasePluginなどが継承する）。
+    """
+    
+    def __init__(self, *args, **kwargs):
+        """初期化"""
+        super().__init__(*args, **kwargs)
+        self._listeners: Dict[str, List[Callable[[Any], None]]] = {}
+    
+    def _get_listeners(self) -> Dict[str, List[Callable[[Any], None]]]:
+        """リスナー一覧（__init__を呼ばないサブクラスでも使えるよう遅延作成）"""
+        if '_listeners' not in self.__dict__:
+            self._listeners = {}
+        return self._listeners
+    
+    def on(self, event_name: str, callback: Callable[[Any], None]):
+        """
+        リスナーを登録
+        
+        Args:
+            event_name: イベント名
+            callback: イベントデータを受け取る関数
+        """
+        self._get_listeners().setdefault(event_name, []).append(callback)
+    
+    def off(self, event_name: str, callback: Optional[Callable[[Any], None]] = None) -> bool:
+        """
+        リスナーを解除
+        
+        Args:
+            event_name: イベント名
+            callback: 解除する関数（Noneの場合はそのイベントのすべて）
+            
+        Returns:
+            bool: 解除した場合True
+        """
+        listeners = self._get_listeners()
+        if callback is None:
+            return listeners.pop(event_name, None) is not None
+        callbacks = listeners.get(event_name, [])
+        if callback not in callbacks:
+            return False
+        callbacks.remove(callback)
+        return True
+    
+    def emit(self, event_name: str, data: Any = None):
+        """
+        イベントを発行
+        
+        Args:
+            event_name: イベント名
+            data: イベントデータ
+        """
+        for callback in list(self._get_listeners().get(event_name, [])):
+            try:
+                callback(data)
+            except Exception as e:
+                get_logger(__name__).error(f"イベントリスナーエラー ({event_name}): {e}")
+
 class EventSystem:
     """イベントシステムクラス"""
     
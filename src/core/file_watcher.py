@@ -0,0 +1,472 @@
+# src/core/file_watcher.py
+"""
+ファイル監視モジュール
+ディスク上の変更を検出し、デバウンス・集約した変更バッチをイベントバスへ発行
+watchdog（Linuxではinotify）が利用できない場合はポーリングで検出する
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# 変更バッチのイベント名
+FILE_CHANGES_EVENT = 'file_changes'
+
+# 変更種別
+CHANGE_CREATED = 'created'
+CHANGE_MODIFIED = 'modified'
+CHANGE_DELETED = 'deleted'
+CHANGE_MOVED = 'moved'
+
+
+@dataclass
+class FileChange:
+    """集約後のファイル変更"""
+    change_type: str
+    file_path: str
+    old_path: Optional[str] = None
+    is_directory: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書形式に変換"""
+        return asdict(self)
+
+
+class ChangeCoalescer:
+    """
+    変更の集約クラス
+
+    パス毎に「変更前に存在したか」「現在存在するか」だけを保持し、
+    作成→変更→削除のような一連のイベントを1件の変更（またはなし）にまとめる。
+    """
+
+    def __init__(self):
+        """初期化"""
+        self._states: Dict[str, List[bool]] = {}
+        self._directories: Set[str] = set()
+        self._renames: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def record(self, change_type: str, path: str, is_directory: bool = False, old_path: Optional[str] = None):
+        """
+        変更を記録
+
+        Args:
+            change_type: 変更種別（created/modified/deleted/moved）
+            path: 対象パス（movedの場合は移動先）
+            is_directory: ディレクトリか
+            old_path: 移動元パス（movedの場合）
+        """
+        if change_type == CHANGE_MOVED and old_path:
+            # a→b→c のような連続した移動は最初の移動元を引き継ぐ
+            origin = self._renames.pop(old_path, old_path)
+            self.record(CHANGE_DELETED, old_path, is_directory)
+            self.record(CHANGE_CREATED, path, is_directory)
+            self._renames[path] = origin
+            return
+
+        if is_directory:
+            self._directories.add(path)
+
+        state = self._states.get(path)
+        if state is None:
+            self._states[path] = [change_type != CHANGE_CREATED, change_type != CHANGE_DELETED]
+        else:
+            state[1] = change_type != CHANGE_DELETED
+            if change_type == CHANGE_DELETED:
+                self._renames.pop(path, None)
+
+    def drain(self) -> List[FileChange]:
+        """
+        集約した変更を取り出して状態をクリア
+
+        Returns:
+            List[FileChange]: 最初に記録された順の変更リスト
+        """
+        changes: List[FileChange] = []
+        consumed: Set[str] = set()
+
+        for path, (existed, exists) in self._states.items():
+            if path in consumed:
+                continue
+            is_directory = path in self._directories
+
+            old_path = self._renames.get(path)
+            if old_path and exists and not existed:
+                old_state = self._states.get(old_path)
+                # 移動元が削除済みの場合のみ移動として扱う
+                if old_state and old_state[0] and not old_state[1]:
+                    consumed.add(old_path)
+                    changes.append(FileChange(CHANGE_MOVED, path, old_path, is_directory))
+                    continue
+
+            if existed and exists:
+                if not is_directory:
+                    changes.append(FileChange(CHANGE_MODIFIED, path, None, is_directory))
+            elif exists:
+                changes.append(FileChange(CHANGE_CREATED, path, None, is_directory))
+            elif existed:
+                changes.append(FileChange(CHANGE_DELETED, path, None, is_directory))
+
+        # 移動として処理した移動元を取り除く（移動元が先に記録されている場合）
+        changes = [change for change in changes
+                   if not (change.change_type == CHANGE_DELETED and change.file_path in consumed)]
+
+        self._states.clear()
+        self._directories.clear()
+        self._renames.clear()
+        return changes
+
+
+class FileWatcher:
+    """
+    ファイル監視クラス
+
+    変更をデバウンス（最後の変更からdebounce秒、最大max_delay秒）して集約し、
+    FILE_CHANGES_EVENTとして {'root', 'backend', 'changes'} を発行する。
+    """
+
+    def __init__(self,
+                 root_path: str,
+                 event_system: Any = None,
+                 debounce: float = 0.2,
+                 max_delay: float = 2.0,
+                 poll_interval: float = 1.0,
+                 exclude_dirs: Optional[Set[str]] = None,
+                 use_polling: bool = False):
+        """
+        初期化
+
+        Args:
+            root_path: 監視するディレクトリ
+            event_system: 発行先のイベントシステム（Noneの場合はグローバル）
+            debounce: 最後の変更から発行までの待ち時間（秒）
+            max_delay: 最初の変更から発行までの最大待ち時間（秒）
+            poll_interval: ポーリング間隔（秒）
+            exclude_dirs: 除外ディレクトリ（Noneの場合はProjectManager.EXCLUDE_DIRS）
+            use_polling: watchdogが利用可能でもポーリングを使用するか
+        """
+        self.root_path = os.path.abspath(root_path)
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.use_polling = use_polling
+
+        if event_system is None:
+            from .event_system import get_event_system
+            event_system = get_event_system()
+        self.event_system = event_system
+
+        if exclude_dirs is None:
+            from .project_manager import ProjectManager
+            exclude_dirs = ProjectManager.EXCLUDE_DIRS
+        self.exclude_dirs = set(exclude_dirs)
+
+        self._coalescer = ChangeCoalescer()
+        self._condition = threading.Condition()
+        self._first_change = 0.0
+        self._last_change = 0.0
+        self._running = False
+        self._stop_event = threading.Event()
+        self._dispatch_thread: Optional[threading.Thread] = None
+        self._poll_thread: Optional[threading.Thread] = None
+        self._observer = None
+        self._backend = ""
+
+        self.stats = {'raw_events': 0, 'batches': 0, 'changes': 0}
+
+    @property
+    def backend(self) -> str:
+        """使用中の検出方式（watchdog/polling）"""
+        return self._backend
+
+    @property
+    def is_running(self) -> bool:
+        """監視中か"""
+        return self._running
+
+    def start(self) -> bool:
+        """
+        監視を開始
+
+        Returns:
+            bool: 開始成功フラグ
+        """
+        if self._running:
+            return True
+        if not os.path.isdir(self.root_path):
+            logger.error(f"監視対象がディレクトリではありません: {self.root_path}")
+            return False
+
+        self._running = True
+        self._stop_event.clear()
+        if self.use_polling or not self._start_watchdog():
+            self._start_polling()
+
+        self._dispatch_thread = threading.Thread(
+            target=self._dispatch_loop, name="file_watcher_dispatch", daemon=True
+        )
+        self._dispatch_thread.start()
+
+        logger.info(f"ファイル監視を開始しました: {self.root_path} ({self._backend})")
+        return True
+
+    def stop(self):
+        """監視を停止（未発行の変更は発行する）"""
+        if not self._running:
+            return
+        self._running = False
+        self._stop_event.set()
+
+        if self._observer is not None:
+            try:
+                self._observer.stop()
+                self._observer.join(timeout=5.0)
+            except Exception as e:
+                logger.error(f"ファイル監視停止エラー: {e}")
+            self._observer = None
+
+        with self._condition:
+            self._condition.notify_all()
+        for thread in (self._poll_thread, self._dispatch_thread):
+            if thread is not None:
+                thread.join(timeout=5.0)
+        self._poll_thread = None
+        self._dispatch_thread = None
+
+        self.flush()
+        logger.info(f"ファイル監視を停止しました: {self.root_path}")
+
+    def notify(self, change_type: str, path: str, is_directory: bool = False, old_path: Optional[str] = None):
+        """
+        変更を記録（検出バックエンド、またはアプリ内の保存処理から呼び出す）
+
+        Args:
+            change_type: 変更種別（created/modified/deleted/moved）
+            path: 対象パス
+            is_directory: ディレクトリか
+            old_path: 移動元パス
+        """
+        path = os.path.abspath(path)
+        old_path = os.path.abspath(old_path) if old_path else None
+        if self._is_excluded(path) and (old_path is None or self._is_excluded(old_path)):
+            return
+
+        with self._condition:
+            now = time.monotonic()
+            if not len(self._coalescer):
+                self._first_change = now
+            self._last_change = now
+            self._coalescer.record(change_type, path, is_directory, old_path)
+            self.stats['raw_events'] += 1
+            self._condition.notify_all()
+
+    def flush(self) -> List[FileChange]:
+        """
+        デバウンスを待たずに集約済みの変更を発行
+
+        Returns:
+            List[FileChange]: 発行した変更
+        """
+        with self._condition:
+            changes = self._coalescer.drain()
+        if changes:
+            self._emit(changes)
+        return changes
+
+    def get_stats(self) -> Dict[str, Any]:
+        """統計情報を取得"""
+        with self._condition:
+            pending = len(self._coalescer)
+        return {**self.stats, 'backend': self._backend, 'pending': pending, 'running': self._running}
+
+    def _is_excluded(self, path: str) -> bool:
+        """除外ディレクトリ配下か"""
+        try:
+            relative = os.path.relpath(path, self.root_path)
+        except ValueError:
+            return True
+        if relative.startswith(os.pardir):
+            return True
+        parts = relative.split(os.sep)
+        return any(part in self.exclude_dirs for part in parts)
+
+    def _dispatch_loop(self):
+        """デバウンス後に変更を発行"""
+        while True:
+            with self._condition:
+                while self._running and not len(self._coalescer):
+                    self._condition.wait()
+                if not self._running:
+                    return
+
+                # 変更が落ち着くか、最大待ち時間に達するまで待機
+                while self._running:
+                    now = time.monotonic()
+                    quiet_until = self._last_change + self.debounce
+                    deadline = self._first_change + self.max_delay
+                    wake_at = min(quiet_until, deadline)
+                    if now >= wake_at:
+                        break
+                    self._condition.wait(wake_at - now)
+                if not self._running:
+                    return
+
+                changes = self._coalescer.drain()
+
+            if changes:
+                self._emit(changes)
+
+    def _emit(self, changes: List[FileChange]):
+        """変更バッチを発行"""
+        self.stats['batches'] += 1
+        self.stats['changes'] += len(changes)
+        try:
+            self.event_system.emit(FILE_CHANGES_EVENT, {
+                'root': self.root_path,
+                'backend': self._backend,
+                'changes': [change.to_dict() for change in changes]
+            }, source='file_watcher')
+        except Exception as e:
+            logger.error(f"ファイル変更イベント発行エラー: {e}")
+
+    # ===== watchdog =====
+
+    def _start_watchdog(self) -> bool:
+        """watchdogで監視を開始"""
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError:
+            logger.info("watchdogが利用できないため、ポーリングで監視します")
+            return False
+
+        watcher = self
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                watcher._on_watchdog_event(event)
+
+        try:
+            observer = Observer()
+            observer.schedule(_Handler(), self.root_path, recursive=True)
+            observer.start()
+        except Exception as e:
+            logger.warning(f"watchdogによる監視を開始できないため、ポーリングで監視します: {e}")
+            return False
+
+        self._observer = observer
+        self._backend = 'watchdog'
+        return True
+
+    def _on_watchdog_event(self, event: Any):
+        """watchdogのイベントを変更として記録"""
+        event_type = event.event_type
+        src_path = os.fsdecode(event.src_path)
+        if event_type == 'moved':
+            self.notify(CHANGE_MOVED, os.fsdecode(event.dest_path), event.is_directory, src_path)
+        elif event_type in (CHANGE_CREATED, CHANGE_DELETED):
+            self.notify(event_type, src_path, event.is_directory)
+        elif event_type in (CHANGE_MODIFIED, 'closed') and not event.is_directory:
+            # ディレクトリのmodifiedは子要素の変更で発生するため無視
+            self.notify(CHANGE_MODIFIED, src_path)
+
+    # ===== ポーリング =====
+
+    def _start_polling(self):
+        """ポーリングで監視を開始"""
+        self._backend = 'polling'
+        snapshot = self._take_snapshot()
+        self._poll_thread = threading.Thread(
+            target=self._poll_loop, args=(snapshot,), name="file_watcher_poll", daemon=True
+        )
+        self._poll_thread.start()
+
+    def _poll_loop(self, snapshot: Dict[str, Tuple[int, int, bool]]):
+        """スナップショットを比較して変更を検出"""
+        while not self._stop_event.wait(self.poll_interval):
+
+            try:
+                current = self._take_snapshot()
+            except Exception as e:
+                logger.error(f"ポーリングエラー: {e}")
+                continue
+
+            for path, (size, mtime_ns, is_directory) in current.items():
+                previous = snapshot.get(path)
+                if previous is None:
+                    self.notify(CHANGE_CREATED, path, is_directory)
+                elif not is_directory and previous[:2] != (size, mtime_ns):
+                    self.notify(CHANGE_MODIFIED, path)
+            for path, (_, _, is_directory) in snapshot.items():
+                if path not in current:
+                    self.notify(CHANGE_DELETED, path, is_directory)
+
+            snapshot = current
+
+    def _take_snapshot(self) -> Dict[str, Tuple[int, int, bool]]:
+        """除外ディレクトリを枝刈りしながら (サイズ, 更新時刻ns, ディレクトリか) を収集"""
+        snapshot: Dict[str, Tuple[int, int, bool]] = {}
+        stack = [self.root_path]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if entry.name not in self.exclude_dirs:
+                                    snapshot[entry.path] = (0, 0, True)
+                                    stack.append(entry.path)
+                                continue
+                            stat = entry.stat(follow_symlinks=False)
+                            snapshot[entry.path] = (stat.st_size, stat.st_mtime_ns, False)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return snapshot
+
+    def __enter__(self):
+        """コンテキストマネージャー対応"""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """コンテキストマネージャー対応"""
+        self.stop()
+
+
+def iter_changes(event: Any, root_path: Optional[str] = None) -> List[FileChange]:
+    """
+    FILE_CHANGES_EVENTのデータから変更を取り出す
+
+    Args:
+        event: イベント（またはイベントデータ）
+        root_path: 指定した場合はこのディレクトリ配下の変更のみ
+
+    Returns:
+        List[FileChange]: 変更リスト
+    """
+    data = getattr(event, 'data', event)
+    if not isinstance(data, dict):
+        return []
+
+    prefix = os.path.join(os.path.abspath(root_path), '') if root_path else None
+    changes = []
+    for item in data.get('changes', []):
+        change = FileChange(**item)
+        if prefix:
+            paths = [change.file_path, change.old_path]
+            if not any(path and (path + os.sep).startswith(prefix) for path in paths):
+                continue
+        changes.append(change)
+    return changes
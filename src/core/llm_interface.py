@@ -19,6 +19,25 @@ import anthropic
 import requests
 from pathlib import Path
 
+from .token_counter import get_token_counter
+
+def _get_rate_limiter(provider: 'LLMProvider'):
+    """プロバイダー共有のレート制限を遅延インポートで取得"""
+    try:
+        from src.llm.rate_limiter import get_rate_limiter_registry
+        return get_rate_limiter_registry().get_limiter(provider.value)
+    except ImportError:
+        return None
+
+def _record_response_headers(raw_response):
+    """成功したAPI呼び出しのレスポンスヘッダーを実行中のレート制限の許可へ記録し、応答本体を返す"""
+    try:
+        from src.llm.rate_limiter import record_response_headers
+        record_response_headers(getattr(raw_response, 'headers', None))
+    except ImportError:
+        pass
+    return raw_response.parse()
+
 class LLMProvider(Enum):
     """LLMプロバイダー"""
     OPENAI = "openai"
@@ -141,9 +160,9 @@ class OpenAIProvider(LLMProviderInterface):
             # メッセージを変換
             openai_messages = [msg.to_dict() for msg in messages]
             
-            # API呼び出し
-            response = await asyncio.to_thread(
-                client.chat.completions.create,
+            # API呼び出し（レート制限ヘッダーを得るため生レスポンスを取得）
+            raw_response = await asyncio.to_thread(
+                client.chat.completions.with_raw_response.create,
                 model=config.model,
                 messages=openai_messages,
                 max_tokens=config.max_tokens,
@@ -154,6 +173,7 @@ class OpenAIProvider(LLMProviderInterface):
                 timeout=config.timeout,
                 **config.additional_params
             )
+            response = _record_response_headers(raw_response)
             
             response_time = time.time() - start_time
             
@@ -260,9 +280,9 @@ class AnthropicProvider(LLMProviderInterface):
             # メッセージを変換
             system_message, anthropic_messages = self._convert_messages(messages)
             
-            # API呼び出し
-            response = await asyncio.to_thread(
-                client.messages.create,
+            # API呼び出し（レート制限ヘッダーを得るため生レスポンスを取得）
+            raw_response = await asyncio.to_thread(
+                client.messages.with_raw_response.create,
                 model=config.model,
                 max_tokens=config.max_tokens,
                 temperature=config.temperature,
@@ -270,6 +290,7 @@ class AnthropicProvider(LLMProviderInterface):
                 messages=anthropic_messages,
                 **config.additional_params
             )
+            response = _record_response_headers(raw_response)
             
             response_time = time.time() - start_time
             
@@ -595,18 +616,29 @@ class LLMInterface:
                                  provider: LLMProviderInterface, 
                                  messages: List[LLMMessage], 
                                  config: LLMConfig) -> LLMResponse:
-        """リトライ機能付きでレスポンスを生成"""
+        """リトライ機能付きでレスポンスを生成（プロバイダー共有のレート制限を適用）"""
         last_exception = None
+        limiter = _get_rate_limiter(config.provider)
+        estimated_tokens = sum(get_token_counter(config.model).count_batch(m.content for m in messages)) + config.max_tokens
         
         for attempt in range(config.retry_attempts):
             try:
-                return await provider.generate_response(messages, config)
+                if limiter is None:
+                    return await provider.generate_response(messages, config)
+                
+                async with limiter.limit(estimated_tokens) as permit:
+                    response = await provider.generate_response(messages, config)
+                    permit.record_usage(response)
+                return response
                 
             except Exception as e:
                 last_exception = e
                 self.logger.warning(f"API呼び出し失敗 (試行 {attempt + 1}/{config.retry_attempts}): {e}")
                 
                 if attempt < config.retry_attempts - 1:
+                    if limiter is not None and limiter.blocked_for() > 0:
+                        # Retry-Afterによる待機はリミッターの取得時に行われる
+                        continue
                     await asyncio.sleep(config.retry_delay * (2 ** attempt))  # 指数バックオフ
         
         raise last_exception
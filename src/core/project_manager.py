@@ -12,20 +12,32 @@ from pathlib import Path
 from typing import Dict, List, Optional, Any, Set, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime
-import hashlib
 import mimetypes
 import sqlite3
+import stat as stat_module
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
 
 from .logger import get_logger
+from .file_watcher import CHANGE_DELETED, CHANGE_MOVED, FILE_CHANGES_EVENT, FileChange, iter_changes
 #from .config_manager import get_config
 from ..utils.file_utils import FileUtils
 from ..utils.text_utils import TextUtils
 from ..utils.validation_utils import ValidationUtils
+from ..utils.hash_service import get_hash_service, new_hasher
 
 logger = get_logger(__name__)
 
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    xxhash = None
+    XXHASH_AVAILABLE = False
+
+# ファイルハッシュのアルゴリズム（xxhashがあれば使用）
+FILE_HASH_ALGORITHM = 'xxh3_128' if XXHASH_AVAILABLE else 'blake2b_128'
+
 def get_config(*args, **kwargs):
     from .config_manager import get_config
     return get_config(*args, **kwargs)
@@ -44,6 +56,8 @@ class FileInfo:
     content_preview: str = ""
     line_count: int = 0
     is_binary: bool = False
+    mtime_ns: int = 0
+    inode: int = 0
 
 @dataclass
 class ProjectInfo:
@@ -87,6 +101,13 @@ class ProjectStats:
 class ProjectDatabase:
     """プロジェクトデータベース管理クラス"""
     
+    _INSERT_FILE_SQL = '''
+        INSERT INTO files 
+        (project_id, path, name, extension, size, modified, 
+         encoding, language, hash, content_preview, line_count, is_binary, mtime_ns, inode)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    
     def __init__(self, db_path: str):
         """
         初期化
@@ -135,10 +156,22 @@ class ProjectDatabase:
                         content_preview TEXT,
                         line_count INTEGER,
                         is_binary BOOLEAN,
+                        mtime_ns INTEGER DEFAULT 0,
+                        inode INTEGER DEFAULT 0,
                         FOREIGN KEY (project_id) REFERENCES projects (id)
                     )
                 ''')
                 
+                # 旧スキーマに分析キャッシュ用の列を追加
+                columns = {row[1] for row in conn.execute('PRAGMA table_info(files)')}
+                for column in ('mtime_ns', 'inode'):
+                    if column not in columns:
+                        conn.execute(f'ALTER TABLE files ADD COLUMN {column} INTEGER DEFAULT 0')
+                
+                conn.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_files_project_path ON files (project_id, path)
+                ''')
+                
                 conn.execute('''
                     CREATE INDEX IF NOT EXISTS idx_files_project_id ON files (project_id)
                 ''')
@@ -167,27 +200,36 @@ class ProjectDatabase:
             bool: 保存成功フラグ
         """
         try:
+            values = (
+                project_info.name,
+                project_info.path,
+                project_info.description,
+                project_info.created,
+                project_info.modified,
+                project_info.version,
+                project_info.author,
+                project_info.language,
+                project_info.framework,
+                json.dumps(project_info.dependencies),
+                json.dumps(project_info.tags),
+                json.dumps(asdict(project_info))
+            )
             with self.lock:
                 with sqlite3.connect(self.db_path) as conn:
-                    conn.execute('''
-                        INSERT OR REPLACE INTO projects 
-                        (name, path, description, created, modified, version, 
-                         author, language, framework, dependencies, tags, metadata)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        project_info.name,
-                        project_info.path,
-                        project_info.description,
-                        project_info.created,
-                        project_info.modified,
-                        project_info.version,
-                        project_info.author,
-                        project_info.language,
-                        project_info.framework,
-                        json.dumps(project_info.dependencies),
-                        json.dumps(project_info.tags),
-                        json.dumps(asdict(project_info))
-                    ))
+                    # 既存プロジェクトはIDを維持して更新（REPLACEだとIDが変わりfilesの参照が切れる）
+                    cursor = conn.execute('''
+                        UPDATE projects SET 
+                        name = ?, path = ?, description = ?, created = ?, modified = ?, version = ?, 
+                        author = ?, language = ?, framework = ?, dependencies = ?, tags = ?, metadata = ?
+                        WHERE path = ?
+                    ''', values + (project_info.path,))
+                    if cursor.rowcount == 0:
+                        conn.execute('''
+                            INSERT OR REPLACE INTO projects 
+                            (name, path, description, created, modified, version, 
+                             author, language, framework, dependencies, tags, metadata)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ''', values)
                     conn.commit()
             return True
             
@@ -265,27 +307,11 @@ class ProjectDatabase:
                         (project_id,)
                     )
                     
-                    # 新しいファイル情報を挿入
-                    for file_info in files:
-                        conn.execute('''
-                            INSERT INTO files 
-                            (project_id, path, name, extension, size, modified, 
-                             encoding, language, hash, content_preview, line_count, is_binary)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        ''', (
-                            project_id,
-                            file_info.path,
-                            file_info.name,
-                            file_info.extension,
-                            file_info.size,
-                            file_info.modified,
-                            file_info.encoding,
-                            file_info.language,
-                            file_info.hash,
-                            file_info.content_preview,
-                            file_info.line_count,
-                            file_info.is_binary
-                        ))
+                    # 新しいファイル情報を一括挿入
+                    conn.executemany(
+                        self._INSERT_FILE_SQL,
+                        (self._file_row(project_id, file_info) for file_info in files)
+                    )
                     
                     conn.commit()
             return True
@@ -294,6 +320,115 @@ class ProjectDatabase:
             logger.error(f"ファイル情報保存エラー: {e}")
             return False
     
+    def update_files(self, project_path: str, files: List[FileInfo], removed_paths: List[str]) -> bool:
+        """
+        ファイル情報を差分更新
+        
+        Args:
+            project_path: プロジェクトパス
+            files: 追加・更新するファイル情報リスト
+            removed_paths: 削除するファイルパス（ディレクトリの場合は配下も削除）
+            
+        Returns:
+            bool: 更新成功フラグ
+        """
+        try:
+            with self.lock:
+                with sqlite3.connect(self.db_path) as conn:
+                    cursor = conn.execute(
+                        'SELECT id FROM projects WHERE path = ?',
+                        (project_path,)
+                    )
+                    project_row = cursor.fetchone()
+                    if not project_row:
+                        return False
+                    
+                    project_id = project_row[0]
+                    
+                    for path in removed_paths:
+                        prefix = path.rstrip('/\\')
+                        conn.execute('''
+                            DELETE FROM files WHERE project_id = ?
+                            AND (path = ? OR substr(path, 1, ?) IN (?, ?))
+                        ''', (project_id, prefix, len(prefix) + 1, prefix + '/', prefix + '\\'))
+                    
+                    conn.executemany(
+                        'DELETE FROM files WHERE project_id = ? AND path = ?',
+                        ((project_id, file_info.path) for file_info in files)
+                    )
+                    conn.executemany(
+                        self._INSERT_FILE_SQL,
+                        (self._file_row(project_id, file_info) for file_info in files)
+                    )
+                    
+                    conn.commit()
+            return True
+            
+        except Exception as e:
+            logger.error(f"ファイル情報更新エラー: {e}")
+            return False
+    
+    def load_files(self, project_path: str) -> Dict[str, FileInfo]:
+        """
+        保存済みのファイル情報を取得（分析キャッシュとして使用）
+        
+        Args:
+            project_path: プロジェクトパス
+            
+        Returns:
+            Dict[str, FileInfo]: 相対パス -> ファイル情報
+        """
+        files = {}
+        try:
+            with self.lock:
+                with sqlite3.connect(self.db_path) as conn:
+                    cursor = conn.execute('''
+                        SELECT f.path, f.name, f.extension, f.size, f.modified, f.encoding, f.language,
+                               f.hash, f.content_preview, f.line_count, f.is_binary, f.mtime_ns, f.inode
+                        FROM files f JOIN projects p ON f.project_id = p.id
+                        WHERE p.path = ?
+                    ''', (project_path,))
+                    for row in cursor:
+                        files[row[0]] = FileInfo(
+                            path=row[0],
+                            name=row[1],
+                            extension=row[2] or "",
+                            size=row[3] or 0,
+                            modified=row[4] or "",
+                            encoding=row[5] or "utf-8",
+                            language=row[6] or "",
+                            hash=row[7] or "",
+                            content_preview=row[8] or "",
+                            line_count=row[9] or 0,
+                            is_binary=bool(row[10]),
+                            mtime_ns=row[11] or 0,
+                            inode=row[12] or 0
+                        )
+        except Exception as e:
+            logger.error(f"ファイル情報読み込みエラー: {e}")
+        
+        return files
+    
+    @staticmethod
+    def _file_row(project_id: int, file_info: FileInfo) -> Tuple:
+        """filesテーブルの行"""
+        return (
+            project_id,
+            file_info.path,
+            file_info.name,
+            file_info.extension,
+            file_info.size,
+            file_info.modified,
+            file_info.encoding,
+            file_info.language,
+            file_info.hash,
+            file_info.content_preview,
+            file_info.line_count,
+            file_info.is_binary,
+            file_info.mtime_ns,
+            file_info.inode
+        )
+    
     def get_projects(self) -> List[ProjectInfo]:
         """
         全プロジェクト情報を取得
@@ -380,6 +515,12 @@ class ProjectManager:
         '.log', '.tmp', '.temp', '.cache'
     }
     
+    # 内容を読み込んでプレビュー・行数を取得するファイルサイズの上限
+    MAX_CONTENT_SIZE = 1024 * 1024
+    
+    # ハッシュ計算時の読み込み単位
+    READ_BLOCK_SIZE = 1024 * 1024
+    
     def __init__(self, db_path: Optional[str] = None):
         """
         初期化
@@ -387,8 +528,9 @@ class ProjectManager:
         Args:
             db_path: データベースファイルパス
         """
-        config = get_config()
-        self.db_path = db_path or "./data/projects.db"
+        config = get_config() or {}
+        # ハッシュキャッシュ（hash_cache.db）と同じ設定のデータディレクトリに置く
+        self.db_path = db_path or str(Path(config.get('paths', {}).get('data_dir') or 'data') / 'projects.db')
         
         # データベースディレクトリを作成
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
@@ -396,6 +538,15 @@ class ProjectManager:
         self.database = ProjectDatabase(self.db_path)
         self.current_project: Optional[ProjectInfo] = None
         self.current_files: List[FileInfo] = []
+        self._files_lock = threading.Lock()
+        
+        # ハッシュ計算はGILを解放するため、CPU数より多めのスレッドでI/O待ちと重ねる
+        self.max_workers = min(32, (os.cpu_count() or 1) + 4)
+        self.last_analysis: Dict[str, int] = {}
+        
+        # ファイル監視との連携
+        self._event_system = None
+        self._subscriber_id = f"project_manager_{id(self)}"
         
         # ユーティリティクラス
         self.file_utils = FileUtils()
@@ -511,79 +662,44 @@ class ProjectManager:
             
             logger.info("プロジェクト分析を開始します...")
             
+            # 前回の分析結果（サイズ・更新時刻・inodeが同じファイルは再分析しない）
+            cached_files = self.database.load_files(self.current_project.path)
+            
             # ファイル情報を収集
             files = []
+            pending = []
             
-            def analyze_file(file_path: Path) -> Optional[FileInfo]:
-                """個別ファイルを分析"""
+            for file_path in self._walk_project(project_path):
                 try:
-                    if not file_path.is_file():
-                        return None
-                    
-                    # 除外ファイルチェック
-                    if file_path.name in self.EXCLUDE_FILES:
-                        return None
-                    
-                    # ファイル情報を取得
                     stat = file_path.stat()
-                    extension = file_path.suffix.lower()
-                    language = self.SUPPORTED_EXTENSIONS.get(extension, "")
-                    
-                    # バイナリファイル判定
-                    is_binary = self._is_binary_file(file_path)
-                    
-                    # ファイルハッシュ計算
-                    file_hash = self._calculate_file_hash(file_path)
-                    
-                    # コンテンツプレビューと行数
-                    content_preview = ""
-                    line_count = 0
-                    encoding = "utf-8"
-                    
-                    if not is_binary and stat.st_size < 1024 * 1024:  # 1MB未満
-                        try:
-                            encoding = self.file_utils.detect_encoding(str(file_path))
-                            content = self.file_utils.read_file(str(file_path), encoding)
-                            if content:
-                                lines = content.split('\n')
-                                line_count = len(lines)
-                                # 最初の5行をプレビューとして保存
-                                content_preview = '\n'.join(lines[:5])
-                        except Exception:
-                            is_binary = True
-                    
-                    return FileInfo(
-                        path=str(file_path.relative_to(project_path)),
-                        name=file_path.name,
-                        extension=extension,
-                        size=stat.st_size,
-                        modified=datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                        encoding=encoding,
-                        language=language,
-                        hash=file_hash,
-                        content_preview=content_preview,
-                        line_count=line_count,
-                        is_binary=is_binary
-                    )
-                    
-                except Exception as e:
-                    logger.warning(f"ファイル分析エラー {file_path}: {e}")
-                    return None
+                except OSError:
+                    continue
+                cached = cached_files.get(str(file_path.relative_to(project_path)))
+                if cached and self._is_unchanged(cached, stat):
+                    files.append(cached)
+                else:
+                    pending.append((file_path, stat))
             
-            # 並列でファイルを分析
-            with ThreadPoolExecutor(max_workers=4) as executor:
-                future_to_file = {}
-                
-                for file_path in self._walk_project(project_path):
-                    future = executor.submit(analyze_file, file_path)
-                    future_to_file[future] = file_path
-                
-                for future in as_completed(future_to_file):
-                    file_info = future.result()
-                    if file_info:
-                        files.append(file_info)
+            unchanged = len(files)
+            
+            # 変更されたファイルのみ並列で分析
+            if pending:
+                with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as executor:
+                    futures = [
+                        executor.submit(self._analyze_file, file_path, project_path, stat)
+                        for file_path, stat in pending
+                    ]
+                    for future in as_completed(futures):
+                        file_info = future.result()
+                        if file_info:
+                            files.append(file_info)
             
             self.current_files = files
+            self.last_analysis = {
+                'files': len(files),
+                'analyzed': len(pending),
+                'unchanged': unchanged
+            }
             
             # データベースに保存
             self.database.save_files(self.current_project.path, files)
@@ -597,13 +713,209 @@ class ProjectManager:
             
             self.database.save_project(self.current_project)
             
-            logger.info(f"プロジェクト分析完了: {len(files)}個のファイルを処理")
+            logger.info(f"プロジェクト分析完了: {len(files)}個のファイルを処理（再分析: {len(pending)}個）")
             return True
             
         except Exception as e:
             logger.error(f"プロジェクト分析エラー: {e}")
             return False
     
+    def apply_file_changes(self, changes: List[FileChange]) -> bool:
+        """
+        ファイル監視の変更バッチをファイル情報に反映（プロジェクト全体は再走査しない）
+        
+        Args:
+            changes: FileChangeのリスト
+            
+        Returns:
+            bool: 反映成功フラグ
+        """
+        if not self.current_project:
+            return False
+        
+        try:
+            project_path = Path(self.current_project.path)
+            updated: Dict[str, FileInfo] = {}
+            removed: List[str] = []
+            
+            def relative(path: str) -> Optional[str]:
+                try:
+                    relative_path = Path(path).relative_to(project_path)
+                except ValueError:
+                    return None
+                if any(part in self.EXCLUDE_DIRS for part in relative_path.parts):
+                    return None
+                return str(relative_path)
+            
+            for change in changes:
+                old_path = change.old_path if change.change_type == CHANGE_MOVED else None
+                if change.change_type == CHANGE_DELETED:
+                    old_path = change.file_path
+                if old_path and relative(old_path):
+                    removed.append(relative(old_path))
+                
+                if change.change_type == CHANGE_DELETED or not relative(change.file_path):
+                    continue
+                
+                path = Path(change.file_path)
+                targets = self._walk_project(path) if change.is_directory else [path]
+                for file_path in targets:
+                    file_info = self._analyze_file(file_path, project_path)
+                    if file_info:
+                        updated[file_info.path] = file_info
+                    elif not file_path.exists():
+                        removed.append(relative(str(file_path)))
+            
+            removed = [path for path in removed if path and path not in updated]
+            if not updated and not removed:
+                return True
+            
+            with self._files_lock:
+                files = {file_info.path: file_info for file_info in self.current_files}
+                for path in removed:
+                    prefix = os.path.join(path, '')
+                    for existing in [p for p in files if p == path or p.startswith(prefix)]:
+                        del files[existing]
+                files.update(updated)
+                self.current_files = list(files.values())
+            
+            self.database.update_files(self.current_project.path, list(updated.values()), removed)
+            logger.debug(f"ファイル情報を差分更新しました: 更新{len(updated)}件, 削除{len(removed)}件")
+            return True
+            
+        except Exception as e:
+            logger.error(f"ファイル変更反映エラー: {e}")
+            return False
+    
+    def attach_event_system(self, event_system: Any):
+        """
+        ファイル変更バッチを購読して現在のプロジェクトのファイル情報を差分更新する
+        
+        Args:
+            event_system: subscribe/unsubscribe_allを持つイベントシステム
+        """
+        self.detach_event_system()
+        
+        def on_file_changes(event):
+            if self.current_project:
+                changes = iter_changes(event, self.current_project.path)
+                if changes:
+                    self.apply_file_changes(changes)
+        
+        event_system.subscribe(FILE_CHANGES_EVENT, on_file_changes, subscriber_id=self._subscriber_id)
+        self._event_system = event_system
+    
+    def detach_event_system(self):
+        """ファイル変更バッチの購読を解除"""
+        if self._event_system is not None:
+            self._event_system.unsubscribe_all(self._subscriber_id)
+            self._event_system = None
+    
+    def _analyze_file(self, file_path: Path, project_path: Path,
+                      stat: Optional[os.stat_result] = None) -> Optional[FileInfo]:
+        """個別ファイルを分析"""
+        try:
+            if stat is None:
+                if not file_path.is_file():
+                    return None
+                stat = file_path.stat()
+            elif not stat_module.S_ISREG(stat.st_mode):
+                return None
+            
+            # 除外ファイルチェック
+            if file_path.name in self.EXCLUDE_FILES:
+                return None
+            
+            # ファイル情報を取得
+            extension = file_path.suffix.lower()
+            language = self.SUPPORTED_EXTENSIONS.get(extension, "")
+            
+            # 1回の読み込みでバイナリ判定・ハッシュ計算・内容取得を行う
+            is_binary, file_hash, data = self._read_file(file_path, stat.st_size)
+            
+            # コンテンツプレビューと行数
+            content_preview = ""
+            line_count = 0
+            encoding = "utf-8"
+            
+            if not is_binary and data is not None:
+                try:
+                    encoding = self.file_utils.detect_bytes_encoding(data)
+                    content = data.decode(encoding, errors='replace')
+                    if '\r' in content:
+                        content = content.replace('\r\n', '\n').replace('\r', '\n')
+                    if content:
+                        line_count = content.count('\n') + 1
+                        # 最初の5行をプレビューとして保存
+                        content_preview = '\n'.join(content.split('\n', 5)[:5])
+                except Exception:
+                    is_binary = True
+            
+            return FileInfo(
+                path=str(file_path.relative_to(project_path)),
+                name=file_path.name,
+                extension=extension,
+                size=stat.st_size,
+                modified=datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                encoding=encoding,
+                language=language,
+                hash=file_hash,
+                content_preview=content_preview,
+                line_count=line_count,
+                is_binary=is_binary,
+                mtime_ns=stat.st_mtime_ns,
+                inode=stat.st_ino
+            )
+            
+        except Exception as e:
+            logger.warning(f"ファイル分析エラー {file_path}: {e}")
+            return None
+    
+    @staticmethod
+    def _is_unchanged(file_info: FileInfo, stat: os.stat_result) -> bool:
+        """前回の分析時からファイルが変更されていないか（サイズ・更新時刻・inodeで判定）"""
+        return (file_info.mtime_ns != 0
+                and file_info.size == stat.st_size
+                and file_info.mtime_ns == stat.st_mtime_ns
+                and file_info.inode == stat.st_ino)
+    
+    def _read_file(self, file_path: Path, size: int) -> Tuple[bool, str, Optional[bytes]]:
+        """
+        ファイルを1回だけ読み込んでバイナリ判定・ハッシュ計算を行う
+        
+        Args:
+            file_path: ファイルパス
+            size: ファイルサイズ
+            
+        Returns:
+            Tuple[bool, str, Optional[bytes]]: (バイナリフラグ, ハッシュ, 内容（上限以下のテキストのみ）)
+        """
+        mime_type, _ = mimetypes.guess_type(str(file_path))
+        is_binary = bool(mime_type and not mime_type.startswith('text/'))
+        
+        hasher = self._new_hasher()
+        data = None
+        try:
+            with open(file_path, 'rb') as f:
+                first = f.read(self.READ_BLOCK_SIZE)
+                hasher.update(first)
+                # 最初の1024バイトをチェック
+                is_binary = is_binary or b'\x00' in first[:1024]
+                if size < self.MAX_CONTENT_SIZE and len(first) < self.READ_BLOCK_SIZE:
+                    data = first
+                for block in iter(lambda: f.read(self.READ_BLOCK_SIZE), b""):
+                    hasher.update(block)
+        except Exception:
+            return True, "", None
+        
+        return is_binary, hasher.hexdigest(), None if is_binary else data
+    
+    @staticmethod
+    def _new_hasher():
+        """ファイルハッシュ用のハッシュオブジェクト（xxhashがあれば使用）"""
+        return new_hasher(FILE_HASH_ALGORITHM)
+    
+    
     def _walk_project(self, project_path: Path):
         """プロジェクト内のファイルを再帰的に取得"""
         for root, dirs, files in os.walk(project_path):
@@ -632,11 +944,7 @@ class ProjectManager:
     def _calculate_file_hash(self, file_path: Path) -> str:
         """ファイルハッシュを計算"""
         try:
-            hash_md5 = hashlib.md5()
-            with open(file_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_md5.update(chunk)
-            return hash_md5.hexdigest()
+            return get_hash_service().hash_file(file_path, FILE_HASH_ALGORITHM)
         except Exception:
             return ""
     
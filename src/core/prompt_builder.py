@@ -12,6 +12,8 @@ from datetime import datetime
 from pathlib import Path
 from enum import Enum
 
+from .token_counter import get_token_counter
+
 class PromptType(Enum):
     """プロンプトタイプの定義"""
     CODE_GENERATION = "code_generation"
@@ -648,7 +650,7 @@ class PromptBuilder:
             'word_count': len(words),
             'section_count': prompt.count('##'),
             'code_block_count': prompt.count('```'),
-            'estimated_tokens': len(words) * 1.3,  # 概算
+            'estimated_tokens': get_token_counter().count(prompt),
             'complexity_score': self._calculate_complexity_score(prompt)
         }
     
@@ -0,0 +1,570 @@
+# src/core/repository_indexer.py
+"""
+リポジトリインデックス作成モジュール
+ファイル探索・並列チャンク分割・一括書き込みのパイプラインでVectorStoreを構築
+"""
+
+import hashlib
+import os
+import queue
+import threading
+import time
+from concurrent.futures import (
+    Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+)
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .file_watcher import CHANGE_DELETED, FILE_CHANGES_EVENT, FileChange, iter_changes
+from .logger import get_logger
+from .project_manager import ProjectManager
+from ..utils.code_parser import CodeParser
+
+logger = get_logger(__name__)
+
+# ワーカー毎のパーサー（プロセスプールではプロセス毎、スレッドプールでは共有）
+_worker_parser: Optional[CodeParser] = None
+
+
+def _init_worker(max_chunk_size: int, overlap_size: int):
+    """ワーカーの初期化"""
+    global _worker_parser
+    _worker_parser = CodeParser(max_chunk_size=max_chunk_size, overlap_size=overlap_size)
+
+
+def _parse_files(tasks: List[Tuple[str, int, int, Optional[str]]], max_file_size: int) -> List[Dict[str, Any]]:
+    """
+    ファイルを読み込んでチャンクに分割（ワーカーで実行）
+
+    Args:
+        tasks: (パス, サイズ, 更新時刻ns, 前回の内容ハッシュ) のリスト
+        max_file_size: 対象とする最大ファイルサイズ
+
+    Returns:
+        List[Dict[str, Any]]: ファイル毎の結果
+        （内容ハッシュが前回と同じ場合はchunksがNone、対象外の場合はskippedに理由）
+    """
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = CodeParser()
+
+    results = []
+    for path, size, mtime_ns, known_hash in tasks:
+        result = {
+            'file_path': path, 'size': size, 'mtime_ns': mtime_ns,
+            'content_hash': None, 'chunks': None, 'skipped': None, 'error': None, 'bytes_read': 0
+        }
+        results.append(result)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read(max_file_size + 1)
+            # 対象外のファイルもチャンク0件としてマニフェストに記録し、次回はstatで判定する
+            if len(data) > max_file_size:
+                result.update(skipped="size_limit", content_hash="", chunks=[])
+                continue
+
+            result['bytes_read'] = len(data)
+            result['content_hash'] = hashlib.sha256(data).hexdigest()
+            if result['content_hash'] == known_hash:
+                continue
+            # バイナリファイルはスキップ
+            if b'\x00' in data[:1024]:
+                result.update(skipped="binary", chunks=[])
+                continue
+
+            content = data.decode('utf-8', errors='ignore')
+            chunks = _worker_parser.parse_and_chunk(content, path)
+            for chunk in chunks:
+                chunk['keywords'] = _worker_parser.extract_keywords(chunk)
+            result['chunks'] = chunks
+
+        except Exception as e:
+            result['error'] = str(e)
+    return results
+
+
+@dataclass
+class IndexingProgress:
+    """インデックス作成の進捗"""
+    files_discovered: int = 0
+    files_parsed: int = 0
+    files_unchanged: int = 0
+    files_skipped: int = 0
+    files_failed: int = 0
+    files_removed: int = 0
+    chunks_parsed: int = 0
+    chunks_written: int = 0
+    bytes_read: int = 0
+    discovery_complete: bool = False
+    cancelled: bool = False
+    started_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        """経過秒数"""
+        return (self.finished_at or time.time()) - self.started_at
+
+    @property
+    def files_per_second(self) -> float:
+        """処理速度（ファイル/秒）"""
+        elapsed = self.elapsed
+        return self.files_parsed / elapsed if elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書形式に変換"""
+        data = asdict(self)
+        data['elapsed'] = self.elapsed
+        data['files_per_second'] = self.files_per_second
+        return data
+
+
+class RepositoryIndexer:
+    """
+    リポジトリインデックス作成クラス
+
+    ファイル探索 → プロセスプールでのチャンク分割 → 単一ライターによるVectorStoreへの一括書き込み
+    の3段で処理する。実行中のタスク数と書き込みキューに上限を設けて、
+    書き込みが追いつかない場合は探索・分割側を待機させる。
+
+    VectorStoreのファイルマニフェストと比較し、サイズと更新時刻が同じファイルは読み込まず、
+    内容ハッシュが同じファイルは分割しない。削除されたファイルのチャンクは最後に削除する。
+    """
+
+    def __init__(self,
+                 vector_store: Any,
+                 max_workers: Optional[int] = None,
+                 use_processes: bool = True,
+                 files_per_task: int = 16,
+                 batch_size: int = 500,
+                 queue_size: int = 64,
+                 max_file_size: int = 1024 * 1024,
+                 max_chunk_size: int = 1000,
+                 overlap_size: int = 100,
+                 exclude_dirs: Optional[Set[str]] = None,
+                 progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 progress_interval: float = 1.0):
+        """
+        初期化
+
+        Args:
+            vector_store: 書き込み先のVectorStore
+            max_workers: 分割ワーカー数（Noneの場合はCPUコア数）
+            use_processes: プロセスプールを使用するか（Falseの場合はスレッドプール）
+            files_per_task: 1タスクで処理するファイル数
+            batch_size: 1回の書き込みでまとめるチャンク数
+            queue_size: 書き込みキューの最大長
+            max_file_size: 対象とする最大ファイルサイズ（バイト）
+            max_chunk_size: チャンクの最大サイズ
+            overlap_size: チャンク間のオーバーラップサイズ
+            exclude_dirs: 除外ディレクトリ（Noneの場合はProjectManager.EXCLUDE_DIRS）
+            progress_callback: 進捗通知コールバック
+            progress_interval: 進捗通知の最小間隔（秒）
+        """
+        self.vector_store = vector_store
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.use_processes = use_processes
+        self.files_per_task = files_per_task
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.max_file_size = max_file_size
+        self.max_chunk_size = max_chunk_size
+        self.overlap_size = overlap_size
+        self.exclude_dirs = set(exclude_dirs if exclude_dirs is not None else ProjectManager.EXCLUDE_DIRS)
+        self.progress_callback = progress_callback
+        self.progress_interval = progress_interval
+
+        # 対象拡張子（CodeParserの対応言語）
+        self.extensions = set(CodeParser(max_chunk_size, overlap_size).supported_extensions)
+        self.exclude_suffixes = {name for name in ProjectManager.EXCLUDE_FILES if name.startswith('.')}
+
+        # 実行中のタスク数の上限（バックプレッシャー）
+        self.max_pending = self.max_workers * 2
+
+        self._cancel_event = threading.Event()
+        self._last_report = 0.0
+
+        # ファイル監視との連携
+        self._update_lock = threading.Lock()
+        self._event_system = None
+        self._subscriber_id = f"repository_indexer_{id(self)}"
+
+        logger.info(f"RepositoryIndexer初期化完了 (workers: {self.max_workers}, processes: {use_processes})")
+
+    def cancel(self):
+        """インデックス作成を中断"""
+        self._cancel_event.set()
+
+    def discover_files(self, root_path: Path, progress: Optional[IndexingProgress] = None) -> Iterator[str]:
+        """
+        インデックス対象のファイルを探索
+
+        Args:
+            root_path: ルートディレクトリ
+            progress: 進捗（探索数を更新）
+
+        Yields:
+            str: ファイルパス
+        """
+        for entry in self._scan(str(root_path), progress):
+            yield entry.path
+
+    def _scan(self, root_path: str, progress: Optional[IndexingProgress] = None) -> Iterator[os.DirEntry]:
+        """除外ディレクトリを枝刈りしながら対象ファイルのエントリを列挙"""
+        stack = [root_path]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    subdirectories = []
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if entry.name not in self.exclude_dirs:
+                                    subdirectories.append(entry.path)
+                                continue
+                            if not entry.is_file(follow_symlinks=False):
+                                continue
+                        except OSError:
+                            continue
+
+                        suffix = os.path.splitext(entry.name)[1].lower()
+                        if suffix not in self.extensions or suffix in self.exclude_suffixes:
+                            continue
+                        if progress is not None:
+                            progress.files_discovered += 1
+                        yield entry
+                    stack.extend(sorted(subdirectories, reverse=True))
+            except (PermissionError, FileNotFoundError, NotADirectoryError) as e:
+                logger.debug(f"ディレクトリ読み込みスキップ {directory}: {e}")
+
+    def _changed_files(self,
+                       root_path: str,
+                       manifest: Dict[str, Dict[str, Any]],
+                       seen: Set[str],
+                       progress: IndexingProgress,
+                       incremental: bool) -> Iterator[Tuple[str, int, int, Optional[str]]]:
+        """マニフェストとstat情報を比較して、再インデックスが必要なファイルを列挙"""
+        for entry in self._scan(root_path, progress):
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            seen.add(entry.path)
+
+            known = manifest.get(entry.path)
+            if known and incremental:
+                if known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+                    progress.files_unchanged += 1
+                    continue
+                yield entry.path, stat.st_size, stat.st_mtime_ns, known['content_hash']
+            else:
+                yield entry.path, stat.st_size, stat.st_mtime_ns, None
+
+    def index_repository(self, root_path: str, retrain: bool = True, incremental: bool = True) -> IndexingProgress:
+        """
+        リポジトリ全体のインデックスを作成
+
+        Args:
+            root_path: リポジトリのルートパス
+            retrain: 書き込み完了後にベクトライザーを再訓練するか
+            incremental: 前回から変更のないファイルをスキップするか（Falseの場合は全ファイルを再分割）
+
+        Returns:
+            IndexingProgress: 最終的な進捗情報
+        """
+        root = os.path.abspath(root_path)
+        progress = IndexingProgress()
+        self._cancel_event.clear()
+        self._last_report = 0.0
+
+        logger.info(f"インデックス作成開始: {root}")
+
+        manifest = self.vector_store.get_file_manifest(root)
+        seen: Set[str] = set()
+        changed = self._changed_files(root, manifest, seen, progress, incremental)
+        completed = self._run_pipeline(changed, progress, self.use_processes)
+
+        progress.cancelled = self._cancel_event.is_set()
+
+        # 削除されたファイルのチャンクを削除（探索が最後まで完了した場合のみ）
+        if completed and not progress.cancelled:
+            removed = [path for path in manifest if path not in seen]
+            if removed:
+                self.vector_store.remove_files(removed)
+                progress.files_removed = len(removed)
+
+        if retrain and (progress.chunks_written or progress.files_removed) and not progress.cancelled:
+            self.vector_store.retrain_vectorizers()
+
+        progress.finished_at = time.time()
+        self._report(progress, force=True)
+        logger.info(
+            f"インデックス作成完了: {progress.files_parsed}ファイル, {progress.chunks_written}チャンク, "
+            f"変更なし{progress.files_unchanged}ファイル, 削除{progress.files_removed}ファイル "
+            f"({progress.elapsed:.1f}秒, {progress.files_per_second:.1f}ファイル/秒)"
+        )
+        return progress
+
+    def update_files(self, file_paths: Iterable[str], retrain: bool = True) -> IndexingProgress:
+        """
+        指定したファイルだけを再インデックス（存在しないファイルのチャンクは削除）
+
+        Args:
+            file_paths: 対象ファイルパス
+            retrain: 書き込み完了後にベクトライザーを再訓練するか
+
+        Returns:
+            IndexingProgress: 最終的な進捗情報
+        """
+        progress = IndexingProgress()
+        self._cancel_event.clear()
+
+        paths = list(dict.fromkeys(os.path.abspath(path) for path in file_paths))
+        manifest = self.vector_store.get_file_manifest(file_paths=paths)
+
+        tasks: List[Tuple[str, int, int, Optional[str]]] = []
+        removed: List[str] = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                stat = None
+
+            suffix = os.path.splitext(path)[1].lower()
+            indexable = suffix in self.extensions and suffix not in self.exclude_suffixes
+            if stat is None or not indexable or not os.path.isfile(path):
+                if path in manifest:
+                    removed.append(path)
+                continue
+
+            progress.files_discovered += 1
+            known = manifest.get(path)
+            if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+                progress.files_unchanged += 1
+                continue
+            tasks.append((path, stat.st_size, stat.st_mtime_ns, known['content_hash'] if known else None))
+
+        # 少数のファイルはプロセスプールの起動コストの方が大きい
+        use_processes = self.use_processes and len(tasks) > self.files_per_task * self.max_workers
+        self._run_pipeline(iter(tasks), progress, use_processes)
+        progress.cancelled = self._cancel_event.is_set()
+
+        if removed and not progress.cancelled:
+            self.vector_store.remove_files(removed)
+            progress.files_removed = len(removed)
+
+        if retrain and (progress.chunks_written or progress.files_removed) and not progress.cancelled:
+            self.vector_store.retrain_vectorizers()
+
+        progress.finished_at = time.time()
+        self._report(progress, force=True)
+        logger.debug(
+            f"ファイル更新完了: {progress.files_parsed}ファイル, {progress.chunks_written}チャンク, "
+            f"削除{progress.files_removed}ファイル"
+        )
+        return progress
+
+    def apply_file_changes(self, changes: Iterable[FileChange]) -> IndexingProgress:
+        """
+        ファイル監視の変更バッチを反映
+
+        Args:
+            changes: 変更リスト
+
+        Returns:
+            IndexingProgress: 最終的な進捗情報
+        """
+        paths: List[str] = []
+        for change in changes:
+            for path, present in ((change.old_path, False), (change.file_path, change.change_type != CHANGE_DELETED)):
+                if not path:
+                    continue
+                if not change.is_directory:
+                    paths.append(path)
+                elif present:
+                    # 作成・移動されたディレクトリ配下のファイル
+                    paths.extend(self.discover_files(Path(path)))
+                else:
+                    # 削除・移動されたディレクトリ配下のインデックス済みファイル
+                    paths.extend(self.vector_store.get_file_manifest(path))
+
+        with self._update_lock:
+            return self.update_files(paths)
+
+    def attach_event_system(self, event_system: Any, root_path: Optional[str] = None):
+        """
+        ファイル変更バッチを購読して変更ファイルだけを再インデックスする
+
+        Args:
+            event_system: subscribe/unsubscribe_allを持つイベントシステム
+            root_path: 指定した場合はこのディレクトリ配下の変更のみ反映
+        """
+        self.detach_event_system()
+
+        def on_file_changes(event):
+            try:
+                changes = iter_changes(event, root_path)
+                if changes:
+                    self.apply_file_changes(changes)
+            except Exception as e:
+                logger.error(f"ファイル変更反映エラー: {e}")
+
+        event_system.subscribe(FILE_CHANGES_EVENT, on_file_changes, subscriber_id=self._subscriber_id)
+        self._event_system = event_system
+
+    def detach_event_system(self):
+        """ファイル変更バッチの購読を解除"""
+        if self._event_system is not None:
+            self._event_system.unsubscribe_all(self._subscriber_id)
+            self._event_system = None
+
+    def _run_pipeline(self,
+                      tasks: Iterator[Tuple[str, int, int, Optional[str]]],
+                      progress: IndexingProgress,
+                      use_processes: bool) -> bool:
+        """
+        分割・書き込みパイプラインを実行
+
+        Returns:
+            bool: タスクの列挙が例外なく完了したか
+        """
+        write_queue: "queue.Queue[Optional[List[Dict[str, Any]]]]" = queue.Queue(maxsize=self.queue_size)
+        writer = threading.Thread(
+            target=self._writer_loop, args=(write_queue, progress),
+            name="repository_indexer_writer", daemon=True
+        )
+        writer.start()
+
+        executor = self._create_executor(use_processes)
+        try:
+            pending: Set[Future] = set()
+            for batch in _batched(tasks, self.files_per_task):
+                if self._cancel_event.is_set():
+                    break
+                pending.add(executor.submit(_parse_files, batch, self.max_file_size))
+
+                # 実行中タスクが上限に達したら完了を待つ
+                if len(pending) >= self.max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    self._collect(done, write_queue, progress)
+
+            progress.discovery_complete = True
+
+            while pending and not self._cancel_event.is_set():
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                self._collect(done, write_queue, progress)
+
+            for future in pending:
+                future.cancel()
+            return True
+
+        except Exception as e:
+            logger.error(f"インデックス作成エラー: {e}")
+            return False
+        finally:
+            executor.shutdown(wait=True)
+            write_queue.put(None)
+            writer.join()
+
+    def _create_executor(self, use_processes: bool) -> Executor:
+        """分割ワーカーのプールを作成"""
+        initargs = (self.max_chunk_size, self.overlap_size)
+        if use_processes:
+            try:
+                return ProcessPoolExecutor(
+                    max_workers=self.max_workers, initializer=_init_worker, initargs=initargs
+                )
+            except (OSError, NotImplementedError) as e:
+                logger.warning(f"プロセスプールを作成できないためスレッドで実行します: {e}")
+        return ThreadPoolExecutor(
+            max_workers=self.max_workers, initializer=_init_worker, initargs=initargs,
+            thread_name_prefix="repository_indexer"
+        )
+
+    def _collect(self, done: Iterable[Future], write_queue: queue.Queue, progress: IndexingProgress):
+        """完了したタスクの結果を書き込みキューへ渡す"""
+        for future in done:
+            try:
+                results = future.result()
+            except Exception as e:
+                logger.error(f"チャンク分割タスクエラー: {e}")
+                progress.files_failed += self.files_per_task
+                continue
+
+            records: List[Dict[str, Any]] = []
+            for result in results:
+                error = result.pop('error')
+                if error:
+                    progress.files_failed += 1
+                    logger.debug(f"ファイル解析エラー {result['file_path']}: {error}")
+                    continue
+
+                progress.bytes_read += result.pop('bytes_read')
+                if result.pop('skipped'):
+                    # 対象外になったファイルの旧チャンクは空のチャンクで置き換えて削除
+                    progress.files_skipped += 1
+                elif result['chunks'] is None:
+                    # 更新時刻のみ変わり内容は同じ
+                    progress.files_unchanged += 1
+                else:
+                    progress.files_parsed += 1
+                    progress.chunks_parsed += len(result['chunks'])
+                records.append(result)
+
+            if records:
+                # キューが満杯の場合はライターが追いつくまで待機
+                write_queue.put(records)
+
+            self._report(progress)
+
+    def _writer_loop(self, write_queue: queue.Queue, progress: IndexingProgress):
+        """書き込みキューのファイルをまとめてVectorStoreへ書き込む"""
+        buffer: List[Dict[str, Any]] = []
+        buffered_chunks = 0
+        while True:
+            records = write_queue.get()
+            if records is None:
+                break
+            buffer.extend(records)
+            buffered_chunks += sum(len(record['chunks'] or ()) for record in records)
+            if buffered_chunks >= self.batch_size:
+                self._flush(buffer, progress)
+                buffer = []
+                buffered_chunks = 0
+        if buffer:
+            self._flush(buffer, progress)
+
+    def _flush(self, records: List[Dict[str, Any]], progress: IndexingProgress):
+        """ファイル単位のチャンクを一括で置き換える"""
+        try:
+            progress.chunks_written += self.vector_store.replace_files(records)
+        except Exception as e:
+            progress.files_failed += len(records)
+            logger.error(f"チャンク書き込みエラー: {e}")
+
+    def _report(self, progress: IndexingProgress, force: bool = False):
+        """進捗を通知"""
+        if not self.progress_callback:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_report < self.progress_interval:
+            return
+        self._last_report = now
+        try:
+            self.progress_callback(progress.to_dict())
+        except Exception as e:
+            logger.error(f"進捗通知エラー: {e}")
+
+
+def _batched(iterable: Iterable[str], size: int) -> Iterator[List[str]]:
+    """size件ずつまとめる"""
+    batch: List[str] = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -118,6 +118,18 @@ class VectorStore:
             )
         """)
         
+        # ファイルマニフェストテーブル（増分インデックス用）
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS file_manifest (
+                file_path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                chunk_ids TEXT NOT NULL,
+                indexed_at TEXT NOT NULL
+            )
+        """)
+        
         # インデックス作成
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_chunks_file_path ON chunks (file_path)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_chunks_language ON chunks (language)")
@@ -146,12 +158,14 @@ class VectorStore:
                 random_state=42
             )
     
-    def add_chunks(self, chunks: List[Dict[str, Any]]) -> List[str]:
+    def add_chunks(self, chunks: List[Dict[str, Any]], retrain: bool = True) -> List[str]:
         """
         チャンクを追加してベクトル化
         
         Args:
             chunks: チャンクのリスト
+            retrain: 追加後にベクトライザーを再訓練するか
+                     （一括投入時はFalseにして最後にretrain_vectorizersを1回呼ぶ）
             
         Returns:
             追加されたチャンクのIDリスト
@@ -159,13 +173,15 @@ class VectorStore:
         added_ids = []
         
         try:
+            # 1トランザクションでまとめて挿入
             for chunk in chunks:
-                chunk_id = self._add_single_chunk(chunk)
+                chunk_id = self._add_single_chunk(chunk, commit=False)
                 if chunk_id:
                     added_ids.append(chunk_id)
+            self.db_connection.commit()
             
             # ベクトライザーの再訓練（必要に応じて）
-            if added_ids:
+            if added_ids and retrain:
                 self._retrain_vectorizers()
             
             self.logger.info(f"チャンク追加完了: {len(added_ids)} 個")
@@ -175,65 +191,17 @@ class VectorStore:
             self.logger.error(f"チャンク追加エラー: {e}")
             return []
     
-    def _add_single_chunk(self, chunk: Dict[str, Any]) -> Optional[str]:
+    def retrain_vectorizers(self):
+        """ベクトライザーを再訓練（add_chunks(retrain=False) で一括投入した後に呼ぶ）"""
+        self._retrain_vectorizers()
+    
+    def _add_single_chunk(self, chunk: Dict[str, Any], commit: bool = True) -> Optional[str]:
         """単一チャンクの追加"""
         try:
-            # チャンクIDの生成
-            chunk_id = self._generate_chunk_id(chunk)
-            
-            # 重複チェック
-            if self._chunk_exists(chunk_id):
-                self.logger.debug(f"チャンクは既に存在します: {chunk_id}")
-                return chunk_id
+            chunk_id = self._insert_chunk(chunk)
             
-            # 内容のハッシュ化
-            content = chunk.get('content', '')
-            content_hash = hashlib.md5(content.encode()).hexdigest()
-            
-            # メタデータの準備
-            metadata = {
-                'function_name': chunk.get('function_name', ''),
-                'class_name': chunk.get('class_name', ''),
-                'docstring': chunk.get('docstring', ''),
-                'keywords': chunk.get('keywords', []),
-                'parameters': chunk.get('parameters', [])
-            }
-            
-            # データベースに挿入
-            cursor = self.db_connection.cursor()
-            now = datetime.now().isoformat()
-            
-            cursor.execute("""
-                INSERT INTO chunks (
-                    id, content, content_hash, metadata, file_path, 
-                    language, chunk_type, line_start, line_end, 
-                    created_at, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                chunk_id,
-                content,
-                content_hash,
-                json.dumps(metadata, ensure_ascii=False),
-                chunk.get('file_path', ''),
-                chunk.get('language', 'text'),
-                chunk.get('type', 'unknown'),
-                chunk.get('line_start', 0),
-                chunk.get('line_end', 0),
-                now,
-                now
-            ))
-            
-            # ベクトル生成と保存
-            vector = self._generate_vector(chunk)
-            if vector is not None:
-                self._save_vector(chunk_id, vector)
-            
-            self.db_connection.commit()
-            
-            # キャッシュに追加
-            self.chunk_cache[chunk_id] = chunk
-            if vector is not None:
-                self.vector_cache[chunk_id] = vector
+            if commit:
+                self.db_connection.commit()
             
             return chunk_id
             
@@ -241,6 +209,65 @@ class VectorStore:
             self.logger.error(f"チャンク追加エラー: {e}")
             return None
     
+    def _insert_chunk(self, chunk: Dict[str, Any]) -> str:
+        """チャンクを挿入（コミットせず、エラーは呼び出し側へ送出）"""
+        # チャンクIDの生成
+        chunk_id = self._generate_chunk_id(chunk)
+        
+        # 重複チェック
+        if self._chunk_exists(chunk_id):
+            self.logger.debug(f"チャンクは既に存在します: {chunk_id}")
+            return chunk_id
+        
+        # 内容のハッシュ化
+        content = chunk.get('content', '')
+        content_hash = hashlib.md5(content.encode()).hexdigest()
+        
+        # メタデータの準備
+        metadata = {
+            'function_name': chunk.get('function_name', ''),
+            'class_name': chunk.get('class_name', ''),
+            'docstring': chunk.get('docstring', ''),
+            'keywords': chunk.get('keywords', []),
+            'parameters': chunk.get('parameters', [])
+        }
+        
+        # データベースに挿入
+        cursor = self.db_connection.cursor()
+        now = datetime.now().isoformat()
+        
+        cursor.execute("""
+            INSERT INTO chunks (
+                id, content, content_hash, metadata, file_path, 
+                language, chunk_type, line_start, line_end, 
+                created_at, updated_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            chunk_id,
+            content,
+            content_hash,
+            json.dumps(metadata, ensure_ascii=False),
+            chunk.get('file_path', ''),
+            chunk.get('language', 'text'),
+            chunk.get('type', 'unknown'),
+            chunk.get('line_start', 0),
+            chunk.get('line_end', 0),
+            now,
+            now
+        ))
+        
+        # ベクトル生成と保存
+        vector = self._generate_vector(chunk)
+        if vector is not None:
+            self._save_vector(chunk_id, vector)
+        
+        # キャッシュに追加
+        self.chunk_cache[chunk_id] = chunk
+        if vector is not None:
+            self.vector_cache[chunk_id] = vector
+        
+        return chunk_id
+    
     def _generate_chunk_id(self, chunk: Dict[str, Any]) -> str:
         """チャンクIDの生成"""
         # ファイルパス、行番号、内容のハッシュからIDを生成
@@ -702,6 +729,164 @@ class VectorStore:
             self.logger.error(f"チャンク削除エラー: {e}")
             return False
     
+    def get_file_manifest(self, 
+                          root_path: Optional[str] = None,
+                          file_paths: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        ファイルマニフェストを取得
+        
+        Args:
+            root_path: 指定した場合はこのディレクトリ配下のファイルのみ
+            file_paths: 指定した場合はこれらのファイルのみ
+            
+        Returns:
+            Dict[str, Dict[str, Any]]: ファイルパス -> (size, mtime_ns, content_hash, chunk_ids, indexed_at)
+        """
+        try:
+            cursor = self.db_connection.cursor()
+            if file_paths is not None:
+                rows = []
+                paths = list(file_paths)
+                # SQLiteのパラメータ数上限を超えないよう分割
+                for i in range(0, len(paths), 500):
+                    batch = paths[i:i + 500]
+                    cursor.execute(
+                        f"SELECT * FROM file_manifest WHERE file_path IN ({','.join('?' * len(batch))})",
+                        batch
+                    )
+                    rows.extend(cursor.fetchall())
+            elif root_path:
+                prefix = str(root_path).rstrip('/\\')
+                cursor.execute(
+                    "SELECT * FROM file_manifest WHERE file_path = ? OR substr(file_path, 1, ?) IN (?, ?)",
+                    (prefix, len(prefix) + 1, prefix + '/', prefix + '\\')
+                )
+                rows = cursor.fetchall()
+            else:
+                cursor.execute("SELECT * FROM file_manifest")
+                rows = cursor.fetchall()
+            
+            return {
+                row['file_path']: {
+                    'size': row['size'],
+                    'mtime_ns': row['mtime_ns'],
+                    'content_hash': row['content_hash'],
+                    'chunk_ids': json.loads(row['chunk_ids']),
+                    'indexed_at': row['indexed_at']
+                }
+                for row in rows
+            }
+            
+        except Exception as e:
+            self.logger.error(f"マニフェスト取得エラー: {e}")
+            return {}
+    
+    def replace_files(self, files: List[Dict[str, Any]]) -> int:
+        """
+        ファイル単位でチャンクを置き換え
+        
+        全ファイルを1トランザクションで処理し、途中で失敗した場合は
+        旧チャンクとマニフェストをそのまま残す。
+        
+        Args:
+            files: file_path, size, mtime_ns, content_hash, chunks を持つ辞書のリスト
+                   （chunksがNoneの場合は内容が変わっていないとみなしてstat情報のみ更新）
+            
+        Returns:
+            int: 書き込んだチャンク数
+        """
+        cursor = self.db_connection.cursor()
+        written = 0
+        
+        try:
+            now = datetime.now().isoformat()
+            for file_info in files:
+                file_path = file_info['file_path']
+                chunks = file_info.get('chunks')
+                
+                if chunks is None:
+                    cursor.execute(
+                        "UPDATE file_manifest SET size = ?, mtime_ns = ? WHERE file_path = ?",
+                        (file_info['size'], file_info['mtime_ns'], file_path)
+                    )
+                    continue
+                
+                self._delete_file_chunks(cursor, file_path)
+                
+                chunk_ids = []
+                for chunk in chunks:
+                    chunk_ids.append(self._insert_chunk(chunk))
+                written += len(chunk_ids)
+                
+                cursor.execute("""
+                    INSERT OR REPLACE INTO file_manifest (
+                        file_path, size, mtime_ns, content_hash, chunk_ids, indexed_at
+                    ) VALUES (?, ?, ?, ?, ?, ?)
+                """, (
+                    file_path,
+                    file_info['size'],
+                    file_info['mtime_ns'],
+                    file_info['content_hash'],
+                    json.dumps(chunk_ids),
+                    now
+                ))
+            
+            self.db_connection.commit()
+            return written
+            
+        except Exception as e:
+            self.db_connection.rollback()
+            # ロールバックした行がキャッシュに残らないようにする
+            self.clear_cache()
+            self.logger.error(f"ファイルチャンク置換エラー: {e}")
+            raise
+    
+    def remove_files(self, file_paths: List[str]) -> int:
+        """
+        ファイルのチャンクとマニフェストを削除
+        
+        Args:
+            file_paths: 削除するファイルパスのリスト
+            
+        Returns:
+            int: 削除したチャンク数
+        """
+        cursor = self.db_connection.cursor()
+        removed = 0
+        
+        try:
+            for file_path in file_paths:
+                removed += self._delete_file_chunks(cursor, file_path)
+                cursor.execute("DELETE FROM file_manifest WHERE file_path = ?", (file_path,))
+            
+            self.db_connection.commit()
+            if file_paths:
+                self.logger.info(f"ファイル削除完了: {len(file_paths)} ファイル, {removed} チャンク")
+            return removed
+            
+        except Exception as e:
+            self.db_connection.rollback()
+            self.logger.error(f"ファイル削除エラー: {e}")
+            return 0
+    
+    def _delete_file_chunks(self, cursor: sqlite3.Cursor, file_path: str) -> int:
+        """ファイルのチャンクとベクトルを削除（コミットしない）"""
+        cursor.execute("SELECT id FROM chunks WHERE file_path = ?", (file_path,))
+        chunk_ids = [row['id'] for row in cursor.fetchall()]
+        if not chunk_ids:
+            return 0
+        
+        cursor.execute(
+            "DELETE FROM vectors WHERE chunk_id IN (SELECT id FROM chunks WHERE file_path = ?)",
+            (file_path,)
+        )
+        cursor.execute("DELETE FROM chunks WHERE file_path = ?", (file_path,))
+        
+        for chunk_id in chunk_ids:
+            self.chunk_cache.pop(chunk_id, None)
+            self.vector_cache.pop(chunk_id, None)
+        return len(chunk_ids)
+    
     def update_chunk(self, chunk_id: str, updated_chunk: Dict[str, Any]) -> bool:
         """チャンクを更新"""
         try:
@@ -9,13 +9,13 @@ import yaml
 import csv
 import xml.etree.ElementTree as ET
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union, BinaryIO, TextIO
+from typing import Dict, Iterator, List, Any, Optional, Union, BinaryIO, TextIO
 import mimetypes
-import chardet
 import logging
 
 from ..core.logger import get_logger
 from ..core.config_manager import get_config
+from ..utils import file_reader
 
 logger = get_logger(__name__)
 
@@ -92,6 +92,10 @@ class FileLoader:
             # ファイル情報を取得
             file_info = self._get_file_info(file_path)
             
+            # エンコーディングは1回だけ検出して各読み込みに渡す
+            if not encoding:
+                encoding = self._detect_encoding(file_path)
+            
             # ファイル形式に応じて読み込み
             if file_info['extension'] in ['.json']:
                 content = self._load_json_file(file_path, encoding)
@@ -109,7 +113,7 @@ class FileLoader:
             result = {
                 'file_info': file_info,
                 'content': content,
-                'encoding': encoding or self._detect_encoding(file_path),
+                'encoding': encoding,
                 'success': True,
                 'error': None
             }
@@ -183,25 +187,15 @@ class FileLoader:
             }
     
     def _detect_encoding(self, file_path: Path) -> str:
-        """エンコーディングを検出"""
+        """エンコーディングを検出（先頭8KBのみ読み込む）"""
         try:
             if not self.encoding_detection_enabled:
                 return self.default_encoding
             
-            with open(file_path, 'rb') as f:
-                raw_data = f.read(8192)  # 最初の8KBで検出
-                
-            result = chardet.detect(raw_data)
-            detected_encoding = result.get('encoding')
-            confidence = result.get('confidence', 0)
-            
-            # 信頼度が低い場合はデフォルトエンコーディングを使用
-            if confidence < 0.7:
-                self.logger.warning(f"エンコーディング検出の信頼度が低いです: {confidence:.2f}")
-                return self.default_encoding
-            
-            self.logger.debug(f"エンコーディング検出: {detected_encoding} (信頼度: {confidence:.2f})")
-            return detected_encoding or self.default_encoding
+            raw_data = file_reader.read_prefix(file_path, 8192)
+            detected_encoding = file_reader.detect_encoding_from_bytes(raw_data, self.default_encoding)
+            self.logger.debug(f"エンコーディング検出: {detected_encoding}")
+            return detected_encoding
             
         except Exception as e:
             self.logger.error(f"エンコーディング検出エラー {file_path}: {e}")
@@ -210,12 +204,11 @@ class FileLoader:
     def _load_text_file(self, file_path: Path, encoding: Optional[str] = None) -> str:
         """テキストファイルを読み込み"""
         try:
-            if not encoding:
-                encoding = self._detect_encoding(file_path)
-            
-            with open(file_path, 'r', encoding=encoding, errors='replace') as f:
-                content = f.read()
+            if not encoding and not self.encoding_detection_enabled:
+                encoding = self.default_encoding
             
+            # 検出が必要な場合も同じファイルハンドルの先頭から判定する
+            content, _ = file_reader.read_text(file_path, encoding, default_encoding=self.default_encoding)
             return content
             
         except Exception as e:
@@ -327,6 +320,53 @@ class FileLoader:
         """サポートされている拡張子のリストを取得"""
         return list(self.supported_extensions.keys())
     
+    def iter_lines(self, file_path: Union[str, Path], encoding: Optional[str] = None) -> Iterator[str]:
+        """
+        ファイルを1行ずつ読み込み（サイズ制限の対象外、ファイル全体は保持しない）
+        
+        Args:
+            file_path: ファイルパス
+            encoding: エンコーディング（指定しない場合は自動検出）
+        
+        Yields:
+            str: 改行を除いた行
+        """
+        if not encoding and not self.encoding_detection_enabled:
+            encoding = self.default_encoding
+        yield from file_reader.iter_lines(file_path, encoding, default_encoding=self.default_encoding)
+    
+    def iter_chunks(self, file_path: Union[str, Path], max_chars: int = 100000,
+                    encoding: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        大きなテキストファイルを行単位のチャンクに分けて読み込み
+        
+        Args:
+            file_path: ファイルパス
+            max_chars: チャンクの最大文字数
+            encoding: エンコーディング（指定しない場合は自動検出）
+        
+        Yields:
+            Dict[str, Any]: start_line, end_line, content
+        """
+        if not encoding:
+            encoding = self._detect_encoding(Path(file_path))
+        for start_line, end_line, content in file_reader.iter_line_chunks(file_path, max_chars, encoding):
+            yield {'start_line': start_line, 'end_line': end_line, 'content': content}
+    
+    def read_range(self, file_path: Union[str, Path], offset: int, length: int) -> bytes:
+        """
+        ファイルの指定範囲のバイト列を読み込み
+        
+        Args:
+            file_path: ファイルパス
+            offset: 開始位置
+            length: 読み込むバイト数
+        
+        Returns:
+            bytes: 読み込んだバイト列
+        """
+        return file_reader.read_range(file_path, offset, length)
+    
     def get_file_preview(self, file_path: Union[str, Path], max_lines: int = 10) -> Dict[str, Any]:
         """ファイルのプレビューを取得"""
         try:
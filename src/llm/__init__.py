@@ -41,6 +41,20 @@ from .base_llm import (
     LLMValidationError
 )
 
+# レート制限
+from .rate_limiter import (
+    RateLimitConfig,
+    ProviderRateLimiter,
+    RateLimiterRegistry,
+    get_rate_limiter_registry
+)
+
+# ヘッジリクエスト
+from .hedging import (
+    HedgingPolicy,
+    HedgeTarget
+)
+
 # LLMクライアント実装
 from .openai_client import OpenAIClient
 from .claude_client import ClaudeClient
@@ -120,6 +134,16 @@ __all__ = [
     'get_available_providers',
     'validate_llm_config',
     
+    # レート制限
+    "RateLimitConfig",
+    "ProviderRateLimiter",
+    "RateLimiterRegistry",
+    "get_rate_limiter_registry",
+    
+    # ヘッジリクエスト
+    "HedgingPolicy",
+    "HedgeTarget",
+    
     # LLMクライアント実装
     "OpenAIClient",
     "ClaudeClient", 
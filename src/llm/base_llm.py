@@ -6,6 +6,8 @@
 """
 
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Dict, List, Optional, Any, Union, AsyncGenerator, Generator
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -18,6 +20,11 @@ from pathlib import Path
 from src.core.logger import get_logger
 from src.utils.validation_utils import ValidationUtils
 from src.utils.text_utils import TextUtils
+from src.llm.rate_limiter import (
+    ProviderRateLimiter,
+    is_rate_limit_error,
+    estimate_request_tokens
+)
 
 logger = get_logger(__name__)
 
@@ -78,6 +85,60 @@ class LLMUsage:
             total_tokens=data.get('total_tokens', 0)
         )
 
+@dataclass
+class StreamResult:
+    """ストリーミング生成の完了時に判明する使用量・終了理由"""
+    usage: Optional[LLMUsage] = None
+    finish_reason: str = ""
+
+
+# 実行中のストリーミング生成の結果の通知先（collect_stream_result()の中でのみ設定される）
+_stream_result: ContextVar[Optional[StreamResult]] = ContextVar('llm_stream_result', default=None)
+
+
+@contextmanager
+def collect_stream_result():
+    """
+    この中で消費したストリーミング生成の使用量・終了理由を受け取る
+
+    使用例:
+        with collect_stream_result() as result:
+            async for chunk in client.generate_stream_async(messages):
+                ...
+        result.usage, result.finish_reason
+
+    Yields:
+        StreamResult: クライアントが完了時に値を設定する
+    """
+    result = StreamResult()
+    token = _stream_result.set(result)
+    try:
+        yield result
+    finally:
+        _stream_result.reset(token)
+
+
+def stream_result_requested() -> bool:
+    """呼び出し側がストリーミング生成の使用量・終了理由を求めているか"""
+    return _stream_result.get() is not None
+
+
+def report_stream_result(usage: Optional[LLMUsage] = None, finish_reason: Optional[str] = None):
+    """
+    ストリーミング生成の使用量・終了理由を呼び出し側へ通知（クライアント実装から呼び出す）
+
+    Args:
+        usage: 使用量
+        finish_reason: 終了理由
+    """
+    result = _stream_result.get()
+    if result is None:
+        return
+    if usage is not None:
+        result.usage = usage
+    if finish_reason:
+        result.finish_reason = finish_reason
+
 @dataclass
 class LLMMessage:
     """LLMメッセージクラス"""
@@ -280,6 +341,9 @@ class BaseLLM(ABC):
         self.metrics = LLMMetrics()
         self.conversation_history: List[LLMMessage] = []
         
+        # プロバイダー共有のレート制限（LLMFactoryが設定）
+        self.rate_limiter: Optional[ProviderRateLimiter] = None
+        
         # ユーティリティ
         self.validation_utils = ValidationUtils()
         self.text_utils = TextUtils()
@@ -682,6 +746,9 @@ class BaseLLM(ABC):
         """
         リトライ機能付きで関数を実行
         
+        rate_limiterが設定されている場合はプロバイダー共有の制限枠を取得してから実行し、
+        レート制限エラー時はRetry-After等のヘッダーに従って待機する
+        
         Args:
             func: 実行する関数
             *args: 引数
@@ -692,15 +759,24 @@ class BaseLLM(ABC):
             Any: 関数の実行結果
         """
         effective_config = config or self.config
+        limiter = self.rate_limiter
+        estimated_tokens = estimate_request_tokens(*args, **kwargs) if limiter else 0
         last_exception = None
+        next_delay = 0.0
         
         for attempt in range(effective_config.retry_count + 1):
             try:
                 if attempt > 0:
                     self.logger.info(f"リトライ {attempt}/{effective_config.retry_count}")
-                    await asyncio.sleep(effective_config.retry_delay * attempt)
+                    await asyncio.sleep(next_delay)
                 
-                return await func(*args, **kwargs)
+                if limiter is None:
+                    return await func(*args, **kwargs)
+                
+                async with limiter.limit(estimated_tokens) as permit:
+                    result = await func(*args, **kwargs)
+                    permit.record_usage(result)
+                return result
                 
             except Exception as e:
                 last_exception = e
@@ -708,6 +784,11 @@ class BaseLLM(ABC):
                 
                 if attempt == effective_config.retry_count:
                     break
+                
+                next_delay = effective_config.retry_delay * (attempt + 1)
+                if limiter is not None and is_rate_limit_error(e) and limiter.blocked_for() > 0:
+                    # Retry-After等による待機はリミッター側で全クライアント共通に行う
+                    next_delay = 0.0
         
         # 全てのリトライが失敗した場合
         self.logger.error(f"全てのリトライが失敗しました: {last_exception}")
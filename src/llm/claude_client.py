@@ -13,8 +13,13 @@ import aiohttp
 import anthropic
 from anthropic import AsyncAnthropic
 
-from src.llm.base_llm import BaseLLM, LLMMessage, LLMResponse, LLMConfig, LLMStatus, LLMRole
+from src.llm.base_llm import (
+    BaseLLM, LLMMessage, LLMResponse, LLMConfig, LLMStatus, LLMRole, LLMUsage,
+    report_stream_result
+)
+from src.llm.rate_limiter import record_response_headers
 from src.core.logger import get_logger
+from src.core.token_counter import get_token_counter
 #from ..core.config_manager import get_config
 from src.utils.validation_utils import ValidationUtils
 
@@ -279,10 +284,11 @@ class ClaudeClient(BaseLLM):
         return params
     
     async def _call_claude_api(self, params: Dict[str, Any]):
-        """Claude APIを呼び出し"""
+        """Claude APIを呼び出し（成功時のレート制限ヘッダーも記録）"""
         try:
-            response = await self.client.messages.create(**params)
-            return response
+            raw_response = await self.client.messages.with_raw_response.create(**params)
+            record_response_headers(raw_response.headers)
+            return raw_response.parse()
             
         except anthropic.RateLimitError as e:
             self.logger.warning(f"Claude レート制限エラー: {e}")
@@ -295,11 +301,25 @@ class ClaudeClient(BaseLLM):
             raise
     
     async def _stream_claude_api(self, params: Dict[str, Any]) -> AsyncGenerator[str, None]:
-        """Claude APIをストリーミング呼び出し"""
+        """Claude APIをストリーミング呼び出し（完了時に使用量・終了理由を通知）"""
         try:
+            # messages.stream()はstream引数を受け付けない
+            params = {key: value for key, value in params.items() if key != 'stream'}
             async with self.client.messages.stream(**params) as stream:
+                record_response_headers(getattr(stream.response, 'headers', None))
                 async for text in stream.text_stream:
                     yield text
+                
+                message = await stream.get_final_message()
+                usage = getattr(message, 'usage', None)
+                report_stream_result(
+                    LLMUsage(
+                        prompt_tokens=usage.input_tokens,
+                        completion_tokens=usage.output_tokens,
+                        total_tokens=usage.input_tokens + usage.output_tokens
+                    ) if usage else None,
+                    message.stop_reason
+                )
                     
         except anthropic.RateLimitError as e:
             self.logger.warning(f"Claude ストリーミングレート制限エラー: {e}")
@@ -403,17 +423,8 @@ class ClaudeClient(BaseLLM):
             int: 概算トークン数
         """
         try:
-            # Claudeのトークン計算は複雑なため簡易版
-            # 英語: 約4文字で1トークン
-            # 日本語: 約1.5文字で1トークン
-            
-            # 日本語文字数をカウント
-            japanese_chars = sum(1 for char in text if ord(char) > 127)
-            english_chars = len(text) - japanese_chars
-            
-            estimated_tokens = int(japanese_chars / 1.5) + (english_chars // 4)
-            
-            return max(estimated_tokens, 1)
+            # Claudeのトークナイザーは非公開のため共通のBPEトークナイザーで近似
+            return max(get_token_counter().count(text), 1)
             
         except Exception as e:
             self.logger.error(f"トークン数概算エラー: {e}")
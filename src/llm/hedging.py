@@ -0,0 +1,200 @@
+# src/llm/hedging.py
+"""
+ヘッジリクエストモジュール
+最初のトークンが遅いリクエストに対して別プロバイダー/モデルへ並行リクエストを送り、
+先に完了した方を採用するためのポリシーと統計を提供
+"""
+
+import threading
+from collections import defaultdict, deque
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Any, Deque
+
+from src.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# llm.hedging.enabled を有効にした場合の対話的なタスクタイプのデフォルトポリシー
+# （ヘッジはプロバイダーへの呼び出し数・コストを増やすため、設定で有効にしない限り使用しない）
+# ヘッジ先は環境ごとに利用できるプロバイダーが異なるため、llm.hedging.secondaries で指定する
+DEFAULT_HEDGING_POLICIES: Dict[str, Dict[str, Any]] = {
+    'chat': {
+        'enabled': True,
+        'secondaries': [],
+    },
+    'general': {
+        'enabled': True,
+        'secondaries': [],
+    },
+}
+
+
+@dataclass
+class HedgeTarget:
+    """ヘッジ先（プロバイダーとモデル）"""
+    provider: str
+    model: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        """レイテンシ統計のキー"""
+        return f"{self.provider}:{self.model or 'default'}"
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'HedgeTarget':
+        """辞書からヘッジ先を作成"""
+        return cls(provider=data['provider'], model=data.get('model'))
+
+
+@dataclass
+class HedgingPolicy:
+    """ヘッジポリシー"""
+    enabled: bool = False
+    percentile: float = 95.0
+    initial_delay: float = 2.0
+    min_delay: float = 0.25
+    max_delay: float = 10.0
+    min_samples: int = 10
+    secondaries: List[HedgeTarget] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書形式に変換"""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> 'HedgingPolicy':
+        """辞書からポリシーを作成（未知のキーは無視）"""
+        data = dict(data or {})
+        secondaries = [
+            target if isinstance(target, HedgeTarget) else HedgeTarget.from_dict(target)
+            for target in data.pop('secondaries', [])
+        ]
+        known = {key: value for key, value in data.items() if key in cls.__dataclass_fields__}
+        return cls(secondaries=secondaries, **known)
+
+    def compute_delay(self, tracker: 'LatencyTracker', key: str) -> float:
+        """
+        ヘッジを開始するまでの待機秒数を算出
+
+        観測済みの最初のトークンまでの時間のパーセンタイル値を使用し、
+        サンプルが不足している間はinitial_delayを使用する
+
+        Args:
+            tracker: レイテンシ統計
+            key: プロバイダー/モデルのキー
+
+        Returns:
+            float: 待機秒数
+        """
+        delay = tracker.percentile(key, self.percentile, self.min_samples)
+        if delay is None:
+            delay = self.initial_delay
+        return min(max(delay, self.min_delay), self.max_delay)
+
+
+class LatencyTracker:
+    """プロバイダー/モデル別の最初のトークンまでの時間（TTFT）を記録"""
+
+    def __init__(self, window_size: int = 200):
+        """
+        初期化
+
+        Args:
+            window_size: キー毎に保持するサンプル数
+        """
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window_size))
+
+    def record(self, key: str, seconds: float):
+        """サンプルを記録"""
+        with self._lock:
+            self._samples[key].append(seconds)
+
+    def percentile(self, key: str, percentile: float, min_samples: int = 1) -> Optional[float]:
+        """
+        パーセンタイル値を取得
+
+        Args:
+            key: プロバイダー/モデルのキー
+            percentile: パーセンタイル（0-100）
+            min_samples: 必要な最小サンプル数
+
+        Returns:
+            Optional[float]: パーセンタイル値（サンプル不足の場合はNone）
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if not samples or len(samples) < min_samples:
+            return None
+        index = min(len(samples) - 1, max(0, int(round(percentile / 100.0 * (len(samples) - 1)))))
+        return samples[index]
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """キー別の統計情報を取得"""
+        with self._lock:
+            keys = list(self._samples.keys())
+        return {
+            key: {
+                'samples': len(self._samples[key]),
+                'p50': self.percentile(key, 50),
+                'p95': self.percentile(key, 95),
+            }
+            for key in keys
+        }
+
+
+class HedgeStats:
+    """ヘッジの実行統計（タスクタイプ別の勝率を含む）"""
+
+    def __init__(self):
+        """初期化"""
+        self._lock = threading.Lock()
+        self._by_task_type: Dict[str, Dict[str, int]] = defaultdict(lambda: {
+            'requests': 0,
+            'hedged': 0,
+            'primary_wins': 0,
+            'secondary_wins': 0,
+            'both_failed': 0,
+        })
+
+    def record(self, task_type: str, hedged: bool, winner: Optional[str] = None):
+        """
+        結果を記録
+
+        Args:
+            task_type: タスクタイプ
+            hedged: ヘッジリクエストを発行したか
+            winner: 'primary' / 'secondary' / None（両方失敗）
+        """
+        with self._lock:
+            stats = self._by_task_type[task_type]
+            stats['requests'] += 1
+            if not hedged:
+                return
+            stats['hedged'] += 1
+            if winner == 'primary':
+                stats['primary_wins'] += 1
+            elif winner == 'secondary':
+                stats['secondary_wins'] += 1
+            else:
+                stats['both_failed'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """統計情報を取得"""
+        with self._lock:
+            by_task_type = {key: dict(value) for key, value in self._by_task_type.items()}
+
+        totals = defaultdict(int)
+        for stats in by_task_type.values():
+            hedged = max(stats['hedged'], 1)
+            stats['hedge_rate'] = stats['hedged'] / max(stats['requests'], 1)
+            stats['secondary_win_rate'] = stats['secondary_wins'] / hedged
+            for key in ('requests', 'hedged', 'primary_wins', 'secondary_wins', 'both_failed'):
+                totals[key] += stats[key]
+
+        return {
+            **totals,
+            'hedge_rate': totals['hedged'] / max(totals['requests'], 1),
+            'secondary_win_rate': totals['secondary_wins'] / max(totals['hedged'], 1),
+            'by_task_type': by_task_type,
+        }
@@ -13,6 +13,7 @@ from dataclasses import dataclass
 from unittest import result
 
 from src.llm.base_llm import BaseLLM, LLMConfig, LLMRole
+from src.llm.rate_limiter import ProviderRateLimiter, RateLimiterRegistry, get_rate_limiter_registry
 from src.llm.openai_client import OpenAIClient
 from src.llm.claude_client import ClaudeClient
 #from src.llm.local_llm_client import LocalLLMClient #旧文LocalLLMClient
@@ -76,6 +77,9 @@ class LLMFactory:
         # デフォルトプロバイダー
         self._default_provider: Optional[str] = None
         
+        # プロバイダー共有のレート制限（同一プロバイダーの全クライアントで共有）
+        self._rate_limiters: RateLimiterRegistry = get_rate_limiter_registry()
+        
         # 初期化
         self._initialize_default_providers()
         
@@ -180,6 +184,7 @@ class LLMFactory:
                 raise ValueError("クライアントクラスはBaseLLMを継承する必要があります")
             
             self._providers[provider_info.name] = provider_info
+            self._configure_rate_limiter(provider_info.name)
             self.logger.info(f"プロバイダーを登録しました: {provider_info.name}")
             
         except Exception as e:
@@ -240,6 +245,7 @@ class LLMFactory:
             
             # クライアントインスタンスの作成
             client = provider_info.client_class(effective_config)
+            client.rate_limiter = self.get_rate_limiter(effective_provider)
             
             # アクティブクライアントとして登録
             client_key = f"{effective_provider}_{id(client)}"
@@ -406,6 +412,41 @@ class LLMFactory:
             self.logger.error(f"設定構築エラー: {e}")
             raise
     
+    def _configure_rate_limiter(self, provider_name: str):
+        """
+        設定ファイルの llm.<provider>.rate_limits からレート制限を設定
+        
+        Args:
+            provider_name: プロバイダー名
+        """
+        try:
+            rate_limits = get_config().get('llm', {}).get(provider_name, {}).get('rate_limits')
+        except Exception as e:
+            self.logger.debug(f"レート制限設定の取得に失敗しました: {e}")
+            rate_limits = None
+        self._rate_limiters.configure(provider_name, rate_limits)
+    
+    def get_rate_limiter(self, provider_name: Optional[str] = None) -> ProviderRateLimiter:
+        """
+        プロバイダーの共有レート制限を取得
+        
+        Args:
+            provider_name: プロバイダー名（Noneの場合はデフォルト）
+            
+        Returns:
+            ProviderRateLimiter: レート制限インスタンス
+        """
+        return self._rate_limiters.get_limiter(provider_name or self._default_provider)
+    
+    def get_rate_limit_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        プロバイダー別のレート制限統計を取得
+        
+        Returns:
+            Dict[str, Dict[str, Any]]: プロバイダー名をキーとする統計情報
+        """
+        return self._rate_limiters.get_stats()
+    
     def get_available_providers(self) -> List[str]:
         """
         利用可能なプロバイダーを取得
@@ -720,6 +761,7 @@ class LLMFactory:
                 'active_clients': len(self._active_clients),
                 'default_provider': self._default_provider,
                 'provider_names': list(self._providers.keys()),
+                'rate_limits': self.get_rate_limit_stats(),
                 'client_info': {}
             }
             
@@ -13,10 +13,20 @@ from dataclasses import dataclass, field
 from enum import Enum
 import json
 
-from .base_llm import BaseLLM, LLMMessage, LLMResponse, LLMConfig, LLMRole, LLMStatus
+from .base_llm import (
+    BaseLLM, LLMMessage, LLMResponse, LLMConfig, LLMRole, LLMStatus, LLMUsage, collect_stream_result
+)
 from .llm_factory import get_llm_factory, LLMFactory
+from .rate_limiter import estimate_request_tokens
 from .prompt_templates import PromptTemplateManager, get_prompt_template_manager
 from .response_parser import ResponseParser, get_response_parser
+from .hedging import (
+    HedgingPolicy,
+    HedgeTarget,
+    HedgeStats,
+    LatencyTracker,
+    DEFAULT_HEDGING_POLICIES
+)
 from ..core.logger import get_logger
 from ..core.event_system import Event
 from ..utils.validation_utils import ValidationUtils
@@ -162,6 +172,11 @@ class LLMServiceCore:
             'start_time': datetime.now()
         }
         
+        # ヘッジリクエスト（タスクタイプ別ポリシー・最初のトークンまでの時間・勝率）
+        self._hedging_policies: Dict[TaskType, HedgingPolicy] = {}
+        self.latency_tracker = LatencyTracker()
+        self.hedge_stats = HedgeStats()
+        
         # アクティブなクライアント
         self.active_clients: Dict[str, BaseLLM] = {}
         
@@ -207,8 +222,12 @@ class LLMServiceCore:
             # メッセージ作成
             messages = self._create_messages(prepared_prompt, task)
             
-            # LLM実行
-            response = await client.generate_async(messages, task.config)
+            # LLM実行（ヘッジが有効でヘッジ先があるタスクタイプは別プロバイダーと競争させる）
+            policy = self.get_hedging_policy(task.task_type)
+            if policy.enabled and policy.secondaries:
+                response = await self._generate_with_hedging(task, client, messages, policy)
+            else:
+                response = await client.generate_async(messages, task.config)
             
             # レスポンス解析
             parsed_content = await self._parse_response(response, task)
@@ -227,9 +246,10 @@ class LLMServiceCore:
                 tokens_used=response.usage.get('total_tokens', 0),
                 cost_estimate=self._estimate_cost(response),
                 metadata={
-                    'provider': task.provider,
+                    'provider': response.metadata.get('provider', task.provider),
                     'model': response.model,
-                    'finish_reason': response.finish_reason
+                    'finish_reason': response.finish_reason,
+                    'hedge': response.metadata.get('hedge')
                 }
             )
             
@@ -333,12 +353,29 @@ class LLMServiceCore:
         Args:
             task: タスク
             
+        Returns:
+            BaseLLM: LLMクライアント
+        """
+        provider = task.provider or self._get_default_provider(task.task_type)
+        return await self._get_client_for(provider, task.model, task.config)
+    
+    async def _get_client_for(self, 
+                              provider: str, 
+                              model: Optional[str] = None,
+                              config: Optional[LLMConfig] = None) -> BaseLLM:
+        """
+        プロバイダー・モデルを指定してLLMクライアントを取得
+        
+        Args:
+            provider: プロバイダー名
+            model: モデル名
+            config: LLM設定
+            
         Returns:
             BaseLLM: LLMクライアント
         """
         try:
-            provider = task.provider or self._get_default_provider(task.task_type)
-            client_key = f"{provider}_{task.model or 'default'}"
+            client_key = f"{provider}_{model or 'default'}"
             
             # キャッシュされたクライアントを確認
             if client_key in self.active_clients:
@@ -350,7 +387,7 @@ class LLMServiceCore:
                     del self.active_clients[client_key]
             
             # 新しいクライアントを作成
-            config = task.config or self._get_default_config(provider, task.model)
+            config = config or self._get_default_config(provider, model)
             client = await self.llm_factory.create_client_async(provider, config)
             
             # キャッシュに保存
@@ -362,6 +399,254 @@ class LLMServiceCore:
             self.logger.error(f"クライアント取得エラー: {e}")
             raise
     
+    def get_hedging_policy(self, task_type: TaskType) -> HedgingPolicy:
+        """
+        タスクタイプのヘッジポリシーを取得
+        
+        llm.hedging.enabled が有効な場合のみ、llm.hedging（共通値）と
+        llm.hedging.task_types.<task_type>（個別値）を DEFAULT_HEDGING_POLICIES に上書きマージする
+        （未設定の場合はヘッジしない）
+        
+        Args:
+            task_type: タスクタイプ
+            
+        Returns:
+            HedgingPolicy: ヘッジポリシー
+        """
+        if task_type in self._hedging_policies:
+            return self._hedging_policies[task_type]
+        
+        try:
+            hedging_config = self.config.get('hedging') or self.app_config.get('llm', {}).get('hedging', {})
+            if hedging_config.get('enabled', False):
+                common = {k: v for k, v in hedging_config.items() if k not in ('enabled', 'task_types')}
+                task_config = hedging_config.get('task_types', {}).get(task_type.value, {})
+                policy = HedgingPolicy.from_dict({
+                    **DEFAULT_HEDGING_POLICIES.get(task_type.value, {}),
+                    **common,
+                    **task_config
+                })
+            else:
+                policy = HedgingPolicy()
+        except Exception as e:
+            self.logger.error(f"ヘッジポリシー取得エラー: {e}")
+            policy = HedgingPolicy()
+        
+        self._hedging_policies[task_type] = policy
+        return policy
+    
+    def set_hedging_policy(self, task_type: Union[TaskType, str], policy: HedgingPolicy):
+        """
+        タスクタイプのヘッジポリシーを設定
+        
+        Args:
+            task_type: タスクタイプ
+            policy: ヘッジポリシー
+        """
+        if isinstance(task_type, str):
+            task_type = TaskType(task_type)
+        self._hedging_policies[task_type] = policy
+        self.logger.info(f"ヘッジポリシーを設定しました: {task_type.value} (enabled={policy.enabled})")
+    
+    async def _generate_with_hedging(self, 
+                                     task: LLMTask, 
+                                     client: BaseLLM,
+                                     messages: List[LLMMessage],
+                                     policy: HedgingPolicy) -> LLMResponse:
+        """
+        ヘッジ付きで生成
+        
+        プライマリが待機時間内に最初のトークンを返さない（または失敗した）場合に
+        セカンダリへ同じリクエストを送り、先に完了した方を採用して他方をキャンセルする
+        
+        Args:
+            task: タスク
+            client: プライマリのクライアント
+            messages: メッセージリスト
+            policy: ヘッジポリシー
+            
+        Returns:
+            LLMResponse: 採用された応答
+        """
+        primary = HedgeTarget(task.provider or self._get_default_provider(task.task_type), task.model)
+        delay = policy.compute_delay(self.latency_tracker, primary.key)
+        
+        first_token = asyncio.Event()
+        primary_task = asyncio.ensure_future(
+            self._race_request(client, messages, task.config, primary, first_token)
+        )
+        first_token_waiter = asyncio.ensure_future(first_token.wait())
+        racers = {primary_task: 'primary'}
+        
+        try:
+            await asyncio.wait(
+                {primary_task, first_token_waiter},
+                timeout=delay,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            first_token_waiter.cancel()
+            
+            primary_failed = primary_task.done() and primary_task.exception() is not None
+            secondary = None
+            if not first_token.is_set() or primary_failed:
+                secondary = self._select_hedge_target(primary, policy)
+            
+            if secondary is None:
+                response = await primary_task
+                self.hedge_stats.record(task.task_type.value, hedged=False)
+                return response
+            
+            self.logger.info(
+                f"ヘッジリクエストを開始: {task.id} {primary.key} -> {secondary.key} "
+                f"({'失敗' if primary_failed else f'{delay:.2f}s経過'})"
+            )
+            try:
+                secondary_client = await self._get_client_for(secondary.provider, secondary.model)
+            except Exception as e:
+                # セカンダリを用意できない場合はプライマリの結果をそのまま使う
+                self.logger.warning(f"ヘッジ先のクライアント取得エラー: {secondary.key}: {e}")
+                response = await primary_task
+                self.hedge_stats.record(task.task_type.value, hedged=False)
+                return response
+            secondary_task = asyncio.ensure_future(
+                self._race_request(secondary_client, messages, None, secondary, asyncio.Event())
+            )
+            racers[secondary_task] = 'secondary'
+            
+            pending = set(racers)
+            last_error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for finished in done:
+                    if finished.exception() is None:
+                        winner = racers[finished]
+                        response = finished.result()
+                        response.metadata['hedge'] = {
+                            'winner': winner,
+                            'delay': delay,
+                            'primary': primary.key,
+                            'secondary': secondary.key
+                        }
+                        self.hedge_stats.record(task.task_type.value, hedged=True, winner=winner)
+                        return response
+                    last_error = finished.exception()
+            
+            self.hedge_stats.record(task.task_type.value, hedged=True, winner=None)
+            raise last_error
+            
+        finally:
+            first_token_waiter.cancel()
+            for racer in racers:
+                if not racer.done():
+                    racer.cancel()
+    
+    async def _race_request(self, 
+                            client: BaseLLM,
+                            messages: List[LLMMessage],
+                            config: Optional[LLMConfig],
+                            target: HedgeTarget,
+                            first_token: asyncio.Event) -> LLMResponse:
+        """
+        ヘッジ競争用に1リクエストを実行し、最初のトークンの到着を通知
+        
+        ストリーミング対応プロバイダーは最初の断片の到着時刻を、
+        非対応プロバイダーは応答完了時刻を最初のトークンまでの時間として記録する
+        
+        Args:
+            client: LLMクライアント
+            messages: メッセージリスト
+            config: LLM設定
+            target: 実行先
+            first_token: 最初のトークン到着時にセットするイベント
+            
+        Returns:
+            LLMResponse: 応答
+        """
+        provider_info = self.llm_factory.get_provider_info(target.provider)
+        
+        if provider_info and provider_info.supports_streaming:
+            # ストリーミングは_execute_with_retryを通らないため、プロバイダー共有の制限枠をここで取得する
+            limiter = getattr(client, 'rate_limiter', None)
+            if limiter is None:
+                return await self._race_stream(client, messages, config, target, first_token)
+            
+            estimated_tokens = estimate_request_tokens({
+                'messages': messages,
+                'max_tokens': (config or client.config).max_tokens
+            })
+            async with limiter.limit(estimated_tokens) as permit:
+                response = await self._race_stream(client, messages, config, target, first_token)
+                # 使用量を通知しないクライアントは見積もりのまま精算する
+                if response.usage.total_tokens:
+                    permit.record_usage(response)
+            return response
+        
+        start_time = time.time()
+        response = await client.generate_async(messages, config)
+        first_token.set()
+        self.latency_tracker.record(target.key, time.time() - start_time)
+        response.metadata['provider'] = target.provider
+        return response
+    
+    async def _race_stream(self, 
+                           client: BaseLLM,
+                           messages: List[LLMMessage],
+                           config: Optional[LLMConfig],
+                           target: HedgeTarget,
+                           first_token: asyncio.Event) -> LLMResponse:
+        """
+        ストリーミングで1リクエストを実行し、断片を連結した応答を返す
+        
+        Args:
+            client: LLMクライアント
+            messages: メッセージリスト
+            config: LLM設定
+            target: 実行先
+            first_token: 最初の断片の到着時にセットするイベント
+            
+        Returns:
+            LLMResponse: 応答
+        """
+        start_time = time.time()
+        chunks = []
+        with collect_stream_result() as stream_result:
+            async for chunk in client.generate_stream_async(messages, config):
+                if not first_token.is_set():
+                    first_token.set()
+                    self.latency_tracker.record(target.key, time.time() - start_time)
+                chunks.append(chunk)
+        
+        # 使用量・終了理由はクライアントが通知した値（通知しないクライアントは未設定のまま）
+        return LLMResponse(
+            content=''.join(chunks),
+            model=(config or client.config).model or target.model or '',
+            usage=stream_result.usage or LLMUsage(),
+            finish_reason=stream_result.finish_reason,
+            response_time=time.time() - start_time,
+            metadata={'provider': target.provider, 'streamed': True}
+        )
+    
+    def _select_hedge_target(self, primary: HedgeTarget, policy: HedgingPolicy) -> Optional[HedgeTarget]:
+        """
+        ヘッジ先を選択（プライマリと同一・未登録・レート制限中のものは除外）
+        
+        Args:
+            primary: プライマリの実行先
+            policy: ヘッジポリシー
+            
+        Returns:
+            Optional[HedgeTarget]: ヘッジ先（候補がない場合はNone）
+        """
+        for target in policy.secondaries:
+            if target.provider == primary.provider and target.model == primary.model:
+                continue
+            if not self.llm_factory.get_provider_info(target.provider):
+                continue
+            if self.llm_factory.get_rate_limiter(target.provider).blocked_for() > 0:
+                continue
+            return target
+        return None
+    
     def _create_messages(self, prompt: str, task: LLMTask) -> List[LLMMessage]:
         """
         メッセージリストを作成
@@ -655,6 +940,8 @@ class LLMServiceCore:
                     self.stats['total_requests'] / max(uptime / 60, 1)
                 ),
                 'active_clients': len(self.active_clients),
+                'hedging': self.hedge_stats.get_stats(),
+                'first_token_latency': self.latency_tracker.get_stats(),
                 'task_history_size': len(self.task_history),
                 'result_history_size': len(self.result_history)
             })
@@ -13,8 +13,13 @@ import aiohttp
 import openai
 from openai import AsyncOpenAI
 
-from .base_llm import BaseLLM, LLMMessage, LLMResponse, LLMConfig, LLMStatus, LLMRole
+from .base_llm import (
+    BaseLLM, LLMMessage, LLMResponse, LLMConfig, LLMStatus, LLMRole, LLMUsage,
+    report_stream_result, stream_result_requested
+)
+from .rate_limiter import record_response_headers
 from ..core.logger import get_logger
+from ..core.token_counter import get_token_counter
 #from ..core.config_manager import get_config
 from ..utils.validation_utils import ValidationUtils
 
@@ -259,10 +264,11 @@ class OpenAIClient(BaseLLM):
         return params
     
     async def _call_openai_api(self, params: Dict[str, Any]):
-        """OpenAI APIを呼び出し"""
+        """OpenAI APIを呼び出し（成功時のレート制限ヘッダーも記録）"""
         try:
-            response = await self.client.chat.completions.create(**params)
-            return response
+            raw_response = await self.client.chat.completions.with_raw_response.create(**params)
+            record_response_headers(raw_response.headers)
+            return raw_response.parse()
             
         except openai.RateLimitError as e:
             self.logger.warning(f"OpenAI レート制限エラー: {e}")
@@ -275,13 +281,31 @@ class OpenAIClient(BaseLLM):
             raise
     
     async def _stream_openai_api(self, params: Dict[str, Any]) -> AsyncGenerator[str, None]:
-        """OpenAI APIをストリーミング呼び出し"""
+        """OpenAI APIをストリーミング呼び出し（完了時に使用量・終了理由を通知）"""
         try:
+            if stream_result_requested():
+                # 最後のチャンクで使用量を受け取る
+                params = {**params, 'stream_options': {'include_usage': True}}
             stream = await self.client.chat.completions.create(**params)
+            record_response_headers(getattr(stream.response, 'headers', None))
             
+            usage = None
+            finish_reason = None
             async for chunk in stream:
-                if chunk.choices and chunk.choices[0].delta.content:
-                    yield chunk.choices[0].delta.content
+                if chunk.choices:
+                    choice = chunk.choices[0]
+                    if choice.finish_reason:
+                        finish_reason = choice.finish_reason
+                    if choice.delta.content:
+                        yield choice.delta.content
+                if getattr(chunk, 'usage', None):
+                    usage = LLMUsage(
+                        prompt_tokens=chunk.usage.prompt_tokens,
+                        completion_tokens=chunk.usage.completion_tokens,
+                        total_tokens=chunk.usage.total_tokens
+                    )
+            
+            report_stream_result(usage, finish_reason)
                     
         except openai.RateLimitError as e:
             self.logger.warning(f"OpenAI ストリーミングレート制限エラー: {e}")
@@ -409,17 +433,8 @@ class OpenAIClient(BaseLLM):
             int: 概算トークン数
         """
         try:
-            # 簡易的な概算（実際のトークナイザーを使用することを推奨）
-            # 英語: 約4文字で1トークン
-            # 日本語: 約1文字で1トークン
-            
-            # 日本語文字数をカウント
-            japanese_chars = sum(1 for char in text if ord(char) > 127)
-            english_chars = len(text) - japanese_chars
-            
-            estimated_tokens = japanese_chars + (english_chars // 4)
-            
-            return max(estimated_tokens, 1)
+            # モデルに対応するエンコーディングで計測（未導入時は較正済み推定）
+            return max(get_token_counter(self.config.model).count(text), 1)
             
         except Exception as e:
             self.logger.error(f"トークン数概算エラー: {e}")
@@ -0,0 +1,816 @@
+# src/llm/rate_limiter.py
+"""
+LLMレート制限モジュール
+プロバイダー単位のトークンバケットとAIMD方式の適応的同時実行制御を提供
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional, Mapping, Tuple, Deque
+
+from src.core.logger import get_logger
+from src.core.token_counter import get_token_counter
+
+logger = get_logger(__name__)
+
+# プロバイダー名の別名（LLMInterface側の名称をファクトリー側に揃える）
+PROVIDER_ALIASES: Dict[str, str] = {
+    'anthropic': 'claude',
+}
+
+# プロバイダー別のデフォルト制限値（設定ファイルで上書き可能）
+DEFAULT_RATE_LIMITS: Dict[str, Dict[str, Any]] = {
+    'openai': {
+        'requests_per_minute': 500,
+        'tokens_per_minute': 200000,
+        'initial_concurrency': 8,
+        'max_concurrency': 64,
+    },
+    'claude': {
+        'requests_per_minute': 50,
+        'tokens_per_minute': 40000,
+        'initial_concurrency': 4,
+        'max_concurrency': 32,
+    },
+    'local': {
+        'initial_concurrency': 2,
+        'max_concurrency': 4,
+    },
+}
+
+
+@dataclass
+class RateLimitConfig:
+    """レート制限設定"""
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+    request_burst: Optional[float] = None
+    token_burst: Optional[float] = None
+    initial_concurrency: int = 4
+    min_concurrency: int = 1
+    max_concurrency: int = 32
+    increase_step: float = 1.0
+    decrease_factor: float = 0.5
+    decrease_cooldown: float = 1.0
+    max_retry_after: float = 120.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書形式に変換"""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> 'RateLimitConfig':
+        """辞書から設定を作成（未知のキーは無視）"""
+        data = data or {}
+        known = {key: value for key, value in data.items() if key in cls.__dataclass_fields__}
+        return cls(**known)
+
+
+@dataclass
+class RateLimitState:
+    """レスポンスヘッダーから得られたレート制限状態"""
+    limit_requests: Optional[float] = None
+    remaining_requests: Optional[float] = None
+    reset_requests: Optional[float] = None
+    limit_tokens: Optional[float] = None
+    remaining_tokens: Optional[float] = None
+    reset_tokens: Optional[float] = None
+    retry_after: Optional[float] = None
+
+
+class TokenBucket:
+    """
+    トークンバケット
+
+    取得時に残量を先に差し引き（負債を許容）、不足分が補充されるまで待機する。
+    複数のイベントループ・スレッドから共有できるようスレッドロックで保護する。
+    """
+
+    def __init__(self, rate_per_second: float, capacity: Optional[float] = None, clock=time.monotonic):
+        """
+        初期化
+
+        Args:
+            rate_per_second: 1秒あたりの補充量
+            capacity: バケット容量（Noneの場合は1分間分）
+            clock: 単調増加時計
+        """
+        if rate_per_second <= 0:
+            raise ValueError(f"補充レートは正の値で設定してください: {rate_per_second}")
+
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.rate = float(rate_per_second)
+        self.capacity = float(capacity) if capacity else self.rate * 60.0
+        self._tokens = self.capacity
+        self._updated_at = self._clock()
+
+    def _refill_locked(self):
+        """経過時間分を補充（ロック保持中に呼び出す）"""
+        now = self._clock()
+        elapsed = now - self._updated_at
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated_at = now
+
+    @property
+    def available(self) -> float:
+        """現在の残量"""
+        with self._lock:
+            self._refill_locked()
+            return self._tokens
+
+    def reserve(self, amount: float) -> float:
+        """
+        指定量を予約し、利用可能になるまでの待機秒数を返す
+
+        Args:
+            amount: 予約量
+
+        Returns:
+            float: 待機秒数（0なら即時利用可能）
+        """
+        with self._lock:
+            self._refill_locked()
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def refund(self, amount: float):
+        """予約量を返却（推定値と実績値の差分補正にも使用）"""
+        with self._lock:
+            self._refill_locked()
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+    def sync(self, remaining: Optional[float] = None, limit: Optional[float] = None,
+             reset_seconds: Optional[float] = None):
+        """
+        サーバー側の制限値に同期
+
+        Args:
+            remaining: 残量
+            limit: 上限値（1分あたり）
+            reset_seconds: 上限まで回復するまでの秒数
+        """
+        with self._lock:
+            self._refill_locked()
+            if limit:
+                self.capacity = float(limit)
+                self.rate = float(limit) / 60.0
+            if remaining is not None:
+                # ローカルの見積もりより厳しい場合のみ採用
+                self._tokens = min(self._tokens, float(remaining))
+                if reset_seconds and reset_seconds > 0 and remaining < self.capacity:
+                    self.rate = max(self.rate, (self.capacity - remaining) / reset_seconds)
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """
+        指定量を取得（必要に応じて待機）
+
+        Returns:
+            float: 待機した秒数
+        """
+        wait = self.reserve(amount)
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self.refund(amount)
+                raise
+        return wait
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD方式の適応的同時実行制御
+
+    成功ごとに上限を加算的に増やし、レート制限を受けた場合は乗算的に減らす。
+    待機はイベントループ毎のFutureで行うため、複数ループから共有できる。
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 32,
+                 increase_step: float = 1.0, decrease_factor: float = 0.5,
+                 decrease_cooldown: float = 1.0, clock=time.monotonic):
+        """
+        初期化
+
+        Args:
+            initial: 初期同時実行数
+            minimum: 最小同時実行数
+            maximum: 最大同時実行数
+            increase_step: 1ウィンドウあたりの加算量
+            decrease_factor: レート制限時の乗算係数
+            decrease_cooldown: 連続した減少を抑止する秒数
+            clock: 単調増加時計
+        """
+        if minimum < 1 or maximum < minimum:
+            raise ValueError(f"同時実行数の範囲が不正です: {minimum}-{maximum}")
+
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+        self._limit = float(min(max(initial, minimum), maximum))
+        self._in_flight = 0
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._last_decrease = float('-inf')
+
+    @property
+    def limit(self) -> int:
+        """現在の同時実行上限"""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """実行中のリクエスト数"""
+        return self._in_flight
+
+    @property
+    def waiting(self) -> int:
+        """待機中のリクエスト数"""
+        return len(self._waiters)
+
+    async def acquire(self):
+        """実行枠を取得（上限に達している場合は待機）"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if not self._waiters and self._in_flight < self.limit:
+                self._in_flight += 1
+                return
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove((loop, future))
+                    granted = False
+                except ValueError:
+                    granted = True
+            # 枠が割り当て済みで結果も設定済みの場合のみここで返却する
+            # （Futureがキャンセル済みの場合は_grantが返却する）
+            if granted and future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        """実行枠を返却"""
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._wake_waiters_locked()
+
+    def _wake_waiters_locked(self):
+        """空き枠の分だけ待機者を起こす（ロック保持中に呼び出す）"""
+        while self._waiters and self._in_flight < self.limit:
+            loop, future = self._waiters.popleft()
+            if future.done():
+                continue
+            self._in_flight += 1
+            try:
+                loop.call_soon_threadsafe(self._grant, future)
+            except RuntimeError:
+                # ループが既に閉じられている
+                self._in_flight -= 1
+
+    def _grant(self, future: asyncio.Future):
+        """待機者に枠を渡す（待機者のループ上で実行）"""
+        if future.done():
+            self.release()
+        else:
+            future.set_result(None)
+
+    def on_success(self):
+        """成功時の加算的増加（1ウィンドウ分の成功で約increase_step増える）"""
+        with self._lock:
+            self._limit = min(float(self.maximum), self._limit + self.increase_step / max(self._limit, 1.0))
+            self._wake_waiters_locked()
+
+    def on_throttled(self) -> bool:
+        """
+        レート制限時の乗算的減少
+
+        Returns:
+            bool: 上限を減少させたかどうか（クールダウン中はFalse）
+        """
+        with self._lock:
+            now = self._clock()
+            if now - self._last_decrease < self.decrease_cooldown:
+                return False
+            self._last_decrease = now
+            self._limit = max(float(self.minimum), self._limit * self.decrease_factor)
+            return True
+
+
+# 実行中の許可（API呼び出し側が成功時のレスポンスヘッダーを記録するために参照する）
+_current_permit: ContextVar[Optional['RateLimitPermit']] = ContextVar('rate_limit_permit', default=None)
+
+
+def record_response_headers(headers: Optional[Mapping[str, str]]):
+    """
+    成功したAPI呼び出しのレスポンスヘッダーを実行中の許可へ記録
+
+    limiter.limit()の中から呼び出された場合のみ記録し、残りのリクエスト数・トークン数を
+    429を待たずにバケットへ反映させる。
+
+    Args:
+        headers: レスポンスヘッダー
+    """
+    permit = _current_permit.get()
+    if permit is not None and headers is not None and hasattr(headers, 'get'):
+        permit.headers = headers
+
+
+class RateLimitPermit:
+    """レート制限の実行許可（非同期コンテキストマネージャー）"""
+
+    def __init__(self, limiter: 'ProviderRateLimiter', estimated_tokens: int = 0):
+        self.limiter = limiter
+        self.estimated_tokens = estimated_tokens
+        self.actual_tokens: Optional[int] = None
+        self.headers: Optional[Mapping[str, str]] = None
+        self.wait_time = 0.0
+        self._context_token = None
+
+    def record_usage(self, result: Any = None, headers: Optional[Mapping[str, str]] = None):
+        """
+        実行結果の使用量・ヘッダーを記録
+
+        Args:
+            result: API応答（usage属性を持つ場合にトークン数を補正）
+            headers: レスポンスヘッダー
+        """
+        tokens = extract_usage_tokens(result)
+        if tokens is not None:
+            self.actual_tokens = tokens
+        if headers is not None:
+            self.headers = headers
+
+    async def __aenter__(self) -> 'RateLimitPermit':
+        self.wait_time = await self.limiter._acquire(self.estimated_tokens)
+        self._context_token = _current_permit.set(self)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._context_token is not None:
+            _current_permit.reset(self._context_token)
+            self._context_token = None
+        try:
+            if exc_val is None:
+                self.limiter.on_success(
+                    headers=self.headers,
+                    estimated_tokens=self.estimated_tokens,
+                    actual_tokens=self.actual_tokens
+                )
+            elif is_rate_limit_error(exc_val):
+                self.limiter.on_rate_limited(exc_val)
+        finally:
+            self.limiter.concurrency.release()
+        return False
+
+
+class ProviderRateLimiter:
+    """プロバイダー単位のレート制限"""
+
+    def __init__(self, provider: str, config: Optional[RateLimitConfig] = None, clock=time.monotonic):
+        """
+        初期化
+
+        Args:
+            provider: プロバイダー名
+            config: レート制限設定
+            clock: 単調増加時計
+        """
+        self.provider = provider
+        self.config = config or RateLimitConfig()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._blocked_until = 0.0
+
+        self.request_bucket: Optional[TokenBucket] = None
+        self.token_bucket: Optional[TokenBucket] = None
+        if self.config.requests_per_minute:
+            self.request_bucket = TokenBucket(
+                self.config.requests_per_minute / 60.0, self.config.request_burst, clock=clock
+            )
+        if self.config.tokens_per_minute:
+            self.token_bucket = TokenBucket(
+                self.config.tokens_per_minute / 60.0, self.config.token_burst, clock=clock
+            )
+
+        self.concurrency = AdaptiveConcurrencyLimiter(
+            initial=self.config.initial_concurrency,
+            minimum=self.config.min_concurrency,
+            maximum=self.config.max_concurrency,
+            increase_step=self.config.increase_step,
+            decrease_factor=self.config.decrease_factor,
+            decrease_cooldown=self.config.decrease_cooldown,
+            clock=clock
+        )
+
+        # 統計情報
+        self.stats = {
+            'requests': 0,
+            'successes': 0,
+            'throttled': 0,
+            'total_wait_time': 0.0,
+            'tokens_estimated': 0,
+            'tokens_actual': 0
+        }
+
+    def limit(self, estimated_tokens: int = 0) -> RateLimitPermit:
+        """
+        レート制限付きで実行するための許可を取得
+
+        使用例:
+            async with limiter.limit(estimated_tokens) as permit:
+                result = await call_api()
+                permit.record_usage(result)
+        """
+        return RateLimitPermit(self, estimated_tokens)
+
+    async def _acquire(self, estimated_tokens: int) -> float:
+        """各制限を順に満たすまで待機し、待機秒数の合計を返す"""
+        waited = 0.0
+
+        # Retry-After等によるブロック期間
+        delay = self._blocked_until - self._clock()
+        if delay > 0:
+            await asyncio.sleep(delay)
+            waited += delay
+
+        started = self._clock()
+        await self.concurrency.acquire()
+        try:
+            if self.request_bucket:
+                await self.request_bucket.acquire(1)
+            if self.token_bucket and estimated_tokens > 0:
+                await self.token_bucket.acquire(estimated_tokens)
+        except BaseException:
+            self.concurrency.release()
+            raise
+        waited += self._clock() - started
+
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['total_wait_time'] += waited
+            self.stats['tokens_estimated'] += estimated_tokens
+        return waited
+
+    def on_success(self, headers: Optional[Mapping[str, str]] = None,
+                   estimated_tokens: int = 0, actual_tokens: Optional[int] = None):
+        """成功時の処理（使用量補正・ヘッダー同期・同時実行数の増加）"""
+        with self._lock:
+            self.stats['successes'] += 1
+            if actual_tokens is not None:
+                self.stats['tokens_actual'] += actual_tokens
+
+        if self.token_bucket and actual_tokens is not None and estimated_tokens:
+            self.token_bucket.refund(estimated_tokens - actual_tokens)
+        if headers:
+            self.update_from_headers(headers)
+        self.concurrency.on_success()
+
+    def on_rate_limited(self, error: Optional[BaseException] = None,
+                        retry_after: Optional[float] = None) -> float:
+        """
+        レート制限を受けた時の処理
+
+        Args:
+            error: 発生した例外（ヘッダーからRetry-Afterを取得）
+            retry_after: 明示的な待機秒数
+
+        Returns:
+            float: 次の試行までに待機すべき秒数
+        """
+        with self._lock:
+            self.stats['throttled'] += 1
+
+        state = None
+        if retry_after is None and error is not None:
+            headers = extract_headers(error)
+            if headers:
+                state = parse_rate_limit_headers(headers)
+                retry_after = state.retry_after
+        if state:
+            self._apply_state(state)
+
+        if self.concurrency.on_throttled():
+            logger.info(f"{self.provider}: レート制限により同時実行数を{self.concurrency.limit}に減少しました")
+
+        if retry_after is not None:
+            retry_after = min(max(retry_after, 0.0), self.config.max_retry_after)
+            self.block_for(retry_after)
+            return retry_after
+        return self.blocked_for()
+
+    def block_for(self, seconds: float):
+        """指定秒数の間、新規リクエストを停止"""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, self._clock() + seconds)
+
+    def blocked_for(self) -> float:
+        """新規リクエストの停止が解除されるまでの残り秒数"""
+        return max(0.0, self._blocked_until - self._clock())
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """レート制限ヘッダーから状態を同期"""
+        self._apply_state(parse_rate_limit_headers(headers))
+
+    def _apply_state(self, state: RateLimitState):
+        """解析済みのレート制限状態を各バケットに反映"""
+        if state.limit_requests and not self.request_bucket:
+            self.request_bucket = TokenBucket(state.limit_requests / 60.0, clock=self._clock)
+        if state.limit_tokens and not self.token_bucket:
+            self.token_bucket = TokenBucket(state.limit_tokens / 60.0, clock=self._clock)
+
+        if self.request_bucket:
+            self.request_bucket.sync(state.remaining_requests, state.limit_requests, state.reset_requests)
+        if self.token_bucket:
+            self.token_bucket.sync(state.remaining_tokens, state.limit_tokens, state.reset_tokens)
+
+        # 残量が尽きている場合はリセットまで停止
+        if state.remaining_requests == 0 and state.reset_requests:
+            self.block_for(min(state.reset_requests, self.config.max_retry_after))
+        if state.retry_after:
+            self.block_for(min(state.retry_after, self.config.max_retry_after))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """統計情報を取得"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats.update({
+            'provider': self.provider,
+            'concurrency_limit': self.concurrency.limit,
+            'in_flight': self.concurrency.in_flight,
+            'waiting': self.concurrency.waiting,
+            'blocked_for': self.blocked_for(),
+            'requests_available': self.request_bucket.available if self.request_bucket else None,
+            'tokens_available': self.token_bucket.available if self.token_bucket else None,
+            'throttle_rate': stats['throttled'] / max(stats['requests'], 1)
+        })
+        return stats
+
+
+class RateLimiterRegistry:
+    """プロバイダー別レート制限のレジストリ"""
+
+    def __init__(self):
+        """初期化"""
+        self._lock = threading.Lock()
+        self._limiters: Dict[str, ProviderRateLimiter] = {}
+        self._configs: Dict[str, RateLimitConfig] = {}
+
+    @staticmethod
+    def normalize_provider(provider: str) -> str:
+        """プロバイダー名を正規化"""
+        name = str(getattr(provider, 'value', provider)).lower()
+        return PROVIDER_ALIASES.get(name, name)
+
+    def configure(self, provider: str, config: Optional[Dict[str, Any]] = None):
+        """
+        プロバイダーのレート制限を設定（既存のリミッターは作り直す）
+
+        Args:
+            provider: プロバイダー名
+            config: 設定辞書（デフォルト値に上書きマージ）
+        """
+        name = self.normalize_provider(provider)
+        merged = {**DEFAULT_RATE_LIMITS.get(name, {}), **(config or {})}
+        with self._lock:
+            self._configs[name] = RateLimitConfig.from_dict(merged)
+            self._limiters.pop(name, None)
+
+    def get_limiter(self, provider: str) -> ProviderRateLimiter:
+        """
+        プロバイダーのリミッターを取得（未作成なら作成）
+
+        Args:
+            provider: プロバイダー名
+
+        Returns:
+            ProviderRateLimiter: 共有リミッター
+        """
+        name = self.normalize_provider(provider)
+        with self._lock:
+            limiter = self._limiters.get(name)
+            if limiter is None:
+                config = self._configs.get(name) or RateLimitConfig.from_dict(DEFAULT_RATE_LIMITS.get(name))
+                limiter = ProviderRateLimiter(name, config)
+                self._limiters[name] = limiter
+            return limiter
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """全プロバイダーの統計情報を取得"""
+        with self._lock:
+            limiters = list(self._limiters.items())
+        return {name: limiter.get_stats() for name, limiter in limiters}
+
+    def reset(self):
+        """全リミッターを破棄"""
+        with self._lock:
+            self._limiters.clear()
+
+
+# ヘッダー・例外解析
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """例外がレート制限（HTTP 429）によるものか判定"""
+    if 'RateLimit' in type(error).__name__:
+        return True
+    status = getattr(error, 'status_code', None) or getattr(error, 'status', None)
+    if status is None:
+        response = getattr(error, 'response', None)
+        status = getattr(response, 'status_code', None) or getattr(response, 'status', None)
+    return status == 429
+
+
+def extract_headers(error: BaseException) -> Optional[Mapping[str, str]]:
+    """例外からレスポンスヘッダーを取り出す（OpenAI/Anthropic SDK・aiohttp・requests対応）"""
+    headers = getattr(error, 'headers', None)
+    if headers is None:
+        response = getattr(error, 'response', None)
+        headers = getattr(response, 'headers', None)
+    return headers if hasattr(headers, 'get') else None
+
+
+def extract_usage_tokens(result: Any) -> Optional[int]:
+    """API応答から実際の使用トークン数を取り出す"""
+    usage = getattr(result, 'usage', None)
+    if usage is None and isinstance(result, dict):
+        usage = result.get('usage')
+    if usage is None:
+        return None
+    if isinstance(usage, dict):
+        total = usage.get('total_tokens')
+        if total is None and ('input_tokens' in usage or 'output_tokens' in usage):
+            total = usage.get('input_tokens', 0) + usage.get('output_tokens', 0)
+        return total
+    total = getattr(usage, 'total_tokens', None)
+    if total is None:
+        input_tokens = getattr(usage, 'input_tokens', None)
+        output_tokens = getattr(usage, 'output_tokens', None)
+        if input_tokens is not None or output_tokens is not None:
+            total = (input_tokens or 0) + (output_tokens or 0)
+    return total
+
+
+def _header(headers: Mapping[str, str], *names: str) -> Optional[str]:
+    """大文字小文字を区別せずヘッダー値を取得"""
+    for name in names:
+        value = headers.get(name)
+        if value is None:
+            value = headers.get(name.lower())
+        if value is None:
+            value = headers.get(name.title())
+        if value is not None:
+            return str(value).strip()
+    return None
+
+
+def _parse_float(value: Optional[str]) -> Optional[float]:
+    """数値ヘッダーを解析"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """
+    リセット時間表記を秒数に変換
+
+    "1.5"（秒）、"6m0s"/"20ms"（OpenAI形式）、RFC3339日時（Anthropic形式）に対応
+    """
+    if not value:
+        return None
+
+    number = _parse_float(value)
+    if number is not None:
+        return number
+
+    total = 0.0
+    matched = False
+    buffer = ''
+    index = 0
+    units = {'h': 3600.0, 'm': 60.0, 's': 1.0, 'ms': 0.001}
+    while index < len(value):
+        char = value[index]
+        if char.isdigit() or char == '.':
+            buffer += char
+            index += 1
+            continue
+        unit = 'ms' if value.startswith('ms', index) else char
+        if unit not in units or not buffer:
+            matched = False
+            break
+        total += float(buffer) * units[unit]
+        matched = True
+        buffer = ''
+        index += len(unit)
+    if matched and not buffer:
+        return total
+
+    try:
+        reset_at = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if reset_at.tzinfo is None:
+            reset_at = reset_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (reset_at - datetime.now(timezone.utc)).total_seconds())
+    except ValueError:
+        return None
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Retry-After系ヘッダーを秒数に変換"""
+    retry_after_ms = _parse_float(_header(headers, 'retry-after-ms'))
+    if retry_after_ms is not None:
+        return retry_after_ms / 1000.0
+
+    value = _header(headers, 'retry-after')
+    if value is None:
+        return None
+    seconds = _parse_float(value)
+    if seconds is not None:
+        return seconds
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_rate_limit_headers(headers: Mapping[str, str]) -> RateLimitState:
+    """OpenAI/Anthropic形式のレート制限ヘッダーを解析"""
+    return RateLimitState(
+        limit_requests=_parse_float(_header(
+            headers, 'x-ratelimit-limit-requests', 'anthropic-ratelimit-requests-limit')),
+        remaining_requests=_parse_float(_header(
+            headers, 'x-ratelimit-remaining-requests', 'anthropic-ratelimit-requests-remaining')),
+        reset_requests=parse_duration(_header(
+            headers, 'x-ratelimit-reset-requests', 'anthropic-ratelimit-requests-reset')),
+        limit_tokens=_parse_float(_header(
+            headers, 'x-ratelimit-limit-tokens', 'anthropic-ratelimit-tokens-limit')),
+        remaining_tokens=_parse_float(_header(
+            headers, 'x-ratelimit-remaining-tokens', 'anthropic-ratelimit-tokens-remaining')),
+        reset_tokens=parse_duration(_header(
+            headers, 'x-ratelimit-reset-tokens', 'anthropic-ratelimit-tokens-reset')),
+        retry_after=parse_retry_after(headers)
+    )
+
+
+def estimate_request_tokens(*args, **kwargs) -> int:
+    """
+    API呼び出し引数からトークン消費量を概算
+
+    messages/prompt のトークン数と max_tokens の合計
+    """
+    params: Dict[str, Any] = {}
+    for arg in args:
+        if isinstance(arg, dict):
+            params.update(arg)
+    params.update(kwargs)
+
+    texts = []
+    for message in params.get('messages') or []:
+        content = message.get('content') if isinstance(message, dict) else getattr(message, 'content', '')
+        if isinstance(content, str):
+            texts.append(content)
+    for key in ('prompt', 'system'):
+        if isinstance(params.get(key), str):
+            texts.append(params[key])
+
+    model = params.get('model') if isinstance(params.get('model'), str) else None
+    return sum(get_token_counter(model).count_batch(texts)) + int(params.get('max_tokens') or 0)
+
+
+# グローバルレジストリ
+_registry_instance: Optional[RateLimiterRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_rate_limiter_registry() -> RateLimiterRegistry:
+    """
+    レート制限レジストリのシングルトンインスタンスを取得
+
+    Returns:
+        RateLimiterRegistry: レジストリインスタンス
+    """
+    global _registry_instance
+    if _registry_instance is None:
+        with _registry_lock:
+            if _registry_instance is None:
+                _registry_instance = RateLimiterRegistry()
+    return _registry_instance
@@ -5,9 +5,6 @@
 """
 
 from .base_plugin import BasePlugin, PluginInfo, PluginStatus, PluginError
-from .git_integration import GitPlugin
-from .code_formatter import FormatterPlugin
-from .export_tools import ExportPlugin
 
 __all__ = [
     'BasePlugin',
@@ -21,3 +18,20 @@ __all__ = [
 
 # バージョン情報
 __version__ = '1.0.0'
+
+# 遅延インポート用の__getattr__（UI依存のプラグインを読み込まずにサブパッケージを利用できるようにする）
+def __getattr__(name):
+    """遅延インポート"""
+    if name == 'GitPlugin':
+        from .git_integration import GitPlugin
+        return GitPlugin
+    
+    elif name == 'FormatterPlugin':
+        from .code_formatter import FormatterPlugin
+        return FormatterPlugin
+    
+    elif name == 'ExportPlugin':
+        from .export_tools import ExportPlugin
+        return ExportPlugin
+    
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
@@ -4,22 +4,59 @@
 様々な形式でのエクスポート機能を提供
 """
 
+import io
 import os
 import json
 import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Callable, Iterable, Iterator, Optional
 from datetime import datetime
 from abc import ABC, abstractmethod
 import zipfile
 import tarfile
 
 from ...core.logger import get_logger
+from ...utils.parallel_compress import ParallelStreamWriter, ParallelZipWriter, resolve_workers
+
+
+def iter_rendered(items: Iterable[Any], render: Callable[[Any], str],
+                  workers: Optional[int] = None) -> Iterator[str]:
+    """
+    項目を複数スレッドで描画し、元の順序で返す
+
+    先読みはスレッド数の2倍までに抑えるため、項目数によらずメモリ使用量は一定。
+
+    Args:
+        items: 描画する項目（1件ずつ取り出す）
+        render: 項目を文字列にする関数
+        workers: スレッド数（Noneの場合はCPU数）
+
+    Yields:
+        str: 描画結果
+    """
+    workers = resolve_workers(workers)
+    if workers == 1:
+        yield from map(render, items)
+        return
+    
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export") as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(render, item))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
 
 
 class BaseExporter(ABC):
     """エクスポーターの基底クラス"""
     
+    # export_project_streamに対応しているか
+    supports_streaming = False
+    
     def __init__(self, format_name: str):
         self.format_name = format_name
         self.logger = get_logger(f"exporter_{format_name}")
@@ -48,6 +85,22 @@ class BaseExporter(ABC):
         """エクスポーターが利用可能かチェック"""
         pass
     
+    def export_project_stream(self, project_info: Dict[str, Any], files: Iterable[Dict[str, Any]],
+                              output_path: str, options: Dict[str, Any]) -> bool:
+        """
+        プロジェクトを逐次エクスポート（ファイル一覧を保持せず、内容も必要な時にディスクから読む）
+        
+        Args:
+            project_info: name・path・metadataを持つプロジェクト情報（filesは含まない）
+            files: ファイル情報（1件ずつ取り出す）
+            output_path: 出力先
+            options: エクスポートオプション
+            
+        Returns:
+            bool: 成功したか
+        """
+        raise NotImplementedError(f"{self.format_name}は逐次エクスポートに対応していません")
+    
     def update_settings(self, settings: Dict[str, Any]):
         """設定を更新"""
         self.settings.update(settings)
@@ -56,6 +109,43 @@ class BaseExporter(ABC):
         """出力ディレクトリを確保"""
         output_dir = Path(output_path).parent
         output_dir.mkdir(parents=True, exist_ok=True)
+    
+    def _should_include_file_content(self, file_info: Dict[str, Any], options: Dict[str, Any]) -> bool:
+        """ファイル内容を含めるかチェック"""
+        # バイナリファイルは除外
+        if file_info.get('language') in ['binary', 'image', 'video', 'audio']:
+            return False
+        
+        # サイズ制限
+        max_size = options.get('max_file_size', 1024 * 1024)  # 1MB
+        if file_info.get('size', 0) > max_size:
+            return False
+        
+        return True
+    
+    def _project_info_json(self, project_info: Dict[str, Any]) -> bytes:
+        """アーカイブに含めるプロジェクト情報"""
+        info = {
+            'name': project_info['name'],
+            'metadata': project_info['metadata'],
+            'export_time': datetime.now().isoformat()
+        }
+        return json.dumps(info, ensure_ascii=False, indent=2).encode('utf-8')
+    
+    def _read_file_content(self, file_info: Dict[str, Any], options: Dict[str, Any],
+                           default_max_length: int = 100000) -> str:
+        """ファイル内容を読み込む（上限を超える部分は読まずに省略）"""
+        max_length = options.get('max_content_length', default_max_length)
+        with open(file_info['path'], 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read(max_length + 1)
+        if len(content) > max_length:
+            content = content[:max_length] + "\n... (省略)"
+        return content
+    
+    @staticmethod
+    def _escape_html(text: str) -> str:
+        """HTMLの特殊文字をエスケープ"""
+        return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
 
 
 class PDFExporter(BaseExporter):
@@ -235,24 +325,14 @@ class PDFExporter(BaseExporter):
                 return f"{size_bytes:.1f} {unit}"
             size_bytes /= 1024.0
         return f"{size_bytes:.1f} TB"
-    
-    def _should_include_file_content(self, file_info: Dict[str, Any], options: Dict[str, Any]) -> bool:
-        """ファイル内容を含めるかチェック"""
-        # バイナリファイルは除外
-        if file_info.get('language') in ['binary', 'image', 'video', 'audio']:
-            return False
-        
-        # サイズ制限
-        max_size = options.get('max_file_size', 1024 * 1024)  # 1MB
-        if file_info.get('size', 0) > max_size:
-            return False
-        
-        return True
+
 
 
 class HTMLExporter(BaseExporter):
     """HTMLエクスポーター"""
     
+    supports_streaming = True
+    
     def __init__(self):
         super().__init__("html")
     
@@ -314,9 +394,38 @@ class HTMLExporter(BaseExporter):
             self.logger.error(f"コードHTMLエクスポートエラー: {e}")
             return False
     
-    def _generate_project_html(self, project_data: Dict[str, Any], options: Dict[str, Any]) -> str:
-        """プロジェクト用HTMLを生成"""
-        html = f"""<!DOCTYPE html>
+    def export_project_stream(self, project_info: Dict[str, Any], files: Iterable[Dict[str, Any]],
+                              output_path: str, options: Dict[str, Any]) -> bool:
+        """プロジェクトをHTMLで逐次エクスポート（ファイル毎の節は並列に描画して順に書き込む）"""
+        try:
+            self._ensure_output_directory(output_path)
+            
+            include_file_list = options.get('include_file_list', True)
+            include_content = options.get('include_content', False)
+            
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(self._generate_project_html_header(project_info))
+                
+                if include_file_list or include_content:
+                    heading = 'ファイル一覧' if include_file_list else 'ファイル内容'
+                    f.write(f'<h2>{heading}</h2>\n<div class="file-list">\n')
+                    render = lambda file_info: self._render_file_section(file_info, options)
+                    for section in iter_rendered(files, render, options.get('workers')):
+                        f.write(section)
+                    f.write('</div>\n')
+                
+                f.write('</body>\n</html>')
+            
+            self.logger.info(f"HTMLエクスポート完了: {output_path}")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"HTMLエクスポートエラー: {e}")
+            return False
+    
+    def _generate_project_html_header(self, project_data: Dict[str, Any]) -> str:
+        """プロジェクト用HTMLのファイル一覧より前の部分を生成"""
+        return f"""<!DOCTYPE html>
 <html lang="ja">
 <head>
     <meta charset="UTF-8">
@@ -343,12 +452,32 @@ class HTMLExporter(BaseExporter):
         <p><strong>総サイズ:</strong> {self._format_size(project_data['metadata']['total_size'])}</p>
     </div>
 """
+    
+    def _render_file_item(self, file_info: Dict[str, Any]) -> str:
+        """ファイル一覧の1行を生成"""
+        relative_path = self._escape_html(str(file_info['relative_path']))
+        return f'<div class="file-item">{relative_path} ({file_info.get("language", "unknown")})</div>\n'
+    
+    def _render_file_section(self, file_info: Dict[str, Any], options: Dict[str, Any]) -> str:
+        """ファイル1件分の節を生成（内容を含める場合はここでディスクから読む）"""
+        section = self._render_file_item(file_info)
+        if options.get('include_content', False) and self._should_include_file_content(file_info, options):
+            try:
+                content = self._escape_html(self._read_file_content(file_info, options))
+                section += f'<div class="code"><pre>{content}</pre></div>\n'
+            except Exception as e:
+                section += f'<p>ファイル読み込みエラー: {self._escape_html(str(e))}</p>\n'
+        return section
+    
+    def _generate_project_html(self, project_data: Dict[str, Any], options: Dict[str, Any]) -> str:
+        """プロジェクト用HTMLを生成"""
+        html = self._generate_project_html_header(project_data)
         
         # ファイル一覧
         if options.get('include_file_list', True):
             html += '<h2>ファイル一覧</h2>\n<div class="file-list">\n'
             for file_info in project_data['files']:
-                html += f'<div class="file-item">{file_info["relative_path"]} ({file_info.get("language", "unknown")})</div>\n'
+                html += self._render_file_item(file_info)
             html += '</div>\n'
         
         html += '</body>\n</html>'
@@ -434,6 +563,8 @@ class HTMLExporter(BaseExporter):
 class MarkdownExporter(BaseExporter):
     """Markdownエクスポーター"""
     
+    supports_streaming = True
+    
     def __init__(self):
         super().__init__("markdown")
     
@@ -495,9 +626,36 @@ class MarkdownExporter(BaseExporter):
             self.logger.error(f"コードMarkdownエクスポートエラー: {e}")
             return False
     
-    def _generate_project_markdown(self, project_data: Dict[str, Any], options: Dict[str, Any]) -> str:
-        """プロジェクト用Markdownを生成"""
-        markdown = f"""# プロジェクト: {project_data['name']}
+    def export_project_stream(self, project_info: Dict[str, Any], files: Iterable[Dict[str, Any]],
+                              output_path: str, options: Dict[str, Any]) -> bool:
+        """プロジェクトをMarkdownで逐次エクスポート（ファイル毎の節は並列に描画して順に書き込む）"""
+        try:
+            self._ensure_output_directory(output_path)
+            
+            include_file_list = options.get('include_file_list', True)
+            include_content = options.get('include_content', False)
+            
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(self._generate_project_markdown_header(project_info))
+                
+                if include_file_list or include_content:
+                    heading = 'ファイル一覧' if include_file_list else 'ファイル内容'
+                    f.write(f"## {heading}\n\n")
+                    render = lambda file_info: self._render_file_section(file_info, options)
+                    for section in iter_rendered(files, render, options.get('workers')):
+                        f.write(section)
+                    f.write("\n")
+            
+            self.logger.info(f"Markdownエクスポート完了: {output_path}")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Markdownエクスポートエラー: {e}")
+            return False
+    
+    def _generate_project_markdown_header(self, project_data: Dict[str, Any]) -> str:
+        """プロジェクト用Markdownのファイル一覧より前の部分を生成"""
+        return f"""# プロジェクト: {project_data['name']}
 
 ## プロジェクト情報
 
@@ -506,12 +664,36 @@ class MarkdownExporter(BaseExporter):
 - **総サイズ:** {self._format_size(project_data['metadata']['total_size'])}
 
 """
+    
+    def _render_file_item(self, file_info: Dict[str, Any]) -> str:
+        """ファイル一覧の1行を生成"""
+        return f"- `{file_info['relative_path']}` ({file_info.get('language', 'unknown')})\n"
+    
+    def _render_file_section(self, file_info: Dict[str, Any], options: Dict[str, Any]) -> str:
+        """ファイル1件分の節を生成（内容を含める場合はここでディスクから読む）"""
+        section = self._render_file_item(file_info)
+        if options.get('include_content', False) and self._should_include_file_content(file_info, options):
+            try:
+                content = self._read_file_content(file_info, options)
+            except Exception as e:
+                return section + f"\n  ファイル読み込みエラー: {e}\n\n"
+            # 内容にバッククォートの連続があっても閉じないよう、それより長いフェンスを使う
+            fence = '`' * 3
+            while fence in content:
+                fence += '`'
+            language = file_info.get('language', 'text')
+            section += f"\n{fence}{language}\n{content}\n{fence}\n\n"
+        return section
+    
+    def _generate_project_markdown(self, project_data: Dict[str, Any], options: Dict[str, Any]) -> str:
+        """プロジェクト用Markdownを生成"""
+        markdown = self._generate_project_markdown_header(project_data)
         
         # ファイル一覧
         if options.get('include_file_list', True):
             markdown += "## ファイル一覧\n\n"
             for file_info in project_data['files']:
-                markdown += f"- `{file_info['relative_path']}` ({file_info.get('language', 'unknown')})\n"
+                markdown += self._render_file_item(file_info)
             markdown += "\n"
         
         return markdown
@@ -552,123 +734,155 @@ class MarkdownExporter(BaseExporter):
             size_bytes /= 1024.0
         return f"{size_bytes:.1f} TB"
 
+
 class ZipExporter(BaseExporter):
     """ZIPエクスポーター"""
-def __init__(self):
-    super().__init__("zip")
-
-def is_available(self) -> bool:
-    """ZIPエクスポーターは常に利用可能"""
-    return True
-
-def export_project(self, project_data: Dict[str, Any], output_path: str,
-                  options: Dict[str, Any]) -> bool:
-    """プロジェクトをZIPでエクスポート"""
-    try:
-        self._ensure_output_directory(output_path)
+    
+    supports_streaming = True
+    
+    def __init__(self):
+        super().__init__("zip")
+    
+    def is_available(self) -> bool:
+        """ZIPエクスポーターは常に利用可能"""
+        return True
+    
+    def export_project(self, project_data: Dict[str, Any], output_path: str,
+                      options: Dict[str, Any]) -> bool:
+        """プロジェクトをZIPでエクスポート"""
+        try:
+            self._ensure_output_directory(output_path)
         
-        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # プロジェクト情報をJSONで追加
-            project_info = {
-                'name': project_data['name'],
-                'metadata': project_data['metadata'],
-                'export_time': datetime.now().isoformat()
-            }
-            zipf.writestr('project_info.json', json.dumps(project_info, ensure_ascii=False, indent=2))
+            with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                # プロジェクト情報をJSONで追加
+                project_info = {
+                    'name': project_data['name'],
+                    'metadata': project_data['metadata'],
+                    'export_time': datetime.now().isoformat()
+                }
+                zipf.writestr('project_info.json', json.dumps(project_info, ensure_ascii=False, indent=2))
             
-            # ファイルを追加
-            for file_info in project_data['files']:
-                try:
-                    zipf.write(file_info['path'], file_info['relative_path'])
-                except Exception as e:
-                    self.logger.warning(f"ファイル追加エラー ({file_info['path']}): {e}")
+                # ファイルを追加
+                for file_info in project_data['files']:
+                    try:
+                        zipf.write(file_info['path'], file_info['relative_path'])
+                    except Exception as e:
+                        self.logger.warning(f"ファイル追加エラー ({file_info['path']}): {e}")
         
-        self.logger.info(f"ZIPエクスポート完了: {output_path}")
-        return True
+            self.logger.info(f"ZIPエクスポート完了: {output_path}")
+            return True
         
-    except Exception as e:
-        self.logger.error(f"ZIPエクスポートエラー: {e}")
-        return False
-
-def export_file(self, file_data: Dict[str, Any], output_path: str,
-               options: Dict[str, Any]) -> bool:
-    """ファイルをZIPでエクスポート"""
-    try:
-        self._ensure_output_directory(output_path)
+        except Exception as e:
+            self.logger.error(f"ZIPエクスポートエラー: {e}")
+            return False
+    
+    def export_project_stream(self, project_info: Dict[str, Any], files: Iterable[Dict[str, Any]],
+                              output_path: str, options: Dict[str, Any]) -> bool:
+        """プロジェクトをZIPで逐次エクスポート（ファイルはブロック単位で並列に圧縮する）"""
+        try:
+            self._ensure_output_directory(output_path)
+            
+            level = options.get('compression_level', 6)
+            with ParallelZipWriter(output_path, level, options.get('workers'), hash_algorithm=None) as writer:
+                # ファイルを追加
+                for file_info in files:
+                    try:
+                        writer.add_file(file_info['path'], file_info['relative_path'])
+                    except OSError as e:
+                        self.logger.warning(f"ファイル追加エラー ({file_info['path']}): {e}")
+                
+                # プロジェクト情報をJSONで追加（ファイルの後に書く）
+                writer.add_bytes(self._project_info_json(project_info), 'project_info.json')
+            
+            self.logger.info(f"ZIPエクスポート完了: {output_path}")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"ZIPエクスポートエラー: {e}")
+            return False
+    
+    def export_file(self, file_data: Dict[str, Any], output_path: str,
+                   options: Dict[str, Any]) -> bool:
+        """ファイルをZIPでエクスポート"""
+        try:
+            self._ensure_output_directory(output_path)
         
-        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # ファイル情報をJSONで追加
-            file_info = {
-                'name': file_data['name'],
-                'metadata': file_data.get('metadata', {}),
-                'export_time': datetime.now().isoformat()
-            }
-            zipf.writestr('file_info.json', json.dumps(file_info, ensure_ascii=False, indent=2))
+            with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                # ファイル情報をJSONで追加
+                file_info = {
+                    'name': file_data['name'],
+                    'metadata': file_data.get('metadata', {}),
+                    'export_time': datetime.now().isoformat()
+                }
+                zipf.writestr('file_info.json', json.dumps(file_info, ensure_ascii=False, indent=2))
             
-            # ファイルを追加
-            zipf.write(file_data['path'], file_data['name'])
+                # ファイルを追加
+                zipf.write(file_data['path'], file_data['name'])
         
-        self.logger.info(f"ファイルZIPエクスポート完了: {output_path}")
-        return True
+            self.logger.info(f"ファイルZIPエクスポート完了: {output_path}")
+            return True
         
-    except Exception as e:
-        self.logger.error(f"ファイルZIPエクスポートエラー: {e}")
-        return False
-
-def export_code(self, code_data: Dict[str, Any], output_path: str,
-               options: Dict[str, Any]) -> bool:
-    """コードをZIPでエクスポート"""
-    try:
-        self._ensure_output_directory(output_path)
+        except Exception as e:
+            self.logger.error(f"ファイルZIPエクスポートエラー: {e}")
+            return False
+    
+    def export_code(self, code_data: Dict[str, Any], output_path: str,
+                   options: Dict[str, Any]) -> bool:
+        """コードをZIPでエクスポート"""
+        try:
+            self._ensure_output_directory(output_path)
         
-        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # コード情報をJSONで追加
-            code_info = {
-                'language': code_data['language'],
-                'timestamp': code_data['timestamp'],
-                'metadata': code_data.get('metadata', {}),
-                'export_time': datetime.now().isoformat()
-            }
-            zipf.writestr('code_info.json', json.dumps(code_info, ensure_ascii=False, indent=2))
+            with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                # コード情報をJSONで追加
+                code_info = {
+                    'language': code_data['language'],
+                    'timestamp': code_data['timestamp'],
+                    'metadata': code_data.get('metadata', {}),
+                    'export_time': datetime.now().isoformat()
+                }
+                zipf.writestr('code_info.json', json.dumps(code_info, ensure_ascii=False, indent=2))
             
-            # コードファイルを追加
-            file_extension = self._get_file_extension(code_data['language'])
-            zipf.writestr(f'code{file_extension}', code_data['content'])
+                # コードファイルを追加
+                file_extension = self._get_file_extension(code_data['language'])
+                zipf.writestr(f'code{file_extension}', code_data['content'])
         
-        self.logger.info(f"コードZIPエクスポート完了: {output_path}")
-        return True
+            self.logger.info(f"コードZIPエクスポート完了: {output_path}")
+            return True
         
-    except Exception as e:
-        self.logger.error(f"コードZIPエクスポートエラー: {e}")
-        return False
+        except Exception as e:
+            self.logger.error(f"コードZIPエクスポートエラー: {e}")
+            return False
+    
+    def _get_file_extension(self, language: str) -> str:
+        """言語に対応するファイル拡張子を取得"""
+        extension_map = {
+            'python': '.py',
+            'javascript': '.js',
+            'typescript': '.ts',
+            'html': '.html',
+            'css': '.css',
+            'java': '.java',
+            'cpp': '.cpp',
+            'c': '.c',
+            'csharp': '.cs',
+            'php': '.php',
+            'ruby': '.rb',
+            'go': '.go',
+            'rust': '.rs',
+            'sql': '.sql',
+            'json': '.json',
+            'xml': '.xml',
+            'yaml': '.yaml',
+            'markdown': '.md'
+        }
+        return extension_map.get(language.lower(), '.txt')
 
-def _get_file_extension(self, language: str) -> str:
-    """言語に対応するファイル拡張子を取得"""
-    extension_map = {
-        'python': '.py',
-        'javascript': '.js',
-        'typescript': '.ts',
-        'html': '.html',
-        'css': '.css',
-        'java': '.java',
-        'cpp': '.cpp',
-        'c': '.c',
-        'csharp': '.cs',
-        'php': '.php',
-        'ruby': '.rb',
-        'go': '.go',
-        'rust': '.rs',
-        'sql': '.sql',
-        'json': '.json',
-        'xml': '.xml',
-        'yaml': '.yaml',
-        'markdown': '.md'
-    }
-    return extension_map.get(language.lower(), '.txt')
 
 class TarExporter(BaseExporter):
     """TARエクスポーター"""
     
+    supports_streaming = True
+    
     def __init__(self):
         super().__init__("tar")
     
@@ -713,6 +927,58 @@ class TarExporter(BaseExporter):
             self.logger.error(f"TARエクスポートエラー: {e}")
             return False
     
+    def export_project_stream(self, project_info: Dict[str, Any], files: Iterable[Dict[str, Any]],
+                              output_path: str, options: Dict[str, Any]) -> bool:
+        """プロジェクトをTARで逐次エクスポート（gz・bz2はブロック単位で並列に圧縮する）"""
+        try:
+            self._ensure_output_directory(output_path)
+            
+            compression = options.get('compression', 'gz')  # gz, bz2, xz
+            level = options.get('compression_level', 6)
+            if compression in ('gz', 'bz2'):
+                codec = 'gzip' if compression == 'gz' else 'bz2'
+                output = ParallelStreamWriter(output_path, codec, level, options.get('workers'), hash_algorithm=None)
+                tar = tarfile.open(fileobj=output, mode='w|')
+            else:
+                output = None
+                tar = tarfile.open(output_path, f'w:{compression}' if compression else 'w')
+            
+            try:
+                # ファイルを追加
+                for file_info in files:
+                    try:
+                        tarinfo = tar.gettarinfo(file_info['path'], file_info['relative_path'])
+                        if tarinfo.isreg():
+                            with open(file_info['path'], 'rb') as f:
+                                tar.addfile(tarinfo, f)
+                        else:
+                            tar.addfile(tarinfo)
+                    except OSError as e:
+                        self.logger.warning(f"ファイル追加エラー ({file_info['path']}): {e}")
+                
+                # プロジェクト情報をJSONで追加（ファイルの後に書く）
+                data = self._project_info_json(project_info)
+                tarinfo = tarfile.TarInfo('project_info.json')
+                tarinfo.size = len(data)
+                tarinfo.mtime = int(datetime.now().timestamp())
+                tar.addfile(tarinfo, io.BytesIO(data))
+                tar.close()
+                if output is not None:
+                    output.close()
+            except BaseException:
+                if output is not None:
+                    output.abort()
+                else:
+                    tar.close()
+                raise
+            
+            self.logger.info(f"TARエクスポート完了: {output_path}")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"TARエクスポートエラー: {e}")
+            return False
+    
     def export_file(self, file_data: Dict[str, Any], output_path: str,
                    options: Dict[str, Any]) -> bool:
         """ファイルをTARでエクスポート"""
@@ -6,7 +6,7 @@
 
 import os
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Iterator, Optional, Tuple
 from datetime import datetime
 
 from ..base_plugin import BasePlugin
@@ -96,11 +96,18 @@ class ExportPlugin(BasePlugin):
             if not exporter.is_available():
                 return False, f"エクスポーター '{export_format}' が利用できません"
             
-            # プロジェクト情報を収集
-            project_data = self._collect_project_data(project_path, options or {})
-            
-            # エクスポート実行
-            success = exporter.export_project(project_data, output_path, options or {})
+            options = options or {}
+            if options.get('streaming', True) and exporter.supports_streaming:
+                # ファイル一覧を保持せず、集計後にもう一度走査しながら書き出す
+                project_info = self._collect_project_summary(project_path, options)
+                files = self._iter_project_files(project_path, options)
+                success = exporter.export_project_stream(project_info, files, output_path, options)
+            else:
+                # プロジェクト情報を収集
+                project_data = self._collect_project_data(project_path, options)
+                
+                # エクスポート実行
+                success = exporter.export_project(project_data, output_path, options)
             
             if success:
                 self.event_system.emit('project_exported', {
@@ -188,42 +195,16 @@ class ExportPlugin(BasePlugin):
     
     def _collect_project_data(self, project_path: str, options: Dict[str, Any]) -> Dict[str, Any]:
         """プロジェクトデータを収集"""
-        project_data = {
-            'name': Path(project_path).name,
-            'path': project_path,
-            'files': [],
-            'structure': {},
-            'metadata': {
-                'export_time': datetime.now().isoformat(),
-                'total_files': 0,
-                'total_size': 0
-            }
-        }
+        project_data = self._new_project_info(project_path)
+        project_data['files'] = []
+        project_data['structure'] = {}
         
         try:
-            # ファイル除外パターン
-            exclude_patterns = options.get('exclude_patterns', [
-                '*.pyc', '__pycache__', '.git', '.svn', 'node_modules',
-                '*.log', '*.tmp', '.DS_Store'
-            ])
-            
             # ファイルを収集
-            for root, dirs, files in os.walk(project_path):
-                # 除外ディレクトリをスキップ
-                dirs[:] = [d for d in dirs if not self._should_exclude(d, exclude_patterns)]
-                
-                for file in files:
-                    if self._should_exclude(file, exclude_patterns):
-                        continue
-                    
-                    file_path = os.path.join(root, file)
-                    relative_path = os.path.relpath(file_path, project_path)
-                    
-                    file_info = self._get_file_info(file_path, relative_path)
-                    if file_info:
-                        project_data['files'].append(file_info)
-                        project_data['metadata']['total_files'] += 1
-                        project_data['metadata']['total_size'] += file_info.get('size', 0)
+            for file_info in self._iter_project_files(project_path, options):
+                project_data['files'].append(file_info)
+                project_data['metadata']['total_files'] += 1
+                project_data['metadata']['total_size'] += file_info.get('size', 0)
             
             # プロジェクト構造を構築
             project_data['structure'] = self._build_project_structure(project_data['files'])
@@ -233,6 +214,54 @@ class ExportPlugin(BasePlugin):
         
         return project_data
     
+    def _collect_project_summary(self, project_path: str, options: Dict[str, Any]) -> Dict[str, Any]:
+        """ファイル数・総サイズだけを集計したプロジェクト情報（ファイル一覧は保持しない）"""
+        project_info = self._new_project_info(project_path)
+        
+        try:
+            for file_info in self._iter_project_files(project_path, options):
+                project_info['metadata']['total_files'] += 1
+                project_info['metadata']['total_size'] += file_info.get('size', 0)
+        except Exception as e:
+            self.logger.error(f"プロジェクトデータ収集エラー: {e}")
+        
+        return project_info
+    
+    def _new_project_info(self, project_path: str) -> Dict[str, Any]:
+        """空のプロジェクト情報"""
+        return {
+            'name': Path(project_path).name,
+            'path': project_path,
+            'metadata': {
+                'export_time': datetime.now().isoformat(),
+                'total_files': 0,
+                'total_size': 0
+            }
+        }
+    
+    def _iter_project_files(self, project_path: str, options: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """エクスポート対象のファイル情報を走査順に1件ずつ返す"""
+        # ファイル除外パターン
+        exclude_patterns = options.get('exclude_patterns', [
+            '*.pyc', '__pycache__', '.git', '.svn', 'node_modules',
+            '*.log', '*.tmp', '.DS_Store'
+        ])
+        
+        for root, dirs, files in os.walk(project_path):
+            # 除外ディレクトリをスキップ（走査順を固定する）
+            dirs[:] = sorted(d for d in dirs if not self._should_exclude(d, exclude_patterns))
+            
+            for file in sorted(files):
+                if self._should_exclude(file, exclude_patterns):
+                    continue
+                
+                file_path = os.path.join(root, file)
+                relative_path = os.path.relpath(file_path, project_path)
+                
+                file_info = self._get_file_info(file_path, relative_path)
+                if file_info:
+                    yield file_info
+    
     def _collect_file_data(self, file_path: str, options: Dict[str, Any]) -> Dict[str, Any]:
         """ファイルデータを収集"""
         file_data = {
@@ -8,13 +8,13 @@ import os
 import shutil
 import json
 import yaml
-import hashlib
 import mimetypes
 from pathlib import Path
-from typing import List, Dict, Optional, Union, Tuple, Any
+from typing import List, Dict, Optional, Union, Tuple, Any, Callable, Iterable, Iterator
 from datetime import datetime, timedelta
 import logging
 import asyncio
+import threading
 import aiofiles
 from dataclasses import dataclass
 from enum import Enum
@@ -28,6 +28,14 @@ from ..core.exceptions import (
 )
 #from ..core.config_manager import ConfigManager
 from src.core.logger import get_logger
+from ..core.content_index import ContentIndex, compile_query, scan_file
+from ..core.file_watcher import CHANGE_DELETED, CHANGE_MODIFIED, FileChange
+from ..utils.dir_scanner import DirectoryScanner
+from ..utils.version_store import VersionInfo, VersionStore
+from ..utils.save_engine import SaveEngine
+from ..utils.file_transfer import FileTransferEngine, TransferCancelled, TransferProgress
+from ..utils.hash_service import get_hash_service
+from ..utils import file_reader
 
 def ConfigManager(*args, **kwargs):
     from ..core.config_manager import ConfigManager
@@ -71,6 +79,12 @@ class FileInfo:
     content_preview: Optional[str] = None
 
 
+# 取得に読み込みを伴うFileInfoの項目（list_directory/search_filesのfieldsで指定）
+FILE_INFO_FIELDS = frozenset({'hash', 'preview', 'mime'})
+# ハッシュを計算する最大ファイルサイズ
+HASH_MAX_FILE_SIZE = 10 * 1024 * 1024
+
+
 @dataclass
 class BackupInfo:
     """バックアップ情報データクラス"""
@@ -79,6 +93,7 @@ class BackupInfo:
     timestamp: datetime
     size: int
     hash_md5: str
+    version_id: Optional[int] = None
 
 
 class FileService:
@@ -98,11 +113,19 @@ class FileService:
         file_config = self.config.get('file_management', {})
         self.auto_save_enabled = file_config.get('auto_save', {}).get('enabled', True)
         self.auto_save_interval = file_config.get('auto_save', {}).get('interval', 300)
+        self.auto_save_debounce = file_config.get('auto_save', {}).get('debounce', 1.0)
+        self.auto_save_max_delay = file_config.get('auto_save', {}).get('max_delay', 10.0)
+        self.fsync_enabled = file_config.get('auto_save', {}).get('fsync', True)
         self.backup_enabled = file_config.get('backup', {}).get('enabled', True)
         self.backup_interval = file_config.get('backup', {}).get('interval', 1800)
         self.max_backups = file_config.get('backup', {}).get('max_backups', 20)
         self.backup_path = Path(file_config.get('backup', {}).get('path', 'backups/files/'))
         self.temp_path = Path(file_config.get('temp_files', {}).get('path', 'temp/'))
+        self.content_index_path = Path(
+            file_config.get('content_index', {}).get('path', 'data/content_index.db')
+        )
+        self.transfer_max_workers = file_config.get('transfer', {}).get('max_workers', 4)
+        self.transfer_max_concurrent = file_config.get('transfer', {}).get('max_concurrent', 4)
         self.max_file_size = self._parse_size(
             self.config.get('performance', {}).get('limits', {}).get('max_file_size', '100MB')
         )
@@ -118,6 +141,28 @@ class FileService:
         # ディレクトリの作成
         self._ensure_directories()
         
+        # コンテンツ検索インデックス（enable_content_indexで作成）
+        self.content_index: Optional[ContentIndex] = None
+        self._indexed_roots: List[str] = []
+        
+        # ファイル毎の版管理（最初のバックアップ時に作成）
+        self._version_store: Optional[VersionStore] = None
+        
+        # 保存エンジンとエディタの未保存バッファ（パス -> (内容, エンコーディング)）
+        self.save_engine = SaveEngine(
+            debounce=self.auto_save_debounce,
+            max_delay=self.auto_save_max_delay,
+            fsync=self.fsync_enabled,
+            on_written=lambda paths: self._refresh_content_index(*paths)
+        )
+        self._buffers: Dict[Path, Tuple[str, str]] = {}
+        
+        # コピー・移動・エクスポートはイベントループを止めないよう転送エンジンで実行
+        self.transfer_engine = FileTransferEngine(
+            max_workers=self.transfer_max_workers,
+            max_concurrent=self.transfer_max_concurrent
+        )
+        
         # ファイル監視とバックアップのタスク
         self._auto_save_task = None
         self._backup_task = None
@@ -171,9 +216,10 @@ class FileService:
                 self.logger.error(f"バックアップエラー: {e}")
     
     async def _perform_auto_save(self):
-        """自動保存の実行"""
-        # 実装は後で追加
-        pass
+        """自動保存の実行（未保存のバッファと予約中の保存をすべて書き込む）"""
+        for path in list(self._buffers):
+            self._schedule_buffer(path)
+        await self.save_engine.flush()
     
     async def _perform_backup(self):
         """バックアップの実行"""
@@ -204,55 +250,88 @@ class FileService:
         
         return type_mapping.get(extension, FileType.UNKNOWN)
     
-    def get_file_info(self, file_path: Union[str, Path]) -> FileInfo:
-        """ファイル情報の取得"""
+    def get_file_info(self, file_path: Union[str, Path],
+                      fields: Optional[Iterable[str]] = None) -> FileInfo:
+        """
+        ファイル情報の取得
+        
+        Args:
+            file_path: ファイルパス
+            fields: 取得する追加項目（'hash', 'preview', 'mime'、Noneの場合はすべて）
+            
+        Returns:
+            FileInfo: ファイル情報
+        """
         try:
             path = Path(file_path)
             if not path.exists():
                 raise FileNotFoundError(f"ファイルが見つかりません: {file_path}")
             
             stat = path.stat()
-            file_type = self.get_file_type(path)
-            mime_type, _ = mimetypes.guess_type(str(path))
-            
-            # ファイルハッシュの計算（小さなファイルのみ）
-            hash_md5 = None
-            if not path.is_dir() and stat.st_size < 10 * 1024 * 1024:  # 10MB未満
-                hash_md5 = self._calculate_file_hash(path)
-            
-            # コンテンツプレビュー（テキストファイルのみ）
-            content_preview = None
-            if file_type in [FileType.PYTHON, FileType.JAVASCRIPT, FileType.TEXT, 
-                           FileType.JSON, FileType.YAML, FileType.MARKDOWN]:
-                content_preview = self._get_content_preview(path)
-            
-            return FileInfo(
-                path=str(path.absolute()),
-                name=path.name,
-                size=stat.st_size,
-                modified=datetime.fromtimestamp(stat.st_mtime),
-                created=datetime.fromtimestamp(stat.st_ctime),
-                file_type=file_type,
-                encoding='utf-8',  # デフォルト
-                mime_type=mime_type or 'application/octet-stream',
-                is_directory=path.is_dir(),
-                permissions=oct(stat.st_mode)[-3:],
-                hash_md5=hash_md5,
-                content_preview=content_preview
-            )
+            return self._build_file_info(path.absolute(), stat, path.is_dir(), fields)
             
         except Exception as e:
             self.logger.error(f"ファイル情報取得エラー: {e}")
             raise FileServiceError(f"ファイル情報の取得に失敗しました: {e}")
     
+    def _build_file_info(self, path: Path, stat: os.stat_result, is_directory: bool,
+                         fields: Optional[Iterable[str]] = None) -> FileInfo:
+        """stat結果からファイル情報を作成（読み込みを伴う項目は指定された場合のみ）"""
+        fields = FILE_INFO_FIELDS if fields is None else frozenset(fields)
+        file_type = self.get_file_type(path)
+        
+        mime_type = ""
+        if 'mime' in fields:
+            mime_type, _ = mimetypes.guess_type(str(path))
+            mime_type = mime_type or 'application/octet-stream'
+        
+        # ファイルハッシュの計算（小さなファイルのみ）
+        hash_md5 = None
+        if 'hash' in fields and not is_directory and stat.st_size < HASH_MAX_FILE_SIZE:
+            hash_md5 = self._calculate_file_hash(path)
+        
+        # コンテンツプレビュー（テキストファイルのみ）
+        content_preview = None
+        if 'preview' in fields and file_type in [FileType.PYTHON, FileType.JAVASCRIPT, FileType.TEXT, 
+                                                FileType.JSON, FileType.YAML, FileType.MARKDOWN]:
+            content_preview = self._get_content_preview(path)
+        
+        return FileInfo(
+            path=str(path),
+            name=path.name,
+            size=stat.st_size,
+            modified=datetime.fromtimestamp(stat.st_mtime),
+            created=datetime.fromtimestamp(stat.st_ctime),
+            file_type=file_type,
+            encoding='utf-8',  # デフォルト
+            mime_type=mime_type,
+            is_directory=is_directory,
+            permissions=oct(stat.st_mode)[-3:],
+            hash_md5=hash_md5,
+            content_preview=content_preview
+        )
+    
+    def _entry_file_info(self, entry: os.DirEntry, fields: Optional[Iterable[str]] = None) -> FileInfo:
+        """走査結果のDirEntryからファイル情報を作成（DirEntryのstatキャッシュを利用）"""
+        return self._build_file_info(Path(os.path.abspath(entry.path)), entry.stat(), entry.is_dir(), fields)
+    
+    def _fill_file_hashes(self, file_infos: List[FileInfo]):
+        """複数のファイル情報のハッシュをまとめて計算（キャッシュの参照・保存は1回、読み込みは並列）"""
+        targets = [info for info in file_infos if not info.is_directory and info.size < HASH_MAX_FILE_SIZE]
+        if not targets:
+            return
+        try:
+            digests = get_hash_service().hash_files([info.path for info in targets], 'md5')
+        except Exception as e:
+            self.logger.warning(f"ハッシュ計算エラー: {e}")
+            return
+        for info in targets:
+            info.hash_md5 = digests.get(info.path)
+    
     def _calculate_file_hash(self, file_path: Path) -> str:
-        """ファイルのMD5ハッシュを計算"""
-        hash_md5 = hashlib.md5()
+        """ファイルのMD5ハッシュを計算（ハッシュ計算サービスのキャッシュを利用）"""
         try:
-            with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_md5.update(chunk)
-            return hash_md5.hexdigest()
+            return get_hash_service().hash_file(file_path, 'md5')
         except Exception as e:
             self.logger.warning(f"ハッシュ計算エラー: {e}")
             return None
@@ -260,14 +339,13 @@ class FileService:
     def _get_content_preview(self, file_path: Path, max_lines: int = 10) -> str:
         """ファイルのコンテンツプレビューを取得"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                lines = []
-                for i, line in enumerate(f):
-                    if i >= max_lines:
-                        lines.append("...")
-                        break
-                    lines.append(line.rstrip())
-                return '\n'.join(lines)
+            lines = []
+            for i, line in enumerate(file_reader.iter_lines(file_path)):
+                if i >= max_lines:
+                    lines.append("...")
+                    break
+                lines.append(line.rstrip())
+            return '\n'.join(lines)
         except Exception as e:
             self.logger.warning(f"プレビュー取得エラー: {e}")
             return None
@@ -292,22 +370,55 @@ class FileService:
             self.logger.error(f"ファイル読み取りエラー: {e}")
             raise FileServiceError(f"ファイルの読み取りに失敗しました: {e}")
     
-    async def write_file(self, file_path: Union[str, Path], content: str, 
-                        encoding: str = 'utf-8', backup: bool = True) -> bool:
-        """ファイルの非同期書き込み"""
+    def iter_lines(self, file_path: Union[str, Path], encoding: Optional[str] = None) -> Iterator[str]:
+        """
+        ファイルを1行ずつ読み取り（サイズ制限の対象外、ファイル全体は保持しない）
+        
+        Args:
+            file_path: ファイルパス
+            encoding: エンコーディング（Noneの場合は先頭から検出）
+            
+        Yields:
+            str: 改行を除いた行
+        """
+        path = Path(file_path)
+        if not path.is_file():
+            raise FileNotFoundError(f"ファイルが見つかりません: {file_path}")
+        yield from file_reader.iter_lines(path, encoding)
+    
+    def read_range(self, file_path: Union[str, Path], offset: int, length: int) -> bytes:
+        """
+        ファイルの指定範囲のバイト列を読み取り
+        
+        Args:
+            file_path: ファイルパス
+            offset: 開始位置
+            length: 読み込むバイト数
+            
+        Returns:
+            bytes: 読み込んだバイト列
+        """
         try:
             path = Path(file_path)
+            if not path.is_file():
+                raise FileNotFoundError(f"ファイルが見つかりません: {file_path}")
+            return file_reader.read_range(path, offset, length)
             
-            # バックアップの作成
-            if backup and path.exists():
-                await self.create_backup(path)
-            
-            # ディレクトリの作成
-            path.parent.mkdir(parents=True, exist_ok=True)
+        except Exception as e:
+            self.logger.error(f"ファイル範囲読み取りエラー: {e}")
+            raise FileServiceError(f"ファイルの読み取りに失敗しました: {e}")
+    
+    async def write_file(self, file_path: Union[str, Path], content: str, 
+                        encoding: str = 'utf-8', backup: bool = True) -> bool:
+        """ファイルの非同期書き込み（一時ファイルに書き込み、fsyncしてから置き換える）"""
+        try:
+            # シンボリックリンクはリンク先を置き換える（リンク自体を通常ファイルで上書きしない）
+            path = Path(os.path.realpath(file_path))
             
-            # ファイルの書き込み
-            async with aiofiles.open(path, 'w', encoding=encoding) as f:
-                await f.write(content)
+            # バックアップは書き込み直前に作成（置き換えるため元のファイルはハードリンクで保持できる）
+            await self.save_engine.write(
+                path, content.encode(encoding), self._backup_before_write if backup else None
+            )
             
             self.logger.info(f"ファイル書き込み完了: {file_path}")
             return True
@@ -316,34 +427,110 @@ class FileService:
             self.logger.error(f"ファイル書き込みエラー: {e}")
             raise FileServiceError(f"ファイルの書き込みに失敗しました: {e}")
     
-    async def create_backup(self, file_path: Union[str, Path]) -> BackupInfo:
-        """ファイルのバックアップを作成"""
+    def _backup_before_write(self, path: Path):
+        """書き込み直前のバックアップ（保存エンジンのスレッドで実行）"""
+        if path.exists():
+            self._get_version_store().save_version(path, replacing=True)
+            self._get_version_store().prune(path, self.max_backups)
+    
+    def update_buffer(self, file_path: Union[str, Path], content: str, encoding: str = 'utf-8'):
+        """
+        エディタのバッファの内容を更新（自動保存が有効な場合は集約して保存を予約）
+        
+        Args:
+            file_path: ファイルパス
+            content: バッファの内容
+            encoding: エンコーディング
+        """
+        path = Path(file_path).absolute()
+        self._buffers[path] = (content, encoding)
+        if self.auto_save_enabled:
+            self._schedule_buffer(path)
+    
+    def _schedule_buffer(self, path: Path) -> asyncio.Future:
+        """バッファの保存を予約し、書き込まれた内容が最新なら未保存の状態を解除"""
+        buffer = self._buffers[path]
+        content, encoding = buffer
+        future = self.save_engine.schedule(path, content.encode(encoding), self._backup_before_write)
+        
+        def done(f: asyncio.Future):
+            if not f.cancelled() and f.exception() is None and self._buffers.get(path) is buffer:
+                del self._buffers[path]
+        
+        future.add_done_callback(done)
+        return future
+    
+    def is_dirty(self, file_path: Union[str, Path]) -> bool:
+        """バッファに未保存の変更があるか"""
+        return Path(file_path).absolute() in self._buffers
+    
+    async def save_buffer(self, file_path: Union[str, Path]) -> bool:
+        """
+        バッファをすぐに保存
+        
+        Args:
+            file_path: ファイルパス
+            
+        Returns:
+            bool: 保存したか（未保存の変更がない場合False）
+        """
+        path = Path(file_path).absolute()
+        if path not in self._buffers:
+            return False
+        try:
+            future = self._schedule_buffer(path)
+            await self.save_engine.flush([path])
+            await future
+            return True
+        except Exception as e:
+            self.logger.error(f"バッファ保存エラー: {e}")
+            raise FileServiceError(f"バッファの保存に失敗しました: {e}")
+    
+    def discard_buffer(self, file_path: Union[str, Path]):
+        """バッファの未保存の変更を破棄（予約中の保存は取り消さない）"""
+        self._buffers.pop(Path(file_path).absolute(), None)
+    
+    def _get_version_store(self) -> VersionStore:
+        """版管理ストアを取得"""
+        if self._version_store is None:
+            self._version_store = VersionStore(self.backup_path / "versions")
+        return self._version_store
+    
+    def _version_to_backup_info(self, version: VersionInfo) -> BackupInfo:
+        """版情報をバックアップ情報に変換"""
+        return BackupInfo(
+            original_path=version.original_path,
+            backup_path=version.blob_path,
+            timestamp=version.timestamp,
+            size=version.size,
+            hash_md5=version.hash_md5,
+            version_id=version.version_id
+        )
+    
+    async def create_backup(self, file_path: Union[str, Path], replacing: bool = False) -> BackupInfo:
+        """
+        ファイルのバックアップを作成
+        
+        Args:
+            file_path: 対象ファイル
+            replacing: この後ファイルを置き換えるか削除する場合True（ハードリンクで保持できる）
+            
+        Returns:
+            BackupInfo: バックアップ情報
+        """
         try:
             source_path = Path(file_path)
             if not source_path.exists():
                 raise FileNotFoundError(f"バックアップ対象ファイルが見つかりません: {file_path}")
             
-            # バックアップファイル名の生成
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_name = f"{source_path.stem}_{timestamp}{source_path.suffix}"
-            backup_file_path = self.backup_path / backup_name
-            
-            # バックアップの作成
-            shutil.copy2(source_path, backup_file_path)
-            
-            # バックアップ情報の作成
-            backup_info = BackupInfo(
-                original_path=str(source_path.absolute()),
-                backup_path=str(backup_file_path.absolute()),
-                timestamp=datetime.now(),
-                size=backup_file_path.stat().st_size,
-                hash_md5=self._calculate_file_hash(backup_file_path)
-            )
+            # ハードリンク・reflink・前版との差分のうち可能な方法で格納
+            version = self._get_version_store().save_version(source_path, replacing=replacing)
+            backup_info = self._version_to_backup_info(version)
             
-            self.logger.info(f"バックアップ作成完了: {backup_file_path}")
+            self.logger.info(f"バックアップ作成完了: {backup_info.backup_path}")
             
             # 古いバックアップの削除
-            await self._cleanup_old_backups(source_path.stem)
+            await self._cleanup_old_backups(source_path)
             
             return backup_info
             
@@ -351,25 +538,77 @@ class FileService:
             self.logger.error(f"バックアップ作成エラー: {e}")
             raise FileServiceError(f"バックアップの作成に失敗しました: {e}")
     
-    async def _cleanup_old_backups(self, file_stem: str):
-        """古いバックアップファイルの削除"""
+    async def _cleanup_old_backups(self, file_path: Path):
+        """古いバックアップの削除（そのファイルの版だけを参照）"""
         try:
-            backup_files = list(self.backup_path.glob(f"{file_stem}_*"))
-            backup_files.sort(key=lambda x: x.stat().st_mtime, reverse=True)
-            
-            # 制限を超えたバックアップを削除
-            for backup_file in backup_files[self.max_backups:]:
-                backup_file.unlink()
-                self.logger.debug(f"古いバックアップを削除: {backup_file}")
+            deleted = self._get_version_store().prune(file_path, self.max_backups)
+            if deleted:
+                self.logger.debug(f"古いバックアップを削除: {file_path} ({deleted}件)")
                 
         except Exception as e:
             self.logger.warning(f"バックアップクリーンアップエラー: {e}")
+    
+    def list_backups(self, file_path: Union[str, Path]) -> List[BackupInfo]:
+        """
+        ファイルのバックアップ一覧（新しい順）
+        
+        Args:
+            file_path: 対象ファイル
+            
+        Returns:
+            List[BackupInfo]: バックアップ情報のリスト
+        """
+        return [self._version_to_backup_info(version)
+                for version in self._get_version_store().list_versions(os.path.realpath(file_path))]
+    
+    async def restore_backup(self, backup_info: BackupInfo,
+                             destination_path: Optional[Union[str, Path]] = None) -> Path:
+        """
+        バックアップを復元
+        
+        Args:
+            backup_info: バックアップ情報
+            destination_path: 復元先（Noneの場合は元のパス）
             
+        Returns:
+            Path: 復元したファイル
+        """
+        try:
+            if backup_info.version_id is None:
+                # 版管理導入前のバックアップはファイルをそのままコピー
+                destination = Path(destination_path or backup_info.original_path)
+                shutil.copy2(backup_info.backup_path, destination)
+            else:
+                destination = self._get_version_store().restore_version(backup_info.version_id, destination_path)
+            
+            self._refresh_content_index(destination)
+            self.logger.info(f"バックアップ復元完了: {destination}")
+            return destination
+            
+        except Exception as e:
+            self.logger.error(f"バックアップ復元エラー: {e}")
+            raise FileServiceError(f"バックアップの復元に失敗しました: {e}")
+    
     def list_directory(self, directory_path: Union[str, Path], 
                       recursive: bool = False, 
                       include_hidden: bool = False,
-                      file_types: Optional[List[FileType]] = None) -> List[FileInfo]:
-        """ディレクトリ内のファイル一覧を取得"""
+                      file_types: Optional[List[FileType]] = None,
+                      fields: Optional[Iterable[str]] = None,
+                      exclude_dirs: Optional[Iterable[str]] = None) -> List[FileInfo]:
+        """
+        ディレクトリ内のファイル一覧を取得
+        
+        Args:
+            directory_path: ディレクトリパス
+            recursive: サブディレクトリも含めるか
+            include_hidden: 隠しファイルを含めるか（含めない場合は隠しディレクトリ配下も走査しない）
+            file_types: ファイルタイプフィルタ
+            fields: 取得する追加項目（'hash', 'preview', 'mime'、Noneの場合はすべて）
+            exclude_dirs: 走査しないディレクトリ名
+            
+        Returns:
+            List[FileInfo]: ファイル情報リスト
+        """
         try:
             path = Path(directory_path)
             if not path.exists():
@@ -379,30 +618,25 @@ class FileService:
                 raise FileServiceError(f"指定されたパスはディレクトリではありません: {directory_path}")
             
             files = []
+            scanner = DirectoryScanner(exclude_dirs=exclude_dirs, include_hidden=include_hidden)
+            # ハッシュは一覧の作成後にまとめて計算する
+            fields = FILE_INFO_FIELDS if fields is None else frozenset(fields)
             
-            if recursive:
-                pattern = "**/*"
-            else:
-                pattern = "*"
-            
-            for item_path in path.glob(pattern):
-                # 隠しファイルのスキップ
-                if not include_hidden and item_path.name.startswith('.'):
-                    continue
-                
+            for entry in scanner.scan(path, recursive=recursive, include_dirs=True):
                 try:
-                    file_info = self.get_file_info(item_path)
-                    
-                    # ファイルタイプフィルタ
-                    if file_types and file_info.file_type not in file_types:
+                    # ファイルタイプフィルタ（名前だけで判定できるため読み込み前に適用）
+                    if file_types and self.get_file_type(entry.name) not in file_types:
                         continue
                     
-                    files.append(file_info)
+                    files.append(self._entry_file_info(entry, fields - {'hash'}))
                     
                 except Exception as e:
-                    self.logger.warning(f"ファイル情報取得スキップ: {item_path}, エラー: {e}")
+                    self.logger.warning(f"ファイル情報取得スキップ: {entry.path}, エラー: {e}")
                     continue
             
+            if 'hash' in fields:
+                self._fill_file_hashes(files)
+            
             # ソート（フォルダ優先、名前順）
             files.sort(key=lambda x: (not x.is_directory, x.name.lower()))
             
@@ -434,15 +668,16 @@ class FileService:
             if not path.exists():
                 raise FileNotFoundError(f"削除対象ファイルが見つかりません: {file_path}")
             
-            # バックアップの作成
+            # バックアップの作成（削除するため元のファイルはハードリンクで保持できる）
             if backup and path.is_file():
-                await self.create_backup(path)
+                await self.create_backup(path, replacing=True)
             
             if path.is_dir():
                 shutil.rmtree(path)
             else:
                 path.unlink()
             
+            self._refresh_content_index(path)
             self.logger.info(f"ファイル削除完了: {file_path}")
             return True
             
@@ -451,8 +686,9 @@ class FileService:
             raise FileServiceError(f"ファイルの削除に失敗しました: {e}")
     
     async def move_file(self, source_path: Union[str, Path], 
-                       destination_path: Union[str, Path], backup: bool = True) -> bool:
-        """ファイルの移動"""
+                       destination_path: Union[str, Path], backup: bool = True,
+                       progress_callback: Optional[Callable[[TransferProgress], None]] = None) -> bool:
+        """ファイルの移動（別のファイルシステムへの移動はコピーして削除）"""
         try:
             src = Path(source_path)
             dst = Path(destination_path)
@@ -464,11 +700,9 @@ class FileService:
             if backup and src.is_file():
                 await self.create_backup(src)
             
-            # 移動先ディレクトリの作成
-            dst.parent.mkdir(parents=True, exist_ok=True)
-            
-            shutil.move(str(src), str(dst))
+            await self.transfer_engine.move(src, dst, progress_callback)
             
+            self._refresh_content_index(src, dst)
             self.logger.info(f"ファイル移動完了: {source_path} -> {destination_path}")
             return True
             
@@ -477,8 +711,9 @@ class FileService:
             raise FileServiceError(f"ファイルの移動に失敗しました: {e}")
     
     async def copy_file(self, source_path: Union[str, Path], 
-                       destination_path: Union[str, Path]) -> bool:
-        """ファイルのコピー"""
+                       destination_path: Union[str, Path],
+                       progress_callback: Optional[Callable[[TransferProgress], None]] = None) -> bool:
+        """ファイルのコピー（ディレクトリの場合はファイルを並行してコピー）"""
         try:
             src = Path(source_path)
             dst = Path(destination_path)
@@ -486,14 +721,12 @@ class FileService:
             if not src.exists():
                 raise FileNotFoundError(f"コピー元ファイルが見つかりません: {source_path}")
             
-            # コピー先ディレクトリの作成
-            dst.parent.mkdir(parents=True, exist_ok=True)
-            
             if src.is_dir():
-                shutil.copytree(src, dst, dirs_exist_ok=True)
+                await self.transfer_engine.copy_tree(src, dst, progress_callback)
             else:
-                shutil.copy2(src, dst)
+                await self.transfer_engine.copy_file(src, dst, progress_callback)
             
+            self._refresh_content_index(dst)
             self.logger.info(f"ファイルコピー完了: {source_path} -> {destination_path}")
             return True
             
@@ -506,47 +739,76 @@ class FileService:
                     content_search: Optional[str] = None,
                     file_types: Optional[List[FileType]] = None,
                     size_range: Optional[Tuple[int, int]] = None,
-                    date_range: Optional[Tuple[datetime, datetime]] = None) -> List[FileInfo]:
-        """ファイル検索"""
+                    date_range: Optional[Tuple[datetime, datetime]] = None,
+                    fields: Optional[Iterable[str]] = None,
+                    exclude_dirs: Optional[Iterable[str]] = None) -> List[FileInfo]:
+        """
+        ファイル検索
+        
+        Args:
+            directory_path: 検索対象ディレクトリ
+            pattern: ファイル名のパターン
+            content_search: ファイル内容の検索文字列
+            file_types: ファイルタイプフィルタ
+            size_range: サイズ範囲 (最小, 最大)
+            date_range: 更新日時の範囲 (開始, 終了)
+            fields: 取得する追加項目（'hash', 'preview', 'mime'、Noneの場合はすべて）
+            exclude_dirs: 走査しないディレクトリ名
+            
+        Returns:
+            List[FileInfo]: 検索結果
+        """
         try:
             path = Path(directory_path)
             if not path.exists() or not path.is_dir():
                 raise FileServiceError(f"検索対象ディレクトリが無効です: {directory_path}")
             
             results = []
+            scanner = DirectoryScanner(exclude_dirs=exclude_dirs)
+            # ハッシュは検索後にまとめて計算する
+            fields = FILE_INFO_FIELDS if fields is None else frozenset(fields)
+            candidates = None
+            if content_search:
+                candidates = self._content_candidates(path, content_search)
             
             # パターンマッチングによる検索
-            for file_path in path.rglob(pattern):
+            for entry in scanner.scan(path, include_dirs=True, pattern=pattern):
                 try:
-                    file_info = self.get_file_info(file_path)
-                    
                     # ファイルタイプフィルタ
-                    if file_types and file_info.file_type not in file_types:
+                    if file_types and self.get_file_type(entry.name) not in file_types:
                         continue
                     
-                    # サイズフィルタ
+                    # サイズ・日付フィルタ（DirEntryのstatのみで判定）
+                    stat = entry.stat()
                     if size_range:
                         min_size, max_size = size_range
-                        if not (min_size <= file_info.size <= max_size):
+                        if not (min_size <= stat.st_size <= max_size):
                             continue
                     
-                    # 日付フィルタ
                     if date_range:
                         start_date, end_date = date_range
-                        if not (start_date <= file_info.modified <= end_date):
+                        if not (start_date <= datetime.fromtimestamp(stat.st_mtime) <= end_date):
                             continue
                     
                     # コンテンツ検索
-                    if content_search and not file_info.is_directory:
-                        if not self._search_in_file_content(file_path, content_search):
+                    is_directory = entry.is_dir()
+                    if content_search and not is_directory:
+                        # 索引外（未索引・変更後未反映・サイズ超過・NULを含む）のファイルは直接走査する
+                        if (candidates is not None and os.path.abspath(entry.path) not in candidates
+                                and self.content_index.is_current(entry.path, stat)):
+                            continue
+                        if not self._search_in_file_content(Path(entry.path), content_search):
                             continue
                     
-                    results.append(file_info)
+                    results.append(self._entry_file_info(entry, fields - {'hash'}))
                     
                 except Exception as e:
-                    self.logger.warning(f"ファイル検索スキップ: {file_path}, エラー: {e}")
+                    self.logger.warning(f"ファイル検索スキップ: {entry.path}, エラー: {e}")
                     continue
             
+            if 'hash' in fields:
+                self._fill_file_hashes(results)
+            
             self.logger.info(f"ファイル検索完了: {len(results)}件")
             return results
             
@@ -555,19 +817,141 @@ class FileService:
             raise FileServiceError(f"ファイル検索に失敗しました: {e}")
     
     def _search_in_file_content(self, file_path: Path, search_term: str) -> bool:
-        """ファイル内容の検索"""
+        """ファイル内容の検索（最初の一致までを1行ずつ読み込む）"""
         try:
             # バイナリファイルのスキップ
             if self.get_file_type(file_path) == FileType.BINARY:
                 return False
             
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-                return search_term.lower() in content.lower()
+            # 改行を含む検索語は行単位では判定できないため全体を読み込む
+            if '\n' in search_term:
+                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                    return search_term.lower() in f.read().lower()
+            
+            return next(scan_file(str(file_path), compile_query(search_term)), None) is not None
                 
         except Exception:
             return False
     
+    def enable_content_index(self, root_path: Union[str, Path],
+                             event_system: Any = None) -> Dict[str, int]:
+        """
+        ディレクトリ配下のコンテンツ検索インデックスを作成・更新
+        
+        以降、このディレクトリ配下の内容検索はインデックスで候補を絞り込み、
+        FileWatcherの変更バッチでインデックスを更新する。
+        
+        Args:
+            root_path: 対象ディレクトリ
+            event_system: FileWatcherの発行先イベントシステム（Noneの場合はグローバル）
+            
+        Returns:
+            Dict[str, int]: indexed/unchanged/removedの件数
+        """
+        try:
+            if self.content_index is None:
+                self.content_index = ContentIndex(str(self.content_index_path))
+            root = os.path.abspath(root_path)
+            stats = self.content_index.sync(root)
+            if root not in self._indexed_roots:
+                self._indexed_roots.append(root)
+            
+            if event_system is None:
+                from ..core.event_system import get_event_system
+                event_system = get_event_system()
+            self.content_index.attach_event_system(event_system, os.path.commonpath(self._indexed_roots))
+            return stats
+            
+        except Exception as e:
+            self.logger.error(f"コンテンツインデックス作成エラー: {e}")
+            raise FileServiceError(f"コンテンツインデックスの作成に失敗しました: {e}")
+    
+    def _refresh_content_index(self, *paths: Path):
+        """このサービスで変更したファイルをコンテンツインデックスに反映"""
+        if self.content_index is None:
+            return
+        changes = []
+        for path in paths:
+            if not self._is_content_indexed(path):
+                continue
+            if path.exists():
+                changes.append(FileChange(CHANGE_MODIFIED, str(path), is_directory=path.is_dir()))
+            else:
+                changes.append(FileChange(CHANGE_DELETED, str(path)))
+        if not changes:
+            return
+        try:
+            self.content_index.apply_file_changes(changes)
+        except Exception as e:
+            self.logger.warning(f"コンテンツインデックス更新エラー: {e}")
+    
+    def _content_candidates(self, directory_path: Path, query: str,
+                            regex: bool = False, case_sensitive: bool = False) -> Optional[set]:
+        """インデックス済みのディレクトリ配下であれば候補ファイルを絞り込む"""
+        if self.content_index is None or not self._is_content_indexed(directory_path):
+            return None
+        directory = os.path.abspath(directory_path)
+        return set(self.content_index.candidates(query, regex, case_sensitive, directory))
+    
+    def _is_content_indexed(self, path: Union[str, Path]) -> bool:
+        """インデックス済みのディレクトリ配下か"""
+        absolute = os.path.abspath(path)
+        return any(absolute == root or absolute.startswith(root.rstrip(os.sep) + os.sep)
+                   for root in self._indexed_roots)
+    
+    def search_content(self, directory_path: Union[str, Path], query: str,
+                       regex: bool = False, case_sensitive: bool = False,
+                       max_results: int = 1000,
+                       exclude_dirs: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        ファイル内容を検索して一致した行・列を返す
+        
+        Args:
+            directory_path: 検索対象ディレクトリ
+            query: 検索語または正規表現
+            regex: 正規表現として扱うか
+            case_sensitive: 大文字小文字を区別するか
+            max_results: 最大件数
+            exclude_dirs: 走査しないディレクトリ名（インデックス未作成の場合のみ使用）
+            
+        Returns:
+            List[Dict[str, Any]]: 一致箇所（file_path, line, column, line_text）
+        """
+        try:
+            path = Path(directory_path)
+            if not path.exists() or not path.is_dir():
+                raise FileServiceError(f"検索対象ディレクトリが無効です: {directory_path}")
+            if not query:
+                return []
+            pattern = compile_query(query, regex, case_sensitive)
+            
+            candidates = self._content_candidates(path, query, regex, case_sensitive)
+            if candidates is None:
+                scanner = DirectoryScanner(exclude_dirs=exclude_dirs)
+                candidates = (os.path.abspath(entry.path) for entry in scanner.scan(path)
+                              if self.get_file_type(entry.name) != FileType.BINARY)
+            else:
+                # 索引外（未索引・変更後未反映・サイズ超過・NULを含む）のファイルは直接走査する
+                candidates.update(
+                    file_path for file_path in self.content_index.unindexed_paths(str(path))
+                    if self.get_file_type(file_path) != FileType.BINARY
+                )
+            
+            results = []
+            for file_path in sorted(candidates):
+                for match in scan_file(file_path, pattern):
+                    results.append(match.to_dict())
+                    if len(results) >= max_results:
+                        self.logger.info(f"コンテンツ検索完了: {len(results)}件（上限）")
+                        return results
+            
+            self.logger.info(f"コンテンツ検索完了: {len(results)}件")
+            return results
+            
+        except Exception as e:
+            self.logger.error(f"コンテンツ検索エラー: {e}")
+            raise FileServiceError(f"コンテンツ検索に失敗しました: {e}")
+    
     async def create_temp_file(self, content: str = "", 
                               suffix: str = ".tmp", 
                               prefix: str = "llm_temp_") -> Path:
@@ -615,29 +999,15 @@ class FileService:
     def get_file_encoding(self, file_path: Union[str, Path]) -> str:
         """ファイルエンコーディングの検出"""
         try:
-            import chardet
-            
             path = Path(file_path)
             if not path.exists() or path.is_dir():
                 return 'utf-8'
             
-            with open(path, 'rb') as f:
-                raw_data = f.read(10000)  # 最初の10KBを読み取り
-                
-            result = chardet.detect(raw_data)
-            encoding = result.get('encoding', 'utf-8')
-            confidence = result.get('confidence', 0)
-            
-            # 信頼度が低い場合はUTF-8を使用
-            if confidence < 0.7:
-                encoding = 'utf-8'
-            
-            self.logger.debug(f"エンコーディング検出: {file_path} -> {encoding} (信頼度: {confidence})")
+            # 先頭10KBのみで判定
+            encoding = file_reader.detect_file_encoding(path)
+            self.logger.debug(f"エンコーディング検出: {file_path} -> {encoding}")
             return encoding
             
-        except ImportError:
-            self.logger.warning("chardetライブラリが見つかりません。UTF-8を使用します。")
-            return 'utf-8'
         except Exception as e:
             self.logger.warning(f"エンコーディング検出エラー: {e}")
             return 'utf-8'
@@ -758,42 +1128,46 @@ class FileService:
     
     async def export_files(self, file_paths: List[Union[str, Path]], 
                           export_path: Union[str, Path], 
-                          format_type: str = "zip") -> Path:
-        """ファイルのエクスポート"""
+                          format_type: str = "zip",
+                          base_path: Optional[Union[str, Path]] = None,
+                          progress_callback: Optional[Callable[[TransferProgress], None]] = None) -> Path:
+        """
+        ファイルのエクスポート（アーカイブの作成は転送エンジンのスレッドで行う）
+        
+        Args:
+            file_paths: エクスポートするファイル・ディレクトリ
+            export_path: 出力先ディレクトリ
+            format_type: zip または tar
+            base_path: アーカイブ内のパスの基準（Noneの場合はファイル名・ディレクトリ名から）
+            progress_callback: 進捗を通知する関数
+            
+        Returns:
+            Path: 作成したアーカイブ
+        """
         try:
+            if format_type not in ("zip", "tar"):
+                raise FileServiceError(f"サポートされていないエクスポート形式: {format_type}")
+            
             export_dir = Path(export_path)
             export_dir.mkdir(parents=True, exist_ok=True)
             
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            suffix = "zip" if format_type == "zip" else "tar.gz"
+            export_file = export_dir / f"export_{timestamp}.{suffix}"
             
-            if format_type == "zip":
-                import zipfile
-                export_file = export_dir / f"export_{timestamp}.zip"
-                
-                with zipfile.ZipFile(export_file, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                    for file_path in file_paths:
-                        path = Path(file_path)
-                        if path.exists():
-                            if path.is_file():
-                                zipf.write(path, path.name)
-                            elif path.is_dir():
-                                for file_in_dir in path.rglob('*'):
-                                    if file_in_dir.is_file():
-                                        arcname = file_in_dir.relative_to(path.parent)
-                                        zipf.write(file_in_dir, arcname)
-            
-            elif format_type == "tar":
-                import tarfile
-                export_file = export_dir / f"export_{timestamp}.tar.gz"
-                
-                with tarfile.open(export_file, 'w:gz') as tarf:
-                    for file_path in file_paths:
-                        path = Path(file_path)
-                        if path.exists():
-                            tarf.add(path, arcname=path.name)
-            
-            else:
-                raise FileServiceError(f"サポートされていないエクスポート形式: {format_type}")
+            entries = await self.transfer_engine.run(self._collect_export_entries, file_paths, base_path)
+            progress = TransferProgress(
+                total_bytes=sum(size for _, _, size in entries), total_files=len(entries)
+            )
+            report = self.transfer_engine.progress_reporter(progress, progress_callback)
+            cancel_event = threading.Event()
+            try:
+                await self.transfer_engine.run(
+                    self._write_export_archive, entries, export_file, format_type, report, cancel_event
+                )
+            except asyncio.CancelledError:
+                cancel_event.set()
+                raise
             
             self.logger.info(f"ファイルエクスポート完了: {export_file}")
             return export_file
@@ -802,18 +1176,85 @@ class FileService:
             self.logger.error(f"ファイルエクスポートエラー: {e}")
             raise FileServiceError(f"ファイルのエクスポートに失敗しました: {e}")
     
+    @staticmethod
+    def _collect_export_entries(file_paths: List[Union[str, Path]],
+                                base_path: Optional[Union[str, Path]]) -> List[Tuple[Path, str, int]]:
+        """エクスポートするファイルの(パス, アーカイブ内のパス, サイズ)の一覧"""
+        base = Path(base_path) if base_path is not None else None
+        
+        def arcname(path: Path, default_base: Path) -> str:
+            if base is not None:
+                try:
+                    return path.relative_to(base).as_posix()
+                except ValueError:
+                    pass
+            return path.relative_to(default_base).as_posix()
+        
+        entries = []
+        for file_path in file_paths:
+            path = Path(file_path)
+            if path.is_file():
+                entries.append((path, arcname(path, path.parent), path.stat().st_size))
+            elif path.is_dir():
+                for file_in_dir in sorted(path.rglob('*')):
+                    if file_in_dir.is_file():
+                        entries.append((file_in_dir, arcname(file_in_dir, path.parent),
+                                        file_in_dir.stat().st_size))
+        return entries
+    
+    @staticmethod
+    def _write_export_archive(entries: List[Tuple[Path, str, int]], export_file: Path, format_type: str,
+                              report: Callable[..., None], cancel_event: threading.Event):
+        """アーカイブを作成（キャンセルされた場合は作成途中のアーカイブを削除）"""
+        try:
+            if format_type == "zip":
+                import zipfile
+                with zipfile.ZipFile(export_file, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                    for path, name, size in entries:
+                        if cancel_event.is_set():
+                            raise TransferCancelled(str(export_file))
+                        zipf.write(path, name)
+                        report(size, 1)
+            else:
+                import tarfile
+                with tarfile.open(export_file, 'w:gz') as tarf:
+                    for path, name, size in entries:
+                        if cancel_event.is_set():
+                            raise TransferCancelled(str(export_file))
+                        tarf.add(path, arcname=name, recursive=False)
+                        report(size, 1)
+        except BaseException:
+            export_file.unlink(missing_ok=True)
+            raise
+    
     async def close(self):
         """サービスのクリーンアップ"""
         try:
             # バックグラウンドタスクの停止
             if self._auto_save_task:
                 self._auto_save_task.cancel()
+            
+            # 未保存のバッファと予約中の保存を書き込む
+            if self.auto_save_enabled:
+                await self._perform_auto_save()
+            else:
+                await self.save_engine.close()
             if self._backup_task:
                 self._backup_task.cancel()
             
+            if self.content_index is not None:
+                self.content_index.close()
+                self.content_index = None
+            
+            if self._version_store is not None:
+                self._version_store.close()
+                self._version_store = None
+            
             # 一時ファイルのクリーンアップ
             await self.cleanup_temp_files()
             
+            self.transfer_engine.shutdown()
+            
             self.logger.info("FileService クリーンアップ完了")
             
         except Exception as e:
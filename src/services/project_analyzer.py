@@ -0,0 +1,501 @@
+# src/services/project_analyzer.py
+"""
+プロジェクト解析用のシグナル収集
+1回の並列走査でマニフェスト・import・テスト・ドキュメントの情報を集め、途中経過を逐次通知する
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from ..core.logger import get_logger
+from ..utils.dir_scanner import DirectoryScanner
+from ..utils.hash_service import RACY_WINDOW
+from ..utils.parallel_compress import resolve_workers
+from .file_service import FileType
+
+try:
+    import tomllib
+    TOMLLIB_AVAILABLE = True
+except ImportError:
+    TOMLLIB_AVAILABLE = False
+    tomllib = None
+
+logger = get_logger(__name__)
+
+PathLike = Union[str, os.PathLike]
+
+# 走査しないディレクトリ（'.'で始まるディレクトリも除外する）
+EXCLUDED_DIRS = ('node_modules', '__pycache__', 'venv', '.venv', 'site-packages')
+
+# プロジェクト直下で内容を解析するマニフェスト
+MANIFEST_FILES = ('requirements.txt', 'pyproject.toml', 'package.json')
+
+# 存在を記録するファイル名（保守性スコア・提案に使用）
+TRACKED_NAMES = ('.gitignore', 'README.md', 'requirements.txt', 'package.json')
+
+# ドキュメントとみなすファイル名（小文字）
+DOC_NAMES = ('readme.md', 'readme.txt', 'changelog.md', 'license')
+
+CODE_TYPES = (FileType.PYTHON, FileType.JAVASCRIPT, FileType.TYPESCRIPT)
+
+# importを調べるため各ファイルの先頭から読むバイト数
+IMPORT_SCAN_BYTES = 64 * 1024
+
+# 大きなファイルの閾値（保守性スコア・問題の検出）
+LARGE_FILE_SIZE = 50000
+VERY_LARGE_FILE_SIZE = 100000
+
+# 途中経過を通知する最短間隔（秒）
+UPDATE_INTERVAL = 0.2
+
+# 解析結果の形式を変えた場合に古いキャッシュを無効にするためのバージョン
+CACHE_VERSION = 1
+
+# パッケージ名 -> フレームワーク名（requirements.txtは部分一致、importは完全一致）
+PYTHON_FRAMEWORKS = {
+    'django': 'Django',
+    'flask': 'Flask',
+    'fastapi': 'FastAPI',
+    'streamlit': 'Streamlit',
+    'pandas': 'Pandas',
+    'numpy': 'NumPy',
+    'tensorflow': 'TensorFlow',
+    'keras': 'TensorFlow',
+    'torch': 'PyTorch',
+    'pytorch': 'PyTorch',
+}
+
+JS_FRAMEWORKS = {
+    'react': 'React',
+    'vue': 'Vue.js',
+    'angular': 'Angular',
+    '@angular/core': 'Angular',
+    'express': 'Express.js',
+    'next': 'Next.js',
+    'nuxt': 'Nuxt.js',
+    'svelte': 'Svelte',
+}
+
+CSS_FRAMEWORKS = {
+    'bootstrap': 'Bootstrap',
+    'tailwind': 'Tailwind CSS',
+    'bulma': 'Bulma',
+}
+
+# プロジェクト直下のファイルから判定するフレームワーク
+ROOT_MARKERS = {
+    'manage.py': 'Django',
+    'app.py': 'Flask',
+    'wsgi.py': 'Flask',
+}
+
+PYTHON_IMPORT_PATTERN = re.compile(rb'^[ \t]*(?:from|import)[ \t]+([A-Za-z_]\w*)', re.MULTILINE)
+JS_IMPORT_PATTERN = re.compile(
+    rb'''(?:\bfrom|\bimport|\brequire[ \t]*\()[ \t]*['"]((?:@[\w.-]+/)?[\w.-]+)'''
+)
+
+
+@dataclass
+class ProjectSignals:
+    """1回の走査で集めたプロジェクト解析の材料"""
+    root_names: Set[str] = field(default_factory=set)
+    file_types: Dict[FileType, int] = field(default_factory=dict)
+    total_files: int = 0
+    total_size: int = 0
+    large_files: int = 0
+    very_large_files: int = 0
+    code_files: int = 0
+    test_code_files: int = 0
+    test_named_files: int = 0
+    doc_files: int = 0
+    has_readme: bool = False
+    tracked_names: Set[str] = field(default_factory=set)
+    dependencies: Set[str] = field(default_factory=set)
+    manifest_frameworks: Set[str] = field(default_factory=set)
+    import_frameworks: Set[str] = field(default_factory=set)
+    css_frameworks: Set[str] = field(default_factory=set)
+    complete: bool = False
+
+    def snapshot(self) -> 'ProjectSignals':
+        """通知用のコピー（走査中のスレッドが更新を続けても影響しない）"""
+        return replace(
+            self,
+            root_names=set(self.root_names),
+            file_types=dict(self.file_types),
+            tracked_names=set(self.tracked_names),
+            dependencies=set(self.dependencies),
+            manifest_frameworks=set(self.manifest_frameworks),
+            import_frameworks=set(self.import_frameworks),
+            css_frameworks=set(self.css_frameworks),
+        )
+
+
+def parse_manifest(name: str, data: bytes) -> Dict[str, List[str]]:
+    """
+    マニフェストから依存関係とフレームワークを抽出
+
+    Args:
+        name: ファイル名（MANIFEST_FILESのいずれか）
+        data: ファイルの内容
+
+    Returns:
+        Dict[str, List[str]]: 'dependencies'・'frameworks' -> 名前のリスト
+    """
+    dependencies: List[str] = []
+    frameworks: List[str] = []
+    text = data.decode('utf-8', errors='ignore')
+
+    if name == 'requirements.txt':
+        for line in text.split('\n'):
+            line = line.strip()
+            if line and not line.startswith('#'):
+                dependencies.append(line.split('==')[0].split('>=')[0].split('<=')[0])
+        lowered = text.lower()
+        frameworks = [framework for package, framework in PYTHON_FRAMEWORKS.items() if package in lowered]
+
+    elif name == 'package.json':
+        package_data = json.loads(text)
+        packages = {
+            **package_data.get('dependencies', {}),
+            **package_data.get('devDependencies', {})
+        }
+        dependencies = list(packages)
+        frameworks = [framework for package, framework in JS_FRAMEWORKS.items() if package in packages]
+
+    elif name == 'pyproject.toml' and TOMLLIB_AVAILABLE:
+        pyproject = tomllib.loads(text)
+        requirements = list(pyproject.get('project', {}).get('dependencies', []))
+        poetry = pyproject.get('tool', {}).get('poetry', {}).get('dependencies', {})
+        requirements.extend(package for package in poetry if package.lower() != 'python')
+        for requirement in requirements:
+            package = re.split(r'[\s<>=!~;\[(]', requirement.strip(), maxsplit=1)[0]
+            if package:
+                dependencies.append(package)
+                if package.lower() in PYTHON_FRAMEWORKS:
+                    frameworks.append(PYTHON_FRAMEWORKS[package.lower()])
+
+    return {'dependencies': dependencies, 'frameworks': sorted(set(frameworks))}
+
+
+def scan_file_signals(path: PathLike, file_type: FileType) -> List[str]:
+    """
+    ファイルの先頭を読み、import・参照しているフレームワークを抽出
+
+    Args:
+        path: ファイルパス
+        file_type: ファイルタイプ（Python・JavaScript・TypeScript・CSS）
+
+    Returns:
+        List[str]: 検出したフレームワーク名
+    """
+    with open(path, 'rb') as f:
+        head = f.read(IMPORT_SCAN_BYTES)
+
+    if file_type == FileType.CSS:
+        lowered = head.lower()
+        return sorted({framework for keyword, framework in CSS_FRAMEWORKS.items()
+                       if keyword.encode() in lowered})
+
+    if file_type == FileType.PYTHON:
+        modules = {match.decode().lower() for match in PYTHON_IMPORT_PATTERN.findall(head)}
+        mapping = PYTHON_FRAMEWORKS
+    else:
+        modules = {match.decode() for match in JS_IMPORT_PATTERN.findall(head)}
+        mapping = JS_FRAMEWORKS
+    return sorted({mapping[module] for module in modules if module in mapping})
+
+
+class ProjectScanner:
+    """
+    プロジェクト解析のシグナル収集クラス
+
+    マニフェストはプロジェクト直下だけを先に読み、内容のハッシュをキーとする解析結果を再利用する。
+    その後ディレクトリを1回だけ並列に走査し、ファイル種別・サイズ・名前の集計と、
+    コード・CSSファイル先頭のimport検出（スレッドプールで並列）を同時に行う。
+    importの検出結果は(パス, サイズ, 更新時刻)をキーとしてSQLiteに保存し、変わっていないファイルは読まない。
+    """
+
+    def __init__(self, type_resolver: Callable[[str], FileType],
+                 cache_path: Optional[PathLike] = None, workers: Optional[int] = None):
+        """
+        初期化
+
+        Args:
+            type_resolver: ファイル名からファイルタイプを判定する関数
+            cache_path: キャッシュのデータベース（Noneの場合はメモリ上のみ）
+            workers: 並列数（Noneの場合はCPU数）
+        """
+        self.type_resolver = type_resolver
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.workers = resolve_workers(workers)
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._types_by_suffix: Dict[str, FileType] = {}
+        self.statistics = {'manifest_hits': 0, 'file_hits': 0, 'files_read': 0}
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """キャッシュのデータベースに接続（最初の使用時に作成）"""
+        if self._connection is None:
+            if self.cache_path is not None:
+                self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(
+                str(self.cache_path) if self.cache_path else ':memory:', check_same_thread=False
+            )
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            with self._connection:
+                self._connection.execute('''
+                    CREATE TABLE IF NOT EXISTS manifest_results (
+                        name TEXT NOT NULL,
+                        digest TEXT NOT NULL,
+                        version INTEGER NOT NULL,
+                        result TEXT NOT NULL,
+                        PRIMARY KEY (name, digest, version)
+                    )
+                ''')
+                self._connection.execute('''
+                    CREATE TABLE IF NOT EXISTS file_signals (
+                        path TEXT PRIMARY KEY,
+                        size INTEGER NOT NULL,
+                        mtime_ns INTEGER NOT NULL,
+                        version INTEGER NOT NULL,
+                        frameworks TEXT NOT NULL
+                    )
+                ''')
+        return self._connection
+
+    # ===== 走査 =====
+
+    def scan(self, project_path: PathLike,
+             on_update: Optional[Callable[[str, ProjectSignals], None]] = None,
+             cancel_event: Optional[threading.Event] = None,
+             update_interval: float = UPDATE_INTERVAL) -> ProjectSignals:
+        """
+        プロジェクトのシグナルを収集
+
+        Args:
+            project_path: プロジェクトディレクトリ
+            on_update: 途中経過の通知先（段階名 'manifests'・'files'・'complete' とシグナルのコピー）
+            cancel_event: セットされると走査を中断する
+            update_interval: 'files' を通知する最短間隔（秒）
+
+        Returns:
+            ProjectSignals: 収集結果（中断した場合は途中まで）
+        """
+        root = os.path.abspath(project_path)
+        signals = ProjectSignals()
+
+        def publish(stage: str):
+            if on_update is not None:
+                on_update(stage, signals.snapshot())
+
+        self._scan_manifests(root, signals)
+        publish('manifests')
+
+        cached = self._load_file_signals(root)
+        scanned: List[Tuple[str, int, int, List[str]]] = []
+        seen: Set[str] = set()
+        pending: Deque[Tuple[Future, str, os.stat_result]] = deque()
+        max_pending = self.workers * 8
+        last_update = time.monotonic()
+
+        def merge(frameworks: Iterable[str], file_type: FileType):
+            target = signals.css_frameworks if file_type == FileType.CSS else signals.import_frameworks
+            target.update(frameworks)
+
+        def drain(limit: int):
+            while len(pending) > limit:
+                future, path, stat = pending.popleft()
+                try:
+                    frameworks = future.result()
+                except (OSError, ValueError) as e:
+                    logger.debug(f"import検出スキップ {path}: {e}")
+                    continue
+                file_type = self._file_type(os.path.basename(path))
+                merge(frameworks, file_type)
+                scanned.append((path, stat.st_size, stat.st_mtime_ns, frameworks))
+
+        scanner = DirectoryScanner(
+            exclude_dirs=EXCLUDED_DIRS,
+            include_hidden=True,
+            max_workers=self.workers,
+            dir_filter=lambda entry: not entry.name.startswith('.'),
+        )
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="project-scan") as executor:
+            for entry in scanner.scan(root):
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                if entry.name.startswith('.'):
+                    # 隠しファイルは集計せず、.gitignoreの有無だけを記録する
+                    if entry.name in TRACKED_NAMES:
+                        signals.tracked_names.add(entry.name)
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+
+                file_type = self._count_file(entry.name, stat.st_size, signals)
+                if file_type in CODE_TYPES or file_type == FileType.CSS:
+                    seen.add(entry.path)
+                    hit = cached.get(entry.path)
+                    if hit is not None and hit[:2] == (stat.st_size, stat.st_mtime_ns):
+                        self.statistics['file_hits'] += 1
+                        merge(hit[2], file_type)
+                    else:
+                        pending.append((executor.submit(scan_file_signals, entry.path, file_type),
+                                        entry.path, stat))
+                        drain(max_pending)
+
+                now = time.monotonic()
+                if now - last_update >= update_interval:
+                    last_update = now
+                    drain(0)
+                    publish('files')
+
+            if cancel_event is not None and cancel_event.is_set():
+                for future, _, _ in pending:
+                    future.cancel()
+                return signals
+            drain(0)
+
+        self.statistics['files_read'] += len(scanned)
+        self._store_file_signals(root, scanned, set(cached) - seen)
+        signals.complete = True
+        publish('complete')
+        return signals
+
+    def _file_type(self, name: str) -> FileType:
+        """ファイルタイプの判定（拡張子毎に1回だけ判定関数を呼ぶ）"""
+        suffix = os.path.splitext(name)[1].lower()
+        file_type = self._types_by_suffix.get(suffix)
+        if file_type is None:
+            file_type = self.type_resolver(name)
+            self._types_by_suffix[suffix] = file_type
+        return file_type
+
+    def _count_file(self, name: str, size: int, signals: ProjectSignals) -> FileType:
+        """1ファイル分の集計"""
+        file_type = self._file_type(name)
+        lowered = name.lower()
+        signals.total_files += 1
+        signals.total_size += size
+        signals.file_types[file_type] = signals.file_types.get(file_type, 0) + 1
+        if size > LARGE_FILE_SIZE:
+            signals.large_files += 1
+        if size > VERY_LARGE_FILE_SIZE:
+            signals.very_large_files += 1
+
+        test_named = 'test' in lowered or 'spec' in lowered
+        if test_named:
+            signals.test_named_files += 1
+        if file_type in CODE_TYPES:
+            if test_named:
+                signals.test_code_files += 1
+            else:
+                signals.code_files += 1
+
+        if file_type == FileType.MARKDOWN or lowered in DOC_NAMES:
+            signals.doc_files += 1
+        if lowered == 'readme.md':
+            signals.has_readme = True
+        if name in TRACKED_NAMES:
+            signals.tracked_names.add(name)
+        return file_type
+
+    def _scan_manifests(self, root: str, signals: ProjectSignals):
+        """プロジェクト直下の名前を取得し、マニフェストを解析（内容が同じなら解析結果を再利用）"""
+        try:
+            with os.scandir(root) as iterator:
+                signals.root_names = {entry.name for entry in iterator}
+        except OSError as e:
+            logger.warning(f"プロジェクト直下の読み込みエラー: {e}")
+            return
+
+        signals.manifest_frameworks.update(
+            framework for name, framework in ROOT_MARKERS.items() if name in signals.root_names
+        )
+        for name in MANIFEST_FILES:
+            if name not in signals.root_names:
+                continue
+            try:
+                data = Path(root, name).read_bytes()
+                result = self._parse_manifest_cached(name, data)
+            except (OSError, ValueError) as e:
+                logger.warning(f"{name} 読み取りエラー: {e}")
+                continue
+            signals.dependencies.update(result['dependencies'])
+            signals.manifest_frameworks.update(result['frameworks'])
+
+    def _parse_manifest_cached(self, name: str, data: bytes) -> Dict[str, List[str]]:
+        """マニフェストの内容のハッシュをキーに解析結果をキャッシュ"""
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        with self._lock:
+            row = self._get_connection().execute(
+                'SELECT result FROM manifest_results WHERE name = ? AND digest = ? AND version = ?',
+                (name, digest, CACHE_VERSION)
+            ).fetchone()
+        if row is not None:
+            self.statistics['manifest_hits'] += 1
+            return json.loads(row[0])
+
+        result = parse_manifest(name, data)
+        with self._lock:
+            connection = self._get_connection()
+            with connection:
+                connection.execute(
+                    'INSERT OR REPLACE INTO manifest_results (name, digest, version, result) VALUES (?, ?, ?, ?)',
+                    (name, digest, CACHE_VERSION, json.dumps(result))
+                )
+        return result
+
+    # ===== キャッシュ =====
+
+    def _load_file_signals(self, root: str) -> Dict[str, Tuple[int, int, List[str]]]:
+        """プロジェクト配下のファイルのキャッシュをまとめて取得"""
+        prefix = root.rstrip(os.sep) + os.sep
+        with self._lock:
+            rows = self._get_connection().execute(
+                'SELECT path, size, mtime_ns, frameworks FROM file_signals '
+                'WHERE path >= ? AND path < ? AND version = ?',
+                (prefix, prefix[:-1] + chr(ord(os.sep) + 1), CACHE_VERSION)
+            ).fetchall()
+        return {path: (size, mtime_ns, json.loads(frameworks)) for path, size, mtime_ns, frameworks in rows}
+
+    def _store_file_signals(self, root: str, scanned: List[Tuple[str, int, int, List[str]]],
+                            removed: Set[str]):
+        """読み込んだファイルの結果を保存し、存在しなくなったファイルのキャッシュを削除"""
+        now = time.time()
+        rows = [
+            (path, size, mtime_ns, CACHE_VERSION, json.dumps(frameworks))
+            for path, size, mtime_ns, frameworks in scanned
+            if now - mtime_ns / 1e9 >= RACY_WINDOW
+        ]
+        if not rows and not removed:
+            return
+        with self._lock:
+            connection = self._get_connection()
+            with connection:
+                connection.executemany(
+                    'INSERT OR REPLACE INTO file_signals (path, size, mtime_ns, version, frameworks) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    rows
+                )
+                connection.executemany('DELETE FROM file_signals WHERE path = ?', [(path,) for path in removed])
+
+    def close(self):
+        """キャッシュの接続を閉じる"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
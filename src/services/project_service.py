@@ -8,8 +8,9 @@ import os
 import json
 import yaml
 import asyncio
+import threading
 from pathlib import Path
-from typing import List, Dict, Optional, Union, Any, Tuple
+from typing import List, Dict, Optional, Union, Any, AsyncIterator, Callable, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 from enum import Enum
@@ -25,6 +26,8 @@ from ..core.exceptions import (
 )
 #from ..core.config_manager import ConfigManager
 from ..services.file_service import FileService, FileType, FileInfo
+from ..services.project_analyzer import CODE_TYPES, ProjectScanner, ProjectSignals
+from ..utils.file_transfer import TransferProgress
 from src.core.logger import get_logger
 
 def ConfigManager(*args, **kwargs):
@@ -139,6 +142,10 @@ class ProjectService:
         self.auto_detect_type = project_config.get('templates', {}).get('auto_detect_type', True)
         self.auto_analyze = project_config.get('analysis', {}).get('auto_analyze', True)
         self.max_analysis_depth = project_config.get('analysis', {}).get('max_depth', 5)
+        self.analysis_max_workers = project_config.get('analysis', {}).get('max_workers', 4)
+        self.analysis_cache_path = Path(
+            project_config.get('analysis', {}).get('cache_path', 'data/project_analysis_cache.db')
+        )
         
         # データディレクトリ
         self.projects_data_path = Path(self.config.get('paths', {}).get('user_data_dir', 'user_data/')) / 'projects'
@@ -148,6 +155,13 @@ class ProjectService:
         self._ensure_directories()
         self._load_recent_projects()
         self._current_project: Optional[ProjectMetadata] = None
+        
+        # 解析用のシグナル収集（走査1回・マニフェストとimportの結果はキャッシュ）
+        self.project_scanner = ProjectScanner(
+            self.file_service.get_file_type,
+            cache_path=self.analysis_cache_path,
+            workers=self.analysis_max_workers
+        )
     
     def _ensure_directories(self):
         """必要なディレクトリを作成"""
@@ -437,121 +451,128 @@ class ProjectService:
             
         except Exception as e:
             self.logger.warning(f"最近のプロジェクト追加エラー: {e}")
-    async def analyze_project(self, project_path: Union[str, Path]) -> ProjectAnalysis:
-        """プロジェクトの詳細解析"""
+    async def analyze_project(self, project_path: Union[str, Path],
+                              progress_callback: Optional[Callable[[ProjectAnalysis], None]] = None
+                              ) -> ProjectAnalysis:
+        """
+        プロジェクトの詳細解析
+        
+        Args:
+            project_path: プロジェクトディレクトリ
+            progress_callback: 途中経過の解析結果を受け取る関数（イベントループのスレッドで呼ばれる）
+            
+        Returns:
+            ProjectAnalysis: 解析結果
+        """
+        analysis = None
+        async for analysis in self.iter_project_analysis(project_path):
+            if progress_callback:
+                progress_callback(analysis)
+        
+        self.logger.info(f"プロジェクト解析完了: {project_path}")
+        return analysis
+    
+    async def iter_project_analysis(self, project_path: Union[str, Path]) -> AsyncIterator[ProjectAnalysis]:
+        """
+        プロジェクトを解析し、途中経過を逐次返す
+        
+        マニフェストを読んだ直後、走査中（一定間隔）、完了時の順に解析結果を返す。
+        走査はスレッドで行うため、途中で反復をやめると走査も中断する。
+        
+        Args:
+            project_path: プロジェクトディレクトリ
+            
+        Yields:
+            ProjectAnalysis: その時点までの解析結果（最後が完了時の結果）
+        """
+        cancel_event = threading.Event()
         try:
             path = Path(project_path)
             if not path.exists() or not path.is_dir():
                 raise ProjectNotFoundError(f"プロジェクトディレクトリが見つかりません: {project_path}")
             
-            # ファイル一覧の取得
-            files = self.file_service.list_directory(
-                path, 
-                recursive=True, 
-                include_hidden=False
-            )
-            
-            # ファイルタイプの集計
-            file_types = {}
-            total_files = 0
-            code_files = 0
-            
-            for file_info in files:
-                if not file_info.is_directory:
-                    total_files += 1
-                    file_type = file_info.file_type
-                    file_types[file_type] = file_types.get(file_type, 0) + 1
-                    
-                    if file_type in [FileType.PYTHON, FileType.JAVASCRIPT, 
-                                   FileType.TYPESCRIPT, FileType.HTML, FileType.CSS]:
-                        code_files += 1
-            
-            # プロジェクトタイプの判定
-            project_type = self._detect_project_type(path, file_types)
-            
-            # 主要言語の判定
-            main_language = self._detect_main_language(file_types)
-            
-            # フレームワークの検出
-            frameworks = await self._detect_frameworks(path, file_types)
-            
-            # 依存関係の検出
-            dependencies = await self._detect_dependencies(path)
-            
-            # 複雑度スコアの計算
-            complexity_score = self._calculate_complexity_score(files, file_types)
-            
-            # 保守性スコアの計算
-            maintainability_score = self._calculate_maintainability_score(files, file_types)
-            
-            # テストカバレッジの計算
-            test_coverage = await self._calculate_test_coverage(path, files)
-            
-            # ドキュメントスコアの計算
-            documentation_score = self._calculate_documentation_score(files)
-            
-            # 問題と提案の生成
-            issues, suggestions = self._generate_analysis_feedback(
-                files, file_types, frameworks, dependencies
-            )
-            
-            analysis = ProjectAnalysis(
-                project_type=project_type,
-                main_language=main_language,
-                frameworks=frameworks,
-                dependencies=dependencies,
-                file_types=file_types,
-                complexity_score=complexity_score,
-                maintainability_score=maintainability_score,
-                test_coverage=test_coverage,
-                documentation_score=documentation_score,
-                issues=issues,
-                suggestions=suggestions
-            )
-            
-            self.logger.info(f"プロジェクト解析完了: {project_path}")
-            return analysis
+            loop = asyncio.get_running_loop()
+            updates: asyncio.Queue = asyncio.Queue()
+            
+            def publish(item):
+                if not cancel_event.is_set():
+                    loop.call_soon_threadsafe(updates.put_nowait, item)
+            
+            def scan():
+                try:
+                    self.project_scanner.scan(path, lambda stage, signals: publish(signals), cancel_event)
+                except Exception as e:
+                    publish(e)
+            
+            loop.run_in_executor(None, scan)
+            while True:
+                item = await updates.get()
+                if isinstance(item, Exception):
+                    raise item
+                yield self._build_analysis(item)
+                if item.complete:
+                    break
             
         except Exception as e:
             self.logger.error(f"プロジェクト解析エラー: {e}")
             raise ProjectServiceError(f"プロジェクトの解析に失敗しました: {e}")
+        finally:
+            cancel_event.set()
     
-    def _detect_project_type(self, project_path: Path, file_types: Dict[FileType, int]) -> ProjectType:
+    def _build_analysis(self, signals: ProjectSignals) -> ProjectAnalysis:
+        """収集したシグナルから解析結果を作成"""
+        frameworks = self._detect_frameworks(signals)
+        dependencies = sorted(signals.dependencies)
+        issues, suggestions = self._generate_analysis_feedback(signals, frameworks)
+        
+        return ProjectAnalysis(
+            project_type=self._detect_project_type(signals),
+            main_language=self._detect_main_language(signals.file_types),
+            frameworks=frameworks,
+            dependencies=dependencies,
+            file_types=signals.file_types,
+            complexity_score=self._calculate_complexity_score(signals),
+            maintainability_score=self._calculate_maintainability_score(signals),
+            test_coverage=self._calculate_test_coverage(signals),
+            documentation_score=self._calculate_documentation_score(signals),
+            issues=issues,
+            suggestions=suggestions
+        )
+    
+    def _detect_project_type(self, signals: ProjectSignals) -> ProjectType:
         """プロジェクトタイプの検出"""
-        try:
-            # 設定ファイルによる判定
-            if (project_path / 'package.json').exists():
-                return ProjectType.JAVASCRIPT
-            elif (project_path / 'tsconfig.json').exists():
-                return ProjectType.TYPESCRIPT
-            elif (project_path / 'requirements.txt').exists() or (project_path / 'pyproject.toml').exists():
-                return ProjectType.PYTHON
-            elif (project_path / 'index.html').exists():
-                return ProjectType.WEB
-            
-            # ファイル数による判定
-            python_files = file_types.get(FileType.PYTHON, 0)
-            js_files = file_types.get(FileType.JAVASCRIPT, 0)
-            ts_files = file_types.get(FileType.TYPESCRIPT, 0)
-            html_files = file_types.get(FileType.HTML, 0)
-            
-            if python_files > max(js_files, ts_files, html_files):
-                # データサイエンス関連ファイルの確認
-                if any((project_path / name).exists() for name in ['jupyter', 'notebooks', 'data']):
-                    return ProjectType.DATA_SCIENCE
-                return ProjectType.PYTHON
-            elif ts_files > 0:
-                return ProjectType.TYPESCRIPT
-            elif js_files > 0:
-                return ProjectType.JAVASCRIPT
-            elif html_files > 0:
-                return ProjectType.WEB
-            
-            return ProjectType.UNKNOWN
-            
-        except Exception as e:
-            self.logger.warning(f"プロジェクトタイプ検出エラー: {e}")
-            return ProjectType.UNKNOWN
+        root_names = signals.root_names
+        
+        # 設定ファイルによる判定
+        if 'package.json' in root_names:
+            return ProjectType.JAVASCRIPT
+        elif 'tsconfig.json' in root_names:
+            return ProjectType.TYPESCRIPT
+        elif 'requirements.txt' in root_names or 'pyproject.toml' in root_names:
+            return ProjectType.PYTHON
+        elif 'index.html' in root_names:
+            return ProjectType.WEB
+        
+        # ファイル数による判定
+        file_types = signals.file_types
+        python_files = file_types.get(FileType.PYTHON, 0)
+        js_files = file_types.get(FileType.JAVASCRIPT, 0)
+        ts_files = file_types.get(FileType.TYPESCRIPT, 0)
+        html_files = file_types.get(FileType.HTML, 0)
+        
+        if python_files > max(js_files, ts_files, html_files):
+            # データサイエンス関連ファイルの確認
+            if any(name in root_names for name in ['jupyter', 'notebooks', 'data']):
+                return ProjectType.DATA_SCIENCE
+            return ProjectType.PYTHON
+        elif ts_files > 0:
+            return ProjectType.TYPESCRIPT
+        elif js_files > 0:
+            return ProjectType.JAVASCRIPT
+        elif html_files > 0:
+            return ProjectType.WEB
+        
+        return ProjectType.UNKNOWN
     
     def _detect_main_language(self, file_types: Dict[FileType, int]) -> str:
         """主要言語の検出"""
@@ -572,328 +593,112 @@ class ProjectService:
         
         return "Unknown"
     
-    async def _detect_frameworks(self, project_path: Path, file_types: Dict[FileType, int]) -> List[str]:
-        """フレームワークの検出"""
-        frameworks = []
+    def _detect_frameworks(self, signals: ProjectSignals) -> List[str]:
+        """フレームワークの検出（マニフェスト・直下のファイル・import・CSS）"""
+        frameworks = signals.manifest_frameworks | signals.import_frameworks
         
-        try:
-            # Python フレームワーク
-            if file_types.get(FileType.PYTHON, 0) > 0:
-                frameworks.extend(await self._detect_python_frameworks(project_path))
-            
-            # JavaScript/TypeScript フレームワーク
-            if file_types.get(FileType.JAVASCRIPT, 0) > 0 or file_types.get(FileType.TYPESCRIPT, 0) > 0:
-                frameworks.extend(await self._detect_js_frameworks(project_path))
-            
-            # Web フレームワーク
-            if file_types.get(FileType.HTML, 0) > 0:
-                frameworks.extend(await self._detect_web_frameworks(project_path))
-            
-        except Exception as e:
-            self.logger.warning(f"フレームワーク検出エラー: {e}")
+        # CSSフレームワークはHTMLを含むプロジェクトのみ
+        if signals.file_types.get(FileType.HTML, 0) > 0:
+            frameworks |= signals.css_frameworks
         
-        return list(set(frameworks))  # 重複除去
+        return sorted(frameworks)
     
-    async def _detect_python_frameworks(self, project_path: Path) -> List[str]:
-        """Python フレームワークの検出"""
-        frameworks = []
+    def _calculate_complexity_score(self, signals: ProjectSignals) -> float:
+        """複雑度スコアの計算"""
+        total_files = signals.total_files
+        if total_files == 0:
+            return 0.0
         
-        # requirements.txt の確認
-        requirements_file = project_path / 'requirements.txt'
-        if requirements_file.exists():
-            try:
-                content = await self.file_service.read_file(requirements_file)
-                requirements = content.lower()
-                
-                if 'django' in requirements:
-                    frameworks.append('Django')
-                if 'flask' in requirements:
-                    frameworks.append('Flask')
-                if 'fastapi' in requirements:
-                    frameworks.append('FastAPI')
-                if 'streamlit' in requirements:
-                    frameworks.append('Streamlit')
-                if 'pandas' in requirements:
-                    frameworks.append('Pandas')
-                if 'numpy' in requirements:
-                    frameworks.append('NumPy')
-                if 'tensorflow' in requirements or 'keras' in requirements:
-                    frameworks.append('TensorFlow')
-                if 'torch' in requirements or 'pytorch' in requirements:
-                    frameworks.append('PyTorch')
-                    
-            except Exception as e:
-                self.logger.warning(f"requirements.txt 読み取りエラー: {e}")
+        # ファイル数による基本スコア
+        base_score = min(total_files / 100, 1.0)  # 100ファイルで1.0
         
-        # ディレクトリ構造による判定
-        if (project_path / 'manage.py').exists():
-            frameworks.append('Django')
-        if (project_path / 'app.py').exists() or (project_path / 'wsgi.py').exists():
-            frameworks.append('Flask')
+        # ファイルタイプの多様性
+        type_diversity = len(signals.file_types) / 10  # 10種類で1.0
         
-        return frameworks
-    
-    async def _detect_js_frameworks(self, project_path: Path) -> List[str]:
-        """JavaScript/TypeScript フレームワークの検出"""
-        frameworks = []
-        
-        # package.json の確認
-        package_json = project_path / 'package.json'
-        if package_json.exists():
-            try:
-                content = await self.file_service.read_file(package_json)
-                package_data = json.loads(content)
-                
-                dependencies = {
-                    **package_data.get('dependencies', {}),
-                    **package_data.get('devDependencies', {})
-                }
-                
-                if 'react' in dependencies:
-                    frameworks.append('React')
-                if 'vue' in dependencies:
-                    frameworks.append('Vue.js')
-                if 'angular' in dependencies or '@angular/core' in dependencies:
-                    frameworks.append('Angular')
-                if 'express' in dependencies:
-                    frameworks.append('Express.js')
-                if 'next' in dependencies:
-                    frameworks.append('Next.js')
-                if 'nuxt' in dependencies:
-                    frameworks.append('Nuxt.js')
-                if 'svelte' in dependencies:
-                    frameworks.append('Svelte')
-                    
-            except Exception as e:
-                self.logger.warning(f"package.json 読み取りエラー: {e}")
+        # コードファイルの割合
+        code_files = sum(count for ft, count in signals.file_types.items() if ft in CODE_TYPES)
+        code_ratio = code_files / total_files
         
-        return frameworks
+        # 最終スコア（0-1の範囲）
+        complexity_score = (base_score * 0.5 + type_diversity * 0.3 + code_ratio * 0.2)
+        return min(complexity_score, 1.0)
     
-    async def _detect_web_frameworks(self, project_path: Path) -> List[str]:
-        """Web フレームワークの検出"""
-        frameworks = []
+    def _calculate_maintainability_score(self, signals: ProjectSignals) -> float:
+        """保守性スコアの計算"""
+        score = 1.0  # 基本スコア
         
-        # CSSフレームワークの検出
-        css_files = list(project_path.rglob('*.css'))
-        for css_file in css_files:
-            try:
-                content = await self.file_service.read_file(css_file)
-                content_lower = content.lower()
-                
-                if 'bootstrap' in content_lower:
-                    frameworks.append('Bootstrap')
-                if 'tailwind' in content_lower:
-                    frameworks.append('Tailwind CSS')
-                if 'bulma' in content_lower:
-                    frameworks.append('Bulma')
-                    
-            except Exception:
-                continue
+        # ファイルサイズの評価（50KB以上のファイルが多いと減点）
+        if signals.total_files > 0:
+            score -= signals.large_files / signals.total_files * 0.3
         
-        return frameworks
-    
-    async def _detect_dependencies(self, project_path: Path) -> List[str]:
-        """依存関係の検出"""
-        dependencies = []
+        # 設定ファイルの存在（.gitignore・README.md・requirements.txt・package.json）
+        score += len(signals.tracked_names) * 0.05
         
-        try:
-            # Python dependencies
-            requirements_file = project_path / 'requirements.txt'
-            if requirements_file.exists():
-                content = await self.file_service.read_file(requirements_file)
-                for line in content.split('\n'):
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        dep = line.split('==')[0].split('>=')[0].split('<=')[0]
-                        dependencies.append(dep)
-            
-            # JavaScript dependencies
-            package_json = project_path / 'package.json'
-            if package_json.exists():
-                content = await self.file_service.read_file(package_json)
-                package_data = json.loads(content)
-                
-                deps = package_data.get('dependencies', {})
-                dev_deps = package_data.get('devDependencies', {})
-                
-                dependencies.extend(list(deps.keys()))
-                dependencies.extend(list(dev_deps.keys()))
-                
-        except Exception as e:
-            self.logger.warning(f"依存関係検出エラー: {e}")
-        
-        return list(set(dependencies))  # 重複除去
-    
-    def _calculate_complexity_score(self, files: List[FileInfo], file_types: Dict[FileType, int]) -> float:
-        """複雑度スコアの計算"""
-        try:
-            total_files = sum(1 for f in files if not f.is_directory)
-            if total_files == 0:
-                return 0.0
-            
-            # ファイル数による基本スコア
-            base_score = min(total_files / 100, 1.0)  # 100ファイルで1.0
-            
-            # ファイルタイプの多様性
-            type_diversity = len(file_types) / 10  # 10種類で1.0
-            
-            # コードファイルの割合
-            code_files = sum(count for ft, count in file_types.items() 
-                           if ft in [FileType.PYTHON, FileType.JAVASCRIPT, FileType.TYPESCRIPT])
-            code_ratio = code_files / total_files if total_files > 0 else 0
-            
-            # 最終スコア（0-1の範囲）
-            complexity_score = (base_score * 0.5 + type_diversity * 0.3 + code_ratio * 0.2)
-            return min(complexity_score, 1.0)
-            
-        except Exception as e:
-            self.logger.warning(f"複雑度スコア計算エラー: {e}")
-            return 0.0
+        return max(min(score, 1.0), 0.0)
     
-    def _calculate_maintainability_score(self, files: List[FileInfo], file_types: Dict[FileType, int]) -> float:
-        """保守性スコアの計算"""
-        try:
-            score = 1.0  # 基本スコア
-            
-            # ファイルサイズの評価
-            large_files = sum(1 for f in files if not f.is_directory and f.size > 50000)  # 50KB以上
-            total_files = sum(1 for f in files if not f.is_directory)
-            
-            if total_files > 0:
-                large_file_ratio = large_files / total_files
-                score -= large_file_ratio * 0.3  # 大きなファイルが多いと減点
-            
-            # 設定ファイルの存在
-            config_bonus = 0
-            config_files = ['.gitignore', 'README.md', 'requirements.txt', 'package.json']
-            for config_file in config_files:
-                if any(f.name == config_file for f in files):
-                    config_bonus += 0.05
-            
-            score += config_bonus
-            
-            return max(min(score, 1.0), 0.0)
-            
-        except Exception as e:
-            self.logger.warning(f"保守性スコア計算エラー: {e}")
-            return 0.5
-    
-    async def _calculate_test_coverage(self, project_path: Path, files: List[FileInfo]) -> float:
+    def _calculate_test_coverage(self, signals: ProjectSignals) -> float:
         """テストカバレッジの計算"""
-        try:
-            # テストファイルの検出
-            test_files = []
-            code_files = []
-            
-            for file_info in files:
-                if file_info.is_directory:
-                    continue
-                
-                file_name = file_info.name.lower()
-                
-                # テストファイルの判定
-                if ('test' in file_name or 'spec' in file_name) and file_info.file_type in [
-                    FileType.PYTHON, FileType.JAVASCRIPT, FileType.TYPESCRIPT
-                ]:
-                    test_files.append(file_info)
-                elif file_info.file_type in [FileType.PYTHON, FileType.JAVASCRIPT, FileType.TYPESCRIPT]:
-                    code_files.append(file_info)
-            
-            if not code_files:
-                return 0.0
-            
-            # 簡易的なカバレッジ計算（テストファイル数 / コードファイル数）
-            coverage = min(len(test_files) / len(code_files), 1.0)
-            
-            return coverage
-            
-        except Exception as e:
-            self.logger.warning(f"テストカバレッジ計算エラー: {e}")
+        if not signals.code_files:
             return 0.0
+        
+        # 簡易的なカバレッジ計算（テストファイル数 / コードファイル数）
+        return min(signals.test_code_files / signals.code_files, 1.0)
     
-    def _calculate_documentation_score(self, files: List[FileInfo]) -> float:
+    def _calculate_documentation_score(self, signals: ProjectSignals) -> float:
         """ドキュメントスコアの計算"""
-        try:
-            doc_files = 0
-            total_files = 0
-            
-            for file_info in files:
-                if file_info.is_directory:
-                    continue
-                
-                total_files += 1
-                file_name = file_info.name.lower()
-                
-                # ドキュメントファイルの判定
-                if (file_info.file_type == FileType.MARKDOWN or 
-                    file_name in ['readme.md', 'readme.txt', 'changelog.md', 'license']):
-                    doc_files += 1
-            
-            if total_files == 0:
-                return 0.0
-            
-            # ドキュメントファイルの割合
-            doc_ratio = doc_files / total_files
-            
-            # README.mdの存在ボーナス
-            readme_bonus = 0.3 if any(f.name.lower() == 'readme.md' for f in files) else 0
-            
-            score = min(doc_ratio * 2 + readme_bonus, 1.0)  # 最大1.0
-            
-            return score
-            
-        except Exception as e:
-            self.logger.warning(f"ドキュメントスコア計算エラー: {e}")
+        if signals.total_files == 0:
             return 0.0
+        
+        # ドキュメントファイルの割合
+        doc_ratio = signals.doc_files / signals.total_files
+        
+        # README.mdの存在ボーナス
+        readme_bonus = 0.3 if signals.has_readme else 0
+        
+        return min(doc_ratio * 2 + readme_bonus, 1.0)  # 最大1.0
     
-    def _generate_analysis_feedback(self, files: List[FileInfo], file_types: Dict[FileType, int], 
-                                  frameworks: List[str], dependencies: List[str]) -> Tuple[List[str], List[str]]:
+    def _generate_analysis_feedback(self, signals: ProjectSignals,
+                                    frameworks: List[str]) -> Tuple[List[str], List[str]]:
         """解析結果に基づく問題と提案の生成"""
         issues = []
         suggestions = []
+        file_types = signals.file_types
         
-        try:
-            total_files = sum(1 for f in files if not f.is_directory)
-            
-            # 問題の検出
-            if total_files == 0:
-                issues.append("プロジェクトにファイルが含まれていません")
-            
-            # 大きなファイルの警告
-            large_files = [f for f in files if not f.is_directory and f.size > 100000]  # 100KB以上
-            if large_files:
-                issues.append(f"{len(large_files)}個の大きなファイルが見つかりました")
-            
-            # README.mdの不存在
-            if not any(f.name.lower() == 'readme.md' for f in files):
-                issues.append("README.mdファイルが見つかりません")
-            
-            # .gitignoreの不存在
-            if not any(f.name == '.gitignore' for f in files):
-                issues.append(".gitignoreファイルが見つかりません")
-            
-            # 提案の生成
-            if not frameworks:
-                suggestions.append("フレームワークの使用を検討してください")
-            
-            if file_types.get(FileType.PYTHON, 0) > 0 and 'requirements.txt' not in [f.name for f in files]:
-                suggestions.append("requirements.txtファイルの作成を推奨します")
-            
-            if file_types.get(FileType.JAVASCRIPT, 0) > 0 and 'package.json' not in [f.name for f in files]:
-                suggestions.append("package.jsonファイルの作成を推奨します")
-            
-            # テストファイルの不足
-            test_files = [f for f in files if 'test' in f.name.lower() or 'spec' in f.name.lower()]
-            if not test_files:
-                suggestions.append("テストファイルの追加を推奨します")
-            
-            if total_files > 50:
-                suggestions.append("プロジェクトが大きくなっています。モジュール化を検討してください")
-                
-        except Exception as e:
-            self.logger.warning(f"フィードバック生成エラー: {e}")
+        # 問題の検出
+        if signals.total_files == 0:
+            issues.append("プロジェクトにファイルが含まれていません")
+        
+        # 大きなファイルの警告（100KB以上）
+        if signals.very_large_files:
+            issues.append(f"{signals.very_large_files}個の大きなファイルが見つかりました")
+        
+        # README.mdの不存在
+        if not signals.has_readme:
+            issues.append("README.mdファイルが見つかりません")
+        
+        # .gitignoreの不存在
+        if '.gitignore' not in signals.tracked_names:
+            issues.append(".gitignoreファイルが見つかりません")
+        
+        # 提案の生成
+        if not frameworks:
+            suggestions.append("フレームワークの使用を検討してください")
+        
+        if file_types.get(FileType.PYTHON, 0) > 0 and 'requirements.txt' not in signals.tracked_names:
+            suggestions.append("requirements.txtファイルの作成を推奨します")
+        
+        if file_types.get(FileType.JAVASCRIPT, 0) > 0 and 'package.json' not in signals.tracked_names:
+            suggestions.append("package.jsonファイルの作成を推奨します")
+        
+        # テストファイルの不足
+        if not signals.test_named_files:
+            suggestions.append("テストファイルの追加を推奨します")
+        
+        if signals.total_files > 50:
+            suggestions.append("プロジェクトが大きくなっています。モジュール化を検討してください")
         
         return issues, suggestions
+    
     async def get_template(self, template_name: str) -> Optional[ProjectTemplate]:
         """テンプレートの取得"""
         try:
@@ -971,7 +776,7 @@ class ProjectService:
             }
             
             # ファイル構造の取得
-            files = self.file_service.list_directory(path, recursive=True, include_hidden=False)
+            files = self.file_service.list_directory(path, recursive=True, include_hidden=False, fields=())
             
             for file_info in files:
                 relative_path = Path(file_info.path).relative_to(path)
@@ -1160,8 +965,9 @@ class ProjectService:
     async def export_project(self, project_path: Union[str, Path], 
                            export_path: Union[str, Path],
                            include_dependencies: bool = True,
-                           include_cache: bool = False) -> Path:
-        """プロジェクトのエクスポート"""
+                           include_cache: bool = False,
+                           progress_callback: Optional[Callable[[TransferProgress], None]] = None) -> Path:
+        """プロジェクトのエクスポート（ファイルの収集・圧縮はイベントループの外で行う）"""
         try:
             path = Path(project_path)
             export_dir = Path(export_path)
@@ -1170,23 +976,17 @@ class ProjectService:
                 raise ProjectNotFoundError(f"プロジェクトが見つかりません: {project_path}")
             
             # エクスポート対象ファイルの収集
-            files_to_export = []
-            
-            for file_path in path.rglob('*'):
-                if file_path.is_file():
-                    relative_path = file_path.relative_to(path)
-                    
-                    # 除外パターンのチェック
-                    if self._should_exclude_from_export(relative_path, include_dependencies, include_cache):
-                        continue
-                    
-                    files_to_export.append(file_path)
+            files_to_export = await self.file_service.transfer_engine.run(
+                self._collect_export_files, path, include_dependencies, include_cache
+            )
             
-            # エクスポートの実行
+            # エクスポートの実行（アーカイブ内はプロジェクトディレクトリ名から始まる）
             export_file = await self.file_service.export_files(
                 files_to_export,
                 export_dir,
-                format_type="zip"
+                format_type="zip",
+                base_path=path.parent,
+                progress_callback=progress_callback
             )
             
             self.logger.info(f"プロジェクトエクスポート完了: {export_file}")
@@ -1196,6 +996,23 @@ class ProjectService:
             self.logger.error(f"プロジェクトエクスポートエラー: {e}")
             raise ProjectServiceError(f"プロジェクトのエクスポートに失敗しました: {e}")
     
+    def _collect_export_files(self, path: Path, include_dependencies: bool,
+                              include_cache: bool) -> List[Path]:
+        """エクスポート対象ファイルの収集"""
+        files_to_export = []
+        
+        for file_path in path.rglob('*'):
+            if file_path.is_file():
+                relative_path = file_path.relative_to(path)
+                
+                # 除外パターンのチェック
+                if self._should_exclude_from_export(relative_path, include_dependencies, include_cache):
+                    continue
+                
+                files_to_export.append(file_path)
+        
+        return files_to_export
+    
     def _should_exclude_from_export(self, file_path: Path, 
                                   include_dependencies: bool, 
                                   include_cache: bool) -> bool:
@@ -1242,7 +1059,7 @@ class ProjectService:
                 if archive_file.suffix.lower() == '.zip':
                     import zipfile
                     with zipfile.ZipFile(archive_file, 'r') as zipf:
-                        zipf.extractall(temp_path)
+                        await self.file_service.transfer_engine.run(zipf.extractall, temp_path)
                 else:
                     raise ProjectServiceError(f"サポートされていないアーカイブ形式: {archive_file.suffix}")
                 
@@ -1352,6 +1169,8 @@ class ProjectService:
             # 最近のプロジェクト情報を保存
             self._save_recent_projects()
             
+            self.project_scanner.close()
+            
             self.logger.info("ProjectService クリーンアップ完了")
             
         except Exception as e:
@@ -15,6 +15,9 @@ import time
 from datetime import datetime
 
 from src.utils.file_utils import FileUtils
+from src.core.file_watcher import (
+    FileWatcher, FILE_CHANGES_EVENT, CHANGE_DELETED, CHANGE_MODIFIED, CHANGE_MOVED, iter_changes
+)
 
 def get_config_manager():
         from src.core.config_manager import ConfigManager
@@ -270,6 +273,8 @@ class FileTree(ttk.Frame):
         # ファイル監視
         self.file_watcher = None
         self.watch_thread = None
+        self._watch_event_system = None
+        self._watch_subscriber_id = f"file_tree_{id(self)}"
         
         self.logger.info("ファイルツリー初期化完了")
     
@@ -1245,48 +1250,131 @@ class FileTree(ttk.Frame):
             return
         
         try:
-            # watchdogが利用可能な場合のみファイル監視を開始
-            from watchdog.observers import Observer
-            from watchdog.events import FileSystemEventHandler
+            from src.core.event_system import get_event_system
             
-            class TreeFileHandler(FileSystemEventHandler):
-                def __init__(self, file_tree):
-                    self.file_tree = file_tree
-                
-                def on_any_event(self, event):
-                    # UIスレッドで更新を実行
-                    self.file_tree.after_idle(self.file_tree._refresh_tree)
+            self._stop_file_watching()
             
-            if self.file_watcher:
-                self.file_watcher.stop()
-                self.file_watcher.join()
+            event_system = get_event_system()
+            root_path = str(self.root_path)
             
-            self.file_watcher = Observer()
-            self.file_watcher.schedule(
-                TreeFileHandler(self), 
-                str(self.root_path), 
-                recursive=True
-            )
+            def on_file_changes(event):
+                changes = iter_changes(event, root_path)
+                if changes:
+                    # UIスレッドで該当ノードのみ更新
+                    self.after_idle(self._apply_file_changes, changes)
+            
+            self.file_watcher = FileWatcher(root_path, event_system=event_system)
             self.file_watcher.start()
+            event_system.subscribe(FILE_CHANGES_EVENT, on_file_changes, subscriber_id=self._watch_subscriber_id)
+            self._watch_event_system = event_system
             
-            self.logger.info("ファイル監視開始")
+            self.logger.info(f"ファイル監視開始 ({self.file_watcher.backend})")
             
-        except ImportError:
-            self.logger.warning("watchdogが利用できません。ファイル監視は無効です")
         except Exception as e:
             self.logger.error(f"ファイル監視開始エラー: {e}")
     
     def _stop_file_watching(self):
         """ファイル監視を停止"""
+        if self._watch_event_system:
+            self._watch_event_system.unsubscribe_all(self._watch_subscriber_id)
+            self._watch_event_system = None
+        
         if self.file_watcher:
             try:
                 self.file_watcher.stop()
-                self.file_watcher.join()
                 self.file_watcher = None
                 self.logger.info("ファイル監視停止")
             except Exception as e:
                 self.logger.error(f"ファイル監視停止エラー: {e}")
     
+    def _apply_file_changes(self, changes: List[Any]):
+        """変更バッチを該当ノードに反映（ツリー全体は再読み込みしない）"""
+        try:
+            nodes_by_path = {str(node.path): node for node in self.node_map.values()}
+            
+            for change in changes:
+                if change.change_type in (CHANGE_DELETED, CHANGE_MOVED):
+                    removed_path = change.old_path if change.change_type == CHANGE_MOVED else change.file_path
+                    node = nodes_by_path.get(removed_path)
+                    if node and node is not self.root_node:
+                        self._remove_tree_node(node, nodes_by_path)
+                
+                if change.change_type == CHANGE_DELETED:
+                    continue
+                
+                node = nodes_by_path.get(change.file_path)
+                if node:
+                    if change.change_type == CHANGE_MODIFIED:
+                        self._update_tree_node(node)
+                    continue
+                
+                parent = nodes_by_path.get(str(Path(change.file_path).parent))
+                if parent and parent.is_loaded:
+                    child = self._insert_tree_node(parent, Path(change.file_path))
+                    if child:
+                        nodes_by_path[str(child.path)] = child
+            
+            self._update_status()
+            
+        except Exception as e:
+            self.logger.error(f"ファイル変更反映エラー: {e}")
+    
+    def _insert_tree_node(self, parent_node: FileTreeNode, path: Path) -> Optional[FileTreeNode]:
+        """ノードを名前順の位置に挿入"""
+        if not path.exists():
+            return None
+        
+        child_node = FileTreeNode(path, parent_node)
+        if not self.filter.should_show_file(child_node):
+            return None
+        
+        parent_node.add_child(child_node)
+        index = parent_node.children.index(child_node)
+        
+        size_text = self._format_file_size(child_node.size) if not child_node.is_directory else ''
+        modified_text = child_node.modified_time.strftime('%Y-%m-%d %H:%M') if child_node.modified_time else ''
+        child_node.tree_item_id = self.tree.insert(
+            parent_node.tree_item_id, index,
+            text=f"{self._get_file_icon(child_node)} {child_node.display_name}",
+            values=(size_text, modified_text),
+            tags=self._get_file_tags(child_node)
+        )
+        self.node_map[child_node.tree_item_id] = child_node
+        
+        if child_node.is_directory:
+            # ダミーアイテムを追加（遅延読み込み用）
+            self.tree.insert(child_node.tree_item_id, 'end', text='読み込み中...')
+        
+        return child_node
+    
+    def _update_tree_node(self, node: FileTreeNode):
+        """ノードのサイズと更新日時を更新"""
+        if not node.path.exists():
+            return
+        
+        stat = node.path.stat()
+        node.size = stat.st_size if not node.is_directory else 0
+        node.modified_time = datetime.fromtimestamp(stat.st_mtime)
+        
+        size_text = self._format_file_size(node.size) if not node.is_directory else ''
+        self.tree.item(node.tree_item_id, values=(size_text, node.modified_time.strftime('%Y-%m-%d %H:%M')))
+    
+    def _remove_tree_node(self, node: FileTreeNode, nodes_by_path: Dict[str, FileTreeNode]):
+        """ノードと配下のノードを削除"""
+        def forget(target: FileTreeNode):
+            for child in target.children:
+                forget(child)
+            self.node_map.pop(target.tree_item_id, None)
+            nodes_by_path.pop(str(target.path), None)
+        
+        forget(node)
+        if node.parent:
+            node.parent.remove_child(node)
+        if node.tree_item_id and self.tree.exists(node.tree_item_id):
+            self.tree.delete(node.tree_item_id)
+        if self.selected_node is node:
+            self.selected_node = None
+    
     def destroy(self):
         """クリーンアップ"""
         self._stop_file_watching()
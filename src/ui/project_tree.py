@@ -18,7 +18,7 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import (
     Qt, pyqtSignal, QTimer, QThread, QObject, QMimeData,
-    QUrl, QModelIndex, QFileSystemWatcher, QSettings
+    QUrl, QModelIndex, QSettings
 )
 from PyQt6.QtGui import (
     QIcon, QPixmap, QDrag, QAction, QFont, QPalette,
@@ -27,6 +27,12 @@ from PyQt6.QtGui import (
 
 from ..core.logger import get_logger
 from ..core.file_manager import FileManager
+from ..core.event_system import get_event_system
+from ..core.file_watcher import (
+    CHANGE_CREATED, CHANGE_DELETED, CHANGE_MOVED, FILE_CHANGES_EVENT,
+    FileWatcher, iter_changes
+)
+from ..core.project_manager import get_project_manager
 from ..utils.file_utils import (
     get_file_size, get_file_extension, is_text_file,
     get_file_icon_path, format_file_size
@@ -41,60 +47,6 @@ class TreeItemType(Enum):
     SYMLINK = "symlink"
 
 
-class FileWatcherThread(QThread):
-    """ファイル変更監視スレッド"""
-    
-    file_changed = pyqtSignal(str)
-    folder_changed = pyqtSignal(str)
-    
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.watcher = QFileSystemWatcher()
-        self.logger = get_logger(__name__)
-        self.watched_paths: Set[str] = set()
-        
-        # シグナル接続
-        self.watcher.fileChanged.connect(self._on_file_changed)
-        self.watcher.directoryChanged.connect(self._on_directory_changed)
-    
-    def add_path(self, path: str):
-        """監視パスを追加"""
-        try:
-            if path not in self.watched_paths:
-                self.watcher.addPath(path)
-                self.watched_paths.add(path)
-                
-        except Exception as e:
-            self.logger.error(f"パス監視追加エラー: {e}")
-    
-    def remove_path(self, path: str):
-        """監視パスを削除"""
-        try:
-            if path in self.watched_paths:
-                self.watcher.removePath(path)
-                self.watched_paths.discard(path)
-                
-        except Exception as e:
-            self.logger.error(f"パス監視削除エラー: {e}")
-    
-    def _on_file_changed(self, path: str):
-        """ファイル変更イベント"""
-        self.file_changed.emit(path)
-    
-    def _on_directory_changed(self, path: str):
-        """ディレクトリ変更イベント"""
-        self.folder_changed.emit(path)
-    
-    def cleanup(self):
-        """クリーンアップ"""
-        try:
-            self.watcher.removePaths(list(self.watched_paths))
-            self.watched_paths.clear()
-            
-        except Exception as e:
-            self.logger.error(f"ファイル監視クリーンアップエラー: {e}")
-
-
 class ProjectTreeItem(QTreeWidgetItem):
     """プロジェクトツリーアイテム"""
     
@@ -182,6 +134,7 @@ class ProjectTree(QTreeWidget):
     file_deleted = pyqtSignal(str)  # ファイルが削除された
     file_renamed = pyqtSignal(str, str)  # ファイルがリネームされた
     project_changed = pyqtSignal(str)  # プロジェクトが変更された
+    file_changes_received = pyqtSignal(list)  # ファイル監視の変更バッチ（GUIスレッドへ受け渡し）
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -190,11 +143,16 @@ class ProjectTree(QTreeWidget):
         self.current_project_path: Optional[str] = None
         self.settings = QSettings()
         
-        # ファイル監視
-        self.file_watcher = FileWatcherThread()
-        self.file_watcher.file_changed.connect(self._on_file_changed)
-        self.file_watcher.folder_changed.connect(self._on_folder_changed)
-        self.file_watcher.start()
+        # ファイル監視（FileWatcherの変更バッチをイベントシステム経由で受け取る）
+        self.event_system = get_event_system()
+        self.file_watcher: Optional[FileWatcher] = None
+        self.repository_indexer = None
+        self._subscriber_id = f"project_tree_{id(self)}"
+        self.file_changes_received.connect(self._on_file_changes)
+        self.event_system.subscribe(
+            FILE_CHANGES_EVENT, self._on_file_changes_event, subscriber_id=self._subscriber_id
+        )
+        get_project_manager().attach_event_system(self.event_system)
         
         # フィルタ設定
         self.show_hidden_files = False
@@ -400,12 +358,12 @@ class ProjectTree(QTreeWidget):
                 return False
             
             # 既存の監視を停止
-            if self.current_project_path:
-                self.file_watcher.remove_path(self.current_project_path)
+            self._stop_file_watcher()
             
-            # 新しいプロジェクトを設定
+            # 新しいプロジェクトを設定（監視の変更パスは絶対パス）
+            project_path = os.path.abspath(project_path)
             self.current_project_path = project_path
-            self.file_watcher.add_path(project_path)
+            self._start_file_watcher(project_path)
             
             # ツリーを構築
             self._build_tree()
@@ -425,7 +383,7 @@ class ProjectTree(QTreeWidget):
         """プロジェクトを閉じる"""
         try:
             if self.current_project_path:
-                self.file_watcher.remove_path(self.current_project_path)
+                self._stop_file_watcher()
                 self.current_project_path = None
             
             self.clear()
@@ -511,10 +469,7 @@ class ProjectTree(QTreeWidget):
                 child_item = ProjectTreeItem(parent_item)
                 child_item.set_file_info(entry_path)
                 
-                # フォルダの場合は監視対象に追加
                 if child_item.is_folder():
-                    self.file_watcher.add_path(entry_path)
-                    
                     # 子フォルダがある場合はダミーアイテムを追加（遅延読み込み用）
                     if self._has_children(entry_path):
                         dummy_item = ProjectTreeItem(child_item)
@@ -668,6 +623,66 @@ class ProjectTree(QTreeWidget):
         except Exception as e:
             self.logger.error(f"アイテム折りたたみ処理エラー: {e}")
     
+    # ファイル監視
+    def set_repository_indexer(self, repository_indexer):
+        """
+        開いているプロジェクトの変更を再インデックスするRepositoryIndexerを設定
+        
+        Args:
+            repository_indexer: RepositoryIndexer（Noneの場合は解除）
+        """
+        if self.repository_indexer is not None:
+            self.repository_indexer.detach_event_system()
+        self.repository_indexer = repository_indexer
+        if repository_indexer is not None and self.current_project_path:
+            repository_indexer.attach_event_system(self.event_system, self.current_project_path)
+    
+    def _start_file_watcher(self, project_path: str):
+        """プロジェクトのファイル監視を開始"""
+        try:
+            self.file_watcher = FileWatcher(project_path, self.event_system)
+            if not self.file_watcher.start():
+                self.file_watcher = None
+                return
+            if self.repository_indexer is not None:
+                self.repository_indexer.attach_event_system(self.event_system, project_path)
+            
+        except Exception as e:
+            self.file_watcher = None
+            self.logger.error(f"ファイル監視開始エラー: {e}")
+    
+    def _stop_file_watcher(self):
+        """プロジェクトのファイル監視を停止"""
+        try:
+            if self.file_watcher is not None:
+                self.file_watcher.stop()
+                self.file_watcher = None
+            
+        except Exception as e:
+            self.logger.error(f"ファイル監視停止エラー: {e}")
+    
+    def _on_file_changes_event(self, event):
+        """変更バッチ通知（イベントシステムのスレッドから呼ばれるためシグナルで受け渡す）"""
+        if self.current_project_path:
+            changes = iter_changes(event, self.current_project_path)
+            if changes:
+                self.file_changes_received.emit(changes)
+    
+    def _on_file_changes(self, changes: list):
+        """変更バッチを反映（作成・削除・移動は親フォルダ、変更はアイテム自体を更新）"""
+        folders = set()
+        for change in changes:
+            if change.change_type in (CHANGE_CREATED, CHANGE_DELETED, CHANGE_MOVED):
+                folders.add(os.path.dirname(change.file_path))
+                if change.old_path:
+                    folders.add(os.path.dirname(change.old_path))
+            elif change.is_directory:
+                folders.add(change.file_path)
+            else:
+                self._on_file_changed(change.file_path)
+        for folder in sorted(folders):
+            self._on_folder_changed(folder)
+    
     def _on_file_changed(self, path: str):
         """ファイル変更通知"""
         try:
@@ -1356,9 +1371,10 @@ class ProjectTree(QTreeWidget):
             self._save_settings()
             
             # ファイル監視を停止
-            self.file_watcher.cleanup()
-            self.file_watcher.quit()
-            self.file_watcher.wait()
+            self._stop_file_watcher()
+            self.event_system.unsubscribe_all(self._subscriber_id)
+            if self.repository_indexer is not None:
+                self.repository_indexer.detach_event_system()
             
             self.logger.info("ProjectTree をクリーンアップしました")
             
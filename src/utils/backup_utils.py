@@ -12,16 +12,20 @@ import json
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Optional, Union, Callable, Any, Tuple
+from typing import List, Dict, Optional, Union, Callable, Any, Tuple, BinaryIO, Iterator
 from dataclasses import dataclass, asdict
 from enum import Enum
 import threading
 import hashlib
 import fnmatch
+from contextlib import contextmanager
 
 from ..core.logger import get_logger
 from .file_utils import get_file_utils
 from .encryption_utils import get_encryption_utils
+from .chunk_store import ChunkStore
+from .delta_sync import DeltaSync
+from .parallel_compress import ParallelStreamWriter, ParallelZipWriter, verify_zip_parallel
 
 
 class BackupType(Enum):
@@ -37,6 +41,7 @@ class CompressionType(Enum):
     ZIP = "zip"
     TAR_GZ = "tar.gz"
     TAR_BZ2 = "tar.bz2"
+    DEDUP = "dedup"
 
 
 @dataclass
@@ -71,6 +76,9 @@ class BackupConfig:
     encryption_password: Optional[str] = None
     auto_cleanup: bool = True
     verify_backup: bool = True
+    # 圧縮レベル（ZIP/tar.gzは0-9、tar.bz2は1-9）と圧縮スレッド数（Noneの場合はCPU数）
+    compression_level: int = 6
+    compression_workers: Optional[int] = None
     
     def __post_init__(self):
         if self.exclude_patterns is None:
@@ -147,6 +155,9 @@ class BackupUtils:
         
         # バックアップ履歴を保存するファイル
         self.backup_history_file = "backup_history.json"
+        # 重複排除バックアップのチャンクストア（バックアップディレクトリ毎）
+        self.chunk_store_directory = "chunk_store"
+        self._chunk_stores: Dict[str, ChunkStore] = {}
         self._lock = threading.Lock()
     
     def _should_include_file(self, file_path: Path, config: BackupConfig) -> bool:
@@ -207,13 +218,88 @@ class BackupUtils:
             self.logger.error(f"サイズ計算エラー: {e}")
         return total_size
     
-    def _create_backup_id(self) -> str:
-        """バックアップIDを生成"""
+    def _create_backup_id(self, backup_directory: Optional[str] = None) -> str:
+        """バックアップIDを生成（同じ秒に作成済みのIDがあれば連番を付ける）"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        return f"backup_{timestamp}"
+        backup_id = f"backup_{timestamp}"
+        if backup_directory is None:
+            return backup_id
+        
+        existing = {b.backup_id for b in self._load_backup_history(backup_directory)}
+        suffix = 1
+        candidate = backup_id
+        while candidate in existing:
+            candidate = f"{backup_id}_{suffix}"
+            suffix += 1
+        return candidate
+    
+    def _relative_path(self, file_path: Path, source_paths: List[str]) -> Path:
+        """バックアップ内の相対パスを計算"""
+        return self._relative_path_resolver(source_paths)(file_path)
+    
+    def _relative_path_resolver(self, source_paths: List[str]) -> Callable[[Path], Path]:
+        """
+        ソースパスの対応表を一度だけ作り、相対パスを計算する関数を返す
+        
+        ファイル毎にすべてのソースパスをstatする代わりに、ファイルの親ディレクトリを
+        対応表から引く。複数のソースパスに含まれる場合は先に指定されたものを優先する。
+        
+        Args:
+            source_paths: ソースパスのリスト
+            
+        Returns:
+            Callable[[Path], Path]: ファイルパスからバックアップ内の相対パスを返す関数
+        """
+        source_files: Dict[Path, int] = {}
+        source_dirs: Dict[Path, int] = {}
+        for index, source_path in enumerate(source_paths):
+            source = Path(source_path)
+            if source.is_file():
+                source_files.setdefault(source, index)
+            elif source.is_dir():
+                source_dirs.setdefault(source, index)
+        
+        def resolve(file_path: Path) -> Path:
+            best = source_files.get(file_path)
+            relative_path = Path(file_path.name)
+            for parent in file_path.parents:
+                index = source_dirs.get(parent)
+                if index is not None and (best is None or index < best):
+                    best = index
+                    relative_path = file_path.relative_to(parent)
+            return relative_path
+        
+        return resolve
+    
+    def get_chunk_store(self, backup_directory: str) -> ChunkStore:
+        """
+        バックアップディレクトリの重複排除チャンクストアを取得
+        
+        Args:
+            backup_directory: バックアップディレクトリ
+            
+        Returns:
+            ChunkStore: チャンクストア
+        """
+        key = str(Path(backup_directory).resolve())
+        with self._lock:
+            store = self._chunk_stores.get(key)
+            if store is None:
+                store = ChunkStore(Path(key) / self.chunk_store_directory)
+                self._chunk_stores[key] = store
+            return store
+    
+    def _get_snapshot_store(self, backup_info: BackupInfo) -> ChunkStore:
+        """重複排除バックアップのマニフェストが属するチャンクストアを取得"""
+        # backup_path は <backup_directory>/chunk_store/snapshots/<id>.json.gz
+        return self.get_chunk_store(str(Path(backup_info.backup_path).parents[2]))
     
     def _save_backup_history(self, backup_directory: str, backup_info: BackupInfo):
         """バックアップ履歴を保存"""
+        self._save_backup_histories(backup_directory, [backup_info])
+    
+    def _save_backup_histories(self, backup_directory: str, backup_infos: List[BackupInfo]):
+        """複数のバックアップ情報を1回の書き込みで履歴に追加"""
         try:
             history_file = Path(backup_directory) / self.backup_history_file
             
@@ -224,12 +310,13 @@ class BackupUtils:
                     history = json.load(f)
             
             # 新しいバックアップ情報を追加
-            backup_dict = asdict(backup_info)
-            backup_dict['timestamp'] = backup_info.timestamp.isoformat()
-            backup_dict['backup_type'] = backup_info.backup_type.value
-            backup_dict['compression_type'] = backup_info.compression_type.value
-            
-            history.append(backup_dict)
+            for backup_info in backup_infos:
+                backup_dict = asdict(backup_info)
+                backup_dict['timestamp'] = backup_info.timestamp.isoformat()
+                backup_dict['backup_type'] = backup_info.backup_type.value
+                backup_dict['compression_type'] = backup_info.compression_type.value
+                
+                history.append(backup_dict)
             
             # 履歴を保存
             with open(history_file, 'w', encoding='utf-8') as f:
@@ -275,41 +362,26 @@ class BackupUtils:
             return []
     
     def _create_zip_backup(self, files: List[Path], source_paths: List[str],
-                          backup_path: Path, progress: BackupProgress) -> int:
-        """ZIPバックアップを作成"""
+                          backup_path: Path, progress: BackupProgress,
+                          compression_level: int = 6,
+                          compression_workers: Optional[int] = None,
+                          encryption_password: Optional[str] = None) -> Tuple[int, str]:
+        """ZIPバックアップを作成（圧縮は並列、チェックサム・暗号化は書き込みと同時に行う）"""
         try:
-            compressed_size = 0
+            relative_path = self._relative_path_resolver(source_paths)
+            output = self._open_backup_output(backup_path, encryption_password)
             
-            with zipfile.ZipFile(backup_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            with ParallelZipWriter(output, compression_level, compression_workers) as writer:
                 for file_path in files:
                     if progress.is_cancelled:
                         break
                     
-                    # 相対パスを計算
-                    relative_path = None
-                    for source_path in source_paths:
-                        source = Path(source_path)
-                        try:
-                            if source.is_file() and file_path == source:
-                                relative_path = file_path.name
-                                break
-                            elif source.is_dir() and file_path.is_relative_to(source):
-                                relative_path = file_path.relative_to(source)
-                                break
-                        except ValueError:
-                            continue
-                    
-                    if relative_path is None:
-                        relative_path = file_path.name
-                    
                     # ファイルをZIPに追加
-                    zipf.write(file_path, str(relative_path))
-                    progress.update(str(file_path), file_path.stat().st_size)
+                    file_size = writer.add_file(file_path, str(relative_path(file_path)))
+                    progress.update(str(file_path), file_size)
             
-            if backup_path.exists():
-                compressed_size = backup_path.stat().st_size
-            
-            return compressed_size
+            _, checksum = writer.close()
+            return backup_path.stat().st_size, checksum
             
         except Exception as e:
             self.logger.error(f"ZIPバックアップ作成エラー: {e}")
@@ -317,88 +389,127 @@ class BackupUtils:
     
     def _create_tar_backup(self, files: List[Path], source_paths: List[str],
                           backup_path: Path, compression_type: CompressionType,
-                          progress: BackupProgress) -> int:
-        """TARバックアップを作成"""
+                          progress: BackupProgress,
+                          compression_level: int = 6,
+                          compression_workers: Optional[int] = None,
+                          encryption_password: Optional[str] = None) -> Tuple[int, str]:
+        """TARバックアップを作成（圧縮は並列、チェックサム・暗号化は書き込みと同時に行う）"""
         try:
-            compressed_size = 0
-            
-            # 圧縮モードを決定
-            if compression_type == CompressionType.TAR_GZ:
-                mode = 'w:gz'
-            elif compression_type == CompressionType.TAR_BZ2:
-                mode = 'w:bz2'
-            else:
-                mode = 'w'
+            relative_path = self._relative_path_resolver(source_paths)
+            output = self._open_backup_output(backup_path, encryption_password)
             
-            with tarfile.open(backup_path, mode) as tarf:
-                for file_path in files:
-                    if progress.is_cancelled:
-                        break
-                    
-                    # 相対パスを計算
-                    relative_path = None
-                    for source_path in source_paths:
-                        source = Path(source_path)
-                        try:
-                            if source.is_file() and file_path == source:
-                                relative_path = file_path.name
-                                break
-                            elif source.is_dir() and file_path.is_relative_to(source):
-                                relative_path = file_path.relative_to(source)
-                                break
-                        except ValueError:
-                            continue
-                    
-                    if relative_path is None:
-                        relative_path = file_path.name
-                    
-                    # ファイルをTARに追加
-                    tarf.add(file_path, str(relative_path))
-                    progress.update(str(file_path), file_path.stat().st_size)
+            # 圧縮形式を決定
+            codec = 'bz2' if compression_type == CompressionType.TAR_BZ2 else 'gzip'
             
-            if backup_path.exists():
-                compressed_size = backup_path.stat().st_size
+            with ParallelStreamWriter(output, codec, compression_level, compression_workers) as writer:
+                with tarfile.open(fileobj=writer, mode='w|') as tarf:
+                    for file_path in files:
+                        if progress.is_cancelled:
+                            break
+                        
+                        # ファイルをTARに追加
+                        tarinfo = tarf.gettarinfo(file_path, str(relative_path(file_path)))
+                        if tarinfo.isreg():
+                            with open(file_path, 'rb') as f:
+                                tarf.addfile(tarinfo, f)
+                        else:
+                            tarf.addfile(tarinfo)
+                        progress.update(str(file_path), tarinfo.size)
             
-            return compressed_size
+            _, checksum = writer.close()
+            return backup_path.stat().st_size, checksum
             
         except Exception as e:
             self.logger.error(f"TARバックアップ作成エラー: {e}")
             raise
     
+    def _open_backup_output(self, backup_path: Path,
+                            encryption_password: Optional[str] = None) -> Union[Path, BinaryIO]:
+        """アーカイブの出力先（パスワード指定時はストリーム暗号化して書き込む）"""
+        if encryption_password:
+            return self.encryption_utils.open_encrypted_writer(backup_path, encryption_password)
+        return backup_path
+    
+    @contextmanager
+    def _open_backup_archive(self, backup_path: Path, encrypted: bool,
+                             password: Optional[str] = None) -> Iterator[BinaryIO]:
+        """
+        アーカイブを読み込み用に開く
+        
+        ストリーム暗号化されたアーカイブは読み込みながら復号するため、平文を
+        ディスクに書き出さない。旧形式の暗号化ファイルは一時ファイルに復号する。
+        
+        Args:
+            backup_path: アーカイブのパス
+            encrypted: 暗号化されているか
+            password: パスワード
+            
+        Yields:
+            BinaryIO: シーク可能な平文のストリーム
+        """
+        if not encrypted:
+            with open(backup_path, 'rb') as f:
+                yield f
+            return
+        
+        if not password:
+            raise ValueError("暗号化されたバックアップにはパスワードが必要です")
+        
+        if self.encryption_utils.is_stream_encrypted(backup_path):
+            with self.encryption_utils.open_encrypted_reader(backup_path, password) as f:
+                yield f
+            return
+        
+        decrypted_path = self.encryption_utils.decrypt_file(backup_path, password)
+        try:
+            with open(decrypted_path, 'rb') as f:
+                yield f
+        finally:
+            decrypted_path.unlink(missing_ok=True)
+    
+    def _create_dedup_backup(self, files: List[Path], source_paths: List[str],
+                             backup_directory: str, backup_id: str,
+                             progress: BackupProgress) -> Tuple[Path, int, Dict[str, Any]]:
+        """重複排除バックアップ（チャンクストアのスナップショット）を作成"""
+        try:
+            store = self.get_chunk_store(backup_directory)
+            relative_path = self._relative_path_resolver(source_paths)
+            snapshot = store.create_snapshot(
+                backup_id,
+                ((file_path, str(relative_path(file_path))) for file_path in files),
+                progress=progress
+            )
+            if snapshot is None:
+                return store.manifest_path(backup_id), 0, {}
+            
+            return Path(snapshot.manifest_path), snapshot.stored_bytes, {
+                'new_chunks': snapshot.new_chunks,
+                'chunk_count': snapshot.chunk_count,
+                'reused_files': snapshot.reused_files
+            }
+            
+        except Exception as e:
+            self.logger.error(f"重複排除バックアップ作成エラー: {e}")
+            raise
+    
     def _create_directory_backup(self, files: List[Path], source_paths: List[str],
                                backup_path: Path, progress: BackupProgress) -> int:
         """ディレクトリバックアップを作成"""
         try:
             backup_path.mkdir(parents=True, exist_ok=True)
+            relative_path = self._relative_path_resolver(source_paths)
             total_size = 0
             
             for file_path in files:
                 if progress.is_cancelled:
                     break
                 
-                # 相対パスを計算
-                relative_path = None
-                for source_path in source_paths:
-                    source = Path(source_path)
-                    try:
-                        if source.is_file() and file_path == source:
-                            relative_path = file_path.name
-                            break
-                        elif source.is_dir() and file_path.is_relative_to(source):
-                            relative_path = file_path.relative_to(source)
-                            break
-                    except ValueError:
-                        continue
-                
-                if relative_path is None:
-                    relative_path = file_path.name
-                
                 # ファイルをコピー
-                dest_path = backup_path / relative_path
+                dest_path = backup_path / relative_path(file_path)
                 dest_path.parent.mkdir(parents=True, exist_ok=True)
                 shutil.copy2(file_path, dest_path)
                 
-                file_size = file_path.stat().st_size
+                file_size = dest_path.stat().st_size
                 total_size += file_size
                 progress.update(str(file_path), file_size)
             
@@ -410,6 +521,13 @@ class BackupUtils:
     
     def create_backup(self, config: BackupConfig, progress: Optional[BackupProgress] = None) -> BackupInfo:
         """バックアップを作成"""
+        return self._create_backup_from_files(
+            config, self._get_backup_files(config.source_paths, config), progress
+        )
+    
+    def _create_backup_from_files(self, config: BackupConfig, backup_files: List[Path],
+                                  progress: Optional[BackupProgress] = None) -> BackupInfo:
+        """指定したファイルのバックアップを作成"""
         try:
             if progress is None:
                 progress = BackupProgress()
@@ -418,8 +536,7 @@ class BackupUtils:
             backup_dir = Path(config.backup_directory)
             backup_dir.mkdir(parents=True, exist_ok=True)
             
-            # バックアップ対象ファイルを取得
-            backup_files = self._get_backup_files(config.source_paths, config)
+            # バックアップ対象ファイルを確認
             if not backup_files:
                 raise ValueError("バックアップ対象ファイルが見つかりません")
             
@@ -428,7 +545,7 @@ class BackupUtils:
             progress.total_size = self._calculate_total_size(backup_files)
             
             # バックアップIDとパスを生成
-            backup_id = self._create_backup_id()
+            backup_id = self._create_backup_id(config.backup_directory)
             
             # 拡張子を決定
             if config.compression_type == CompressionType.ZIP:
@@ -442,40 +559,55 @@ class BackupUtils:
             
             backup_path = backup_dir / f"{backup_id}{extension}"
             
+            # アーカイブは書き込みながら暗号化する
+            encryption_password = None
+            if config.encrypt_backup and config.encryption_password:
+                if config.compression_type == CompressionType.DEDUP:
+                    self.logger.warning("重複排除バックアップの暗号化はサポートされていません")
+                elif extension:
+                    encryption_password = config.encryption_password
+                    backup_path = backup_path.with_name(backup_path.name + ".encrypted")
+                else:
+                    self.logger.warning("ディレクトリバックアップの暗号化はサポートされていません")
+            
             # バックアップを作成
             compressed_size = None
-            if config.compression_type == CompressionType.ZIP:
-                compressed_size = self._create_zip_backup(backup_files, config.source_paths, backup_path, progress)
+            checksum = None
+            dedup_stats = None
+            if config.compression_type == CompressionType.DEDUP:
+                backup_path, compressed_size, dedup_stats = self._create_dedup_backup(
+                    backup_files, config.source_paths, config.backup_directory, backup_id, progress
+                )
+            elif config.compression_type == CompressionType.ZIP:
+                compressed_size, checksum = self._create_zip_backup(
+                    backup_files, config.source_paths, backup_path, progress,
+                    config.compression_level, config.compression_workers, encryption_password
+                )
             elif config.compression_type in [CompressionType.TAR_GZ, CompressionType.TAR_BZ2]:
-                compressed_size = self._create_tar_backup(backup_files, config.source_paths, backup_path, config.compression_type, progress)
+                compressed_size, checksum = self._create_tar_backup(
+                    backup_files, config.source_paths, backup_path, config.compression_type, progress,
+                    config.compression_level, config.compression_workers, encryption_password
+                )
             else:
                 backup_path = backup_dir / backup_id
                 compressed_size = self._create_directory_backup(backup_files, config.source_paths, backup_path, progress)
             
             # キャンセルされた場合はクリーンアップ
             if progress.is_cancelled:
-                if backup_path.exists():
+                if config.compression_type == CompressionType.DEDUP:
+                    self.get_chunk_store(config.backup_directory).delete_snapshot(backup_id)
+                elif backup_path.exists():
                     if backup_path.is_file():
                         backup_path.unlink()
                     else:
                         shutil.rmtree(backup_path)
                 raise InterruptedError("バックアップがキャンセルされました")
             
-            # チェックサムを計算
-            checksum = None
-            if config.verify_backup and backup_path.is_file():
-                checksum = self.file_utils.calculate_file_hash(backup_path)
-            
-            # 暗号化
-            if config.encrypt_backup and config.encryption_password:
-                if backup_path.is_file():
-                    encrypted_path = self.encryption_utils.encrypt_file(
-                        backup_path, config.encryption_password
-                    )
-                    backup_path.unlink()  # 元ファイルを削除
-                    backup_path = encrypted_path
-                else:
-                    self.logger.warning("ディレクトリバックアップの暗号化はサポートされていません")
+            # チェックサムを計算（アーカイブは書き込み時に計算済み）
+            if not config.verify_backup:
+                checksum = None
+            elif checksum is None and backup_path.is_file():
+                checksum = self.file_utils.calculate_file_hash(backup_path, use_cache=False)
             
             # バックアップ情報を作成
             backup_info = BackupInfo(
@@ -489,12 +621,14 @@ class BackupUtils:
                 total_size=progress.total_size,
                 compressed_size=compressed_size,
                 checksum=checksum,
-                encrypted=config.encrypt_backup,
+                encrypted=encryption_password is not None,
                 metadata={
                     'exclude_patterns': config.exclude_patterns,
                     'include_patterns': config.include_patterns
                 }
             )
+            if dedup_stats is not None:
+                backup_info.metadata['dedup'] = dedup_stats
             
             # バックアップ履歴を保存
             self._save_backup_history(config.backup_directory, backup_info)
@@ -527,30 +661,23 @@ class BackupUtils:
             # 復元ディレクトリを作成
             restore_dir.mkdir(parents=True, exist_ok=True)
             
-            # 暗号化されている場合は復号化
-            if backup_info.encrypted:
-                if not password:
-                    raise ValueError("暗号化されたバックアップにはパスワードが必要です")
-                
-                decrypted_path = self.encryption_utils.decrypt_file(backup_path, password)
-                backup_path = decrypted_path
-            
-            # バックアップを展開
-            if backup_info.compression_type == CompressionType.ZIP:
-                with zipfile.ZipFile(backup_path, 'r') as zipf:
-                    zipf.extractall(restore_dir)
+            # バックアップを展開（暗号化されている場合は読み込みながら復号化）
+            if backup_info.compression_type == CompressionType.DEDUP:
+                store = self._get_snapshot_store(backup_info)
+                store.restore_snapshot(backup_info.backup_id, restore_dir, progress=progress)
+            elif backup_info.compression_type == CompressionType.ZIP:
+                with self._open_backup_archive(backup_path, backup_info.encrypted, password) as f:
+                    with zipfile.ZipFile(f, 'r') as zipf:
+                        zipf.extractall(restore_dir)
             elif backup_info.compression_type in [CompressionType.TAR_GZ, CompressionType.TAR_BZ2]:
-                with tarfile.open(backup_path, 'r') as tarf:
-                    tarf.extractall(restore_dir)
+                with self._open_backup_archive(backup_path, backup_info.encrypted, password) as f:
+                    with tarfile.open(fileobj=f, mode='r:*') as tarf:
+                        tarf.extractall(restore_dir)
             else:
                 # ディレクトリバックアップの場合
                 if backup_path.is_dir():
                     shutil.copytree(backup_path, restore_dir, dirs_exist_ok=True)
             
-            # 暗号化で一時ファイルを作成した場合はクリーンアップ
-            if backup_info.encrypted and backup_path != Path(backup_info.backup_path):
-                backup_path.unlink()
-            
             self.logger.info(f"バックアップを復元しました: {backup_info.backup_id} -> {restore_path}")
             return True
             
@@ -584,7 +711,12 @@ class BackupUtils:
             
             # バックアップファイルを削除
             backup_path = Path(backup_to_delete.backup_path)
-            if backup_path.exists():
+            if backup_to_delete.compression_type == CompressionType.DEDUP:
+                # どのスナップショットからも参照されなくなったチャンクを回収
+                store = self.get_chunk_store(backup_directory)
+                store.delete_snapshot(backup_id)
+                store.prune()
+            elif backup_path.exists():
                 if backup_path.is_file():
                     backup_path.unlink()
                 else:
@@ -648,43 +780,21 @@ class BackupUtils:
                 self.logger.error(f"バックアップファイルが見つかりません: {backup_path}")
                 return False
             
-            # 暗号化されている場合は復号化してチェック
-            if backup_info.encrypted:
-                if not password:
-                    self.logger.error("暗号化されたバックアップの検証にはパスワードが必要です")
-                    return False
-                
-                try:
-                    # 一時的に復号化
-                    decrypted_path = self.encryption_utils.decrypt_file(backup_path, password)
-                    backup_path = decrypted_path
-                except Exception as e:
-                    self.logger.error(f"バックアップの復号化に失敗しました: {e}")
-                    return False
-            
-            # チェックサム検証
-            if backup_info.checksum and backup_path.is_file():
-                current_checksum = self.file_utils.calculate_file_hash(backup_path)
-                if current_checksum != backup_info.checksum:
-                    self.logger.error("バックアップのチェックサムが一致しません")
-                    return False
+            if backup_info.encrypted and not password:
+                self.logger.error("暗号化されたバックアップの検証にはパスワードが必要です")
+                return False
             
-            # アーカイブの整合性チェック
             try:
-                if backup_info.compression_type == CompressionType.ZIP:
-                    with zipfile.ZipFile(backup_path, 'r') as zipf:
-                        zipf.testzip()
-                elif backup_info.compression_type in [CompressionType.TAR_GZ, CompressionType.TAR_BZ2]:
-                    with tarfile.open(backup_path, 'r') as tarf:
-                        tarf.getmembers()  # アーカイブの読み込みテスト
+                if backup_info.compression_type == CompressionType.DEDUP:
+                    store = self._get_snapshot_store(backup_info)
+                    if not store.verify_snapshot(backup_info.backup_id):
+                        raise ValueError("チャンクの検証に失敗しました")
+                elif backup_path.is_file():
+                    self._verify_archive(backup_info, backup_path, password)
             except Exception as e:
                 self.logger.error(f"アーカイブの整合性チェックに失敗しました: {e}")
                 return False
             
-            # 暗号化で一時ファイルを作成した場合はクリーンアップ
-            if backup_info.encrypted and backup_path != Path(backup_info.backup_path):
-                backup_path.unlink()
-            
             self.logger.info(f"バックアップの検証が完了しました: {backup_info.backup_id}")
             return True
             
@@ -692,6 +802,52 @@ class BackupUtils:
             self.logger.error(f"バックアップ検証エラー: {e}")
             return False
     
+    def _verify_archive(self, backup_info: BackupInfo, backup_path: Path, password: Optional[str]):
+        """
+        アーカイブのチェックサムと内容を検証（暗号化されている場合は読み込みながら復号化）
+        
+        Args:
+            backup_info: バックアップ情報
+            backup_path: アーカイブのパス
+            password: パスワード
+        """
+        stream_encrypted = backup_info.encrypted and self.encryption_utils.is_stream_encrypted(backup_path)
+        
+        with self._open_backup_archive(backup_path, backup_info.encrypted, password) as f:
+            # チェックサム検証（暗号化されていない場合はmmapで読む）
+            if backup_info.checksum:
+                if backup_info.encrypted:
+                    digest = hashlib.md5()
+                    while block := f.read(1024 * 1024):
+                        digest.update(block)
+                    current_checksum = digest.hexdigest()
+                else:
+                    current_checksum = self.file_utils.calculate_file_hash(backup_path, use_cache=False)
+                if current_checksum != backup_info.checksum:
+                    raise ValueError("バックアップのチェックサムが一致しません")
+            
+            if backup_info.compression_type == CompressionType.ZIP:
+                if backup_info.encrypted and not stream_encrypted:
+                    # 旧形式は復号済みの一時ファイルを1スレッドで検証
+                    f.seek(0)
+                    with zipfile.ZipFile(f) as zipf:
+                        bad_entry = zipf.testzip()
+                else:
+                    opener = None
+                    if stream_encrypted:
+                        opener = lambda: self.encryption_utils.open_encrypted_reader(backup_path, password)
+                    bad_entry = verify_zip_parallel(backup_path, opener=opener)
+                if bad_entry is not None:
+                    raise zipfile.BadZipFile(f"破損したエントリ: {bad_entry}")
+            elif backup_info.compression_type in [CompressionType.TAR_GZ, CompressionType.TAR_BZ2]:
+                f.seek(0)
+                with tarfile.open(fileobj=f, mode='r:*') as tarf:
+                    for member in tarf:
+                        if member.isreg():
+                            extracted = tarf.extractfile(member)
+                            while extracted.read(1024 * 1024):
+                                pass
+    
     def get_backup_statistics(self, backup_directory: str) -> Dict[str, Any]:
         """バックアップ統計情報を取得"""
         try:
@@ -779,52 +935,9 @@ class BackupUtils:
                                  progress: Optional[BackupProgress] = None) -> BackupInfo:
         """増分バックアップを作成"""
         try:
-            # 最後のバックアップ以降に変更されたファイルのみを対象とする
-            all_files = self._get_backup_files(config.source_paths, config)
-            
-            # 変更されたファイルをフィルタリング
-            modified_files = []
-            for file_path in all_files:
-                try:
-                    file_mtime = datetime.fromtimestamp(file_path.stat().st_mtime)
-                    if file_mtime > last_backup_time:
-                        modified_files.append(file_path)
-                except Exception:
-                    continue
-            
-            if not modified_files:
-                self.logger.info("増分バックアップ対象のファイルがありません")
-                return None
-            
-            # 一時的にファイルリストを置き換えて通常のバックアップを実行
-            original_get_backup_files = self._get_backup_files
-            self._get_backup_files = lambda paths, cfg: modified_files
-            
-            try:
-                # バックアップタイプを増分に設定
-                incremental_config = BackupConfig(
-                    source_paths=config.source_paths,
-                    backup_directory=config.backup_directory,
-                    backup_type=BackupType.INCREMENTAL,
-                    compression_type=config.compression_type,
-                    max_backups=config.max_backups,
-                    exclude_patterns=config.exclude_patterns,
-                    include_patterns=config.include_patterns,
-                    encrypt_backup=config.encrypt_backup,
-                    encryption_password=config.encryption_password,
-                    auto_cleanup=config.auto_cleanup,
-                    verify_backup=config.verify_backup
-                )
-                
-                backup_info = self.create_backup(incremental_config, progress)
-                backup_info.description = f"増分バックアップ（{len(modified_files)}ファイル）"
-                
-                return backup_info
-                
-            finally:
-                # 元のメソッドを復元
-                self._get_backup_files = original_get_backup_files
-                
+            return self._create_changed_files_backup(
+                config, last_backup_time, BackupType.INCREMENTAL, "増分", progress
+            )
         except Exception as e:
             self.logger.error(f"増分バックアップ作成エラー: {e}")
             raise
@@ -834,56 +947,73 @@ class BackupUtils:
                                   progress: Optional[BackupProgress] = None) -> BackupInfo:
         """差分バックアップを作成"""
         try:
-            # ベースバックアップ以降に変更されたファイルを対象とする
-            all_files = self._get_backup_files(config.source_paths, config)
-            
-            # 変更されたファイルをフィルタリング
-            modified_files = []
-            for file_path in all_files:
-                try:
-                    file_mtime = datetime.fromtimestamp(file_path.stat().st_mtime)
-                    if file_mtime > base_backup_time:
-                        modified_files.append(file_path)
-                except Exception:
-                    continue
-            
-            if not modified_files:
-                self.logger.info("差分バックアップ対象のファイルがありません")
-                return None
-            
-            # 一時的にファイルリストを置き換えて通常のバックアップを実行
-            original_get_backup_files = self._get_backup_files
-            self._get_backup_files = lambda paths, cfg: modified_files
-            
-            try:
-                # バックアップタイプを差分に設定
-                differential_config = BackupConfig(
-                    source_paths=config.source_paths,
-                    backup_directory=config.backup_directory,
-                    backup_type=BackupType.DIFFERENTIAL,
-                    compression_type=config.compression_type,
-                    max_backups=config.max_backups,
-                    exclude_patterns=config.exclude_patterns,
-                    include_patterns=config.include_patterns,
-                    encrypt_backup=config.encrypt_backup,
-                    encryption_password=config.encryption_password,
-                    auto_cleanup=config.auto_cleanup,
-                    verify_backup=config.verify_backup
-                )
-                
-                backup_info = self.create_backup(differential_config, progress)
-                backup_info.description = f"差分バックアップ（{len(modified_files)}ファイル）"
-                
-                return backup_info
-                
-            finally:
-                # 元のメソッドを復元
-                self._get_backup_files = original_get_backup_files
-                
+            return self._create_changed_files_backup(
+                config, base_backup_time, BackupType.DIFFERENTIAL, "差分", progress
+            )
         except Exception as e:
             self.logger.error(f"差分バックアップ作成エラー: {e}")
             raise
     
+    def _create_changed_files_backup(self, config: BackupConfig, since: datetime,
+                                     backup_type: BackupType, label: str,
+                                     progress: Optional[BackupProgress] = None) -> Optional[BackupInfo]:
+        """
+        指定時刻以降に変更されたファイルのバックアップを作成
+        
+        重複排除形式では変更のないファイルもスナップショットに含める（チャンクは
+        再利用されるため追加の容量は変更分のみで、どのスナップショットからも完全に復元できる）。
+        
+        Args:
+            config: バックアップ設定
+            since: 基準時刻
+            backup_type: バックアップタイプ
+            label: 説明に使う種別名
+            progress: 進捗
+            
+        Returns:
+            Optional[BackupInfo]: バックアップ情報（変更がない場合はNone）
+        """
+        all_files = self._get_backup_files(config.source_paths, config)
+        
+        # 変更されたファイルをフィルタリング
+        modified_files = []
+        for file_path in all_files:
+            try:
+                file_mtime = datetime.fromtimestamp(file_path.stat().st_mtime)
+                if file_mtime > since:
+                    modified_files.append(file_path)
+            except Exception:
+                continue
+        
+        if not modified_files:
+            self.logger.info(f"{label}バックアップ対象のファイルがありません")
+            return None
+        
+        changed_config = BackupConfig(
+            source_paths=config.source_paths,
+            backup_directory=config.backup_directory,
+            backup_type=backup_type,
+            compression_type=config.compression_type,
+            max_backups=config.max_backups,
+            exclude_patterns=config.exclude_patterns,
+            include_patterns=config.include_patterns,
+            encrypt_backup=config.encrypt_backup,
+            encryption_password=config.encryption_password,
+            auto_cleanup=config.auto_cleanup,
+            verify_backup=config.verify_backup,
+            compression_level=config.compression_level,
+            compression_workers=config.compression_workers
+        )
+        
+        if config.compression_type == CompressionType.DEDUP:
+            backup_files = all_files
+        else:
+            backup_files = modified_files
+        
+        backup_info = self._create_backup_from_files(changed_config, backup_files, progress)
+        backup_info.description = f"{label}バックアップ（{len(modified_files)}ファイル）"
+        return backup_info
+    
     def export_backup_config(self, config: BackupConfig, file_path: str) -> bool:
         """バックアップ設定をファイルにエクスポート"""
         try:
@@ -898,6 +1028,8 @@ class BackupUtils:
                 'encrypt_backup': config.encrypt_backup,
                 'auto_cleanup': config.auto_cleanup,
                 'verify_backup': config.verify_backup,
+                'compression_level': config.compression_level,
+                'compression_workers': config.compression_workers,
                 'exported_at': datetime.now().isoformat()
             }
             
@@ -927,7 +1059,9 @@ class BackupUtils:
                 include_patterns=config_dict.get('include_patterns'),
                 encrypt_backup=config_dict.get('encrypt_backup', False),
                 auto_cleanup=config_dict.get('auto_cleanup', True),
-                verify_backup=config_dict.get('verify_backup', True)
+                verify_backup=config_dict.get('verify_backup', True),
+                compression_level=config_dict.get('compression_level', 6),
+                compression_workers=config_dict.get('compression_workers')
             )
             
             self.logger.info(f"バックアップ設定をインポートしました: {file_path}")
@@ -938,8 +1072,22 @@ class BackupUtils:
             return None
     
     def sync_backups(self, source_directory: str, target_directory: str,
-                    delete_extra: bool = False) -> bool:
-        """バックアップディレクトリ間の同期"""
+                    delete_extra: bool = False, delta: bool = False,
+                    workers: Optional[int] = None) -> bool:
+        """
+        バックアップディレクトリ間の同期
+        
+        Args:
+            source_directory: 同期元ディレクトリ
+            target_directory: 同期先ディレクトリ
+            delete_extra: 同期元にないバックアップを同期先から削除するか
+            delta: 同期先の既存チャンクと比較し、ないブロックだけを書き込むか
+            workers: 差分同期で同時に転送するファイル数（Noneの場合はCPU数）
+        
+        Returns:
+            bool: 成功したか
+        """
+        delta_sync = None
         try:
             source_dir = Path(source_directory)
             target_dir = Path(target_directory)
@@ -948,6 +1096,8 @@ class BackupUtils:
                 raise FileNotFoundError(f"ソースディレクトリが見つかりません: {source_directory}")
             
             target_dir.mkdir(parents=True, exist_ok=True)
+            if delta:
+                delta_sync = DeltaSync(target_dir, workers=workers)
             
             # ソースのバックアップ履歴を読み込み
             source_history = self._load_backup_history(source_directory)
@@ -956,23 +1106,52 @@ class BackupUtils:
             # ターゲットに存在しないバックアップIDを特定
             target_backup_ids = {b.backup_id for b in target_history}
             
-            synced_count = 0
+            synced = []
+            delta_files = []
             for backup_info in source_history:
                 if backup_info.backup_id not in target_backup_ids:
                     # バックアップファイルをコピー
                     source_backup_path = Path(backup_info.backup_path)
-                    if source_backup_path.exists():
+                    if backup_info.compression_type == CompressionType.DEDUP:
+                        # ターゲットにないチャンクとマニフェストのみ転送
+                        target_store = self.get_chunk_store(target_directory)
+                        self._get_snapshot_store(backup_info).copy_snapshot_to(
+                            target_store, backup_info.backup_id
+                        )
+                        backup_info.backup_path = str(target_store.manifest_path(backup_info.backup_id))
+                        synced.append(backup_info)
+                    elif source_backup_path.exists():
                         target_backup_path = target_dir / source_backup_path.name
                         
-                        if source_backup_path.is_file():
+                        if delta_sync is not None:
+                            # 転送はまとめて並行に行う
+                            if source_backup_path.is_file():
+                                delta_files.append((source_backup_path, source_backup_path.name))
+                            else:
+                                delta_files.extend(
+                                    (path, (Path(source_backup_path.name) / path.relative_to(source_backup_path)).as_posix())
+                                    for path in sorted(source_backup_path.rglob('*')) if path.is_file()
+                                )
+                        elif source_backup_path.is_file():
                             shutil.copy2(source_backup_path, target_backup_path)
                         else:
                             shutil.copytree(source_backup_path, target_backup_path, dirs_exist_ok=True)
                         
                         # バックアップ情報を更新
                         backup_info.backup_path = str(target_backup_path)
-                        self._save_backup_history(target_directory, backup_info)
-                        synced_count += 1
+                        synced.append(backup_info)
+            
+            if delta_files:
+                stats = delta_sync.sync_files(delta_files)
+                self.logger.info(
+                    f"差分同期: {stats.total_bytes}バイト中 {stats.written_bytes}バイトを転送、"
+                    f"{stats.reused_bytes}バイトを同期先から再利用"
+                )
+            
+            # 履歴は1回の書き込みで更新
+            if synced:
+                self._save_backup_histories(target_directory, synced)
+            synced_count = len(synced)
             
             # 余分なバックアップを削除
             if delete_extra:
@@ -983,6 +1162,8 @@ class BackupUtils:
                     if backup_info.backup_id not in source_backup_ids:
                         if self.delete_backup(target_directory, backup_info.backup_id):
                             deleted_count += 1
+                            if delta_sync is not None:
+                                delta_sync.forget(Path(backup_info.backup_path).name)
                 
                 self.logger.info(f"{deleted_count}個の余分なバックアップを削除しました")
             
@@ -992,6 +1173,9 @@ class BackupUtils:
         except Exception as e:
             self.logger.error(f"バックアップ同期エラー: {e}")
             return False
+        finally:
+            if delta_sync is not None:
+                delta_sync.close()
 
 
 # グローバルインスタンス
@@ -0,0 +1,672 @@
+# src/utils/chunk_store.py
+"""
+重複排除チャンクストア
+コンテンツ定義チャンク分割・ハッシュをキーとしたブロブ・圧縮パックファイルでスナップショットを保存する
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from ..core.logger import get_logger
+
+logger = get_logger(__name__)
+
+PathLike = Union[str, os.PathLike]
+
+# チャンクの格納形式
+CODEC_RAW = 0
+CODEC_ZLIB = 1
+
+
+def _gear_table() -> np.ndarray:
+    """ローリングハッシュ用の乱数表（numpyの乱数実装に依存しないようハッシュから生成）"""
+    return np.array([
+        int.from_bytes(hashlib.blake2b(bytes([value]), digest_size=8).digest(), 'little')
+        for value in range(256)
+    ], dtype=np.uint64)
+
+
+GEAR = _gear_table()
+
+
+def chunk_hash(data: Union[bytes, memoryview]) -> str:
+    """チャンクのハッシュ（ストアのキー）"""
+    return hashlib.blake2b(data, digest_size=32).hexdigest()
+
+
+class ContentDefinedChunker:
+    """
+    コンテンツ定義チャンク分割クラス
+
+    直前window_sizeバイトの乱数表の値の和をローリングハッシュとし、上位ビットが
+    すべて0になる位置で区切る。境界は周辺の内容だけで決まるため、ファイルの途中に
+    挿入・削除があっても変更箇所以外のチャンクは同じになる。
+    """
+
+    def __init__(self,
+                 min_size: int = 16 * 1024,
+                 avg_bits: int = 15,
+                 max_size: int = 256 * 1024,
+                 window_size: int = 48,
+                 read_size: int = 4 * 1024 * 1024):
+        """
+        初期化
+
+        Args:
+            min_size: 最小チャンクサイズ
+            avg_bits: 境界判定のビット数（min_size + 2**avg_bits が平均サイズの目安）
+            max_size: 最大チャンクサイズ
+            window_size: ローリングハッシュの窓幅（min_size以下）
+            read_size: ストリームから一度に読み込むサイズ
+        """
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size)
+        self.window_size = min(window_size, min_size)
+        self.read_size = max(read_size, self.max_size)
+        self.mask = np.uint64(((1 << avg_bits) - 1) << (64 - avg_bits))
+
+    def cut_points(self, data: Union[bytes, memoryview], final: bool = True) -> List[int]:
+        """
+        チャンクの終了位置を求める
+
+        Args:
+            data: チャンク境界から始まるバイト列
+            final: データの終端か（Falseの場合、最後の未確定部分の終了位置は返さない）
+
+        Returns:
+            List[int]: 終了位置（昇順）
+        """
+        size = len(data)
+        if size <= self.min_size:
+            return [size] if final and size else []
+
+        window = self.window_size
+        sums = np.cumsum(GEAR[np.frombuffer(data, dtype=np.uint8)])
+        rolling = sums[window:] - sums[:-window]
+        candidates = np.flatnonzero((rolling & self.mask) == 0) + (window + 1)
+
+        ends: List[int] = []
+        start = 0
+        while True:
+            index = np.searchsorted(candidates, start + self.min_size)
+            if index < len(candidates) and candidates[index] <= start + self.max_size:
+                end = int(candidates[index])
+            elif start + self.max_size <= size:
+                end = start + self.max_size
+            else:
+                break
+            ends.append(end)
+            start = end
+        if final and start < size:
+            ends.append(size)
+        return ends
+
+    def iter_chunks(self, stream: BinaryIO) -> Iterator[bytes]:
+        """
+        ストリームをチャンクに分割（一度に保持するのはread_size + max_size程度）
+
+        Args:
+            stream: バイナリストリーム
+
+        Yields:
+            bytes: チャンク
+        """
+        buffer = b''
+        while True:
+            block = stream.read(self.read_size)
+            buffer = buffer + block if buffer else block
+            final = not block
+            start = 0
+            view = memoryview(buffer)
+            for end in self.cut_points(view, final):
+                yield bytes(view[start:end])
+                start = end
+            view.release()
+            buffer = buffer[start:]
+            if final:
+                return
+
+
+@dataclass
+class SnapshotInfo:
+    """スナップショットの作成結果"""
+    snapshot_id: str
+    file_count: int = 0
+    total_size: int = 0
+    chunk_count: int = 0
+    new_chunks: int = 0
+    stored_bytes: int = 0
+    reused_files: int = 0
+    manifest_path: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書形式に変換"""
+        return asdict(self)
+
+
+class ChunkStore:
+    """
+    重複排除チャンクストアクラス
+
+    チャンクはハッシュをキーに一度だけ圧縮してパックファイルへ追記し、位置を
+    SQLiteの索引に記録する。スナップショットはファイル毎のチャンクリストを
+    持つマニフェストで、前回のスナップショットとサイズ・更新時刻が同じファイルは
+    読み込まずにチャンクリストを引き継ぐ。
+    """
+
+    PACK_SIZE = 64 * 1024 * 1024
+    INDEX_FILE = "index.db"
+    # 不要チャンクがこの割合を超えたパックは再パックする
+    REPACK_RATIO = 0.5
+
+    def __init__(self,
+                 store_path: PathLike,
+                 chunker: Optional[ContentDefinedChunker] = None,
+                 compression_level: int = 6):
+        """
+        初期化
+
+        Args:
+            store_path: ストアのディレクトリ
+            chunker: チャンク分割器
+            compression_level: zlibの圧縮レベル
+        """
+        self.store_path = Path(store_path)
+        self.packs_path = self.store_path / "packs"
+        self.snapshots_path = self.store_path / "snapshots"
+        self.packs_path.mkdir(parents=True, exist_ok=True)
+        self.snapshots_path.mkdir(parents=True, exist_ok=True)
+
+        self.chunker = chunker or ContentDefinedChunker()
+        self.compression_level = compression_level
+        self._lock = threading.RLock()
+        self._readers: Dict[int, BinaryIO] = {}
+        self._writer: Optional[BinaryIO] = None
+        self._writer_pack = 0
+        # 未コミットのチャンク: ハッシュ -> (パック, 位置, 格納サイズ, 元サイズ, 形式)
+        self._pending: Dict[str, Tuple[int, int, int, int, int]] = {}
+
+        self.connection = sqlite3.connect(str(self.store_path / self.INDEX_FILE), check_same_thread=False)
+        self._init_database()
+
+    def _init_database(self):
+        """索引データベースを初期化"""
+        with self.connection:
+            self.connection.execute('''
+                CREATE TABLE IF NOT EXISTS chunks (
+                    hash TEXT PRIMARY KEY,
+                    pack INTEGER NOT NULL,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    codec INTEGER NOT NULL
+                )
+            ''')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS idx_chunks_pack ON chunks(pack)')
+            self.connection.execute('''
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    snapshot_id TEXT PRIMARY KEY,
+                    created TEXT NOT NULL,
+                    file_count INTEGER,
+                    total_size INTEGER
+                )
+            ''')
+
+    # ===== チャンク =====
+
+    def has_chunk(self, digest: str) -> bool:
+        """チャンクが格納済みか"""
+        if digest in self._pending:
+            return True
+        return self.connection.execute('SELECT 1 FROM chunks WHERE hash = ?', (digest,)).fetchone() is not None
+
+    def put_chunk(self, data: bytes) -> Tuple[str, int]:
+        """
+        チャンクを格納（格納済みの場合は書き込まない）
+
+        Args:
+            data: チャンクの内容
+
+        Returns:
+            Tuple[str, int]: ハッシュと新たに書き込んだバイト数
+        """
+        digest = chunk_hash(data)
+        with self._lock:
+            if self.has_chunk(digest):
+                return digest, 0
+            compressed = zlib.compress(data, self.compression_level)
+            if len(compressed) < len(data):
+                stored, codec = compressed, CODEC_ZLIB
+            else:
+                stored, codec = data, CODEC_RAW
+            return digest, self._append(digest, stored, len(data), codec)
+
+    def read_chunk(self, digest: str, verify: bool = False) -> bytes:
+        """
+        チャンクを読み込む
+
+        Args:
+            digest: チャンクのハッシュ
+            verify: 内容がハッシュと一致するか検証するか
+
+        Returns:
+            bytes: チャンクの内容
+        """
+        stored, size, codec = self._read_stored(digest)
+        data = zlib.decompress(stored) if codec == CODEC_ZLIB else stored
+        if len(data) != size or (verify and chunk_hash(data) != digest):
+            raise ValueError(f"チャンクが破損しています: {digest}")
+        return data
+
+    def _locate(self, digest: str) -> Tuple[int, int, int, int, int]:
+        """チャンクの位置を取得"""
+        location = self._pending.get(digest)
+        if location is None:
+            location = self.connection.execute(
+                'SELECT pack, offset, length, size, codec FROM chunks WHERE hash = ?', (digest,)
+            ).fetchone()
+        if location is None:
+            raise KeyError(f"チャンクが見つかりません: {digest}")
+        return location
+
+    def _read_stored(self, digest: str) -> Tuple[bytes, int, int]:
+        """格納されたままのチャンクを読み込む"""
+        with self._lock:
+            pack, offset, length, size, codec = self._locate(digest)
+            if self._writer is not None and pack == self._writer_pack:
+                self._writer.flush()
+            reader = self._readers.get(pack)
+            if reader is None:
+                reader = open(self._pack_file(pack), 'rb')
+                self._readers[pack] = reader
+            reader.seek(offset)
+            stored = reader.read(length)
+        if len(stored) != length:
+            raise ValueError(f"パックファイルが途中で切れています: {digest}")
+        return stored, size, codec
+
+    def _append(self, digest: str, stored: bytes, size: int, codec: int) -> int:
+        """現在のパックファイルに追記"""
+        writer = self._current_writer()
+        offset = writer.tell()
+        writer.write(stored)
+        self._pending[digest] = (self._writer_pack, offset, len(stored), size, codec)
+        return len(stored)
+
+    def _current_writer(self) -> BinaryIO:
+        """追記先のパックファイル（サイズ上限を超えたら次のパック）"""
+        if self._writer is not None and self._writer.tell() >= self.PACK_SIZE:
+            self._close_writer()
+            self._writer_pack += 1
+        if self._writer is None:
+            if not self._writer_pack:
+                packs = [int(path.stem) for path in self.packs_path.glob("*.pack") if path.stem.isdigit()]
+                self._writer_pack = max(packs, default=1)
+            self._writer = open(self._pack_file(self._writer_pack), 'ab')
+        return self._writer
+
+    def _close_writer(self):
+        """パックファイルをディスクに書き出して閉じる"""
+        if self._writer is not None:
+            self._writer.flush()
+            os.fsync(self._writer.fileno())
+            self._writer.close()
+            self._writer = None
+            reader = self._readers.pop(self._writer_pack, None)
+            if reader is not None:
+                reader.close()
+
+    def _pack_file(self, pack: int) -> Path:
+        """パックファイルのパス"""
+        return self.packs_path / f"{pack:08d}.pack"
+
+    def commit(self):
+        """追記したチャンクをディスクに書き出してから索引に登録"""
+        with self._lock:
+            if self._writer is not None:
+                self._writer.flush()
+                os.fsync(self._writer.fileno())
+            if not self._pending:
+                return
+            with self.connection:
+                self.connection.executemany(
+                    'INSERT OR REPLACE INTO chunks (hash, pack, offset, length, size, codec) VALUES (?, ?, ?, ?, ?, ?)',
+                    [(digest, *location) for digest, location in self._pending.items()]
+                )
+            self._pending.clear()
+
+    # ===== スナップショット =====
+
+    def create_snapshot(self,
+                        snapshot_id: str,
+                        files: Iterable[Tuple[PathLike, str]],
+                        parent_id: Optional[str] = None,
+                        progress: Optional[Any] = None) -> Optional[SnapshotInfo]:
+        """
+        ファイル群のスナップショットを作成
+
+        Args:
+            snapshot_id: スナップショットID
+            files: (ファイルパス, スナップショット内の相対パス) のリスト
+            parent_id: 変更検出に使うスナップショット（Noneの場合は最新）
+            progress: update(file_path, size)とis_cancelledを持つ進捗オブジェクト
+
+        Returns:
+            Optional[SnapshotInfo]: 作成結果（キャンセルされた場合はNone）
+        """
+        with self._lock:
+            if self.connection.execute('SELECT 1 FROM snapshots WHERE snapshot_id = ?',
+                                       (snapshot_id,)).fetchone():
+                raise ValueError(f"スナップショットは既に存在します: {snapshot_id}")
+
+            parent_id = parent_id or self.latest_snapshot()
+            previous = {}
+            if parent_id:
+                previous = {entry['source']: entry for entry in self.load_manifest(parent_id)['files']}
+
+            info = SnapshotInfo(snapshot_id=snapshot_id)
+            entries = []
+            for file_path, relative_path in files:
+                if progress is not None and progress.is_cancelled:
+                    self.commit()
+                    return None
+
+                source = os.path.abspath(file_path)
+                stat = os.stat(source)
+                known = previous.get(source)
+                if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+                    chunks = known['chunks']
+                    info.reused_files += 1
+                else:
+                    chunks = self._store_file(source, info)
+
+                entries.append({
+                    'path': Path(relative_path).as_posix(),
+                    'source': source,
+                    'size': stat.st_size,
+                    'mtime_ns': stat.st_mtime_ns,
+                    'mode': stat.st_mode & 0o7777,
+                    'chunks': chunks,
+                })
+                info.file_count += 1
+                info.total_size += stat.st_size
+                info.chunk_count += len(chunks)
+                if progress is not None:
+                    progress.update(source, stat.st_size)
+
+            # マニフェストより先にチャンクをディスクに書き出す
+            self.commit()
+            manifest = {
+                'snapshot_id': snapshot_id,
+                'created': datetime.now().isoformat(),
+                'parent_id': parent_id,
+                'file_count': info.file_count,
+                'total_size': info.total_size,
+                'files': entries,
+            }
+            manifest_path = self.manifest_path(snapshot_id)
+            temp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+            with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False)
+            os.replace(temp_path, manifest_path)
+            with self.connection:
+                self.connection.execute(
+                    'INSERT INTO snapshots (snapshot_id, created, file_count, total_size) VALUES (?, ?, ?, ?)',
+                    (snapshot_id, manifest['created'], info.file_count, info.total_size)
+                )
+
+            info.manifest_path = str(manifest_path)
+            logger.info(f"スナップショット作成: {snapshot_id} "
+                        f"(ファイル {info.file_count}, 新規チャンク {info.new_chunks}, "
+                        f"書き込み {info.stored_bytes} バイト)")
+            return info
+
+    def _store_file(self, file_path: str, info: SnapshotInfo) -> List[str]:
+        """ファイルをチャンクに分割して格納"""
+        chunks = []
+        with open(file_path, 'rb') as f:
+            for data in self.chunker.iter_chunks(f):
+                digest, written = self.put_chunk(data)
+                chunks.append(digest)
+                if written:
+                    info.new_chunks += 1
+                    info.stored_bytes += written
+        return chunks
+
+    def manifest_path(self, snapshot_id: str) -> Path:
+        """マニフェストのパス"""
+        return self.snapshots_path / f"{snapshot_id}.json.gz"
+
+    def load_manifest(self, snapshot_id: str) -> Dict[str, Any]:
+        """
+        マニフェストを読み込む
+
+        Args:
+            snapshot_id: スナップショットID
+
+        Returns:
+            Dict[str, Any]: マニフェスト
+        """
+        with gzip.open(self.manifest_path(snapshot_id), 'rt', encoding='utf-8') as f:
+            return json.load(f)
+
+    def list_snapshots(self) -> List[str]:
+        """スナップショットIDの一覧（作成順）"""
+        return [row[0] for row in self.connection.execute(
+            'SELECT snapshot_id FROM snapshots ORDER BY created, snapshot_id')]
+
+    def latest_snapshot(self) -> Optional[str]:
+        """最新のスナップショットID"""
+        row = self.connection.execute(
+            'SELECT snapshot_id FROM snapshots ORDER BY created DESC, snapshot_id DESC LIMIT 1'
+        ).fetchone()
+        return row[0] if row else None
+
+    def restore_snapshot(self,
+                         snapshot_id: str,
+                         restore_path: PathLike,
+                         verify: bool = True,
+                         progress: Optional[Any] = None) -> int:
+        """
+        スナップショットを復元
+
+        Args:
+            snapshot_id: スナップショットID
+            restore_path: 復元先ディレクトリ
+            verify: チャンクの内容をハッシュで検証するか
+            progress: update(file_path, size)を持つ進捗オブジェクト
+
+        Returns:
+            int: 復元したファイル数
+        """
+        manifest = self.load_manifest(snapshot_id)
+        restore_dir = Path(restore_path).resolve()
+        restored = 0
+        for entry in manifest['files']:
+            target = (restore_dir / entry['path']).resolve()
+            if restore_dir not in target.parents:
+                raise ValueError(f"復元先の外を指すパスです: {entry['path']}")
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with open(target, 'wb') as f:
+                for digest in entry['chunks']:
+                    f.write(self.read_chunk(digest, verify))
+            os.chmod(target, entry['mode'])
+            os.utime(target, ns=(entry['mtime_ns'], entry['mtime_ns']))
+            restored += 1
+            if progress is not None:
+                progress.update(str(target), entry['size'])
+        logger.info(f"スナップショット復元: {snapshot_id} -> {restore_dir} ({restored}ファイル)")
+        return restored
+
+    def verify_snapshot(self, snapshot_id: str) -> bool:
+        """
+        スナップショットのすべてのチャンクを読み込んで検証
+
+        Args:
+            snapshot_id: スナップショットID
+
+        Returns:
+            bool: すべてのチャンクが揃っていて内容が一致する場合True
+        """
+        try:
+            manifest = self.load_manifest(snapshot_id)
+            checked: Set[str] = set()
+            for entry in manifest['files']:
+                size = 0
+                for digest in entry['chunks']:
+                    if digest in checked:
+                        size += self._locate(digest)[3]
+                        continue
+                    size += len(self.read_chunk(digest, verify=True))
+                    checked.add(digest)
+                if size != entry['size']:
+                    logger.error(f"ファイルサイズが一致しません: {entry['path']}")
+                    return False
+            return True
+        except Exception as e:
+            logger.error(f"スナップショット検証エラー: {e}")
+            return False
+
+    def delete_snapshot(self, snapshot_id: str) -> bool:
+        """
+        スナップショットを削除（チャンクはpruneで回収する）
+
+        Args:
+            snapshot_id: スナップショットID
+
+        Returns:
+            bool: 削除した場合True
+        """
+        with self._lock:
+            manifest_path = self.manifest_path(snapshot_id)
+            existed = manifest_path.exists()
+            if existed:
+                manifest_path.unlink()
+            with self.connection:
+                cursor = self.connection.execute('DELETE FROM snapshots WHERE snapshot_id = ?', (snapshot_id,))
+            return existed or cursor.rowcount > 0
+
+    def prune(self) -> Dict[str, int]:
+        """
+        どのスナップショットからも参照されないチャンクを回収
+
+        参照のないパックは削除し、不要部分が多いパックは必要なチャンクだけを
+        現在のパックに移してから削除する。
+
+        Returns:
+            Dict[str, int]: removed_packs/repacked_packs/removed_chunks/reclaimed_bytes
+        """
+        stats = {'removed_packs': 0, 'repacked_packs': 0, 'removed_chunks': 0, 'reclaimed_bytes': 0}
+        with self._lock:
+            self.commit()
+            live: Set[str] = set()
+            for snapshot_id in self.list_snapshots():
+                for entry in self.load_manifest(snapshot_id)['files']:
+                    live.update(entry['chunks'])
+
+            packs: Dict[int, List[Tuple[str, int]]] = {}
+            for digest, pack, length in self.connection.execute('SELECT hash, pack, length FROM chunks'):
+                packs.setdefault(pack, []).append((digest, length))
+
+            # 移動先は整理対象と重ならない新しいパックにする
+            self._close_writer()
+            existing = [int(path.stem) for path in self.packs_path.glob("*.pack") if path.stem.isdigit()]
+            self._writer_pack = max(existing + list(packs), default=0) + 1
+
+            for pack, chunks in sorted(packs.items()):
+                dead = [(digest, length) for digest, length in chunks if digest not in live]
+                if not dead:
+                    continue
+                pack_size = self._pack_file(pack).stat().st_size if self._pack_file(pack).exists() else 0
+                dead_bytes = sum(length for _, length in dead)
+                if len(dead) < len(chunks) and dead_bytes < pack_size * self.REPACK_RATIO:
+                    continue
+
+                kept = [digest for digest, _ in chunks if digest in live]
+                for digest in kept:
+                    stored, size, codec = self._read_stored(digest)
+                    self._pending.pop(digest, None)
+                    self._append(digest, stored, size, codec)
+                # 移動先を書き出して索引を更新してから元のパックを削除する
+                self.commit()
+                with self.connection:
+                    self.connection.executemany('DELETE FROM chunks WHERE hash = ? AND pack = ?',
+                                                [(digest, pack) for digest, _ in dead])
+                reader = self._readers.pop(pack, None)
+                if reader is not None:
+                    reader.close()
+                self._pack_file(pack).unlink(missing_ok=True)
+
+                stats['removed_packs' if not kept else 'repacked_packs'] += 1
+                stats['removed_chunks'] += len(dead)
+                stats['reclaimed_bytes'] += pack_size - sum(length for digest, length in chunks if digest in live)
+
+        logger.info(f"チャンクストア整理: {stats}")
+        return stats
+
+    def copy_snapshot_to(self, target: 'ChunkStore', snapshot_id: str) -> int:
+        """
+        スナップショットを別のストアへ複製（相手にないチャンクだけを転送）
+
+        Args:
+            target: 複製先のストア
+            snapshot_id: スナップショットID
+
+        Returns:
+            int: 転送した格納バイト数
+        """
+        manifest = self.load_manifest(snapshot_id)
+        transferred = 0
+        with target._lock:
+            for digest in dict.fromkeys(d for entry in manifest['files'] for d in entry['chunks']):
+                if target.has_chunk(digest):
+                    continue
+                stored, size, codec = self._read_stored(digest)
+                transferred += target._append(digest, stored, size, codec)
+            target.commit()
+            manifest_path = target.manifest_path(snapshot_id)
+            temp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+            with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False)
+            os.replace(temp_path, manifest_path)
+            with target.connection:
+                target.connection.execute(
+                    'INSERT OR REPLACE INTO snapshots (snapshot_id, created, file_count, total_size) '
+                    'VALUES (?, ?, ?, ?)',
+                    (snapshot_id, manifest['created'], manifest['file_count'], manifest['total_size'])
+                )
+        return transferred
+
+    def get_statistics(self) -> Dict[str, int]:
+        """ストアの統計情報"""
+        chunks, stored, original = self.connection.execute(
+            'SELECT COUNT(*), COALESCE(SUM(length), 0), COALESCE(SUM(size), 0) FROM chunks'
+        ).fetchone()
+        return {
+            'snapshots': len(self.list_snapshots()),
+            'chunks': chunks,
+            'stored_bytes': stored,
+            'original_bytes': original,
+            'pack_bytes': sum(path.stat().st_size for path in self.packs_path.glob("*.pack")),
+        }
+
+    def close(self):
+        """ファイルと接続を閉じる"""
+        with self._lock:
+            self.commit()
+            self._close_writer()
+            for reader in self._readers.values():
+                reader.close()
+            self._readers.clear()
+            self.connection.close()
@@ -8,26 +8,358 @@ import ast
 import re
 import os
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from bisect import bisect_right
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator, Callable
 from pathlib import Path
 import json
 
+from .tree_sitter_parser import get_tree_sitter_parser
+
+class SourceIndex:
+    """
+    ソースの行頭オフセットを事前計算し、ASTの位置情報から文字列をスライスするクラス
+    
+    ASTのcol_offsetはUTF-8のバイト位置のため、非ASCII行のみ文字位置に変換する
+    """
+    
+    def __init__(self, content: str):
+        """
+        初期化
+        
+        Args:
+            content: ソースコード
+        """
+        self.content = content
+        self.lines = content.split('\n')
+        self.line_offsets = [0] * (len(self.lines) + 1)
+        offset = 0
+        for i, line in enumerate(self.lines):
+            self.line_offsets[i] = offset
+            offset += len(line) + 1
+        self.line_offsets[len(self.lines)] = len(content)
+    
+    def offset(self, lineno: int, col_offset: int) -> int:
+        """
+        行番号（1始まり）とバイト単位の列位置から文字オフセットを取得
+        
+        Args:
+            lineno: 行番号
+            col_offset: UTF-8バイト単位の列位置
+            
+        Returns:
+            int: contentの文字オフセット
+        """
+        index = min(max(lineno - 1, 0), len(self.lines) - 1)
+        line = self.lines[index]
+        if not line.isascii():
+            col_offset = len(line.encode('utf-8')[:col_offset].decode('utf-8', errors='replace'))
+        return self.line_offsets[index] + col_offset
+    
+    def segment(self, node: ast.AST, include_decorators: bool = False) -> str:
+        """
+        ASTノードに対応するソースを取得（ast.get_source_segmentと同じ範囲）
+        
+        Args:
+            node: ASTノード
+            include_decorators: デコレーターを含めるか
+            
+        Returns:
+            str: ソースコード
+        """
+        end_lineno = getattr(node, 'end_lineno', None)
+        end_col_offset = getattr(node, 'end_col_offset', None)
+        if end_lineno is None or end_col_offset is None:
+            return ""
+        
+        start = self.offset(node.lineno, node.col_offset)
+        decorators = getattr(node, 'decorator_list', None)
+        if include_decorators and decorators:
+            first = decorators[0]
+            decorator_start = self.offset(first.lineno, first.col_offset)
+            at_position = self.content.rfind('@', self.line_offsets[first.lineno - 1], decorator_start)
+            start = at_position if at_position >= 0 else decorator_start
+        
+        return self.content[start:self.offset(end_lineno, end_col_offset)]
+    
+    def lines_between(self, line_start: int, line_end: int) -> str:
+        """行範囲（1始まり、両端を含む）のソースを取得"""
+        start = self.line_offsets[max(line_start - 1, 0)]
+        end = self.line_offsets[min(line_end, len(self.lines))]
+        return self.content[start:end].rstrip('\n')
+
+class _PythonChunkVisitor:
+    """
+    Python ASTを1回の走査でチャンクに変換するビジター
+    
+    文（statement）のみを辿り、クラス・関数のスコープを追跡する。
+    関数本体の中の定義は親関数のチャンクに含まれるため個別には出力しない。
+    """
+    
+    # 子の文リストを持つフィールド
+    _BODY_FIELDS = ('body', 'orelse', 'finalbody', 'handlers', 'cases')
+    
+    def __init__(self, parser: 'CodeParser', index: SourceIndex, file_path: str):
+        self.parser = parser
+        self.index = index
+        self.file_path = file_path
+        self.imports: List[ast.AST] = []
+        self.definitions: List[Dict[str, Any]] = []
+    
+    def visit(self, tree: ast.Module):
+        """モジュールを走査"""
+        # (ノード, クラス名のスタック, 関数内か) を深さ優先で処理
+        stack: List[Tuple[ast.AST, Tuple[str, ...], bool]] = [
+            (node, (), False) for node in reversed(tree.body)
+        ]
+        
+        while stack:
+            node, class_scope, in_function = stack.pop()
+            
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                self.imports.append(node)
+                continue
+            
+            if isinstance(node, ast.ClassDef):
+                if not in_function:
+                    self.definitions.append(self._class_chunk(node, class_scope))
+                child_scope = class_scope + (node.name,)
+                child_in_function = in_function
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                if not in_function:
+                    self.definitions.append(self._function_chunk(node, class_scope))
+                child_scope = class_scope
+                child_in_function = True
+            else:
+                child_scope = class_scope
+                child_in_function = in_function
+            
+            children = []
+            for field_name in self._BODY_FIELDS:
+                for child in getattr(node, field_name, None) or ():
+                    if isinstance(child, (ast.excepthandler, getattr(ast, 'match_case', ()))):
+                        children.extend(child.body)
+                    else:
+                        children.append(child)
+            stack.extend((child, child_scope, child_in_function) for child in reversed(children))
+    
+    def _line_start(self, node: ast.AST) -> int:
+        """デコレーターを含めた開始行"""
+        decorators = getattr(node, 'decorator_list', None)
+        return decorators[0].lineno if decorators else node.lineno
+    
+    def _decorators(self, node: ast.AST) -> List[str]:
+        """デコレーターのソース"""
+        return [self.index.segment(decorator) for decorator in node.decorator_list]
+    
+    def _class_chunk(self, node: ast.ClassDef, class_scope: Tuple[str, ...]) -> Dict[str, Any]:
+        """クラスのチャンク"""
+        return {
+            'content': self.index.segment(node, include_decorators=True),
+            'type': 'class',
+            'file_path': self.file_path,
+            'line_start': self._line_start(node),
+            'line_end': node.end_lineno or node.lineno,
+            'function_name': '',
+            'class_name': node.name,
+            'qualified_name': '.'.join(class_scope + (node.name,)),
+            'language': 'python',
+            'docstring': self.parser._extract_docstring(node),
+            'decorators': self._decorators(node)
+        }
+    
+    def _function_chunk(self, node: ast.AST, class_scope: Tuple[str, ...]) -> Dict[str, Any]:
+        """関数・メソッドのチャンク"""
+        return {
+            'content': self.index.segment(node, include_decorators=True),
+            'type': 'method' if class_scope else 'function',
+            'file_path': self.file_path,
+            'line_start': self._line_start(node),
+            'line_end': node.end_lineno or node.lineno,
+            'function_name': node.name,
+            'class_name': class_scope[-1] if class_scope else '',
+            'qualified_name': '.'.join(class_scope + (node.name,)),
+            'language': 'python',
+            'docstring': self.parser._extract_docstring(node),
+            'parameters': [arg.arg for arg in node.args.args],
+            'is_async': isinstance(node, ast.AsyncFunctionDef),
+            'decorators': self._decorators(node)
+        }
+
+def line_offsets(content: str) -> List[int]:
+    """
+    各行の先頭オフセットを計算（split('\n')で行のコピーを作らない）
+    
+    Args:
+        content: テキスト
+        
+    Returns:
+        List[int]: 行頭の文字オフセット（末尾にlen(content)を追加）
+    """
+    offsets = [0]
+    find = content.find
+    position = find('\n')
+    while position != -1:
+        offsets.append(position + 1)
+        position = find('\n', position + 1)
+    offsets.append(len(content) + 1)
+    return offsets
+
+
+class ChunkSplitter:
+    """
+    大きなチャンクを文字オフセットで分割するクラス
+    
+    内容を行に分割・再結合せず、分割位置付近の改行だけをfind/rfind/countで調べて直接スライスする。
+    分割位置は予算内で最も後ろの構文境界（関数・メソッドの開始行など）を優先し、
+    なければ空行、それもなければ行末で分割する。1行が予算を超える場合（minify済み
+    ファイルなど）は行内の空白・区切り文字で分割する。
+    """
+    
+    _BLANK_LINE_PATTERN = re.compile(r'\n[ \t]*\n')
+    _INLINE_BREAK_CHARACTERS = (' ', ';', ',', '}', ')', '>')
+    
+    def __init__(self, max_chunk_size: int = 1000, overlap_size: int = 100,
+                 max_tokens: Optional[int] = None,
+                 count_tokens: Optional[Callable[[str], int]] = None):
+        """
+        初期化
+        
+        Args:
+            max_chunk_size: サブチャンクの最大サイズ（文字数）
+            overlap_size: 前のサブチャンクと重複させる文字数（行単位に切り上げ）
+            max_tokens: サブチャンクの最大トークン数（Noneの場合は文字数のみ）
+            count_tokens: トークン数の計測関数（Noneの場合は共有のTokenCounter）
+        """
+        self.max_chunk_size = max(1, max_chunk_size)
+        self.overlap_size = max(0, overlap_size)
+        self.max_tokens = max_tokens
+        if max_tokens and count_tokens is None:
+            from ..core.token_counter import get_token_counter
+            count_tokens = get_token_counter().count
+        self.count_tokens = count_tokens
+    
+    def iter_split(self, chunk: Dict[str, Any],
+                   boundaries: Optional[Iterable[int]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        チャンクを分割したサブチャンクを順に生成
+        
+        Args:
+            chunk: 分割するチャンク
+            boundaries: 優先する分割位置の行番号（ファイル内の行番号、その行の前で分割）
+            
+        Yields:
+            Dict[str, Any]: サブチャンク
+        """
+        content = chunk['content']
+        length = len(content)
+        line = chunk.get('line_start', 1)
+        boundary_lines = sorted(set(boundaries or ()))
+        
+        metadata = {key: value for key, value in chunk.items() if key != 'content'}
+        start = 0
+        split_index = 0
+        while start < length:
+            end = self._find_split(content, start, line, boundary_lines)
+            
+            sub_chunk = dict(metadata)
+            sub_chunk.update({
+                'content': content[start:end],
+                'line_start': line,
+                'line_end': line + content.count('\n', start, end - 1),
+                'is_split': True,
+                'split_index': split_index
+            })
+            yield sub_chunk
+            split_index += 1
+            
+            if end >= length:
+                break
+            next_start = self._next_start(content, start, end)
+            line += content.count('\n', start, next_start)
+            start = next_start
+    
+    def _find_split(self, content: str, start: int, line: int, boundary_lines: List[int]) -> int:
+        """startから始まるサブチャンクの終了位置を決定"""
+        limit = min(len(content), start + self.max_chunk_size)
+        while True:
+            end = self._best_break(content, start, limit, line, boundary_lines)
+            if not self.max_tokens or end - start <= 1:
+                return end
+            tokens = self.count_tokens(content[start:end])
+            if tokens <= self.max_tokens:
+                return end
+            # トークン数の超過分だけ上限を縮めて分割位置を選び直す
+            limit = start + max(1, min(end - start - 1, (end - start) * self.max_tokens // tokens))
+    
+    def _best_break(self, content: str, start: int, limit: int, line: int, boundary_lines: List[int]) -> int:
+        """予算内で最も適した分割位置"""
+        if limit >= len(content):
+            return len(content)
+        
+        # 予算の半分より前では分割しない（小さすぎるサブチャンクを避ける）
+        minimum = start + (limit - start) // 2
+        
+        # 構文境界（予算内で最も後ろの境界行の先頭）
+        if boundary_lines:
+            limit_line = line + content.count('\n', start, limit)
+            index = bisect_right(boundary_lines, limit_line) - 1
+            if index >= 0 and boundary_lines[index] > line:
+                position = start
+                for _ in range(boundary_lines[index] - line):
+                    position = content.find('\n', position) + 1
+                if minimum < position <= limit:
+                    return position
+        
+        # 空行（空行の直後で分割）
+        blank_end = -1
+        for match in self._BLANK_LINE_PATTERN.finditer(content, minimum, limit):
+            blank_end = match.end()
+        if blank_end > start:
+            return blank_end
+        
+        # 行末
+        newline = content.rfind('\n', start, limit)
+        if newline >= 0:
+            return newline + 1
+        
+        # 1行が予算を超える場合は行内の区切り文字で分割
+        inline = max(content.rfind(char, minimum, limit) for char in self._INLINE_BREAK_CHARACTERS)
+        return inline + 1 if inline >= minimum else limit
+    
+    def _next_start(self, content: str, start: int, end: int) -> int:
+        """オーバーラップを考慮した次のサブチャンクの開始位置"""
+        if not self.overlap_size or content[end - 1] != '\n':
+            return end
+        # 重複範囲を含む行の先頭から開始（前のサブチャンクの開始位置より後ろに限る）
+        overlap_start = content.rfind('\n', start, max(start, end - self.overlap_size)) + 1
+        return overlap_start if start < overlap_start < end else end
+
+
 class CodeParser:
     """
     コードファイルを解析し、検索・LLM処理に適したチャンクに分割するクラス
     """
     
-    def __init__(self, max_chunk_size: int = 1000, overlap_size: int = 100):
+    # tree-sitterで解析する言語（文法が未インストールの場合は正規表現で解析）
+    TREE_SITTER_LANGUAGES = {'javascript', 'typescript', 'java', 'c', 'cpp', 'go', 'rust'}
+    
+    def __init__(self, max_chunk_size: int = 1000, overlap_size: int = 100, use_tree_sitter: bool = True,
+                 max_tokens: Optional[int] = None):
         """
         初期化
         
         Args:
             max_chunk_size: チャンクの最大サイズ（文字数）
             overlap_size: チャンク間のオーバーラップサイズ
+            use_tree_sitter: tree-sitterが利用可能な場合に使用するか
+            max_tokens: チャンクの最大トークン数（Noneの場合は文字数のみで判定）
         """
         self.logger = logging.getLogger(__name__)
         self.max_chunk_size = max_chunk_size
         self.overlap_size = overlap_size
+        self.max_tokens = max_tokens
+        self.splitter = ChunkSplitter(max_chunk_size, overlap_size, max_tokens=max_tokens)
+        self.tree_sitter = get_tree_sitter_parser() if use_tree_sitter else None
         
         # サポートする言語の拡張子
         self.supported_extensions = {
@@ -77,20 +409,9 @@ class CodeParser:
             self.logger.debug(f"ファイル解析開始: {file_path} ({language})")
             
             # 言語別の解析
-            if language == 'python':
-                chunks = self._parse_python(content, file_path)
-            elif language in ['javascript', 'typescript']:
-                chunks = self._parse_javascript(content, file_path)
-            elif language == 'java':
-                chunks = self._parse_java(content, file_path)
-            elif language in ['cpp', 'c']:
-                chunks = self._parse_cpp(content, file_path)
-            elif language == 'markdown':
-                chunks = self._parse_markdown(content, file_path)
-            elif language == 'json':
-                chunks = self._parse_json(content, file_path)
-            else:
-                chunks = self._parse_generic(content, file_path)
+            chunks = self._parse_with_tree_sitter(content, file_path, language)
+            if chunks is None:
+                chunks = self._parse_by_language(content, file_path, language)
             
             # チャンクサイズの調整
             adjusted_chunks = self._adjust_chunk_sizes(chunks)
@@ -112,74 +433,75 @@ class CodeParser:
                 'language': self.supported_extensions.get(Path(file_path).suffix.lower(), 'text')
             }]
     
+    def _parse_by_language(self, content: str, file_path: str, language: str) -> List[Dict[str, Any]]:
+        """言語別の解析（ast・正規表現）"""
+        if language == 'python':
+            return self._parse_python(content, file_path)
+        elif language in ['javascript', 'typescript']:
+            return self._parse_javascript(content, file_path)
+        elif language == 'java':
+            return self._parse_java(content, file_path)
+        elif language in ['cpp', 'c']:
+            return self._parse_cpp(content, file_path)
+        elif language == 'markdown':
+            return self._parse_markdown(content, file_path)
+        elif language == 'json':
+            return self._parse_json(content, file_path)
+        else:
+            return self._parse_generic(content, file_path)
+    
+    def _parse_with_tree_sitter(self, content: str, file_path: str, language: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        tree-sitterで解析（文法が利用できない場合はNone）
+        
+        Args:
+            content: ファイルの内容
+            file_path: ファイルパス
+            language: 言語名
+            
+        Returns:
+            Optional[List[Dict[str, Any]]]: チャンクのリスト
+        """
+        if self.tree_sitter is None or language not in self.TREE_SITTER_LANGUAGES:
+            return None
+        if not self.tree_sitter.supports(language, file_path):
+            return None
+        
+        try:
+            return self.tree_sitter.parse_chunks(content, file_path, language)
+        except Exception as e:
+            self.logger.warning(f"tree-sitter解析エラー {file_path}: {e}")
+            return None
+    
     def _parse_python(self, content: str, file_path: str) -> List[Dict[str, Any]]:
         """Python ファイルの解析"""
         chunks = []
         lines = content.split('\n')
         
         try:
-            # AST を使用した解析
+            # AST を使用した解析（行オフセットを事前計算し、1回の走査でチャンク化）
             tree = ast.parse(content)
-            
-            # インポート文を抽出
-            imports = []
-            for node in ast.walk(tree):
-                if isinstance(node, (ast.Import, ast.ImportFrom)):
-                    import_line = ast.get_source_segment(content, node)
-                    if import_line:
-                        imports.append({
-                            'content': import_line,
-                            'type': 'import',
-                            'line_start': node.lineno,
-                            'line_end': node.end_lineno or node.lineno
-                        })
+            index = SourceIndex(content)
+            visitor = _PythonChunkVisitor(self, index, file_path)
+            visitor.visit(tree)
             
             # インポート文をまとめて1つのチャンクに
+            imports = [node for node in visitor.imports if getattr(node, 'end_lineno', None)]
             if imports:
-                import_content = '\n'.join([imp['content'] for imp in imports])
+                import_content = '\n'.join(index.segment(node) for node in imports)
                 chunks.append({
                     'content': import_content,
                     'type': 'imports',
                     'file_path': file_path,
-                    'line_start': imports[0]['line_start'],
-                    'line_end': imports[-1]['line_end'],
+                    'line_start': imports[0].lineno,
+                    'line_end': imports[-1].end_lineno,
                     'function_name': '',
                     'class_name': '',
                     'language': 'python'
                 })
             
-            # クラスと関数を抽出
-            for node in ast.walk(tree):
-                if isinstance(node, ast.ClassDef):
-                    class_content = self._extract_node_content(content, node)
-                    chunks.append({
-                        'content': class_content,
-                        'type': 'class',
-                        'file_path': file_path,
-                        'line_start': node.lineno,
-                        'line_end': node.end_lineno or node.lineno,
-                        'function_name': '',
-                        'class_name': node.name,
-                        'language': 'python',
-                        'docstring': self._extract_docstring(node)
-                    })
-                    
-                elif isinstance(node, ast.FunctionDef):
-                    # トップレベルの関数のみ（クラス内メソッドは除く）
-                    if self._is_top_level_function(tree, node):
-                        func_content = self._extract_node_content(content, node)
-                        chunks.append({
-                            'content': func_content,
-                            'type': 'function',
-                            'file_path': file_path,
-                            'line_start': node.lineno,
-                            'line_end': node.end_lineno or node.lineno,
-                            'function_name': node.name,
-                            'class_name': '',
-                            'language': 'python',
-                            'docstring': self._extract_docstring(node),
-                            'parameters': [arg.arg for arg in node.args.args]
-                        })
+            # クラス・メソッド・関数（async含む）
+            chunks.extend(visitor.definitions)
             
         except SyntaxError as e:
             self.logger.warning(f"Python構文エラー {file_path}: {e}")
@@ -488,36 +810,39 @@ class CodeParser:
     
     def _parse_generic(self, content: str, file_path: str) -> List[Dict[str, Any]]:
         """汎用ファイルの解析（行ベース分割）"""
-        lines = content.split('\n')
+        offsets = line_offsets(content)
+        line_count = len(offsets) - 1
         chunks = []
         
         # 行数が少ない場合は全体を1つのチャンクに
-        if len(lines) <= 50:
+        if line_count <= 50:
             return [self._create_fallback_chunk(content, file_path, 'text')]
         
         # 行ベースでチャンクを作成
         chunk_size = max(20, self.max_chunk_size // 50)  # 文字数をおおよその行数に変換
         
-        for i in range(0, len(lines), chunk_size):
-            chunk_lines = lines[i:i + chunk_size]
-            chunk_content = '\n'.join(chunk_lines)
+        for i in range(0, line_count, chunk_size):
+            end_line = min(i + chunk_size, line_count)
+            # 末尾の改行を含めない（行を'\n'で結合した場合と同じ内容）
+            chunk_content = content[offsets[i]:offsets[end_line] - 1]
             
             chunks.append({
                 'content': chunk_content,
                 'type': 'text_block',
                 'file_path': file_path,
                 'line_start': i + 1,
-                'line_end': min(i + chunk_size, len(lines)),
+                'line_end': end_line,
                 'function_name': '',
                 'class_name': '',
                 'language': 'text'
             })
         
         return chunks
-    def _extract_node_content(self, content: str, node: ast.AST) -> str:
+    
+    def _extract_node_content(self, content: str, node: ast.AST, index: Optional[SourceIndex] = None) -> str:
         """ASTノードから対応するソースコードを抽出"""
         try:
-            return ast.get_source_segment(content, node) or ""
+            return (index or SourceIndex(content)).segment(node)
         except Exception:
             # フォールバック: 行番号ベースで抽出
             lines = content.split('\n')
@@ -584,49 +909,43 @@ class CodeParser:
     
     def _adjust_chunk_sizes(self, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """チャンクサイズを調整"""
-        adjusted_chunks = []
+        return list(self.iter_adjusted_chunks(chunks))
+    
+    def iter_adjusted_chunks(self, chunks: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        チャンクサイズを調整したチャンクを順に生成（大きなチャンクは遅延分割）
         
+        Args:
+            chunks: 同じファイルのチャンクのリスト
+            
+        Yields:
+            Dict[str, Any]: チャンク
+        """
+        boundaries = None
         for chunk in chunks:
-            content = chunk['content']
+            if not self._exceeds_budget(chunk['content']):
+                yield chunk
+                continue
             
-            # チャンクが大きすぎる場合は分割
-            if len(content) > self.max_chunk_size:
-                sub_chunks = self._split_large_chunk(chunk)
-                adjusted_chunks.extend(sub_chunks)
-            else:
-                adjusted_chunks.append(chunk)
-        
-        return adjusted_chunks
+            # 他のチャンク（メソッド等）の開始・終了行を構文境界として分割位置に優先する
+            if boundaries is None:
+                boundaries = set()
+                for other in chunks:
+                    if other.get('type') not in ('imports', 'includes'):
+                        boundaries.add(other.get('line_start', 0))
+                        boundaries.add(other.get('line_end', 0) + 1)
+            yield from self.splitter.iter_split(chunk, boundaries)
+    
+    def _exceeds_budget(self, content: str) -> bool:
+        """チャンクが文字数・トークン数の上限を超えるか"""
+        if len(content) > self.max_chunk_size:
+            return True
+        return bool(self.max_tokens) and self.splitter.count_tokens(content) > self.max_tokens
     
-    def _split_large_chunk(self, chunk: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _split_large_chunk(self, chunk: Dict[str, Any],
+                           boundaries: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
         """大きなチャンクを分割"""
-        content = chunk['content']
-        lines = content.split('\n')
-        sub_chunks = []
-        
-        # 行ベースで分割
-        lines_per_chunk = max(10, self.max_chunk_size // 80)  # 1行平均80文字と仮定
-        
-        for i in range(0, len(lines), lines_per_chunk):
-            # オーバーラップを考慮
-            start_idx = max(0, i - self.overlap_size // 80) if i > 0 else 0
-            end_idx = min(len(lines), i + lines_per_chunk)
-            
-            sub_content = '\n'.join(lines[start_idx:end_idx])
-            
-            # 元のチャンク情報をコピーして更新
-            sub_chunk = chunk.copy()
-            sub_chunk.update({
-                'content': sub_content,
-                'line_start': chunk['line_start'] + start_idx,
-                'line_end': chunk['line_start'] + end_idx - 1,
-                'is_split': True,
-                'split_index': len(sub_chunks)
-            })
-            
-            sub_chunks.append(sub_chunk)
-        
-        return sub_chunks
+        return list(self.splitter.iter_split(chunk, boundaries))
     
     def _create_fallback_chunk(self, content: str, file_path: str, language: str) -> Dict[str, Any]:
         """フォールバック用のチャンクを作成"""
@@ -0,0 +1,360 @@
+# src/utils/delta_sync.py
+"""
+差分同期ユーティリティ
+チャンクのハッシュを比較し、同期先に存在しないブロックだけを書き込むrsync方式のファイル同期を提供する
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from ..core.logger import get_logger
+from .chunk_store import ContentDefinedChunker, chunk_hash
+from .parallel_compress import resolve_workers
+
+logger = get_logger(__name__)
+
+PathLike = Union[str, os.PathLike]
+
+# 書き込み・コピーの単位
+COPY_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+@dataclass
+class SyncStats:
+    """同期結果"""
+    files: int = 0
+    skipped_files: int = 0
+    appended_files: int = 0
+    total_bytes: int = 0
+    written_bytes: int = 0
+    reused_bytes: int = 0
+
+    def add(self, other: 'SyncStats'):
+        """集計に加える"""
+        for name, value in asdict(other).items():
+            setattr(self, name, getattr(self, name) + value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書形式に変換"""
+        return asdict(self)
+
+
+@dataclass
+class _FileSignature:
+    """同期先ファイルの署名（チャンクのハッシュと長さ）"""
+    size: int
+    mtime_ns: int
+    chunks: List[Tuple[str, int]]
+
+
+def _copy_range(source_fd: int, target_fd: int, offset: int, length: int, target_offset: int):
+    """ファイル間で範囲をコピー（可能ならcopy_file_rangeでカーネル・サーバー側コピー）"""
+    copy_file_range = getattr(os, 'copy_file_range', None)
+    while length > 0:
+        if copy_file_range is not None:
+            try:
+                copied = copy_file_range(source_fd, target_fd, min(length, COPY_BLOCK_SIZE),
+                                         offset, target_offset)
+            except OSError:
+                copy_file_range = None
+                continue
+            if copied == 0:
+                raise IOError("コピー元ファイルが途中で切れています")
+        else:
+            data = os.pread(source_fd, min(length, COPY_BLOCK_SIZE), offset)
+            if not data:
+                raise IOError("コピー元ファイルが途中で切れています")
+            copied = os.pwrite(target_fd, data, target_offset)
+        offset += copied
+        target_offset += copied
+        length -= copied
+
+
+class DeltaSync:
+    """
+    差分同期クラス
+
+    同期先に書き込んだファイルのチャンク署名を同期先ディレクトリのSQLiteに記録する。
+    同期元のファイルをコンテンツ定義チャンクに分割して署名と比較し、
+    - 署名と同じ内容なら何もしない
+    - 同期先の旧版が先頭一致する場合（追記されたファイル）は末尾だけを追記する
+    - それ以外は同期先の既存チャンクをcopy_file_rangeで流用し、ないチャンクだけを書き込む
+    同期元から書き込むチャンクは書き込み時にハッシュを照合する。
+    """
+
+    INDEX_FILE = ".delta_sync.db"
+    TEMP_SUFFIX = ".delta-tmp"
+
+    def __init__(self,
+                 target_root: PathLike,
+                 chunker: Optional[ContentDefinedChunker] = None,
+                 workers: Optional[int] = None):
+        """
+        初期化
+
+        Args:
+            target_root: 同期先ディレクトリ
+            chunker: チャンク分割器
+            workers: 同時に同期するファイル数（Noneの場合はCPU数）
+        """
+        self.target_root = Path(target_root)
+        self.target_root.mkdir(parents=True, exist_ok=True)
+        self.chunker = chunker or ContentDefinedChunker()
+        self.workers = resolve_workers(workers)
+        self._lock = threading.RLock()
+
+        self.connection = sqlite3.connect(str(self.target_root / self.INDEX_FILE), check_same_thread=False)
+        with self.connection:
+            self.connection.execute('''
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    chunks TEXT NOT NULL
+                )
+            ''')
+
+        # 署名とチャンクの所在（ハッシュ -> (パス, 位置, 長さ)）をメモリに保持
+        self._signatures: Dict[str, _FileSignature] = {}
+        self._locations: Dict[str, Tuple[str, int, int]] = {}
+        for path, size, mtime_ns, chunks in self.connection.execute('SELECT path, size, mtime_ns, chunks FROM files'):
+            self._register(path, _FileSignature(size, mtime_ns, [tuple(chunk) for chunk in json.loads(chunks)]))
+
+    def _register(self, path: str, signature: _FileSignature):
+        """署名とチャンクの所在を登録"""
+        self._unregister(path)
+        self._signatures[path] = signature
+        offset = 0
+        for digest, length in signature.chunks:
+            self._locations.setdefault(digest, (path, offset, length))
+            offset += length
+
+    def _unregister(self, path: str):
+        """署名とチャンクの所在を削除"""
+        signature = self._signatures.pop(path, None)
+        if signature is None:
+            return
+        for digest, _ in signature.chunks:
+            location = self._locations.get(digest)
+            if location is not None and location[0] == path:
+                del self._locations[digest]
+
+    def _valid_signature(self, relative_path: str) -> Optional[_FileSignature]:
+        """同期先のファイルが署名を記録した時点から変わっていなければ署名を返す"""
+        with self._lock:
+            signature = self._signatures.get(relative_path)
+        if signature is None:
+            return None
+        try:
+            stat = os.stat(self.target_root / relative_path)
+        except OSError:
+            return None
+        if stat.st_size != signature.size or stat.st_mtime_ns != signature.mtime_ns:
+            return None
+        return signature
+
+    def _signature_of(self, source: Path) -> List[Tuple[str, int]]:
+        """同期元ファイルのチャンク署名"""
+        with open(source, 'rb') as f:
+            return [(chunk_hash(data), len(data)) for data in self.chunker.iter_chunks(f)]
+
+    # ===== 同期 =====
+
+    def sync_file(self, source: PathLike, relative_path: str) -> SyncStats:
+        """
+        ファイルを同期
+
+        Args:
+            source: 同期元ファイル
+            relative_path: 同期先ディレクトリ内のパス
+
+        Returns:
+            SyncStats: 同期結果
+        """
+        source = Path(source)
+        relative_path = Path(relative_path).as_posix()
+        target = self.target_root / relative_path
+        stats = SyncStats(files=1)
+        stat = os.stat(source)
+        stats.total_bytes = stat.st_size
+
+        current = self._valid_signature(relative_path)
+        if current is not None and current.size == stat.st_size and current.mtime_ns == stat.st_mtime_ns:
+            stats.skipped_files = 1
+            return stats
+
+        chunks = self._signature_of(source)
+        if current is not None and current.chunks == chunks:
+            # 内容が同じで更新時刻だけが異なる
+            os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            stats.skipped_files = 1
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            prefix = self._common_prefix(current, chunks)
+            if prefix:
+                self._append(source, target, chunks, prefix, stats)
+            else:
+                self._rebuild(source, target, chunks, stats)
+            os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        signature = _FileSignature(stat.st_size, os.stat(target).st_mtime_ns, chunks)
+        with self._lock:
+            with self.connection:
+                self.connection.execute(
+                    'INSERT OR REPLACE INTO files (path, size, mtime_ns, chunks) VALUES (?, ?, ?, ?)',
+                    (relative_path, signature.size, signature.mtime_ns, json.dumps(chunks))
+                )
+            self._register(relative_path, signature)
+        return stats
+
+    def _common_prefix(self, current: Optional[_FileSignature], chunks: List[Tuple[str, int]]) -> int:
+        """
+        同期先の旧版を残して追記できる場合、残すチャンク数を返す
+
+        旧版の最後のチャンクはファイル末尾で切られているため比較から除く。
+        """
+        if current is None or len(current.chunks) < 2:
+            return 0
+        keep = len(current.chunks) - 1
+        if chunks[:keep] != current.chunks[:keep]:
+            return 0
+        return keep
+
+    def _write_from_source(self, source_file, target_fd: int, chunks: List[Tuple[str, int]],
+                           offset: int, target_offset: int, stats: SyncStats) -> int:
+        """同期元のチャンクを読み込み、ハッシュを照合して書き込む"""
+        for digest, length in chunks:
+            source_file.seek(offset)
+            data = source_file.read(length)
+            if len(data) != length or chunk_hash(data) != digest:
+                raise ValueError("同期中に同期元ファイルが変更されました")
+            view = memoryview(data)
+            while view:
+                written = os.pwrite(target_fd, view, target_offset)
+                view = view[written:]
+                target_offset += written
+            offset += length
+            stats.written_bytes += length
+        return target_offset
+
+    def _append(self, source: Path, target: Path, chunks: List[Tuple[str, int]],
+                keep: int, stats: SyncStats):
+        """同期先の先頭部分を残し、以降を同期元から書き込む"""
+        prefix_size = sum(length for _, length in chunks[:keep])
+        with open(source, 'rb') as source_file, open(target, 'r+b') as target_file:
+            target_file.truncate(prefix_size)
+            end = self._write_from_source(source_file, target_file.fileno(), chunks[keep:],
+                                          prefix_size, prefix_size, stats)
+            target_file.truncate(end)
+            os.fsync(target_file.fileno())
+        stats.appended_files = 1
+        stats.reused_bytes += prefix_size
+
+    def _rebuild(self, source: Path, target: Path, chunks: List[Tuple[str, int]], stats: SyncStats):
+        """同期先の既存チャンクと同期元のチャンクから一時ファイルを作って置き換える"""
+        temp = target.with_name(f".{target.name}{self.TEMP_SUFFIX}")
+        basis_files: Dict[str, Optional[int]] = {}
+        try:
+            with open(source, 'rb') as source_file, open(temp, 'wb') as temp_file:
+                fd = temp_file.fileno()
+                source_offset = 0
+                target_offset = 0
+                for index, (digest, length) in enumerate(chunks):
+                    basis_fd, basis_offset = self._basis(digest, length, basis_files)
+                    if basis_fd is not None:
+                        _copy_range(basis_fd, fd, basis_offset, length, target_offset)
+                        stats.reused_bytes += length
+                        target_offset += length
+                    else:
+                        target_offset = self._write_from_source(
+                            source_file, fd, chunks[index:index + 1], source_offset, target_offset, stats
+                        )
+                    source_offset += length
+                os.fsync(fd)
+            os.replace(temp, target)
+        except Exception:
+            temp.unlink(missing_ok=True)
+            raise
+        finally:
+            for basis_fd in basis_files.values():
+                if basis_fd is not None:
+                    os.close(basis_fd)
+
+    def _basis(self, digest: str, length: int,
+               basis_files: Dict[str, Optional[int]]) -> Tuple[Optional[int], int]:
+        """同期先に同じチャンクがあれば、そのファイル記述子と位置を返す"""
+        with self._lock:
+            location = self._locations.get(digest)
+        if location is None or location[2] != length:
+            return None, 0
+        path, offset, _ = location
+        if path not in basis_files:
+            basis_files[path] = None
+            if self._valid_signature(path) is not None:
+                try:
+                    basis_files[path] = os.open(self.target_root / path, os.O_RDONLY)
+                except OSError:
+                    pass
+        return basis_files[path], offset
+
+    def sync_files(self, files: Iterable[Tuple[PathLike, str]]) -> SyncStats:
+        """
+        複数のファイルを並行して同期
+
+        Args:
+            files: (同期元ファイル, 同期先ディレクトリ内のパス) のリスト
+
+        Returns:
+            SyncStats: 同期結果の合計
+        """
+        total = SyncStats()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="delta-sync") as executor:
+            for stats in executor.map(lambda item: self.sync_file(*item), files):
+                total.add(stats)
+        logger.info(f"差分同期が完了しました: {total.to_dict()}")
+        return total
+
+    def sync_tree(self, source_dir: PathLike, relative_dir: str = "") -> SyncStats:
+        """
+        ディレクトリ以下のファイルを同期
+
+        Args:
+            source_dir: 同期元ディレクトリ
+            relative_dir: 同期先ディレクトリ内の配置先
+
+        Returns:
+            SyncStats: 同期結果の合計
+        """
+        source_dir = Path(source_dir)
+        files = []
+        for path in sorted(source_dir.rglob('*')):
+            if path.is_file() and path.name != self.INDEX_FILE and not path.name.endswith(self.TEMP_SUFFIX):
+                files.append((path, (Path(relative_dir) / path.relative_to(source_dir)).as_posix()))
+        return self.sync_files(files)
+
+    def forget(self, relative_path: str):
+        """
+        同期先から削除したファイルの署名を削除
+
+        Args:
+            relative_path: 同期先ディレクトリ内のパス（ディレクトリの場合は配下すべて）
+        """
+        relative_path = Path(relative_path).as_posix()
+        with self._lock:
+            paths = [path for path in self._signatures
+                     if path == relative_path or path.startswith(relative_path + "/")]
+            with self.connection:
+                self.connection.executemany('DELETE FROM files WHERE path = ?', [(path,) for path in paths])
+            for path in paths:
+                self._unregister(path)
+
+    def close(self):
+        """接続を閉じる"""
+        with self._lock:
+            self.connection.close()
@@ -0,0 +1,175 @@
+# src/utils/dir_scanner.py
+"""
+ディレクトリ走査ユーティリティ
+os.scandirによる高速なファイル列挙を各ファイルサービスで共有する
+"""
+
+import fnmatch
+import logging
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, os.PathLike]
+
+
+class DirectoryScanner:
+    """
+    os.scandirによるディレクトリ走査クラス
+
+    os.DirEntryをそのまま返すため、種別判定はreaddirの結果を使い、stat()は
+    呼び出し側が必要とした場合に1回だけ実行される（DirEntryがキャッシュする）。
+    除外ディレクトリは読み込む前に枝刈りし、max_workers > 1の場合は
+    サブディレクトリをスレッドで並列に走査する（出力順は不定）。
+    """
+
+    def __init__(self,
+                 exclude_dirs: Optional[Iterable[str]] = None,
+                 include_hidden: bool = True,
+                 follow_symlinks: bool = False,
+                 max_workers: int = 1,
+                 dir_filter: Optional[Callable[[os.DirEntry], bool]] = None):
+        """
+        初期化
+
+        Args:
+            exclude_dirs: 走査しないディレクトリ名
+            include_hidden: '.'で始まるファイル・ディレクトリを含めるか
+            follow_symlinks: シンボリックリンクのディレクトリ配下も走査するか
+            max_workers: 並列走査のスレッド数（1の場合は逐次走査）
+            dir_filter: Falseを返したディレクトリを枝刈りする追加条件
+        """
+        self.exclude_dirs = frozenset(exclude_dirs or ())
+        self.include_hidden = include_hidden
+        self.follow_symlinks = follow_symlinks
+        self.max_workers = max(1, max_workers)
+        self.dir_filter = dir_filter
+
+    def scan(self,
+             root: PathLike,
+             recursive: bool = True,
+             include_files: bool = True,
+             include_dirs: bool = False,
+             pattern: Optional[str] = None,
+             case_sensitive: Optional[bool] = None,
+             max_depth: Optional[int] = None) -> Iterator[os.DirEntry]:
+        """
+        ディレクトリ配下のエントリを列挙
+
+        Args:
+            root: 走査するディレクトリ
+            recursive: サブディレクトリも走査するか
+            include_files: ファイルを返すか
+            include_dirs: ディレクトリを返すか
+            pattern: 名前のfnmatchパターン（走査範囲には影響しない）
+            case_sensitive: パターンの大文字小文字を区別するか（Noneの場合はOSの規則）
+            max_depth: 走査する深さの上限（rootの直下が0）
+
+        Yields:
+            os.DirEntry: エントリ
+        """
+        matcher = self._compile_pattern(pattern, case_sensitive)
+        if not recursive:
+            max_depth = 0
+
+        if self.max_workers > 1 and max_depth != 0:
+            yield from self._scan_parallel(root, include_files, include_dirs, matcher, max_depth)
+            return
+
+        stack: List[Tuple[PathLike, int]] = [(root, 0)]
+        while stack:
+            path, depth = stack.pop()
+            entries, subdirs = self._scan_directory(path, depth, include_files, include_dirs,
+                                                    matcher, max_depth)
+            yield from entries
+            # 名前順に近い順序で処理されるよう逆順に積む
+            stack.extend((subdir, depth + 1) for subdir in reversed(subdirs))
+
+    def total_size(self, root: PathLike) -> int:
+        """
+        ディレクトリ配下のファイルサイズの合計
+
+        Args:
+            root: 走査するディレクトリ
+
+        Returns:
+            int: 合計サイズ（バイト）
+        """
+        total = 0
+        for entry in self.scan(root):
+            try:
+                total += entry.stat().st_size
+            except OSError:
+                continue
+        return total
+
+    def _scan_parallel(self, root: PathLike, include_files: bool, include_dirs: bool,
+                       matcher: Optional[Callable[[str], bool]],
+                       max_depth: Optional[int]) -> Iterator[os.DirEntry]:
+        """サブディレクトリ単位でスレッドに分配して走査"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            def submit(path, depth):
+                return executor.submit(self._scan_directory, path, depth, include_files,
+                                       include_dirs, matcher, max_depth)
+
+            pending = {submit(root, 0): 0}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    depth = pending.pop(future)
+                    entries, subdirs = future.result()
+                    for subdir in subdirs:
+                        pending[submit(subdir, depth + 1)] = depth + 1
+                    yield from entries
+
+    def _scan_directory(self, path: PathLike, depth: int, include_files: bool, include_dirs: bool,
+                        matcher: Optional[Callable[[str], bool]],
+                        max_depth: Optional[int]) -> Tuple[List[os.DirEntry], List[str]]:
+        """1ディレクトリを読み込み、返すエントリと走査するサブディレクトリに分ける"""
+        entries: List[os.DirEntry] = []
+        subdirs: List[str] = []
+        descend = max_depth is None or depth < max_depth
+
+        try:
+            with os.scandir(path) as iterator:
+                for entry in iterator:
+                    name = entry.name
+                    if not self.include_hidden and name.startswith('.'):
+                        continue
+
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+
+                    if is_dir:
+                        if name in self.exclude_dirs:
+                            continue
+                        if self.dir_filter is not None and not self.dir_filter(entry):
+                            continue
+                        if include_dirs and (matcher is None or matcher(name)):
+                            entries.append(entry)
+                        if descend and (self.follow_symlinks or not entry.is_symlink()):
+                            subdirs.append(entry.path)
+                    elif include_files and (matcher is None or matcher(name)):
+                        entries.append(entry)
+        except OSError as e:
+            # 権限がない・走査中に削除されたディレクトリはos.walkと同様に無視する
+            logger.debug(f"ディレクトリ走査スキップ {path}: {e}")
+
+        return entries, subdirs
+
+    @staticmethod
+    def _compile_pattern(pattern: Optional[str],
+                         case_sensitive: Optional[bool]) -> Optional[Callable[[str], bool]]:
+        """fnmatchパターンを一度だけ正規表現に変換"""
+        if not pattern or pattern in ('*', '**'):
+            return None
+        if case_sensitive is None:
+            case_sensitive = os.path.normcase('A') == 'A'
+        flags = 0 if case_sensitive else re.IGNORECASE
+        return re.compile(fnmatch.translate(pattern), flags).match
+
@@ -4,12 +4,14 @@
 データ暗号化・復号化に関する共通機能を提供
 """
 
+import io
 import os
 import base64
 import hashlib
 import re
 import secrets
-from typing import Optional, Union, Tuple, Dict, Any
+import struct
+from typing import Optional, Union, Tuple, Dict, Any, BinaryIO
 from dataclasses import dataclass
 from enum import Enum
 import json
@@ -20,12 +22,15 @@ try:
     from cryptography.hazmat.primitives import hashes, serialization
     from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
     from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
     from cryptography.hazmat.backends import default_backend
+    from cryptography.exceptions import InvalidTag
     CRYPTOGRAPHY_AVAILABLE = True
 except ImportError:
     CRYPTOGRAPHY_AVAILABLE = False
 
 from ..core.logger import get_logger
+from .hash_service import get_hash_service
 
 
 class EncryptionMethod(Enum):
@@ -33,6 +38,7 @@ class EncryptionMethod(Enum):
     FERNET = "fernet"
     AES_256_GCM = "aes_256_gcm"
     AES_256_CBC = "aes_256_cbc"
+    AES_256_GCM_STREAM = "aes_256_gcm_stream"
 
 
 @dataclass
@@ -54,6 +60,215 @@ class KeyInfo:
     method: str
 
 
+# ストリーム暗号化形式
+# ヘッダー: マジック(8) + セグメントサイズ(4) + 反復回数(4) + ソルト(16) + ノンス接頭辞(7)
+# 本体: セグメント毎のAES-256-GCM暗号文（平文 segment_size バイト + タグ16バイト）
+# ノンスは 接頭辞(7) + セグメント番号(4) + 最終フラグ(1) で、ヘッダーを追加認証データとする。
+# 最終セグメントだけが segment_size 未満（0バイトも可）で最終フラグ付きのため、
+# セグメントの並べ替え・削除・末尾の切り詰めは認証エラーになる。
+STREAM_MAGIC = b"LCAEGCM1"
+STREAM_SEGMENT_SIZE = 1024 * 1024
+_STREAM_HEADER = struct.Struct('>8sII16s7s')
+_STREAM_TAG_SIZE = 16
+
+
+def _stream_nonce(prefix: bytes, index: int, final: bool) -> bytes:
+    """セグメントのノンス"""
+    return prefix + struct.pack('>IB', index, 1 if final else 0)
+
+
+class EncryptedStreamWriter:
+    """
+    ストリーム暗号化書き込みクラス
+
+    書き込まれたデータをセグメント単位でAES-256-GCM暗号化して出力する。
+    保持するのは1セグメント分のバッファのみ。
+    """
+
+    def __init__(self, raw: BinaryIO, key: bytes, salt: bytes, iterations: int,
+                 segment_size: int = STREAM_SEGMENT_SIZE):
+        """
+        初期化
+
+        Args:
+            raw: 出力先（closeで閉じる）
+            key: 256ビットの鍵
+            salt: 鍵導出のソルト（ヘッダーに記録）
+            iterations: 鍵導出の反復回数（ヘッダーに記録）
+            segment_size: セグメントの平文サイズ
+        """
+        self.raw = raw
+        self.segment_size = segment_size
+        self._aead = AESGCM(key)
+        self._nonce_prefix = os.urandom(7)
+        self.header = _STREAM_HEADER.pack(STREAM_MAGIC, segment_size, iterations, salt, self._nonce_prefix)
+        self.raw.write(self.header)
+        self._buffer = bytearray()
+        self._index = 0
+        self._size = 0
+        self.closed = False
+
+    def __enter__(self) -> 'EncryptedStreamWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, data: bytes) -> int:
+        """
+        データを書き込む
+
+        Args:
+            data: 平文
+
+        Returns:
+            int: 書き込んだバイト数
+        """
+        self._buffer += data
+        self._size += len(data)
+        # 最終セグメントはsegment_size未満にするため、ちょうど1セグメント分は残しておく
+        while len(self._buffer) > self.segment_size:
+            self._write_segment(bytes(self._buffer[:self.segment_size]), final=False)
+            del self._buffer[:self.segment_size]
+        return len(data)
+
+    def _write_segment(self, plaintext: bytes, final: bool):
+        nonce = _stream_nonce(self._nonce_prefix, self._index, final)
+        self.raw.write(self._aead.encrypt(nonce, plaintext, self.header))
+        self._index += 1
+
+    def tell(self) -> int:
+        return self._size
+
+    def flush(self):
+        self.raw.flush()
+
+    def close(self):
+        """最終セグメントを書き込んで閉じる"""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            if len(self._buffer) == self.segment_size:
+                self._write_segment(bytes(self._buffer), final=False)
+                self._buffer.clear()
+            self._write_segment(bytes(self._buffer), final=True)
+            self._buffer.clear()
+        finally:
+            self.raw.close()
+
+
+class EncryptedStreamReader(io.RawIOBase):
+    """
+    ストリーム暗号化読み込みクラス
+
+    セグメントを必要になった時点で復号・認証する。シークできるため、
+    zipfile・tarfileに復号済みの一時ファイルなしで直接渡せる。
+    """
+
+    def __init__(self, raw: BinaryIO, key: bytes):
+        """
+        初期化
+
+        Args:
+            raw: シーク可能な暗号化データ（closeで閉じる）
+            key: 256ビットの鍵
+        """
+        super().__init__()
+        self.raw = raw
+        self.raw.seek(0)
+        self.header = self.raw.read(_STREAM_HEADER.size)
+        _, self.segment_size, _, _, self._nonce_prefix = parse_stream_header(self.header)
+        self._aead = AESGCM(key)
+
+        # 暗号文のサイズから平文のサイズを求める
+        body = self.raw.seek(0, io.SEEK_END) - _STREAM_HEADER.size
+        stride = self.segment_size + _STREAM_TAG_SIZE
+        self._segments = max(1, -(-body // stride))
+        last = body - (self._segments - 1) * stride
+        if last < _STREAM_TAG_SIZE or last - _STREAM_TAG_SIZE >= self.segment_size:
+            raise ValueError("暗号化データが途中で切れています")
+        self.size = (self._segments - 1) * self.segment_size + last - _STREAM_TAG_SIZE
+
+        self._position = 0
+        self._cached_index = -1
+        self._cached = b''
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"無効なwhenceです: {whence}")
+        if position < 0:
+            raise ValueError("負の位置にはシークできません")
+        self._position = position
+        return position
+
+    def _segment(self, index: int) -> bytes:
+        """セグメントを復号（直前のセグメントはキャッシュ）"""
+        if index != self._cached_index:
+            stride = self.segment_size + _STREAM_TAG_SIZE
+            self.raw.seek(_STREAM_HEADER.size + index * stride)
+            ciphertext = self.raw.read(stride)
+            final = index == self._segments - 1
+            try:
+                self._cached = self._aead.decrypt(
+                    _stream_nonce(self._nonce_prefix, index, final), ciphertext, self.header
+                )
+            except InvalidTag:
+                raise ValueError("暗号化データの認証に失敗しました（パスワードの誤りまたは改ざん）")
+            self._cached_index = index
+        return self._cached
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer).cast('B')
+        filled = 0
+        while filled < len(view) and self._position < self.size:
+            index, offset = divmod(self._position, self.segment_size)
+            segment = self._segment(index)
+            length = min(len(view) - filled, len(segment) - offset)
+            view[filled:filled + length] = segment[offset:offset + length]
+            filled += length
+            self._position += length
+        return filled
+
+    def close(self):
+        if not self.closed:
+            self.raw.close()
+        super().close()
+
+
+def parse_stream_header(header: bytes) -> Tuple[bytes, int, int, bytes, bytes]:
+    """
+    ストリーム暗号化のヘッダーを解析
+
+    Args:
+        header: ファイル先頭のバイト列
+
+    Returns:
+        Tuple[bytes, int, int, bytes, bytes]: マジック、セグメントサイズ、反復回数、ソルト、ノンス接頭辞
+    """
+    if len(header) < _STREAM_HEADER.size or not header.startswith(STREAM_MAGIC):
+        raise ValueError("ストリーム暗号化形式ではありません")
+    fields = _STREAM_HEADER.unpack(header[:_STREAM_HEADER.size])
+    if fields[1] <= 0:
+        raise ValueError("無効なセグメントサイズです")
+    return fields
+
+
 class EncryptionUtils:
     """暗号化ユーティリティクラス"""
     
@@ -378,6 +593,15 @@ class EncryptionUtils:
             else:
                 output_path = Path(output_path)
             
+            if method == EncryptionMethod.AES_256_GCM_STREAM:
+                # セグメント単位で暗号化（ファイル全体をメモリに読み込まない）
+                with open(file_path, 'rb') as source, \
+                        self.open_encrypted_writer(output_path, password) as writer:
+                    while block := source.read(STREAM_SEGMENT_SIZE):
+                        writer.write(block)
+                self.logger.info(f"ファイルを暗号化しました: {file_path} -> {output_path}")
+                return output_path
+            
             # ファイルを読み込み
             with open(file_path, 'rb') as f:
                 file_data = f.read()
@@ -409,6 +633,26 @@ class EncryptionUtils:
             if not encrypted_file_path.exists():
                 raise FileNotFoundError(f"暗号化ファイルが見つかりません: {encrypted_file_path}")
             
+            if self.is_stream_encrypted(encrypted_file_path):
+                if output_path is None:
+                    if encrypted_file_path.suffix == '.encrypted':
+                        output_path = encrypted_file_path.with_suffix('')
+                    else:
+                        output_path = encrypted_file_path.with_suffix(encrypted_file_path.suffix + '.decrypted')
+                output_path = Path(output_path)
+                
+                # セグメント単位で復号化（認証に失敗した場合は出力を残さない）
+                try:
+                    with self.open_encrypted_reader(encrypted_file_path, password) as reader, \
+                            open(output_path, 'wb') as target:
+                        while block := reader.read(STREAM_SEGMENT_SIZE):
+                            target.write(block)
+                except Exception:
+                    output_path.unlink(missing_ok=True)
+                    raise
+                self.logger.info(f"ファイルを復号化しました: {encrypted_file_path} -> {output_path}")
+                return output_path
+            
             # 暗号化されたファイルを読み込み
             with open(encrypted_file_path, 'r', encoding='utf-8') as f:
                 encrypted_dict = json.load(f)
@@ -434,6 +678,67 @@ class EncryptionUtils:
             self.logger.error(f"ファイル復号化エラー: {e}")
             raise
     
+    def open_encrypted_writer(self, file_path: Union[str, Path], password: str,
+                              segment_size: int = STREAM_SEGMENT_SIZE) -> EncryptedStreamWriter:
+        """
+        ストリーム暗号化でファイルを書き込み用に開く
+        
+        Args:
+            file_path: 出力ファイル
+            password: パスワード
+            segment_size: セグメントの平文サイズ
+            
+        Returns:
+            EncryptedStreamWriter: 書き込みストリーム
+        """
+        try:
+            if not self._check_cryptography():
+                raise RuntimeError("cryptographyライブラリが利用できません")
+            
+            key_info = self.generate_key(password)
+            return EncryptedStreamWriter(open(file_path, 'wb'), key_info.key, key_info.salt,
+                                         key_info.iterations, segment_size)
+            
+        except Exception as e:
+            self.logger.error(f"暗号化ストリーム作成エラー: {e}")
+            raise
+    
+    def open_encrypted_reader(self, file_path: Union[str, Path], password: str) -> io.BufferedReader:
+        """
+        ストリーム暗号化されたファイルを読み込み用に開く（シーク可能）
+        
+        Args:
+            file_path: 暗号化ファイル
+            password: パスワード
+            
+        Returns:
+            io.BufferedReader: 復号済みの内容を読むストリーム
+        """
+        try:
+            if not self._check_cryptography():
+                raise RuntimeError("cryptographyライブラリが利用できません")
+            
+            raw = open(file_path, 'rb')
+            try:
+                _, _, iterations, salt, _ = parse_stream_header(raw.read(_STREAM_HEADER.size))
+                key_info = self.generate_key(password, salt, iterations)
+                return io.BufferedReader(EncryptedStreamReader(raw, key_info.key), STREAM_SEGMENT_SIZE)
+            except Exception:
+                raw.close()
+                raise
+            
+        except Exception as e:
+            self.logger.error(f"復号ストリーム作成エラー: {e}")
+            raise
+    
+    def is_stream_encrypted(self, file_path: Union[str, Path]) -> bool:
+        """ファイルがストリーム暗号化形式か"""
+        try:
+            with open(file_path, 'rb') as f:
+                return f.read(len(STREAM_MAGIC)) == STREAM_MAGIC
+        except OSError:
+            return False
+    
     def calculate_hash(self, data: Union[str, bytes], algorithm: str = 'sha256') -> str:
         """データのハッシュ値を計算"""
         try:
@@ -458,30 +763,20 @@ class EncryptionUtils:
             raise
     
     def calculate_file_hash(self, file_path: Union[str, Path],
-                          algorithm: str = 'sha256', chunk_size: int = 8192) -> str:
-        """ファイルのハッシュ値を計算"""
+                          algorithm: str = 'sha256', chunk_size: int = 8192,
+                          use_cache: bool = False) -> str:
+        """ファイルのハッシュ値を計算（chunk_sizeは互換性のため残している。読み込みはハッシュ計算サービスが行う）"""
         try:
             file_path = Path(file_path)
             
             if not file_path.exists():
                 raise FileNotFoundError(f"ファイルが見つかりません: {file_path}")
             
-            if algorithm.lower() == 'md5':
-                hash_obj = hashlib.md5()
-            elif algorithm.lower() == 'sha1':
-                hash_obj = hashlib.sha1()
-            elif algorithm.lower() == 'sha256':
-                hash_obj = hashlib.sha256()
-            elif algorithm.lower() == 'sha512':
-                hash_obj = hashlib.sha512()
-            else:
+            if algorithm.lower() not in ('md5', 'sha1', 'sha256', 'sha512'):
                 raise ValueError(f"サポートされていないハッシュアルゴリズム: {algorithm}")
             
-            with open(file_path, 'rb') as f:
-                while chunk := f.read(chunk_size):
-                    hash_obj.update(chunk)
-            
-            return hash_obj.hexdigest()
+            # 改ざん検知に使われるため、既定ではキャッシュを使わず常に内容を読む
+            return get_hash_service().hash_file(file_path, algorithm, use_cache)
             
         except Exception as e:
             self.logger.error(f"ファイルハッシュ計算エラー: {e}")
@@ -0,0 +1,348 @@
+# src/utils/file_reader.py
+"""
+ファイル読み込みユーティリティ
+大きなファイルを全体を読み込まずに扱うためのストリーミング・mmap読み込みを提供する
+"""
+
+import codecs
+import io
+import logging
+import mmap
+import os
+from typing import Iterator, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, os.PathLike]
+
+# エンコーディング判定に使う先頭バイト数
+ENCODING_SAMPLE_SIZE = 10000
+# ストリーミング読み込みのバッファサイズ
+READ_BLOCK_SIZE = 1024 * 1024
+
+# UTF-32のBOMはUTF-16のBOMを前方一致で含むため先に判定する
+_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+
+def detect_encoding_from_bytes(sample: bytes, default: str = 'utf-8', min_confidence: float = 0.7) -> str:
+    """
+    先頭のバイト列からエンコーディングを検出
+
+    BOM、UTF-8としての妥当性、chardetの順に判定する。先頭がASCIIのみの場合も
+    UTF-8とみなすため、後半に現れる非ASCII文字をasciiで読み損なうことはない。
+
+    Args:
+        sample: ファイル先頭のバイト列
+        default: 判定できない場合のエンコーディング
+        min_confidence: chardetの判定を採用する最低信頼度
+
+    Returns:
+        str: エンコーディング名
+    """
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    try:
+        # 末尾で途切れたマルチバイト文字は許容する
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+
+    try:
+        import chardet
+    except ImportError:
+        return default
+
+    try:
+        result = chardet.detect(sample)
+    except Exception as e:
+        logger.warning(f"エンコーディング検出エラー: {e}")
+        return default
+    encoding = result.get('encoding')
+    if not encoding or (result.get('confidence') or 0) < min_confidence:
+        return default
+    return encoding
+
+
+def read_prefix(file_path: PathLike, size: int = ENCODING_SAMPLE_SIZE) -> bytes:
+    """
+    ファイルの先頭を読み込む
+
+    Args:
+        file_path: ファイルパス
+        size: 読み込む最大バイト数
+
+    Returns:
+        bytes: 先頭のバイト列
+    """
+    with open(file_path, 'rb') as f:
+        return f.read(size)
+
+
+def detect_file_encoding(file_path: PathLike, default: str = 'utf-8',
+                         sample_size: int = ENCODING_SAMPLE_SIZE) -> str:
+    """
+    ファイル先頭の一定範囲だけを読み込んでエンコーディングを検出
+
+    Args:
+        file_path: ファイルパス
+        default: 判定できない場合のエンコーディング
+        sample_size: 判定に使う先頭バイト数
+
+    Returns:
+        str: エンコーディング名
+    """
+    return detect_encoding_from_bytes(read_prefix(file_path, sample_size), default)
+
+
+def open_text(file_path: PathLike, encoding: Optional[str] = None, errors: str = 'replace',
+              default_encoding: str = 'utf-8') -> Tuple[io.TextIOWrapper, str]:
+    """
+    エンコーディングを先頭から判定してテキストとして開く（ファイルを開くのは1回）
+
+    Args:
+        file_path: ファイルパス
+        encoding: エンコーディング（Noneの場合は先頭から検出）
+        errors: デコードエラーの扱い
+        default_encoding: 判定できない場合のエンコーディング
+
+    Returns:
+        Tuple[io.TextIOWrapper, str]: テキストストリームとエンコーディング
+    """
+    raw = open(file_path, 'rb', buffering=READ_BLOCK_SIZE)
+    try:
+        if encoding is None:
+            encoding = detect_encoding_from_bytes(raw.read(ENCODING_SAMPLE_SIZE), default_encoding)
+            raw.seek(0)
+        return io.TextIOWrapper(raw, encoding=encoding, errors=errors), encoding
+    except Exception:
+        raw.close()
+        raise
+
+
+def read_text(file_path: PathLike, encoding: Optional[str] = None, errors: str = 'replace',
+              default_encoding: str = 'utf-8') -> Tuple[str, str]:
+    """
+    テキストファイル全体を読み込む
+
+    Args:
+        file_path: ファイルパス
+        encoding: エンコーディング（Noneの場合は先頭から検出）
+        errors: デコードエラーの扱い
+        default_encoding: 判定できない場合のエンコーディング
+
+    Returns:
+        Tuple[str, str]: 内容とエンコーディング
+    """
+    stream, encoding = open_text(file_path, encoding, errors, default_encoding)
+    with stream:
+        return stream.read(), encoding
+
+
+def iter_lines(file_path: PathLike, encoding: Optional[str] = None, errors: str = 'replace',
+               keepends: bool = False, default_encoding: str = 'utf-8') -> Iterator[str]:
+    """
+    テキストファイルを1行ずつ読み込む
+
+    Args:
+        file_path: ファイルパス
+        encoding: エンコーディング（Noneの場合は先頭から検出）
+        errors: デコードエラーの扱い
+        keepends: 改行文字を残すか
+        default_encoding: 判定できない場合のエンコーディング
+
+    Yields:
+        str: 行
+    """
+    stream, _ = open_text(file_path, encoding, errors, default_encoding)
+    with stream:
+        if keepends:
+            yield from stream
+        else:
+            for line in stream:
+                yield line.rstrip('\r\n')
+
+
+def iter_line_chunks(file_path: PathLike, max_chars: int, encoding: Optional[str] = None,
+                     errors: str = 'replace') -> Iterator[Tuple[int, int, str]]:
+    """
+    行をまとめたチャンクを順に返す（ファイル全体は保持しない）
+
+    Args:
+        file_path: ファイルパス
+        max_chars: チャンクの最大文字数（これを超える1行は分割する）
+        encoding: エンコーディング（Noneの場合は先頭から検出）
+        errors: デコードエラーの扱い
+
+    Yields:
+        Tuple[int, int, str]: (開始行, 終了行, 内容)（行番号は1始まり）
+    """
+    max_chars = max(1, max_chars)
+    stream, _ = open_text(file_path, encoding, errors)
+    with stream:
+        pending = ''
+        line_number = 1
+        while True:
+            # 行毎ではなくブロック単位で読み込み、最後の改行で区切る
+            block = stream.read(max_chars - len(pending))
+            text = pending + block
+            if block and len(text) < max_chars:
+                pending = text
+                continue
+            if not text:
+                break
+
+            cut = text.rfind('\n') + 1 if block else len(text)
+            if cut == 0:
+                # 改行を含まない長い行は最大文字数で分割する
+                cut = len(text)
+            chunk, pending = text[:cut], text[cut:]
+            newlines = chunk.count('\n')
+            end_line = line_number + newlines - (1 if chunk.endswith('\n') else 0)
+            yield line_number, end_line, chunk
+            line_number += newlines
+            if not block:
+                break
+
+
+def read_range(file_path: PathLike, offset: int, length: int) -> bytes:
+    """
+    ファイルの指定範囲のバイト列を読み込む
+
+    Args:
+        file_path: ファイルパス
+        offset: 開始位置
+        length: 読み込むバイト数
+
+    Returns:
+        bytes: 読み込んだバイト列（ファイル末尾を超える分は含まない）
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(offset)
+        return f.read(length)
+
+
+def hash_file(file_path: PathLike, hasher):
+    """
+    ファイル全体をmmap経由でハッシュオブジェクトに入力
+
+    Args:
+        file_path: ファイルパス
+        hasher: update()を持つハッシュオブジェクト
+
+    Returns:
+        入力済みのハッシュオブジェクト
+    """
+    with MappedFile(file_path) as mapped:
+        for block in mapped.iter_blocks():
+            hasher.update(block)
+    return hasher
+
+
+class MappedFile:
+    """
+    mmapによる読み取り専用のファイルビュー
+
+    viewはファイル全体のmemoryviewで、ハッシュ計算やバイト列の検索にコピーなしで
+    渡せる。viewやiter_blocksのスライスはclose前に解放すること。
+    """
+
+    def __init__(self, file_path: PathLike):
+        """
+        初期化
+
+        Args:
+            file_path: ファイルパス
+        """
+        self.path = os.fspath(file_path)
+        self._file = open(self.path, 'rb')
+        self._mmap: Optional[mmap.mmap] = None
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            # 空ファイルはmmapできない
+            if size:
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        self.view = memoryview(self._mmap) if self._mmap is not None else memoryview(b'')
+
+    def __enter__(self) -> 'MappedFile':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.view)
+
+    @property
+    def size(self) -> int:
+        """ファイルサイズ"""
+        return len(self.view)
+
+    def read_range(self, offset: int, length: int) -> bytes:
+        """
+        指定範囲のバイト列をコピーして返す
+
+        Args:
+            offset: 開始位置
+            length: バイト数
+
+        Returns:
+            bytes: バイト列
+        """
+        return bytes(self.view[offset:offset + length])
+
+    def find(self, sub: bytes, start: int = 0, end: Optional[int] = None) -> int:
+        """
+        バイト列を検索
+
+        Args:
+            sub: 検索するバイト列
+            start: 検索開始位置
+            end: 検索終了位置
+
+        Returns:
+            int: 見つかった位置（見つからない場合は-1）
+        """
+        if self._mmap is None:
+            return -1
+        return self._mmap.find(sub, start, self.size if end is None else end)
+
+    def iter_blocks(self, block_size: int = 8 * READ_BLOCK_SIZE) -> Iterator[memoryview]:
+        """
+        ファイルをブロック単位のmemoryviewで返す
+
+        Args:
+            block_size: ブロックサイズ
+
+        Yields:
+            memoryview: ブロック（コピーなし）
+        """
+        for offset in range(0, self.size, block_size):
+            block = self.view[offset:offset + block_size]
+            try:
+                yield block
+            finally:
+                block.release()
+
+    def close(self):
+        """ビューとファイルを閉じる"""
+        self.view.release()
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # 呼び出し側がスライスを保持している場合は参照が消えた時点で解放される
+                logger.debug(f"mmapビューが使用中のため解放を延期: {self.path}")
+            self._mmap = None
+        self._file.close()
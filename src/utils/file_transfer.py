@@ -0,0 +1,365 @@
+# src/utils/file_transfer.py
+"""
+ファイル転送ユーティリティ
+copy_file_range/sendfileによるカーネル内コピーと、イベントループを止めない非同期のコピー・移動を提供する
+"""
+
+import asyncio
+import errno
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple, Union
+
+from ..core.logger import get_logger
+
+logger = get_logger(__name__)
+
+PathLike = Union[str, os.PathLike]
+
+# 1回のシステムコールで転送する量（進捗通知・キャンセル確認の単位）
+TRANSFER_CHUNK_SIZE = 8 * 1024 * 1024
+
+# フォールバック時の読み込みバッファ
+BUFFER_SIZE = 1024 * 1024
+
+
+class TransferCancelled(Exception):
+    """転送がキャンセルされた"""
+
+
+@dataclass
+class TransferProgress:
+    """転送の進捗"""
+    total_bytes: int = 0
+    done_bytes: int = 0
+    total_files: int = 0
+    done_files: int = 0
+    current_file: str = ""
+
+    @property
+    def ratio(self) -> float:
+        """進捗率（0.0〜1.0）"""
+        if self.total_bytes:
+            return self.done_bytes / self.total_bytes
+        return self.done_files / self.total_files if self.total_files else 1.0
+
+
+def _kernel_copy(copy: Callable[[int, int, int, int], int], source_fd: int, target_fd: int,
+                 size: int, offset: int, on_chunk: Callable[[int], None]) -> int:
+    """カーネル内コピーを繰り返し、コピーできた位置を返す"""
+    while offset < size:
+        copied = copy(source_fd, target_fd, min(TRANSFER_CHUNK_SIZE, size - offset), offset)
+        if copied == 0:
+            break
+        offset += copied
+        on_chunk(copied)
+    return offset
+
+
+def copy_file_sync(source: PathLike, target: PathLike,
+                   on_chunk: Optional[Callable[[int], None]] = None,
+                   cancel_event: Optional[threading.Event] = None,
+                   preserve_metadata: bool = True) -> int:
+    """
+    ファイルをコピー（copy_file_range → sendfile → バッファ読み書きの順に試す）
+
+    Args:
+        source: コピー元
+        target: コピー先
+        on_chunk: 転送毎に転送したバイト数を渡して呼び出す関数
+        cancel_event: セットされると中断する（コピー先は削除する）
+        preserve_metadata: 更新時刻・パーミッションを保持するか
+
+    Returns:
+        int: コピーしたバイト数
+    """
+    source = Path(source)
+    target = Path(target)
+    # 既存のディレクトリへのコピーはその中に同じ名前で作成する（shutil.copy2と同じ）
+    if target.is_dir():
+        target = target / source.name
+    # 同じファイルへのコピーは開いた時点で内容が消えるため、開く前に拒否する
+    if target.exists() and os.path.samefile(source, target):
+        raise shutil.SameFileError(f"コピー元とコピー先が同じファイルです: {source}")
+
+    def progress(count: int):
+        if cancel_event is not None and cancel_event.is_set():
+            raise TransferCancelled(str(source))
+        if on_chunk is not None:
+            on_chunk(count)
+
+    try:
+        with open(source, 'rb') as src, open(target, 'wb') as dst:
+            source_fd, target_fd = src.fileno(), dst.fileno()
+            size = os.fstat(source_fd).st_size
+            offset = 0
+
+            copy_file_range = getattr(os, 'copy_file_range', None)
+            if copy_file_range is not None:
+                try:
+                    offset = _kernel_copy(
+                        lambda s, t, n, o: copy_file_range(s, t, n, o, o), source_fd, target_fd,
+                        size, offset, progress
+                    )
+                except OSError as e:
+                    if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EPERM):
+                        raise
+
+            sendfile = getattr(os, 'sendfile', None)
+            if offset < size and sendfile is not None:
+                try:
+                    os.lseek(target_fd, offset, os.SEEK_SET)
+                    offset = _kernel_copy(
+                        lambda s, t, n, o: sendfile(t, s, o, n), source_fd, target_fd,
+                        size, offset, progress
+                    )
+                except OSError as e:
+                    if e.errno not in (errno.ENOSYS, errno.EINVAL, errno.ENOTSOCK, errno.EOPNOTSUPP):
+                        raise
+
+            # フォールバック（ファイルサイズが変わっていた場合の残りもここで読む）
+            src.seek(offset)
+            dst.seek(offset)
+            buffer = bytearray(BUFFER_SIZE)
+            view = memoryview(buffer)
+            while True:
+                count = src.readinto(buffer)
+                if not count:
+                    break
+                dst.write(view[:count])
+                offset += count
+                progress(count)
+            dst.truncate(offset)
+        if preserve_metadata:
+            shutil.copystat(source, target)
+        return offset
+    except BaseException:
+        target.unlink(missing_ok=True)
+        raise
+
+
+class FileTransferEngine:
+    """
+    非同期ファイル転送エンジンクラス
+
+    転送は専用の上限付きスレッドプールで行い、同時に転送するファイル数をセマフォで制限する。
+    進捗はイベントループのスレッドで通知し、タスクがキャンセルされると転送中のファイルも中断する。
+    """
+
+    def __init__(self, max_workers: int = 4, max_concurrent: Optional[int] = None):
+        """
+        初期化
+
+        Args:
+            max_workers: スレッドプールのスレッド数
+            max_concurrent: 同時に転送するファイル数（Noneの場合はmax_workers）
+        """
+        self.max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="file-transfer")
+        self._semaphore = asyncio.Semaphore(max_concurrent or self.max_workers)
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        ブロッキング処理を転送用スレッドプールで実行
+
+        Args:
+            func: 実行する関数
+            *args, **kwargs: 関数の引数
+
+        Returns:
+            関数の戻り値
+        """
+        loop = asyncio.get_running_loop()
+        async with self._semaphore:
+            return await loop.run_in_executor(self._executor, lambda: func(*args, **kwargs))
+
+    def progress_reporter(self, progress: TransferProgress,
+                           callback: Optional[Callable[[TransferProgress], None]]) -> Callable[..., None]:
+        """
+        スレッドから呼ばれ、イベントループのスレッドで進捗を更新・通知する関数を作成
+
+        Args:
+            progress: 更新する進捗
+            callback: 進捗を通知する関数
+
+        Returns:
+            report(転送したバイト数, 完了したファイル数=0)
+        """
+        loop = asyncio.get_running_loop()
+
+        def report(count: int, files: int = 0):
+            def update():
+                progress.done_bytes += count
+                progress.done_files += files
+                if callback is not None:
+                    try:
+                        callback(progress)
+                    except Exception as e:
+                        logger.warning(f"進捗通知エラー: {e}")
+            loop.call_soon_threadsafe(update)
+
+        return report
+
+    async def _copy_one(self, source: Path, target: Path, report: Callable[[int], None]) -> int:
+        """1ファイルをコピー（キャンセルされたらスレッド側も中断する）"""
+        cancel_event = threading.Event()
+        try:
+            return await self.run(copy_file_sync, source, target, report, cancel_event)
+        except asyncio.CancelledError:
+            cancel_event.set()
+            raise
+
+    async def copy_file(self, source: PathLike, target: PathLike,
+                        progress_callback: Optional[Callable[[TransferProgress], None]] = None) -> int:
+        """
+        ファイルを非同期にコピー
+
+        Args:
+            source: コピー元
+            target: コピー先
+            progress_callback: 進捗を通知する関数
+
+        Returns:
+            int: コピーしたバイト数
+        """
+        source, target = Path(source), Path(target)
+        progress = TransferProgress(total_bytes=source.stat().st_size, total_files=1, current_file=str(source))
+        target.parent.mkdir(parents=True, exist_ok=True)
+        copied = await self._copy_one(source, target, self.progress_reporter(progress, progress_callback))
+        await asyncio.sleep(0)
+        progress.done_files = 1
+        if progress_callback is not None:
+            progress_callback(progress)
+        return copied
+
+    async def copy_tree(self, source: PathLike, target: PathLike,
+                        progress_callback: Optional[Callable[[TransferProgress], None]] = None) -> int:
+        """
+        ディレクトリを非同期にコピー（ファイルは並行して転送、シンボリックリンクはリンクとして再作成）
+
+        Args:
+            source: コピー元ディレクトリ
+            target: コピー先ディレクトリ（既存のファイルは上書き）
+            progress_callback: 進捗を通知する関数
+
+        Returns:
+            int: コピーしたバイト数
+        """
+        source, target = Path(source), Path(target)
+        directories, files, links = await self.run(self._list_tree, source)
+        progress = TransferProgress(total_bytes=sum(size for _, size in files), total_files=len(files))
+        for relative in directories:
+            (target / relative).mkdir(parents=True, exist_ok=True)
+        await self.run(self._create_links, target, links)
+
+        report = self.progress_reporter(progress, progress_callback)
+
+        async def copy(relative: Path) -> int:
+            copied = await self._copy_one(source / relative, target / relative, report)
+            progress.done_files += 1
+            progress.current_file = str(source / relative)
+            return copied
+
+        tasks = [asyncio.ensure_future(copy(relative)) for relative, _ in files]
+        try:
+            copied = sum(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        await self.run(self._copy_directory_stats, source, target, directories)
+        await asyncio.sleep(0)
+        if progress_callback is not None:
+            progress_callback(progress)
+        return copied
+
+    @staticmethod
+    def _list_tree(source: Path) -> Tuple[List[Path], List[Tuple[Path, int]], List[Tuple[Path, str, bool]]]:
+        """
+        ディレクトリ以下の一覧
+
+        Returns:
+            ディレクトリ、ファイル（相対パス, サイズ）、シンボリックリンク（相対パス, リンク先, ディレクトリか）
+        """
+        directories = [Path('.')]
+        files = []
+        links = []
+        for root, dirnames, filenames in os.walk(source):
+            root_path = Path(root)
+            relative_root = root_path.relative_to(source)
+            for name in list(dirnames):
+                path = root_path / name
+                if path.is_symlink():
+                    # リンク先のディレクトリは走査しない（os.walkも辿らない）
+                    dirnames.remove(name)
+                    links.append((relative_root / name, os.readlink(path), True))
+                else:
+                    directories.append(relative_root / name)
+            for name in filenames:
+                path = root_path / name
+                if path.is_symlink():
+                    links.append((relative_root / name, os.readlink(path), False))
+                elif path.is_file():
+                    files.append((relative_root / name, path.stat().st_size))
+        return directories, files, links
+
+    @staticmethod
+    def _create_links(target: Path, links: List[Tuple[Path, str, bool]]):
+        """シンボリックリンクを同じリンク先で再作成（既存のファイル・リンクは置き換える）"""
+        for relative, link_target, is_directory in links:
+            path = target / relative
+            if path.is_symlink() or path.is_file():
+                path.unlink()
+            os.symlink(link_target, path, target_is_directory=is_directory)
+
+    @staticmethod
+    def _copy_directory_stats(source: Path, target: Path, directories: List[Path]):
+        """ディレクトリの更新時刻・パーミッションを保持（深い順に設定）"""
+        for relative in sorted(directories, key=lambda p: len(p.parts), reverse=True):
+            try:
+                shutil.copystat(source / relative, target / relative)
+            except OSError:
+                pass
+
+    async def move(self, source: PathLike, target: PathLike,
+                   progress_callback: Optional[Callable[[TransferProgress], None]] = None):
+        """
+        ファイル・ディレクトリを非同期に移動（同じファイルシステムではrename、異なる場合はコピーして削除）
+
+        Args:
+            source: 移動元
+            target: 移動先
+            progress_callback: 進捗を通知する関数（コピーが必要な場合）
+        """
+        source, target = Path(source), Path(target)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if target.is_dir():
+            target = target / source.name
+        try:
+            await self.run(os.rename, source, target)
+            return
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+
+        if source.is_symlink():
+            # リンク先ではなくリンク自体を移動する
+            await self.run(self._create_links, target.parent,
+                           [(Path(target.name), os.readlink(source), source.is_dir())])
+            await self.run(source.unlink)
+        elif source.is_dir():
+            await self.copy_tree(source, target, progress_callback)
+            await self.run(shutil.rmtree, source)
+        else:
+            await self.copy_file(source, target, progress_callback)
+            await self.run(source.unlink)
+
+    def shutdown(self):
+        """スレッドプールを停止"""
+        self._executor.shutdown(wait=True)
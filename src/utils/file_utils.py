@@ -6,7 +6,6 @@
 
 import os
 import shutil
-import hashlib
 import mimetypes
 import tempfile
 import zipfile
@@ -19,6 +18,9 @@ import json
 import yaml
 
 from ..core.logger import get_logger
+from .dir_scanner import DirectoryScanner
+from . import file_reader
+from .hash_service import get_hash_service
 
 
 @dataclass
@@ -92,8 +94,9 @@ class FileUtils:
             # ハッシュ値を計算（ファイルの場合のみ）
             if not file_info.is_directory and file_info.size > 0:
                 try:
-                    file_info.hash_md5 = self.calculate_file_hash(file_path, 'md5')
-                    file_info.hash_sha256 = self.calculate_file_hash(file_path, 'sha256')
+                    hashes = self.calculate_file_hashes(file_path, ('md5', 'sha256'))
+                    file_info.hash_md5 = hashes['md5']
+                    file_info.hash_sha256 = hashes['sha256']
                 except Exception as e:
                     self.logger.warning(f"ハッシュ計算エラー {file_path}: {e}")
             
@@ -107,23 +110,29 @@ class FileUtils:
             self.logger.error(f"ファイル情報取得エラー {file_path}: {e}")
             return None
     
-    def calculate_file_hash(self, file_path: str, algorithm: str = 'md5') -> str:
-        """ファイルのハッシュ値を計算"""
+    def calculate_file_hash(self, file_path: str, algorithm: str = 'md5', use_cache: bool = True) -> str:
+        """ファイルのハッシュ値を計算（検証に使う場合はuse_cache=Falseで必ず読み込む）"""
+        return self.calculate_file_hashes(file_path, (algorithm,), use_cache)[algorithm]
+    
+    def calculate_file_hashes(self, file_path: str, algorithms: Tuple[str, ...] = ('md5', 'sha256'),
+                              use_cache: bool = True) -> Dict[str, str]:
+        """
+        複数のハッシュ値を1回の走査で計算（ハッシュ計算サービスのキャッシュを利用）
+        
+        Args:
+            file_path: ファイルパス
+            algorithms: ハッシュアルゴリズム（md5, sha256, sha1）
+            use_cache: キャッシュを使うか（サイズ・更新時刻を保ったままの改変は検出できない）
+            
+        Returns:
+            Dict[str, str]: アルゴリズム名 -> ハッシュ値
+        """
         try:
-            if algorithm.lower() == 'md5':
-                hash_obj = hashlib.md5()
-            elif algorithm.lower() == 'sha256':
-                hash_obj = hashlib.sha256()
-            elif algorithm.lower() == 'sha1':
-                hash_obj = hashlib.sha1()
-            else:
-                raise ValueError(f"サポートされていないハッシュアルゴリズム: {algorithm}")
+            for algorithm in algorithms:
+                if algorithm.lower() not in ('md5', 'sha256', 'sha1'):
+                    raise ValueError(f"サポートされていないハッシュアルゴリズム: {algorithm}")
             
-            with open(file_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_obj.update(chunk)
-            
-            return hash_obj.hexdigest()
+            return get_hash_service().hash_file_multi(file_path, algorithms, use_cache)
             
         except Exception as e:
             self.logger.error(f"ハッシュ計算エラー {file_path}: {e}")
@@ -159,30 +168,26 @@ class FileUtils:
             return False
     
     def detect_encoding(self, file_path: str) -> str:
-        """ファイルのエンコーディングを検出"""
+        """ファイルのエンコーディングを検出（先頭10KBのみ読み込む）"""
         try:
-            import chardet
-            
-            with open(file_path, 'rb') as f:
-                raw_data = f.read(10000)  # 最初の10KBを読み取り
-                
-            result = chardet.detect(raw_data)
-            encoding = result.get('encoding', 'utf-8')
-            confidence = result.get('confidence', 0)
-            
-            # 信頼度が低い場合はUTF-8を使用
-            if confidence < 0.7:
-                encoding = 'utf-8'
-            
-            return encoding
+            return file_reader.detect_file_encoding(file_path)
             
-        except ImportError:
-            # chardetがない場合はUTF-8を返す
-            return 'utf-8'
         except Exception as e:
             self.logger.warning(f"エンコーディング検出エラー {file_path}: {e}")
             return 'utf-8'
     
+    def detect_bytes_encoding(self, raw_data: bytes) -> str:
+        """
+        読み込み済みのバイト列からエンコーディングを検出（先頭10KBで判定）
+        
+        Args:
+            raw_data: ファイル先頭のバイト列
+            
+        Returns:
+            str: エンコーディング名
+        """
+        return file_reader.detect_encoding_from_bytes(raw_data[:file_reader.ENCODING_SAMPLE_SIZE])
+    
     def read_file(self, file_path: str, encoding: str = None) -> Optional[str]:
         """ファイルを読み取り"""
         try:
@@ -193,16 +198,48 @@ class FileUtils:
                 self.logger.warning(f"テキストファイルではありません: {file_path}")
                 return None
             
-            if encoding is None:
-                encoding = self.detect_encoding(file_path)
-            
-            with open(file_path, 'r', encoding=encoding, errors='replace') as f:
-                return f.read()
+            # エンコーディングは同じファイルハンドルの先頭から判定する
+            content, _ = file_reader.read_text(file_path, encoding)
+            return content
                 
         except Exception as e:
             self.logger.error(f"ファイル読み取りエラー {file_path}: {e}")
             return None
     
+    def iter_lines(self, file_path: str, encoding: str = None) -> Iterator[str]:
+        """
+        ファイルを1行ずつ読み取り（ファイル全体は読み込まない）
+        
+        Args:
+            file_path: ファイルパス
+            encoding: エンコーディング（Noneの場合は先頭から検出）
+            
+        Yields:
+            str: 改行を除いた行
+        """
+        try:
+            yield from file_reader.iter_lines(file_path, encoding)
+        except Exception as e:
+            self.logger.error(f"ファイル読み取りエラー {file_path}: {e}")
+    
+    def read_range(self, file_path: str, offset: int, length: int) -> Optional[bytes]:
+        """
+        ファイルの指定範囲を読み取り
+        
+        Args:
+            file_path: ファイルパス
+            offset: 開始位置（バイト）
+            length: 読み込むバイト数
+            
+        Returns:
+            Optional[bytes]: 読み込んだバイト列
+        """
+        try:
+            return file_reader.read_range(file_path, offset, length)
+        except Exception as e:
+            self.logger.error(f"ファイル読み取りエラー {file_path}: {e}")
+            return None
+    
     def write_file(self, file_path: str, content: str, encoding: str = 'utf-8',
                    create_dirs: bool = True, backup: bool = False) -> bool:
         """ファイルを書き込み"""
@@ -283,28 +320,14 @@ class FileUtils:
                    include_dirs: bool = True, pattern: str = None) -> List[str]:
         """ディレクトリ内のファイル一覧を取得"""
         try:
-            files = []
-            
-            if recursive:
-                for root, dirs, filenames in os.walk(directory):
-                    if include_dirs:
-                        for dirname in dirs:
-                            dir_path = os.path.join(root, dirname)
-                            if pattern is None or self._match_pattern(dirname, pattern):
-                                files.append(dir_path)
-                    
-                    for filename in filenames:
-                        file_path = os.path.join(root, filename)
-                        if pattern is None or self._match_pattern(filename, pattern):
-                            files.append(file_path)
-            else:
-                for item in os.listdir(directory):
-                    item_path = os.path.join(directory, item)
-                    if os.path.isfile(item_path) or (include_dirs and os.path.isdir(item_path)):
-                        if pattern is None or self._match_pattern(item, pattern):
-                            files.append(item_path)
-            
-            return sorted(files)
+            entries = DirectoryScanner().scan(
+                directory,
+                recursive=recursive,
+                include_dirs=include_dirs,
+                pattern=pattern,
+                case_sensitive=False
+            )
+            return sorted(entry.path for entry in entries)
             
         except Exception as e:
             self.logger.error(f"ファイル一覧取得エラー {directory}: {e}")
@@ -324,31 +347,28 @@ class FileUtils:
         """条件に一致するファイルを検索"""
         try:
             found_files = []
+            extension_set = {ext.lower() for ext in extensions} if extensions else None
             
-            for root, dirs, files in os.walk(directory):
-                for filename in files:
-                    file_path = os.path.join(root, filename)
-                    
-                    # 拡張子フィルタ
-                    if extensions:
-                        file_ext = Path(filename).suffix.lower()
-                        if file_ext not in [ext.lower() for ext in extensions]:
-                            continue
-                    
-                    # ファイル名パターンフィルタ
-                    if name_pattern and not self._match_pattern(filename, name_pattern):
+            entries = DirectoryScanner().scan(
+                directory,
+                recursive=recursive,
+                pattern=name_pattern,
+                case_sensitive=False
+            )
+            for entry in entries:
+                file_path = entry.path
+                
+                # 拡張子フィルタ
+                if extension_set is not None and os.path.splitext(entry.name)[1].lower() not in extension_set:
+                    continue
+                
+                # ファイル内容パターンフィルタ
+                if content_pattern and self.is_text_file(file_path):
+                    content = self.read_file(file_path)
+                    if content and content_pattern.lower() not in content.lower():
                         continue
-                    
-                    # ファイル内容パターンフィルタ
-                    if content_pattern and self.is_text_file(file_path):
-                        content = self.read_file(file_path)
-                        if content and content_pattern.lower() not in content.lower():
-                            continue
-                    
-                    found_files.append(file_path)
                 
-                if not recursive:
-                    break
+                found_files.append(file_path)
             
             return found_files
             
@@ -359,15 +379,7 @@ class FileUtils:
     def get_directory_size(self, directory: str) -> int:
         """ディレクトリのサイズを取得（バイト）"""
         try:
-            total_size = 0
-            for root, dirs, files in os.walk(directory):
-                for filename in files:
-                    file_path = os.path.join(root, filename)
-                    try:
-                        total_size += os.path.getsize(file_path)
-                    except (OSError, IOError):
-                        continue
-            return total_size
+            return DirectoryScanner().total_size(directory)
             
         except Exception as e:
             self.logger.error(f"ディレクトリサイズ取得エラー {directory}: {e}")
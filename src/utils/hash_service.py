@@ -0,0 +1,342 @@
+# src/utils/hash_service.py
+"""
+ハッシュ計算サービス
+ファイルハッシュの計算をスレッドで並列化し、(パス, サイズ, 更新時刻)をキーとする永続キャッシュで再計算を省く
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence, Tuple, Union
+
+from ..core.logger import get_logger
+from . import file_reader
+from .parallel_compress import resolve_workers
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+    xxhash = None
+
+logger = get_logger(__name__)
+
+
+def get_config(*args, **kwargs):
+    from ..core.config_manager import get_config
+    return get_config(*args, **kwargs)
+
+
+PathLike = Union[str, os.PathLike]
+
+# これより小さいファイルは1回のreadで読み込む（大きいファイルはmmap）
+SMALL_FILE_SIZE = file_reader.READ_BLOCK_SIZE
+
+# キャッシュをまとめて参照する件数（SQLiteのパラメータ数の上限未満）
+LOOKUP_BATCH_SIZE = 500
+
+# キャッシュのファイル名（設定のデータディレクトリに、プロジェクトのデータベースと並べて置く）
+CACHE_FILE_NAME = 'hash_cache.db'
+
+# 更新直後のファイルは同じ更新時刻のまま再度変更され得るためキャッシュしない（秒）
+RACY_WINDOW = 2.0
+
+
+def new_hasher(algorithm: str):
+    """
+    ハッシュオブジェクトを作成
+
+    Args:
+        algorithm: hashlibのアルゴリズム名、blake2b_128、xxh3_64、xxh3_128
+
+    Returns:
+        update()/hexdigest()を持つハッシュオブジェクト
+    """
+    name = algorithm.lower()
+    if name == 'blake2b_128':
+        return hashlib.blake2b(digest_size=16)
+    if name in ('xxh3_64', 'xxh3_128'):
+        if not XXHASH_AVAILABLE:
+            raise ValueError(f"xxhashがインストールされていません: {algorithm}")
+        return getattr(xxhash, name)()
+    try:
+        return hashlib.new(name)
+    except ValueError:
+        raise ValueError(f"サポートされていないハッシュアルゴリズム: {algorithm}")
+
+
+class HashService:
+    """
+    ハッシュ計算サービスクラス
+
+    小さいファイルは1回のread、大きいファイルはmmapのビューを直接ハッシュに入力する。
+    複数ファイルはスレッドプールで並列に計算する（hashlibは計算中にGILを解放する）。
+    結果は(パス, アルゴリズム)毎にサイズ・更新時刻と共にSQLiteに保存し、変わっていなければ再利用する。
+    """
+
+    def __init__(self, cache_path: Optional[PathLike] = None, workers: Optional[int] = None):
+        """
+        初期化
+
+        Args:
+            cache_path: キャッシュのデータベース（Noneの場合はメモリ上のみ）
+            workers: 並列数（Noneの場合はCPU数）
+        """
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.workers = resolve_workers(workers)
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self.statistics = {'hits': 0, 'misses': 0}
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """キャッシュのデータベースに接続（最初の使用時に作成）"""
+        if self._connection is None:
+            if self.cache_path is not None:
+                self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(
+                str(self.cache_path) if self.cache_path else ':memory:', check_same_thread=False
+            )
+            # キャッシュのため書き込み毎のfsyncは行わない（WALで破損は防ぐ）
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            with self._connection:
+                self._connection.execute('''
+                    CREATE TABLE IF NOT EXISTS file_hashes (
+                        path TEXT NOT NULL,
+                        algorithm TEXT NOT NULL,
+                        size INTEGER NOT NULL,
+                        mtime_ns INTEGER NOT NULL,
+                        digest TEXT NOT NULL,
+                        PRIMARY KEY (path, algorithm)
+                    )
+                ''')
+        return self._connection
+
+    # ===== 計算 =====
+
+    @staticmethod
+    def _digest(path: Path, size: int, algorithms: Sequence[str]) -> Dict[str, str]:
+        """ファイルを1回だけ読んで各アルゴリズムのハッシュを計算"""
+        hashers = {algorithm: new_hasher(algorithm) for algorithm in algorithms}
+        if size < SMALL_FILE_SIZE:
+            with open(path, 'rb') as f:
+                data = f.read()
+            for hasher in hashers.values():
+                hasher.update(data)
+        else:
+            with file_reader.MappedFile(path) as mapped:
+                for block in mapped.iter_blocks():
+                    for hasher in hashers.values():
+                        hasher.update(block)
+        return {algorithm: hasher.hexdigest() for algorithm, hasher in hashers.items()}
+
+    def hash_file_multi(self, file_path: PathLike, algorithms: Sequence[str],
+                        use_cache: bool = True) -> Dict[str, str]:
+        """
+        ファイルの複数のハッシュ値を計算（キャッシュにないものだけを1回の走査で計算）
+
+        Args:
+            file_path: ファイルパス
+            algorithms: ハッシュアルゴリズム
+            use_cache: キャッシュを使うか
+
+        Returns:
+            Dict[str, str]: アルゴリズム名 -> ハッシュ値
+        """
+        path = Path(file_path).absolute()
+        stat = path.stat()
+        key = str(path)
+        names = list(dict.fromkeys(algorithm.lower() for algorithm in algorithms))
+        results: Dict[str, str] = {}
+        if use_cache:
+            results = self._lookup(key, stat, names)
+        missing = [name for name in names if name not in results]
+        if missing:
+            computed = self._digest(path, stat.st_size, missing)
+            results.update(computed)
+            if use_cache:
+                self._store(key, stat, path, computed)
+        return {algorithm: results[algorithm.lower()] for algorithm in algorithms}
+
+    def hash_file(self, file_path: PathLike, algorithm: str = 'sha256', use_cache: bool = True) -> str:
+        """
+        ファイルのハッシュ値を計算
+
+        Args:
+            file_path: ファイルパス
+            algorithm: ハッシュアルゴリズム
+            use_cache: キャッシュを使うか
+
+        Returns:
+            str: ハッシュ値
+        """
+        return self.hash_file_multi(file_path, (algorithm,), use_cache)[algorithm]
+
+    def hash_files(self, file_paths: Iterable[PathLike], algorithm: str = 'sha256',
+                   use_cache: bool = True) -> Dict[str, Optional[str]]:
+        """
+        複数のファイルのハッシュ値を並列に計算（キャッシュの参照・保存はまとめて行う）
+
+        Args:
+            file_paths: ファイルパスのリスト
+            algorithm: ハッシュアルゴリズム
+            use_cache: キャッシュを使うか
+
+        Returns:
+            Dict[str, Optional[str]]: 指定されたパス -> ハッシュ値（読み込めないファイルはNone）
+        """
+        name = algorithm.lower()
+        new_hasher(name)
+        results: Dict[str, Optional[str]] = {}
+        entries: Dict[str, Tuple[str, Path, os.stat_result]] = {}
+        for file_path in file_paths:
+            original = str(file_path)
+            results[original] = None
+            try:
+                path = Path(file_path).absolute()
+                entries[original] = (str(path), path, path.stat())
+            except OSError as e:
+                logger.warning(f"ハッシュ計算エラー {original}: {e}")
+
+        cached = self._lookup_many([(key, stat) for key, _, stat in entries.values()], name) if use_cache else {}
+        pending = []
+        for original, (key, path, stat) in entries.items():
+            if key in cached:
+                results[original] = cached[key]
+            else:
+                pending.append((original, key, path, stat))
+
+        def compute(item) -> Optional[str]:
+            original, _, path, stat = item
+            try:
+                return self._digest(path, stat.st_size, (name,))[name]
+            except OSError as e:
+                logger.warning(f"ハッシュ計算エラー {original}: {e}")
+                return None
+
+        if len(pending) > 1 and self.workers > 1:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hash") as executor:
+                digests = list(executor.map(compute, pending))
+        else:
+            digests = [compute(item) for item in pending]
+
+        computed = []
+        for (original, key, path, stat), digest in zip(pending, digests):
+            results[original] = digest
+            if digest is not None:
+                computed.append((key, path, stat, {name: digest}))
+        if use_cache and computed:
+            self._store_many(computed)
+        return results
+
+    # ===== キャッシュ =====
+
+    def _lookup(self, key: str, stat: os.stat_result, algorithms: Sequence[str]) -> Dict[str, str]:
+        """サイズ・更新時刻が一致するキャッシュを取得"""
+        with self._lock:
+            rows = self._get_connection().execute(
+                f'SELECT algorithm, digest FROM file_hashes WHERE path = ? AND size = ? AND mtime_ns = ? '
+                f'AND algorithm IN ({",".join("?" * len(algorithms))})',
+                (key, stat.st_size, stat.st_mtime_ns, *algorithms)
+            ).fetchall()
+            self.statistics['hits'] += len(rows)
+            self.statistics['misses'] += len(algorithms) - len(rows)
+        return dict(rows)
+
+    def _lookup_many(self, items: Sequence[Tuple[str, os.stat_result]], algorithm: str) -> Dict[str, str]:
+        """複数ファイルのキャッシュをまとめて取得"""
+        found: Dict[str, str] = {}
+        with self._lock:
+            connection = self._get_connection()
+            for offset in range(0, len(items), LOOKUP_BATCH_SIZE):
+                batch = items[offset:offset + LOOKUP_BATCH_SIZE]
+                stats = {key: (stat.st_size, stat.st_mtime_ns) for key, stat in batch}
+                rows = connection.execute(
+                    f'SELECT path, size, mtime_ns, digest FROM file_hashes WHERE algorithm = ? '
+                    f'AND path IN ({",".join("?" * len(stats))})',
+                    (algorithm, *stats)
+                )
+                for key, size, mtime_ns, digest in rows:
+                    if stats[key] == (size, mtime_ns):
+                        found[key] = digest
+            self.statistics['hits'] += len(found)
+            self.statistics['misses'] += len(items) - len(found)
+        return found
+
+    def _store(self, key: str, stat: os.stat_result, path: Path, digests: Dict[str, str]):
+        """計算結果をキャッシュへ保存"""
+        self._store_many([(key, path, stat, digests)])
+
+    def _store_many(self, items: Sequence[Tuple[str, Path, os.stat_result, Dict[str, str]]]):
+        """計算中に変更されておらず、更新直後でもないファイルの結果を1回のトランザクションで保存"""
+        now = time.time()
+        rows = []
+        for key, path, stat, digests in items:
+            if now - stat.st_mtime_ns / 1e9 < RACY_WINDOW:
+                continue
+            try:
+                after = path.stat()
+            except OSError:
+                continue
+            if (after.st_size, after.st_mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+                continue
+            rows.extend((key, algorithm, stat.st_size, stat.st_mtime_ns, digest)
+                        for algorithm, digest in digests.items())
+        if not rows:
+            return
+        with self._lock:
+            connection = self._get_connection()
+            with connection:
+                connection.executemany(
+                    'INSERT OR REPLACE INTO file_hashes (path, algorithm, size, mtime_ns, digest) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    rows
+                )
+
+    def invalidate(self, file_path: PathLike):
+        """ファイルのキャッシュを削除"""
+        with self._lock:
+            connection = self._get_connection()
+            with connection:
+                connection.execute('DELETE FROM file_hashes WHERE path = ?', (str(Path(file_path).absolute()),))
+
+    def prune(self) -> int:
+        """
+        存在しなくなったファイルのキャッシュを削除
+
+        Returns:
+            int: 削除した件数
+        """
+        with self._lock:
+            connection = self._get_connection()
+            paths = [row[0] for row in connection.execute('SELECT DISTINCT path FROM file_hashes')]
+            missing = [(path,) for path in paths if not os.path.exists(path)]
+            with connection:
+                connection.executemany('DELETE FROM file_hashes WHERE path = ?', missing)
+        return len(missing)
+
+    def close(self):
+        """キャッシュの接続を閉じる"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+# グローバルインスタンス
+_hash_service: Optional[HashService] = None
+
+
+def get_hash_service() -> HashService:
+    """グローバルハッシュ計算サービスを取得"""
+    global _hash_service
+    if _hash_service is None:
+        # 作業ディレクトリが後から変わっても同じキャッシュを使うよう絶対パスで固定する
+        data_dir = get_config('paths', 'data_dir') or 'data'
+        _hash_service = HashService(Path(data_dir).absolute() / CACHE_FILE_NAME)
+    return _hash_service
@@ -0,0 +1,470 @@
+# src/utils/parallel_compress.py
+"""
+並列圧縮ユーティリティ
+ブロック単位の並列圧縮でZIP・gzip・bz2アーカイブを書き出し、書き込みと同時にハッシュを計算する
+"""
+
+import bz2
+import hashlib
+import io
+import os
+import struct
+import time
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Deque, Optional, Tuple, Union
+
+PathLike = Union[str, os.PathLike]
+
+# 並列圧縮の単位
+BLOCK_SIZE = 1024 * 1024
+# 前のブロックから引き継ぐ辞書のサイズ（deflateの窓幅）
+DICTIONARY_SIZE = 32 * 1024
+
+# ZIPのデータディスクリプタ
+_DATA_DESCRIPTOR_FLAG = 0x08
+_DATA_DESCRIPTOR_SIGNATURE = b"PK\x07\x08"
+
+
+def _open_output(target: Union[PathLike, BinaryIO]) -> BinaryIO:
+    """出力先を開く（ファイルオブジェクトはそのまま使い、closeで閉じる）"""
+    if hasattr(target, 'write'):
+        return target
+    return open(target, 'wb')
+
+
+def resolve_workers(workers: Optional[int] = None) -> int:
+    """
+    圧縮スレッド数を決定
+
+    Args:
+        workers: スレッド数（Noneまたは0以下の場合はCPU数）
+
+    Returns:
+        int: スレッド数
+    """
+    if workers is None or workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def deflate_block(data: bytes, level: int, zdict: bytes = b'', final: bool = True) -> bytes:
+    """
+    1ブロックをraw deflateで圧縮
+
+    途中のブロックはZ_SYNC_FLUSHでバイト境界に揃えて終えるため、ブロック毎の出力を
+    連結すると1つのdeflateストリームになる。zdictに直前のブロックの末尾を渡すと
+    ブロック境界をまたぐ一致も圧縮できる。
+
+    Args:
+        data: 圧縮するデータ
+        level: 圧縮レベル（0-9）
+        zdict: 直前のデータの末尾
+        final: ストリームの最後のブロックか
+
+    Returns:
+        bytes: 圧縮データ
+    """
+    if zdict:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=zdict)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class HashingWriter:
+    """書き込んだバイト列のサイズとハッシュを記録する出力ラッパー（シーク不可）"""
+
+    def __init__(self, raw: BinaryIO, hash_algorithm: Optional[str] = 'md5'):
+        """
+        初期化
+
+        Args:
+            raw: 出力先
+            hash_algorithm: ハッシュアルゴリズム（Noneの場合は計算しない）
+        """
+        self.raw = raw
+        self.hasher = hashlib.new(hash_algorithm) if hash_algorithm else None
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self.raw.write(data)
+        if self.hasher is not None:
+            self.hasher.update(data)
+        self.size += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.size
+
+    def flush(self):
+        self.raw.flush()
+
+    def hexdigest(self) -> Optional[str]:
+        """書き込んだ内容のハッシュ"""
+        return self.hasher.hexdigest() if self.hasher is not None else None
+
+
+class _OrderedCompressor:
+    """
+    圧縮ジョブを並列に実行し、結果を投入順に書き出す
+
+    未完了のジョブ数を上限で抑えるため、メモリ使用量は
+    おおよそ (スレッド数 * 2) * ブロックサイズ に収まる。
+    """
+
+    def __init__(self, output: HashingWriter, workers: Optional[int]):
+        self.output = output
+        self.workers = resolve_workers(workers)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="compress")
+        self.max_in_flight = self.workers * 2
+        # 書き出し待ちの項目: Future（圧縮データ）またはコールバック
+        self._queue: Deque[Any] = deque()
+        self._in_flight = 0
+
+    def submit(self, func, *args, on_written=None):
+        """圧縮ジョブを投入（on_writtenには書き出した圧縮データのサイズが渡される）"""
+        self._queue.append((self.executor.submit(func, *args), on_written))
+        self._in_flight += 1
+        self.drain(self.max_in_flight)
+
+    def then(self, callback):
+        """それまでに投入したジョブを書き出した後に実行する処理を追加"""
+        self._queue.append((None, callback))
+
+    def drain(self, limit: int = 0):
+        """未完了のジョブがlimit以下になるまで投入順に書き出す"""
+        while self._queue and (self._in_flight > limit or self._queue[0][0] is None):
+            future, callback = self._queue.popleft()
+            if future is None:
+                callback()
+                continue
+            data = future.result()
+            self._in_flight -= 1
+            self.output.write(data)
+            if callback is not None:
+                callback(len(data))
+
+    def shutdown(self):
+        """スレッドを停止（未完了のジョブは破棄）"""
+        for future, _ in self._queue:
+            if isinstance(future, Future):
+                future.cancel()
+        self._queue.clear()
+        self.executor.shutdown(wait=True)
+
+
+class ParallelZipWriter:
+    """
+    並列圧縮ZIP書き込みクラス
+
+    ファイルをブロックに分けて複数スレッドでdeflate圧縮し、投入順にアーカイブへ
+    書き出す。各エントリはデータディスクリプタ付きで先頭から順に書き込むため、
+    書き戻しなしでアーカイブ全体のハッシュを書き込みと同時に計算できる。
+    出力はzipfileで読める通常のZIPファイル。
+    """
+
+    def __init__(self,
+                 path: Union[PathLike, BinaryIO],
+                 level: int = 6,
+                 workers: Optional[int] = None,
+                 block_size: int = BLOCK_SIZE,
+                 hash_algorithm: Optional[str] = 'md5'):
+        """
+        初期化
+
+        Args:
+            path: 出力するZIPファイル（暗号化ストリームなどのファイルオブジェクトも可）
+            level: 圧縮レベル（0-9）
+            workers: 圧縮スレッド数（Noneの場合はCPU数）
+            block_size: 並列圧縮の単位
+            hash_algorithm: アーカイブのハッシュアルゴリズム
+        """
+        self.level = max(0, min(9, level))
+        self.block_size = max(DICTIONARY_SIZE, block_size)
+        self._file = _open_output(path)
+        self.output = HashingWriter(self._file, hash_algorithm)
+        # 中央ディレクトリの書き出しはzipfileに任せる（出力はシーク不可として扱われる）
+        self._zip = zipfile.ZipFile(self.output, 'w', zipfile.ZIP_DEFLATED)
+        self._compressor = _OrderedCompressor(self.output, workers)
+        self._closed = False
+
+    def __enter__(self) -> 'ParallelZipWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def add_file(self, file_path: PathLike, arcname: str) -> int:
+        """
+        ファイルを追加（読み込みは呼び出し元スレッド、圧縮はワーカースレッド）
+
+        Args:
+            file_path: 追加するファイル
+            arcname: アーカイブ内のパス
+
+        Returns:
+            int: 読み込んだバイト数
+        """
+        with open(file_path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            return self._add_stream(f, self._make_info(arcname, stat.st_mtime, stat.st_mode, stat.st_size))
+
+    def add_bytes(self, data: bytes, arcname: str) -> int:
+        """
+        メモリ上のデータを追加
+
+        Args:
+            data: 追加するデータ
+            arcname: アーカイブ内のパス
+
+        Returns:
+            int: 追加したバイト数
+        """
+        return self._add_stream(io.BytesIO(data), self._make_info(arcname, time.time(), 0o100644, len(data)))
+
+    def _add_stream(self, f: BinaryIO, zinfo: zipfile.ZipInfo) -> int:
+        """ストリームをブロック毎に圧縮ジョブとして投入"""
+        zip64 = zinfo.file_size * 1.05 > zipfile.ZIP64_LIMIT
+        self._compressor.then(lambda: self._write_header(zinfo, zip64))
+
+        crc = 0
+        size = 0
+        previous = b''
+        block = f.read(self.block_size)
+        while True:
+            following = f.read(self.block_size) if block else b''
+            crc = zlib.crc32(block, crc)
+            size += len(block)
+            final = not following
+            self._compressor.submit(
+                deflate_block, block, self.level, previous, final,
+                on_written=lambda length: self._add_compressed(zinfo, length)
+            )
+            if final:
+                break
+            previous = block[-DICTIONARY_SIZE:]
+            block = following
+
+        self._compressor.then(lambda: self._write_descriptor(zinfo, crc, size, zip64))
+        return size
+
+    def _make_info(self, arcname: str, mtime: float, mode: int, size: int) -> zipfile.ZipInfo:
+        """エントリ情報を作成（ZIPで表せない1980年より前の時刻は切り上げる）"""
+        date_time = time.localtime(mtime)[:6]
+        if date_time[0] < 1980:
+            date_time = (1980, 1, 1, 0, 0, 0)
+        zinfo = zipfile.ZipInfo(Path(arcname).as_posix(), date_time)
+        zinfo.external_attr = (mode & 0xFFFF) << 16
+        zinfo.compress_type = zipfile.ZIP_DEFLATED
+        zinfo.flag_bits |= _DATA_DESCRIPTOR_FLAG
+        zinfo.file_size = size
+        zinfo.compress_size = 0
+        return zinfo
+
+    def _write_header(self, zinfo: zipfile.ZipInfo, zip64: bool):
+        zinfo.header_offset = self.output.tell()
+        self.output.write(zinfo.FileHeader(zip64))
+
+    def _add_compressed(self, zinfo: zipfile.ZipInfo, length: int):
+        zinfo.compress_size += length
+
+    def _write_descriptor(self, zinfo: zipfile.ZipInfo, crc: int, size: int, zip64: bool):
+        zinfo.CRC = crc
+        zinfo.file_size = size
+        if not zip64 and max(size, zinfo.compress_size) > zipfile.ZIP64_LIMIT:
+            raise RuntimeError(f"書き込み中にファイルサイズが増加しました: {zinfo.filename}")
+        fmt = '<4sLQQ' if zip64 else '<4sLLL'
+        self.output.write(struct.pack(fmt, _DATA_DESCRIPTOR_SIGNATURE, crc, zinfo.compress_size, size))
+        self._zip.filelist.append(zinfo)
+        self._zip.NameToInfo[zinfo.filename] = zinfo
+        self._zip.start_dir = self.output.tell()
+
+    def close(self) -> Tuple[int, Optional[str]]:
+        """
+        残りを書き出して中央ディレクトリを書き込む
+
+        Returns:
+            Tuple[int, Optional[str]]: アーカイブのサイズとハッシュ
+        """
+        if not self._closed:
+            self._closed = True
+            try:
+                self._compressor.drain()
+                self._zip.close()
+            finally:
+                self._compressor.shutdown()
+                self._file.close()
+        return self.output.size, self.output.hexdigest()
+
+    def abort(self):
+        """書き込みを中止してファイルを閉じる"""
+        if not self._closed:
+            self._closed = True
+            self._compressor.shutdown()
+            self._file.close()
+
+
+class ParallelStreamWriter:
+    """
+    並列圧縮ストリーム書き込みクラス
+
+    書き込まれたデータをブロック単位で並列に圧縮し、gzipまたはbz2として書き出す。
+    gzipはブロック毎のraw deflateを連結した1メンバー、bz2はブロック毎の独立した
+    ストリームを連結したマルチストリーム形式で、いずれも標準のgzip/bz2・tarfileで
+    読める。tarfile.open(fileobj=..., mode='w|')の出力先として使う。
+    """
+
+    CODECS = ('gzip', 'bz2')
+
+    def __init__(self,
+                 path: Union[PathLike, BinaryIO],
+                 codec: str = 'gzip',
+                 level: int = 6,
+                 workers: Optional[int] = None,
+                 block_size: int = BLOCK_SIZE,
+                 hash_algorithm: Optional[str] = 'md5'):
+        """
+        初期化
+
+        Args:
+            path: 出力ファイル（暗号化ストリームなどのファイルオブジェクトも可）
+            codec: 'gzip' または 'bz2'
+            level: 圧縮レベル（gzipは0-9、bz2は1-9）
+            workers: 圧縮スレッド数（Noneの場合はCPU数）
+            block_size: 並列圧縮の単位（bz2は900KB以上を推奨）
+            hash_algorithm: 出力のハッシュアルゴリズム
+        """
+        if codec not in self.CODECS:
+            raise ValueError(f"サポートされていない圧縮形式です: {codec}")
+        self.codec = codec
+        self.level = max(0 if codec == 'gzip' else 1, min(9, level))
+        self.block_size = max(DICTIONARY_SIZE, block_size)
+        self._file = _open_output(path)
+        self.output = HashingWriter(self._file, hash_algorithm)
+        self._compressor = _OrderedCompressor(self.output, workers)
+        self._buffer = bytearray()
+        self._previous = b''
+        self._crc = 0
+        self._size = 0
+        self._blocks = 0
+        self._closed = False
+
+        if codec == 'gzip':
+            extra_flags = 2 if self.level == 9 else 4 if self.level == 1 else 0
+            self.output.write(b'\x1f\x8b\x08\x00' + struct.pack('<L', int(time.time()))
+                              + bytes([extra_flags, 255]))
+
+    def __enter__(self) -> 'ParallelStreamWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, data: bytes) -> int:
+        """
+        データを書き込む
+
+        Args:
+            data: データ
+
+        Returns:
+            int: 書き込んだバイト数
+        """
+        self._buffer += data
+        while len(self._buffer) >= self.block_size:
+            block = bytes(self._buffer[:self.block_size])
+            del self._buffer[:self.block_size]
+            self._submit(block, final=False)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def _submit(self, block: bytes, final: bool):
+        self._blocks += 1
+        if self.codec == 'gzip':
+            self._crc = zlib.crc32(block, self._crc)
+            self._size += len(block)
+            self._compressor.submit(deflate_block, block, self.level, self._previous, final)
+            self._previous = block[-DICTIONARY_SIZE:]
+        elif block or self._blocks == 1:
+            # 空のbz2ストリームは最初のブロックが空の場合のみ書く
+            self._compressor.submit(bz2.compress, block, self.level)
+
+    def close(self) -> Tuple[int, Optional[str]]:
+        """
+        残りを圧縮して書き出す
+
+        Returns:
+            Tuple[int, Optional[str]]: 出力のサイズとハッシュ
+        """
+        if not self._closed:
+            self._closed = True
+            try:
+                self._submit(bytes(self._buffer), final=True)
+                self._buffer.clear()
+                self._compressor.drain()
+                if self.codec == 'gzip':
+                    self.output.write(struct.pack('<LL', self._crc, self._size & 0xFFFFFFFF))
+            finally:
+                self._compressor.shutdown()
+                self._file.close()
+        return self.output.size, self.output.hexdigest()
+
+    def abort(self):
+        """書き込みを中止してファイルを閉じる"""
+        if not self._closed:
+            self._closed = True
+            self._compressor.shutdown()
+            self._file.close()
+
+
+def verify_zip_parallel(path: PathLike, workers: Optional[int] = None,
+                        opener: Optional[Callable[[], BinaryIO]] = None) -> Optional[str]:
+    """
+    ZIPの全エントリを複数スレッドで展開してCRCを検証（zipfile.ZipFile.testzipの並列版）
+
+    Args:
+        path: ZIPファイル
+        workers: スレッド数（Noneの場合はCPU数）
+        opener: ZIPを読み込み用に開く関数（暗号化ストリームなど。Noneの場合はpathを開く）
+
+    Returns:
+        Optional[str]: 最初に見つかった破損エントリ名（問題がない場合はNone）
+    """
+    if opener is None:
+        opener = lambda: open(path, 'rb')
+
+    with opener() as f, zipfile.ZipFile(f) as archive:
+        infos = sorted(archive.infolist(), key=lambda info: info.header_offset)
+    workers = min(resolve_workers(workers), max(1, len(infos)))
+    # エントリを連続した範囲に分け、各スレッドが自分のハンドルで先頭から読む
+    groups = [infos[index * len(infos) // workers:(index + 1) * len(infos) // workers]
+              for index in range(workers)]
+
+    def check(group):
+        with opener() as f, zipfile.ZipFile(f) as archive:
+            for info in group:
+                try:
+                    with archive.open(info) as member:
+                        while member.read(BLOCK_SIZE):
+                            pass
+                except (zipfile.BadZipFile, zlib.error):
+                    return info.filename
+        return None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for bad in executor.map(check, groups):
+            if bad is not None:
+                return bad
+    return None
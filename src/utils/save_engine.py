@@ -0,0 +1,244 @@
+# src/utils/save_engine.py
+"""
+保存エンジン
+一時ファイルへの書き込み・fsync・renameによる原子的な保存と、同じファイルへの連続した保存の集約を提供する
+"""
+
+import asyncio
+import itertools
+import os
+import shutil
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Union
+
+from ..core.logger import get_logger
+
+logger = get_logger(__name__)
+
+PathLike = Union[str, os.PathLike]
+
+_temp_counter = itertools.count()
+
+
+def fsync_directory(directory: PathLike):
+    """ディレクトリをfsync（renameを永続化する。対応していない環境では何もしない）"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_atomic(path: PathLike, data: bytes, fsync: bool = True, sync_directory: bool = True):
+    """
+    ファイルを原子的に書き込み（同じディレクトリの一時ファイルに書き込み、fsyncしてから置き換える）
+
+    Args:
+        path: 書き込み先
+        data: 書き込む内容
+        fsync: ファイルをfsyncするか
+        sync_directory: 置き換え後にディレクトリをfsyncするか（まとめて行う場合はFalse）
+    """
+    # シンボリックリンクはリンク先を置き換える（リンク自体を通常ファイルで上書きしない）
+    path = Path(os.path.realpath(path))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.{next(_temp_counter)}.tmp")
+    fd = os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        if path.exists():
+            shutil.copymode(path, temp)
+        os.replace(temp, path)
+    except BaseException:
+        temp.unlink(missing_ok=True)
+        raise
+    if fsync and sync_directory:
+        fsync_directory(path.parent)
+
+
+@dataclass
+class _PendingWrite:
+    """保存待ちの内容"""
+    data: bytes
+    first_scheduled: float
+    before_write: Optional[Callable[[Path], None]] = None
+    waiters: List[asyncio.Future] = field(default_factory=list)
+    handle: Optional[asyncio.TimerHandle] = None
+
+
+class SaveEngine:
+    """
+    保存エンジンクラス
+
+    同じファイルへの保存はdebounce秒の間に次の保存がなければ書き込む（最後の内容を書き込む）。
+    保存が続く場合でも最初の保存からmax_delay秒で書き込む。
+    書き込みはスレッドで行い、同時に書き込む複数のファイルのディレクトリのfsyncは1回にまとめる。
+    """
+
+    def __init__(self,
+                 debounce: float = 1.0,
+                 max_delay: float = 10.0,
+                 fsync: bool = True,
+                 on_written: Optional[Callable[[List[Path]], None]] = None):
+        """
+        初期化
+
+        Args:
+            debounce: 集約の待ち時間（秒）
+            max_delay: 最初の保存から書き込むまでの最大待ち時間（秒）
+            fsync: ファイル・ディレクトリをfsyncするか
+            on_written: 書き込み完了時にイベントループで呼び出す関数（書き込んだパスのリストを渡す）
+        """
+        self.debounce = debounce
+        self.max_delay = max(max_delay, debounce)
+        self.fsync = fsync
+        self.on_written = on_written
+        self._pending: Dict[Path, _PendingWrite] = {}
+        self._ready: Set[Path] = set()
+        self._drain_task: Optional[asyncio.Task] = None
+        self.statistics = {'requests': 0, 'writes': 0, 'batches': 0, 'directory_syncs': 0}
+
+    def schedule(self, path: PathLike, data: bytes,
+                 before_write: Optional[Callable[[Path], None]] = None) -> asyncio.Future:
+        """
+        保存を予約（同じファイルへの未書き込みの保存は置き換える）
+
+        Args:
+            path: 書き込み先
+            data: 書き込む内容
+            before_write: 書き込み直前にスレッドで呼び出す関数（バックアップ等）
+
+        Returns:
+            asyncio.Future: この内容（またはより新しい内容）が書き込まれると完了するFuture
+        """
+        loop = asyncio.get_running_loop()
+        path = Path(path).absolute()
+        now = loop.time()
+        self.statistics['requests'] += 1
+
+        entry = self._pending.get(path)
+        if entry is None:
+            entry = _PendingWrite(data, now, before_write)
+            self._pending[path] = entry
+        else:
+            entry.data = data
+            entry.before_write = before_write or entry.before_write
+            if entry.handle is not None:
+                entry.handle.cancel()
+                entry.handle = None
+
+        future = loop.create_future()
+        entry.waiters.append(future)
+        if path not in self._ready:
+            delay = min(self.debounce, max(0.0, entry.first_scheduled + self.max_delay - now))
+            entry.handle = loop.call_later(delay, self._mark_ready, path)
+        return future
+
+    async def write(self, path: PathLike, data: bytes,
+                    before_write: Optional[Callable[[Path], None]] = None):
+        """
+        すぐに書き込む（同じファイルの予約中の保存はこの内容で置き換える）
+
+        Args:
+            path: 書き込み先
+            data: 書き込む内容
+            before_write: 書き込み直前にスレッドで呼び出す関数
+        """
+        future = self.schedule(path, data, before_write)
+        self._mark_ready(Path(path).absolute())
+        await future
+
+    async def flush(self, paths: Optional[Iterable[PathLike]] = None):
+        """
+        予約中の保存をすぐに書き込む
+
+        Args:
+            paths: 対象のファイル（Noneの場合はすべて）
+        """
+        targets = list(self._pending) if paths is None else [Path(p).absolute() for p in paths]
+        for path in targets:
+            self._mark_ready(path)
+        # 書き込み中のものを含めて完了を待つ
+        if self._drain_task is not None:
+            await asyncio.shield(self._drain_task)
+
+    def has_pending(self, path: Optional[PathLike] = None) -> bool:
+        """未書き込みの保存があるか"""
+        if path is None:
+            return bool(self._pending)
+        return Path(path).absolute() in self._pending
+
+    def _mark_ready(self, path: Path):
+        """書き込み対象に加えて書き込みタスクを起動"""
+        entry = self._pending.get(path)
+        if entry is None:
+            return
+        if entry.handle is not None:
+            entry.handle.cancel()
+            entry.handle = None
+        self._ready.add(path)
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.get_running_loop().create_task(self._drain())
+
+    async def _drain(self):
+        """書き込み対象をまとめて書き込む（同じファイルの書き込みは順に行う）"""
+        loop = asyncio.get_running_loop()
+        while self._ready:
+            batch = {path: self._pending.pop(path) for path in self._ready if path in self._pending}
+            self._ready.clear()
+            errors = await loop.run_in_executor(None, self._write_batch, batch)
+
+            written = []
+            for path, entry in batch.items():
+                error = errors.get(path)
+                if error is None:
+                    written.append(path)
+                else:
+                    logger.error(f"保存エラー: {path}: {error}")
+                for waiter in entry.waiters:
+                    if waiter.done():
+                        continue
+                    if error is None:
+                        waiter.set_result(path)
+                    else:
+                        waiter.set_exception(error)
+            if written and self.on_written is not None:
+                try:
+                    self.on_written(written)
+                except Exception as e:
+                    logger.warning(f"保存後の処理エラー: {e}")
+
+    def _write_batch(self, batch: Dict[Path, _PendingWrite]) -> Dict[Path, BaseException]:
+        """スレッドで書き込み、ディレクトリ毎に1回fsyncする"""
+        errors: Dict[Path, BaseException] = {}
+        directories: Dict[Path, List[Path]] = {}
+        for path, entry in batch.items():
+            try:
+                if entry.before_write is not None:
+                    entry.before_write(path)
+                write_atomic(path, entry.data, fsync=self.fsync, sync_directory=False)
+                directories.setdefault(Path(os.path.realpath(path)).parent, []).append(path)
+            except Exception as e:
+                errors[path] = e
+        if self.fsync:
+            for directory in directories:
+                fsync_directory(directory)
+        self.statistics['writes'] += sum(len(paths) for paths in directories.values())
+        self.statistics['batches'] += 1
+        self.statistics['directory_syncs'] += len(directories) if self.fsync else 0
+        return errors
+
+    async def close(self):
+        """予約中の保存をすべて書き込む"""
+        await self.flush()
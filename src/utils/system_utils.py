@@ -18,7 +18,6 @@ from dataclasses import dataclass, asdict
 from datetime import datetime, timezone
 import shutil
 import tempfile
-import hashlib
 import socket
 import uuid
 from concurrent.futures import ThreadPoolExecutor, TimeoutError
@@ -27,6 +26,7 @@ from contextlib import contextmanager
 
 from src.core.logger import get_logger
 from src.core.exceptions import SystemError, ResourceNotFoundError, PermissionError
+from src.utils.hash_service import get_hash_service
 
 logger = get_logger(__name__)
 
@@ -495,25 +495,20 @@ class SystemUtils:
             self.logger.error(f"一時ディレクトリ削除エラー: {e}")
             return False
     
-    def calculate_file_hash(self, file_path: Path, algorithm: str = 'sha256') -> str:
+    def calculate_file_hash(self, file_path: Path, algorithm: str = 'sha256', use_cache: bool = False) -> str:
         """
         ファイルのハッシュ値を計算
         
         Args:
             file_path: ファイルパス
             algorithm: ハッシュアルゴリズム
+            use_cache: サイズ・更新時刻が同じ場合にキャッシュした値を使うか
             
         Returns:
             str: ハッシュ値
         """
         try:
-            hash_obj = hashlib.new(algorithm)
-            
-            with open(file_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_obj.update(chunk)
-            
-            hash_value = hash_obj.hexdigest()
+            hash_value = get_hash_service().hash_file(file_path, algorithm, use_cache)
             self.logger.debug(f"ファイルハッシュ計算完了: {file_path} -> {hash_value}")
             return hash_value
             
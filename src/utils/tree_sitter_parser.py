@@ -0,0 +1,567 @@
+# src/utils/tree_sitter_parser.py
+"""
+tree-sitterによるコード解析バックエンド
+JS/TS/Java/C/C++/Go/Rustの関数・クラス境界を構文木から抽出する
+文法パッケージがインストールされている場合のみ使用し、なければCodeParserの正規表現解析を使う
+"""
+
+import importlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tree_sitter
+    TREE_SITTER_AVAILABLE = True
+except ImportError:
+    tree_sitter = None
+    TREE_SITTER_AVAILABLE = False
+
+
+# 文法名 -> (モジュール名, 言語関数名)
+GRAMMAR_MODULES = {
+    'javascript': ('tree_sitter_javascript', 'language'),
+    'typescript': ('tree_sitter_typescript', 'language_typescript'),
+    'tsx': ('tree_sitter_typescript', 'language_tsx'),
+    'java': ('tree_sitter_java', 'language'),
+    'c': ('tree_sitter_c', 'language'),
+    'cpp': ('tree_sitter_cpp', 'language'),
+    'go': ('tree_sitter_go', 'language'),
+    'rust': ('tree_sitter_rust', 'language'),
+}
+
+# 言語毎のノード種別
+#   classes: クラス相当（配下のメソッドを探索する）
+#   functions: 関数・メソッド（配下は探索せず親チャンクに含める）
+#   imports: インポート相当
+#   containers: 配下を探索するノード（名前空間・exportなど）
+_JS_SPEC = {
+    'classes': {'class_declaration', 'abstract_class_declaration', 'interface_declaration'},
+    'functions': {'function_declaration', 'generator_function_declaration', 'method_definition'},
+    'imports': {'import_statement'},
+    'containers': {'export_statement', 'class_body', 'interface_body', 'object_type',
+                   'internal_module', 'module', 'statement_block', 'ambient_declaration'},
+    'variables': {'lexical_declaration', 'variable_declaration'},
+}
+
+LANGUAGE_SPECS: Dict[str, Dict[str, Set[str]]] = {
+    'javascript': _JS_SPEC,
+    'typescript': _JS_SPEC,
+    'tsx': _JS_SPEC,
+    'java': {
+        'classes': {'class_declaration', 'interface_declaration', 'enum_declaration', 'record_declaration'},
+        'functions': {'method_declaration', 'constructor_declaration'},
+        'imports': {'package_declaration', 'import_declaration'},
+        'containers': {'class_body', 'interface_body', 'enum_body', 'enum_body_declarations'},
+    },
+    'c': {
+        'classes': {'struct_specifier', 'union_specifier', 'enum_specifier'},
+        'functions': {'function_definition'},
+        'imports': {'preproc_include'},
+        'containers': {'preproc_if', 'preproc_ifdef', 'preproc_else', 'preproc_elif', 'linkage_specification',
+                       'declaration_list', 'type_definition', 'declaration'},
+    },
+    'cpp': {
+        'classes': {'class_specifier', 'struct_specifier', 'union_specifier', 'enum_specifier'},
+        'functions': {'function_definition'},
+        'imports': {'preproc_include', 'using_declaration'},
+        'containers': {'preproc_if', 'preproc_ifdef', 'preproc_else', 'preproc_elif', 'linkage_specification',
+                       'namespace_definition', 'declaration_list', 'field_declaration_list',
+                       'template_declaration', 'type_definition', 'declaration', 'field_declaration'},
+    },
+    'go': {
+        'classes': {'type_declaration'},
+        'functions': {'function_declaration', 'method_declaration'},
+        'imports': {'import_declaration', 'package_clause'},
+        'containers': set(),
+    },
+    'rust': {
+        'classes': {'struct_item', 'enum_item', 'trait_item', 'impl_item', 'union_item'},
+        'functions': {'function_item', 'function_signature_item'},
+        'imports': {'use_declaration', 'extern_crate_declaration'},
+        'containers': {'declaration_list', 'mod_item'},
+    },
+}
+
+# 内側の宣言に外側の範囲（exportキーワード・テンプレート引数など）を含めるノード
+_WRAPPER_TYPES = {'export_statement', 'template_declaration', 'decorated_definition'}
+
+# 関数値として扱う式
+_FUNCTION_VALUES = {'arrow_function', 'function_expression', 'function', 'generator_function'}
+
+# インポートチャンクのtype（既存の正規表現解析に合わせる）
+_IMPORT_CHUNK_TYPES = {'c': 'includes', 'cpp': 'includes'}
+
+
+def _common_prefix_length(old: bytes, new: bytes) -> int:
+    """共通接頭辞の長さ（スライス比較による二分探索）"""
+    low, high = 0, min(len(old), len(new))
+    while low < high:
+        mid = (low + high + 1) // 2
+        if old[:mid] == new[:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _common_suffix_length(old: bytes, new: bytes, limit: int) -> int:
+    """共通接尾辞の長さ（limitを上限とする）"""
+    low, high = 0, limit
+    while low < high:
+        mid = (low + high + 1) // 2
+        if old[len(old) - mid:] == new[len(new) - mid:]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _point_at(source: bytes, byte_offset: int) -> Tuple[int, int]:
+    """バイト位置を (行, 列) に変換"""
+    row = source.count(b'\n', 0, byte_offset)
+    line_start = source.rfind(b'\n', 0, byte_offset) + 1
+    return row, byte_offset - line_start
+
+
+class TreeSitterParser:
+    """
+    tree-sitterによるチャンク抽出クラス
+
+    ファイル毎に前回の構文木を保持し、内容が一部だけ変わった場合は
+    変更範囲を構文木に反映して差分再解析する。
+    """
+
+    def __init__(self, max_cached_trees: int = 64):
+        """
+        初期化
+
+        Args:
+            max_cached_trees: 差分再解析のために保持する構文木の最大数
+        """
+        self.max_cached_trees = max_cached_trees
+        self._languages: Dict[str, Any] = {}
+        self._parsers: Dict[str, Any] = {}
+        self._trees: "OrderedDict[str, Tuple[str, bytes, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'full_parses': 0, 'incremental_parses': 0}
+
+    @staticmethod
+    def grammar_for(language: str, file_path: str) -> str:
+        """言語名とファイルパスから文法名を決定"""
+        if language == 'typescript' and Path(file_path).suffix.lower() == '.tsx':
+            return 'tsx'
+        return language
+
+    def supports(self, language: str, file_path: str = "") -> bool:
+        """
+        指定言語の文法が利用可能か
+
+        Args:
+            language: 言語名
+            file_path: ファイルパス（.tsxの判定用）
+
+        Returns:
+            bool: 利用可能フラグ
+        """
+        grammar = self.grammar_for(language, file_path)
+        return grammar in LANGUAGE_SPECS and self._get_parser(grammar) is not None
+
+    def parse_chunks(self, content: str, file_path: str, language: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        構文木から関数・クラス単位のチャンクを抽出
+
+        Args:
+            content: ファイルの内容
+            file_path: ファイルパス
+            language: 言語名
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: チャンクのリスト（解析できない場合はNone）
+        """
+        grammar = self.grammar_for(language, file_path)
+        source = content.encode('utf-8')
+        tree = self.parse(source, file_path, grammar)
+        if tree is None or tree.root_node.has_error and not tree.root_node.named_children:
+            return None
+
+        spec = LANGUAGE_SPECS[grammar]
+        chunks = _ChunkExtractor(source, file_path, language, grammar, spec).extract(tree.root_node)
+        if not chunks:
+            lines = content.split('\n')
+            chunks = [{
+                'content': content,
+                'type': 'file',
+                'file_path': file_path,
+                'line_start': 1,
+                'line_end': len(lines),
+                'function_name': '',
+                'class_name': '',
+                'language': language
+            }]
+        return chunks
+
+    def parse(self, source: bytes, file_path: str, grammar: str) -> Optional[Any]:
+        """
+        ソースを解析（同じファイルの前回の構文木があれば差分再解析）
+
+        Args:
+            source: ソースのバイト列
+            file_path: ファイルパス（構文木キャッシュのキー）
+            grammar: 文法名
+
+        Returns:
+            Optional[Any]: tree_sitter.Tree
+        """
+        parser = self._get_parser(grammar)
+        if parser is None:
+            return None
+
+        with self._lock:
+            cached = self._trees.pop(file_path, None)
+
+            old_tree = None
+            if cached and cached[0] == grammar:
+                _, old_source, old_tree = cached
+                if old_source == source:
+                    self._remember(file_path, grammar, source, old_tree)
+                    return old_tree
+                self._apply_edit(old_tree, old_source, source)
+
+            try:
+                tree = parser.parse(source, old_tree) if old_tree is not None else parser.parse(source)
+            except Exception as e:
+                logger.debug(f"tree-sitter解析エラー {file_path}: {e}")
+                return None
+
+            self.stats['incremental_parses' if old_tree is not None else 'full_parses'] += 1
+            self._remember(file_path, grammar, source, tree)
+            return tree
+
+    def forget(self, file_path: Optional[str] = None):
+        """保持している構文木を破棄"""
+        with self._lock:
+            if file_path is None:
+                self._trees.clear()
+            else:
+                self._trees.pop(file_path, None)
+
+    def _remember(self, file_path: str, grammar: str, source: bytes, tree: Any):
+        """構文木を保持（LRU）"""
+        if self.max_cached_trees <= 0:
+            return
+        self._trees[file_path] = (grammar, source, tree)
+        while len(self._trees) > self.max_cached_trees:
+            self._trees.popitem(last=False)
+
+    @staticmethod
+    def _apply_edit(tree: Any, old: bytes, new: bytes):
+        """旧ソースと新ソースの差分範囲を構文木に通知"""
+        start = _common_prefix_length(old, new)
+        suffix = _common_suffix_length(old, new, min(len(old), len(new)) - start)
+        old_end = len(old) - suffix
+        new_end = len(new) - suffix
+        tree.edit(
+            start_byte=start,
+            old_end_byte=old_end,
+            new_end_byte=new_end,
+            start_point=_point_at(old, start),
+            old_end_point=_point_at(old, old_end),
+            new_end_point=_point_at(new, new_end),
+        )
+
+    def _get_parser(self, grammar: str) -> Optional[Any]:
+        """文法のパーサーを取得（未インストールの場合はNone）"""
+        if grammar in self._parsers:
+            return self._parsers[grammar]
+
+        parser = None
+        language = self._load_language(grammar)
+        if language is not None:
+            try:
+                parser = tree_sitter.Parser(language)
+            except TypeError:
+                # 0.21以前のAPI
+                parser = tree_sitter.Parser()
+                parser.set_language(language)
+            except Exception as e:
+                logger.debug(f"tree-sitterパーサー作成エラー {grammar}: {e}")
+
+        self._parsers[grammar] = parser
+        return parser
+
+    def _load_language(self, grammar: str) -> Optional[Any]:
+        """文法パッケージを読み込み"""
+        if not TREE_SITTER_AVAILABLE or grammar not in GRAMMAR_MODULES:
+            return None
+
+        module_name, function_name = GRAMMAR_MODULES[grammar]
+        try:
+            module = importlib.import_module(module_name)
+            return tree_sitter.Language(getattr(module, function_name)())
+        except ImportError:
+            pass
+        except Exception as e:
+            logger.debug(f"tree-sitter文法読み込みエラー {grammar}: {e}")
+            return None
+
+        # 複数言語をまとめたパッケージ
+        for pack_name in ('tree_sitter_language_pack', 'tree_sitter_languages'):
+            try:
+                pack = importlib.import_module(pack_name)
+                return pack.get_language(grammar)
+            except ImportError:
+                continue
+            except Exception as e:
+                logger.debug(f"tree-sitter文法読み込みエラー {grammar}: {e}")
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """統計情報を取得"""
+        return {
+            **self.stats,
+            'cached_trees': len(self._trees),
+            'grammars': sorted(name for name, parser in self._parsers.items() if parser is not None)
+        }
+
+
+class _ChunkExtractor:
+    """構文木をスタックで走査してチャンクを生成"""
+
+    def __init__(self, source: bytes, file_path: str, language: str, grammar: str, spec: Dict[str, Set[str]]):
+        self.source = source
+        self.file_path = file_path
+        self.language = language
+        self.grammar = grammar
+        self.spec = spec
+        self.import_nodes: List[Any] = []
+        self.chunks: List[Dict[str, Any]] = []
+
+    def extract(self, root: Any) -> List[Dict[str, Any]]:
+        """チャンクを出現順に抽出"""
+        # (ノード, 範囲の起点となる外側ノード, クラススコープ)
+        stack: List[Tuple[Any, Optional[Any], Tuple[str, ...]]] = [
+            (child, None, ()) for child in reversed(root.named_children)
+        ]
+        spec = self.spec
+
+        while stack:
+            node, wrapper, scope = stack.pop()
+            node_type = node.type
+            outer = wrapper or node
+
+            if node_type in spec['imports']:
+                self.import_nodes.append(node)
+            elif node_type in spec['functions']:
+                self._add_function(node, outer, scope)
+            elif node_type in spec['classes']:
+                name = self._class_name(node)
+                if name is None:
+                    # 名前のない構造体（typedef struct {...}など）は中身だけ探索
+                    self._push_children(stack, node, scope)
+                    continue
+                self.chunks.append(self._chunk(outer, 'class', '', name, scope))
+                self._push_children(stack, node, scope + (name,))
+            elif node_type in spec.get('variables', ()):
+                self._add_variable_functions(node, outer, scope)
+            elif node_type in _WRAPPER_TYPES:
+                self._push_children(stack, node, scope, wrapper=outer)
+            elif node_type in spec['containers'] or node_type.endswith('_body'):
+                self._push_children(stack, node, scope)
+
+        if self.import_nodes:
+            self.chunks.insert(0, self._imports_chunk())
+        return self.chunks
+
+    def _push_children(self, stack: List, node: Any, scope: Tuple[str, ...], wrapper: Optional[Any] = None):
+        """子ノードを出現順に処理されるよう積む"""
+        body = node.child_by_field_name('body')
+        children = list(node.named_children)
+        if body is not None and body not in children:
+            children.append(body)
+        for child in reversed(children):
+            stack.append((child, wrapper, scope))
+
+    def _add_function(self, node: Any, outer: Any, scope: Tuple[str, ...]):
+        """関数・メソッドのチャンクを追加"""
+        name = self._function_name(node)
+        class_name = scope[-1] if scope else ''
+        chunk_type = 'method' if class_name else 'function'
+
+        # Goのメソッドはレシーバーの型をクラスとする
+        if node.type == 'method_declaration' and self.grammar == 'go':
+            class_name = self._go_receiver_type(node)
+            chunk_type = 'method'
+
+        chunk = self._chunk(outer, chunk_type, name, class_name, scope)
+        parameters = node.child_by_field_name('parameters')
+        if parameters is None:
+            declarator = node.child_by_field_name('declarator')
+            parameters = self._find_descendant(declarator, 'parameter_list') if declarator is not None else None
+        if parameters is not None:
+            chunk['parameters'] = self._parameter_names(parameters)
+        chunk['is_async'] = any(child.type == 'async' for child in node.children)
+        self.chunks.append(chunk)
+
+    def _add_variable_functions(self, node: Any, outer: Any, scope: Tuple[str, ...]):
+        """const f = () => {...} 形式の関数を追加"""
+        for declarator in node.named_children:
+            if declarator.type != 'variable_declarator':
+                continue
+            value = declarator.child_by_field_name('value')
+            name_node = declarator.child_by_field_name('name')
+            if value is not None and value.type == 'call_expression' and self._is_require(value):
+                # const x = require('x') はインポートとして扱う
+                self.import_nodes.append(node)
+                return
+            if value is None or name_node is None or value.type not in _FUNCTION_VALUES:
+                continue
+
+            name = self._text(name_node)
+            chunk = self._chunk(outer, 'function', name, scope[-1] if scope else '', scope)
+            parameters = value.child_by_field_name('parameters')
+            if parameters is not None:
+                chunk['parameters'] = self._parameter_names(parameters)
+            chunk['is_async'] = any(child.type == 'async' for child in value.children)
+            self.chunks.append(chunk)
+
+    def _is_require(self, call: Any) -> bool:
+        """require()呼び出しか"""
+        function = call.child_by_field_name('function')
+        return function is not None and self._text(function) == 'require'
+
+    def _chunk(self, node: Any, chunk_type: str, function_name: str, class_name: str,
+               scope: Tuple[str, ...]) -> Dict[str, Any]:
+        """チャンク辞書を作成"""
+        own_name = function_name or class_name
+        if chunk_type == 'class':
+            qualified = '.'.join(scope + (class_name,))
+        else:
+            qualified = '.'.join(scope + (function_name,)) if scope else (
+                f"{class_name}.{function_name}" if class_name else function_name
+            )
+        return {
+            'content': self._text(node),
+            'type': chunk_type,
+            'file_path': self.file_path,
+            'line_start': node.start_point[0] + 1,
+            'line_end': node.end_point[0] + 1,
+            'function_name': function_name,
+            'class_name': class_name,
+            'qualified_name': qualified or own_name,
+            'language': self.language
+        }
+
+    def _imports_chunk(self) -> Dict[str, Any]:
+        """インポートをまとめたチャンク"""
+        first, last = self.import_nodes[0], self.import_nodes[-1]
+        return {
+            'content': '\n'.join(self._text(node) for node in self.import_nodes),
+            'type': _IMPORT_CHUNK_TYPES.get(self.grammar, 'imports'),
+            'file_path': self.file_path,
+            'line_start': first.start_point[0] + 1,
+            'line_end': last.end_point[0] + 1,
+            'function_name': '',
+            'class_name': '',
+            'language': self.language
+        }
+
+    def _text(self, node: Any) -> str:
+        """ノードのソース文字列"""
+        return self.source[node.start_byte:node.end_byte].decode('utf-8', errors='replace')
+
+    def _class_name(self, node: Any) -> Optional[str]:
+        """クラス相当ノードの名前"""
+        if node.type == 'type_declaration':
+            # Go: type Foo struct {...}
+            for spec in node.named_children:
+                name = spec.child_by_field_name('name')
+                if name is not None:
+                    return self._text(name)
+            return None
+        if node.type == 'impl_item':
+            # Rust: impl Trait for Type / impl Type
+            type_node = node.child_by_field_name('type')
+            return self._text(type_node) if type_node is not None else None
+
+        name = node.child_by_field_name('name')
+        if name is None:
+            return None
+        # C/C++の前方宣言（本体なし）はチャンクにしない
+        if node.type.endswith('_specifier') and node.child_by_field_name('body') is None:
+            return None
+        return self._text(name)
+
+    def _function_name(self, node: Any) -> str:
+        """関数ノードの名前"""
+        name = node.child_by_field_name('name')
+        if name is not None:
+            return self._text(name)
+
+        # C/C++: 宣言子を辿って識別子を探す
+        declarator = node.child_by_field_name('declarator')
+        while declarator is not None:
+            inner = declarator.child_by_field_name('declarator')
+            if inner is None:
+                return self._text(declarator)
+            if declarator.type in ('qualified_identifier', 'destructor_name', 'operator_name'):
+                return self._text(declarator)
+            declarator = inner
+        return 'anonymous'
+
+    def _go_receiver_type(self, node: Any) -> str:
+        """Goのメソッドのレシーバー型"""
+        receiver = node.child_by_field_name('receiver')
+        if receiver is None:
+            return ''
+        type_node = self._find_descendant(receiver, 'type_identifier')
+        return self._text(type_node) if type_node is not None else ''
+
+    def _parameter_names(self, parameters: Any) -> List[str]:
+        """引数名のリスト"""
+        names = []
+        for parameter in parameters.named_children:
+            if parameter.type in ('identifier', 'shorthand_property_identifier_pattern'):
+                names.append(self._text(parameter))
+                continue
+            name = (parameter.child_by_field_name('name') or parameter.child_by_field_name('pattern')
+                    or parameter.child_by_field_name('declarator'))
+            if name is not None:
+                identifier = name if name.type in ('identifier', 'field_identifier') else \
+                    self._find_descendant(name, 'identifier')
+                names.append(self._text(identifier or name))
+        return names
+
+    @staticmethod
+    def _find_descendant(node: Any, node_type: str) -> Optional[Any]:
+        """指定種別の最初の子孫ノード"""
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current.type == node_type:
+                return current
+            stack.extend(reversed(current.named_children))
+        return None
+
+
+# グローバルインスタンス
+_tree_sitter_parser: Optional[TreeSitterParser] = None
+
+
+def get_tree_sitter_parser() -> Optional[TreeSitterParser]:
+    """
+    tree-sitterパーサーを取得
+
+    Returns:
+        Optional[TreeSitterParser]: tree-sitterが未インストールの場合はNone
+    """
+    global _tree_sitter_parser
+    if not TREE_SITTER_AVAILABLE:
+        return None
+    if _tree_sitter_parser is None:
+        _tree_sitter_parser = TreeSitterParser()
+    return _tree_sitter_parser
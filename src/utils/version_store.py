@@ -0,0 +1,436 @@
+# src/utils/version_store.py
+"""
+ファイル版管理ユーティリティ
+保存前のファイルをハードリンク・reflink・コピー・前版との差分で格納し、版の索引をSQLiteで管理する
+"""
+
+import errno
+import hashlib
+import os
+import sqlite3
+import struct
+import threading
+import zlib
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from ..core.logger import get_logger
+from .chunk_store import ContentDefinedChunker
+
+logger = get_logger(__name__)
+
+PathLike = Union[str, os.PathLike]
+
+# 格納方式
+KIND_LINK = "link"
+KIND_REFLINK = "reflink"
+KIND_COPY = "copy"
+KIND_DELTA = "delta"
+
+# ハードリンクをファイルシステム（デバイス）として作成できないことを示すエラー
+_LINK_UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.EPERM, errno.EOPNOTSUPP}
+
+# Linuxのioctl(FICLONE)
+FICLONE = 0x40049409
+
+# 差分の命令: (種類, 値1, 値2)。コピーは(0, 前版の位置, 長さ)、リテラルは(1, 長さ, 0)の後にデータ
+_OP = struct.Struct('>BQQ')
+_OP_COPY = 0
+_OP_LITERAL = 1
+
+# 差分の連鎖の上限（超える場合は全体を格納）
+MAX_DELTA_DEPTH = 8
+
+
+def _reflink(source: Path, target: Path) -> bool:
+    """reflink（ブロックを共有するコピー）を作成。対応していなければFalse"""
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(source, 'rb') as src, open(target, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except OSError:
+        target.unlink(missing_ok=True)
+        return False
+
+
+def _chunk_key(data: bytes) -> str:
+    """版間の比較に使うチャンクのキー"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+@dataclass
+class VersionInfo:
+    """版情報"""
+    version_id: int
+    original_path: str
+    blob_path: str
+    timestamp: datetime
+    size: int
+    kind: str
+    hash_md5: Optional[str] = None
+    base_id: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書形式に変換"""
+        data = asdict(self)
+        data['timestamp'] = self.timestamp.isoformat()
+        return data
+
+
+class VersionStore:
+    """
+    ファイル版管理クラス
+
+    保存で置き換えられる前のファイルを次の順に安価な方法で格納する。
+    - link: 呼び出し側が元ファイルを置き換える・削除する場合、ハードリンクを作るだけ（複製のIOなし）
+    - reflink: ファイルシステムが対応していればブロックを共有するコピー
+    - copy: 前版がない場合はそのままコピー（以降の版の差分の基準になる）
+    - delta: 前版とのコンテンツ定義チャンクの差分をzlib圧縮して格納
+    ハードリンク・reflinkが作成できない（別デバイス・非対応）ことはデバイス毎に一度だけ検出し、以降は試さない。
+    版はSQLiteの索引で元ファイルのパス毎に管理するため、一覧・整理はそのファイルの版数に比例する。
+    """
+
+    INDEX_FILE = "versions.db"
+    BLOB_DIRECTORY = "blobs"
+    _COLUMNS = 'version_id, original_path, blob, created, size, kind, md5, base_id'
+
+    def __init__(self, store_path: PathLike, chunker: Optional[ContentDefinedChunker] = None):
+        """
+        初期化
+
+        Args:
+            store_path: 格納先ディレクトリ
+            chunker: 差分計算用のチャンク分割器
+        """
+        self.store_path = Path(store_path)
+        self.blob_path = self.store_path / self.BLOB_DIRECTORY
+        self.blob_path.mkdir(parents=True, exist_ok=True)
+        self.chunker = chunker or ContentDefinedChunker(min_size=512, avg_bits=11, max_size=32 * 1024)
+        self._lock = threading.RLock()
+        # ハードリンク・reflinkが作成できなかった元ファイルのデバイス
+        self._link_unsupported: Set[int] = set()
+        self._reflink_unsupported: Set[int] = set()
+
+        self.connection = sqlite3.connect(str(self.store_path / self.INDEX_FILE), check_same_thread=False)
+        with self.connection:
+            self.connection.execute('''
+                CREATE TABLE IF NOT EXISTS versions (
+                    version_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    original_path TEXT NOT NULL,
+                    blob TEXT NOT NULL,
+                    created TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    kind TEXT NOT NULL,
+                    md5 TEXT,
+                    base_id INTEGER,
+                    depth INTEGER NOT NULL DEFAULT 0,
+                    mtime_ns INTEGER,
+                    chunks TEXT
+                )
+            ''')
+            self.connection.execute(
+                'CREATE INDEX IF NOT EXISTS idx_versions_path ON versions(original_path, version_id)'
+            )
+            self.connection.execute('CREATE INDEX IF NOT EXISTS idx_versions_base ON versions(base_id)')
+
+    # ===== 格納 =====
+
+    def save_version(self, file_path: PathLike, replacing: bool = False) -> VersionInfo:
+        """
+        ファイルの現在の内容を版として格納
+
+        Args:
+            file_path: 対象ファイル
+            replacing: 呼び出し側がこの後ファイルを置き換える（os.replace）か削除し、
+                       同じinodeに書き込まない場合True（ハードリンクで格納できる）
+
+        Returns:
+            VersionInfo: 格納した版
+        """
+        source = Path(file_path).absolute()
+        stat = source.stat()
+        created = datetime.now()
+        blob_name = f"{source.stem}_{created.strftime('%Y%m%d_%H%M%S_%f')}{source.suffix}"
+        blob = self.blob_path / blob_name
+
+        with self._lock:
+            kind = None
+            if replacing and stat.st_nlink == 1 and stat.st_dev not in self._link_unsupported:
+                try:
+                    os.link(source, blob)
+                    kind = KIND_LINK
+                except OSError as e:
+                    if e.errno in _LINK_UNSUPPORTED_ERRNOS:
+                        self._link_unsupported.add(stat.st_dev)
+            if kind is None and stat.st_dev not in self._reflink_unsupported:
+                if _reflink(source, blob):
+                    kind = KIND_REFLINK
+                else:
+                    self._reflink_unsupported.add(stat.st_dev)
+
+            md5 = None
+            base_id = None
+            depth = 0
+            chunks = None
+            if kind is None:
+                base = self._delta_base(str(source))
+                if base is None:
+                    kind = KIND_COPY
+                    md5, chunks = self._write_copy(source, blob)
+                    stat = blob.stat()
+                else:
+                    kind = KIND_DELTA
+                    blob = blob.with_name(blob_name + ".delta")
+                    base_id, depth, base_chunks = base
+                    md5, chunks = self._write_delta(source, blob, base_chunks)
+            else:
+                # ハードリンク・reflinkは後から内容が変わっていないかをmtimeで確認する
+                stat = blob.stat()
+
+            cursor = self.connection.execute(
+                'INSERT INTO versions (original_path, blob, created, size, kind, md5, base_id, depth, mtime_ns, chunks) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (str(source), blob.name, created.isoformat(), stat.st_size, kind, md5, base_id,
+                 depth, stat.st_mtime_ns, chunks)
+            )
+            self.connection.commit()
+            version = VersionInfo(cursor.lastrowid, str(source), str(blob), created, stat.st_size,
+                                  kind, md5, base_id)
+        logger.debug(f"版を格納しました: {source} ({kind})")
+        return version
+
+    def _delta_base(self, original_path: str) -> Optional[Tuple[int, int, str]]:
+        """差分の基準にする直前の版（チャンク一覧があり、連鎖が上限未満のもの）"""
+        row = self.connection.execute(
+            'SELECT version_id, depth, chunks FROM versions WHERE original_path = ? '
+            'ORDER BY version_id DESC LIMIT 1',
+            (original_path,)
+        ).fetchone()
+        if row is None or row[2] is None or row[1] + 1 > MAX_DELTA_DEPTH:
+            return None
+        return row[0], row[1] + 1, row[2]
+
+    def _write_copy(self, source: Path, blob: Path) -> Tuple[str, str]:
+        """ファイルをそのままコピーし、MD5とチャンク一覧を返す（ファイルは1回だけ読む）"""
+        md5 = hashlib.md5()
+        keys: List[str] = []
+        try:
+            with open(source, 'rb') as src, open(blob, 'wb') as out:
+                for data in self.chunker.iter_chunks(src):
+                    md5.update(data)
+                    keys.append(f"{_chunk_key(data)}:{len(data)}")
+                    out.write(data)
+        except Exception:
+            blob.unlink(missing_ok=True)
+            raise
+        return md5.hexdigest(), ",".join(keys)
+
+    def _write_delta(self, source: Path, blob: Path, base_chunks: Optional[str]) -> Tuple[str, str]:
+        """前版との差分を書き込み、MD5とチャンク一覧を返す（ファイルは1回だけ読む）"""
+        base: Dict[str, Tuple[int, int]] = {}
+        if base_chunks:
+            offset = 0
+            for key, length in (item.split(':') for item in base_chunks.split(',')):
+                base.setdefault(key, (offset, int(length)))
+                offset += int(length)
+
+        md5 = hashlib.md5()
+        keys: List[str] = []
+        compressor = zlib.compressobj(6)
+        pending: Optional[List[int]] = None
+        try:
+            with open(source, 'rb') as src, open(blob, 'wb') as out:
+                for data in self.chunker.iter_chunks(src):
+                    md5.update(data)
+                    key = _chunk_key(data)
+                    keys.append(f"{key}:{len(data)}")
+                    match = base.get(key)
+                    if match is not None and match[1] == len(data):
+                        # 前版で連続するコピーはまとめる
+                        if pending is not None and pending[0] + pending[1] == match[0]:
+                            pending[1] += match[1]
+                            continue
+                        if pending is not None:
+                            out.write(compressor.compress(_OP.pack(_OP_COPY, *pending)))
+                        pending = [match[0], match[1]]
+                        continue
+                    if pending is not None:
+                        out.write(compressor.compress(_OP.pack(_OP_COPY, *pending)))
+                        pending = None
+                    out.write(compressor.compress(_OP.pack(_OP_LITERAL, len(data), 0)))
+                    out.write(compressor.compress(data))
+                if pending is not None:
+                    out.write(compressor.compress(_OP.pack(_OP_COPY, *pending)))
+                out.write(compressor.flush())
+        except Exception:
+            blob.unlink(missing_ok=True)
+            raise
+        return md5.hexdigest(), ",".join(keys)
+
+    # ===== 参照 =====
+
+    def _row_to_info(self, row: Tuple) -> VersionInfo:
+        """索引の行を版情報に変換"""
+        version_id, original_path, blob, created, size, kind, md5, base_id = row
+        return VersionInfo(version_id, original_path, str(self.blob_path / blob),
+                           datetime.fromisoformat(created), size, kind, md5, base_id)
+
+    def list_versions(self, file_path: PathLike) -> List[VersionInfo]:
+        """
+        ファイルの版一覧（新しい順）
+
+        Args:
+            file_path: 対象ファイル
+
+        Returns:
+            List[VersionInfo]: 版情報のリスト
+        """
+        with self._lock:
+            rows = self.connection.execute(
+                f'SELECT {self._COLUMNS} FROM versions WHERE original_path = ? ORDER BY version_id DESC',
+                (str(Path(file_path).absolute()),)
+            ).fetchall()
+        return [self._row_to_info(row) for row in rows]
+
+    def get_version(self, version_id: int) -> Optional[VersionInfo]:
+        """版情報を取得"""
+        with self._lock:
+            row = self.connection.execute(
+                f'SELECT {self._COLUMNS} FROM versions WHERE version_id = ?', (version_id,)
+            ).fetchone()
+        return self._row_to_info(row) if row else None
+
+    def read_version(self, version_id: int) -> bytes:
+        """
+        版の内容を読み込み
+
+        Args:
+            version_id: 版ID
+
+        Returns:
+            bytes: 版の内容
+        """
+        with self._lock:
+            row = self.connection.execute(
+                'SELECT blob, kind, base_id, size, mtime_ns, md5 FROM versions WHERE version_id = ?',
+                (version_id,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"版が見つかりません: {version_id}")
+        blob_name, kind, base_id, size, mtime_ns, md5 = row
+        blob = self.blob_path / blob_name
+
+        if kind != KIND_DELTA:
+            stat = blob.stat()
+            if stat.st_size != size or stat.st_mtime_ns != mtime_ns:
+                raise ValueError(f"格納後に版の内容が変更されています: {blob}")
+            return blob.read_bytes()
+
+        base = self.read_version(base_id) if base_id is not None else b''
+        stream = zlib.decompress(blob.read_bytes())
+        content = bytearray()
+        position = 0
+        while position < len(stream):
+            op, first, second = _OP.unpack_from(stream, position)
+            position += _OP.size
+            if op == _OP_COPY:
+                content += base[first:first + second]
+            else:
+                content += stream[position:position + first]
+                position += first
+        if len(content) != size or (md5 and hashlib.md5(content).hexdigest() != md5):
+            raise ValueError(f"版の復元結果が一致しません: {version_id}")
+        return bytes(content)
+
+    def restore_version(self, version_id: int, target: Optional[PathLike] = None) -> Path:
+        """
+        版を復元
+
+        Args:
+            version_id: 版ID
+            target: 復元先（Noneの場合は元のパス）
+
+        Returns:
+            Path: 復元したファイル
+        """
+        version = self.get_version(version_id)
+        if version is None:
+            raise KeyError(f"版が見つかりません: {version_id}")
+        target = Path(target) if target else Path(version.original_path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        # 置き換えで書き込むため、ハードリンクで格納した版を書き換えない
+        temp = target.with_name(f".{target.name}.restore-tmp")
+        try:
+            if version.kind == KIND_DELTA or not _reflink(Path(version.blob_path), temp):
+                temp.write_bytes(self.read_version(version_id))
+            os.replace(temp, target)
+        except Exception:
+            temp.unlink(missing_ok=True)
+            raise
+        return target
+
+    # ===== 整理 =====
+
+    def prune(self, file_path: PathLike, keep: int) -> int:
+        """
+        古い版を削除（残す版が削除する版を基準にしている場合は全体を格納し直す）
+
+        Args:
+            file_path: 対象ファイル
+            keep: 残す版数
+
+        Returns:
+            int: 削除した版数
+        """
+        with self._lock:
+            rows = self.connection.execute(
+                'SELECT version_id, blob FROM versions WHERE original_path = ? ORDER BY version_id DESC',
+                (str(Path(file_path).absolute()),)
+            ).fetchall()
+            expired = rows[keep:]
+            if not expired:
+                return 0
+            expired_ids = {version_id for version_id, _ in expired}
+
+            for version_id, _ in reversed(rows[:keep]):
+                base_id = self.connection.execute(
+                    'SELECT base_id FROM versions WHERE version_id = ?', (version_id,)
+                ).fetchone()[0]
+                if base_id in expired_ids:
+                    self._rebase_to_full(version_id)
+
+            for version_id, blob in expired:
+                (self.blob_path / blob).unlink(missing_ok=True)
+            self.connection.executemany('DELETE FROM versions WHERE version_id = ?',
+                                        [(version_id,) for version_id in expired_ids])
+            self.connection.commit()
+        return len(expired)
+
+    def _rebase_to_full(self, version_id: int):
+        """差分の版を前版に依存しない形で格納し直す"""
+        content = self.read_version(version_id)
+        blob_name = self.connection.execute(
+            'SELECT blob FROM versions WHERE version_id = ?', (version_id,)
+        ).fetchone()[0]
+        blob = self.blob_path / blob_name
+        temp = blob.with_name(blob.name + ".tmp")
+        compressor = zlib.compressobj(6)
+        temp.write_bytes(compressor.compress(_OP.pack(_OP_LITERAL, len(content), 0) + content) + compressor.flush())
+        os.replace(temp, blob)
+        self.connection.execute('UPDATE versions SET base_id = NULL, depth = 0 WHERE version_id = ?', (version_id,))
+
+    def delete_versions(self, file_path: PathLike) -> int:
+        """ファイルの版をすべて削除"""
+        return self.prune(file_path, 0)
+
+    def close(self):
+        """接続を閉じる"""
+        with self._lock:
+            self.connection.close()
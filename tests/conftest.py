@@ -25,6 +25,7 @@ from core.logger import Logger
 from core.project_manager import ProjectManager
 from core.file_manager import FileManager
 from llm.llm_factory import LLMFactory
+from src.utils import hash_service as hash_service_module
 
 
 # pytest設定
@@ -105,6 +106,17 @@ def temp_file() -> Generator[Path, None, None]:
             temp_path.unlink()
 
 
+@pytest.fixture(autouse=True)
+def hash_service(monkeypatch) -> Generator[hash_service_module.HashService, None, None]:
+    """グローバルのハッシュ計算サービスをメモリ上のキャッシュに差し替える（data/hash_cache.dbを作らない）"""
+    service = hash_service_module.HashService()
+    monkeypatch.setattr(hash_service_module, "_hash_service", service)
+    try:
+        yield service
+    finally:
+        service.close()
+
+
 # 設定関連のフィクスチャ
 @pytest.fixture
 def test_config() -> Dict[str, Any]:
@@ -0,0 +1,282 @@
+# tests/test_core/test_content_index.py
+"""
+ContentIndexのテストモジュール
+トライグラムによる候補の絞り込み・一致箇所の確定・差分更新を検証
+"""
+
+import asyncio
+import os
+
+from src.core.content_index import ContentIndex, extract_trigrams, query_trigrams, required_literals
+from src.core.file_watcher import CHANGE_CREATED, CHANGE_DELETED, CHANGE_MOVED, FILE_CHANGES_EVENT, FileChange
+
+
+class FakeEventSystem:
+    """購読内容を記録するテスト用イベントシステム"""
+
+    def __init__(self):
+        self.callbacks = {}
+
+    def subscribe(self, event_name, callback, **kwargs):
+        self.callbacks[event_name] = callback
+        return kwargs.get('subscriber_id', '')
+
+    def unsubscribe_all(self, subscriber_id):
+        count = len(self.callbacks)
+        self.callbacks.clear()
+        return count
+
+    def emit(self, name, data):
+        self.callbacks[name](data)
+
+
+def build_tree(root):
+    """テスト用のプロジェクトを作成"""
+    files = {
+        "main.py": "import os\n\ndef main():\n    print('Hello World')\n",
+        "pkg/util.py": "def helper(value):\n    return value * 2\n",
+        "pkg/config.yaml": "name: sample\nmode: debug\n",
+        "docs/README.md": "# サンプル\n日本語の説明文です。\nhello again\n",
+        "node_modules/lib/index.js": "console.log('hello');\n",
+    }
+    for relative, content in files.items():
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+    (root / "image.bin").write_bytes(b"\x89PNG\x00\x00hello")
+    return files
+
+
+def bump_mtime(path, seconds=10):
+    """更新時刻を進める（同一秒内の書き込みでも変更を検出させる）"""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 10 ** 9))
+
+
+def relative(root, paths):
+    return sorted(os.path.relpath(path, root).replace(os.sep, '/') for path in paths)
+
+
+class TestTrigrams:
+    """トライグラム抽出のテストクラス"""
+
+    def test_extract_is_case_folded_and_unique(self):
+        """ASCIIは小文字化し、重複を除く"""
+        assert extract_trigrams(b"ABCabc").tolist() == sorted({
+            (ord('a') << 16) | (ord('b') << 8) | ord('c'),
+            (ord('b') << 16) | (ord('c') << 8) | ord('a'),
+            (ord('c') << 16) | (ord('a') << 8) | ord('b'),
+        })
+        assert len(extract_trigrams(b"ab")) == 0
+
+    def test_query_trigrams_skip_cased_non_ascii(self):
+        """大文字小文字を持つ非ASCII文字は大文字小文字を無視する検索で条件にしない"""
+        assert query_trigrams(["Ég"]) == set()
+        assert query_trigrams(["Ég"], case_sensitive=True)
+        # 大文字小文字のない文字はそのまま使える
+        assert len(query_trigrams(["日本"])) == 4
+
+    def test_required_literals(self):
+        """正規表現から必須のリテラルを抽出する"""
+        assert required_literals(r"def \w+\(value\)") == ["def ", "(value)"]
+        assert required_literals(r"^import (os|sys)$") == ["import "]
+        assert required_literals(r"(abc)+x?yz") == ["abc", "yz"]
+        assert required_literals(r"[a-z]+") == []
+
+
+class TestContentIndex:
+    """ContentIndexのテストクラス"""
+
+    def _index(self, tmp_path):
+        root = tmp_path / "project"
+        build_tree(root)
+        index = ContentIndex(str(tmp_path / "index.db"))
+        index.sync(str(root))
+        return root, index
+
+    def test_sync_skips_excluded_and_binary_files(self, tmp_path):
+        """除外ディレクトリとバイナリファイルは検索対象にしない"""
+        root, index = self._index(tmp_path)
+        assert index.file_count == 4
+        assert relative(root, index.candidates("hello")) == ["docs/README.md", "main.py"]
+
+    def test_search_returns_line_and_column(self, tmp_path):
+        """一致した行・列（1始まり）を返す"""
+        root, index = self._index(tmp_path)
+        matches = index.search("hello")
+
+        assert [(os.path.relpath(m.file_path, root).replace(os.sep, '/'), m.line, m.column) for m in matches] == [
+            ("docs/README.md", 3, 1), ("main.py", 4, 12)
+        ]
+        assert matches[1].line_text == "    print('Hello World')"
+        assert index.search("hello", case_sensitive=True)[0].line_text == "hello again"
+
+    def test_regex_and_non_ascii_search(self, tmp_path):
+        """正規表現と日本語の検索"""
+        root, index = self._index(tmp_path)
+
+        matches = index.search(r"def \w+\(value\)", regex=True)
+        assert [(m.line, m.column) for m in matches] == [(1, 1)]
+        assert relative(root, index.candidates(r"def \w+\(value\)", regex=True)) == ["pkg/util.py"]
+
+        assert [m.line_text for m in index.search("説明文")] == ["日本語の説明文です。"]
+        # 絞り込みに使えるリテラルがない正規表現は全ファイルが候補
+        assert len(index.candidates(r"\d+", regex=True)) == 4
+
+    def test_root_filter_and_max_results(self, tmp_path):
+        """ディレクトリと件数の制限"""
+        root, index = self._index(tmp_path)
+        matches = index.search("value", root_path=str(root / "pkg"))
+        assert [(os.path.basename(m.file_path), m.line, m.column) for m in matches] == [
+            ("util.py", 1, 12), ("util.py", 2, 12)
+        ]
+        assert index.search("value", root_path=str(root / "docs")) == []
+        assert len(index.search("e", max_results=3)) == 3
+
+    def test_resync_reads_only_changed_files(self, tmp_path):
+        """サイズ・更新時刻が同じファイルは再索引しない"""
+        root, index = self._index(tmp_path)
+        target = root / "pkg" / "util.py"
+        target.write_text("def helper(value):\n    return unique_token\n", encoding='utf-8')
+        bump_mtime(target)
+        (root / "main.py").unlink()
+
+        assert index.sync(str(root)) == {'indexed': 1, 'unchanged': 3, 'removed': 1}
+        assert relative(root, index.candidates("unique_token")) == ["pkg/util.py"]
+        assert index.candidates("value * 2") == []
+        assert relative(root, index.candidates("hello")) == ["docs/README.md"]
+
+    def test_index_persists(self, tmp_path):
+        """別インスタンスからもインデックスを利用できる"""
+        root, index = self._index(tmp_path)
+        index.close()
+
+        reopened = ContentIndex(str(tmp_path / "index.db"))
+        assert reopened.file_count == 4
+        assert relative(root, reopened.candidates("helper")) == ["pkg/util.py"]
+        assert reopened.sync(str(root))['indexed'] == 0
+
+    def test_apply_file_changes(self, tmp_path):
+        """ファイル監視の変更バッチを反映する"""
+        root, index = self._index(tmp_path)
+        (root / "new.py").write_text("watch_me = 1\n", encoding='utf-8')
+        os.rename(root / "pkg" / "util.py", root / "moved.py")
+
+        index.apply_file_changes([
+            FileChange(CHANGE_CREATED, str(root / "new.py")),
+            FileChange(CHANGE_MOVED, str(root / "moved.py"), old_path=str(root / "pkg" / "util.py")),
+            FileChange(CHANGE_DELETED, str(root / "docs"), is_directory=True),
+        ])
+        assert relative(root, index.candidates("watch_me")) == ["new.py"]
+        assert relative(root, index.candidates("helper")) == ["moved.py"]
+        assert relative(root, index.candidates("hello")) == ["main.py"]
+
+    def test_compact_removes_dead_ids(self, tmp_path):
+        """無効なファイルIDを転置リストから取り除く"""
+        root, index = self._index(tmp_path)
+        for _ in range(3):
+            target = root / "main.py"
+            target.write_text(target.read_text(encoding='utf-8') + "# edit\n", encoding='utf-8')
+            index.update_file(str(target))
+        index.compact()
+
+        total = sum(len(blob) // 4 for (blob,) in index.connection.execute('SELECT file_ids FROM postings'))
+        expected = sum(len(extract_trigrams((root / name).read_bytes()))
+                       for name in ["main.py", "pkg/util.py", "pkg/config.yaml", "docs/README.md"])
+        assert total == expected
+        assert relative(root, index.candidates("# edit")) == ["main.py"]
+
+
+class TestFileServiceContentSearch:
+    """FileServiceのコンテンツ検索のテストクラス"""
+
+    def _run(self, tmp_path, scenario):
+        from src.services.file_service import FileService
+
+        async def main():
+            config = {'file_management': {
+                'content_index': {'path': str(tmp_path / "index.db")},
+                'backup': {'enabled': False, 'path': str(tmp_path / "backups")},
+                'auto_save': {'enabled': False},
+                'temp_files': {'path': str(tmp_path / "temp")},
+            }}
+            service = FileService(config)
+            try:
+                return await scenario(service)
+            finally:
+                await service.close()
+
+        return asyncio.run(main())
+
+    def test_search_content_with_and_without_index(self, tmp_path):
+        """インデックスの有無で同じ結果を返す"""
+        root = tmp_path / "project"
+        build_tree(root)
+
+        async def scenario(service):
+            linear = service.search_content(root, "hello", exclude_dirs={'node_modules'})
+            service.enable_content_index(root)
+            indexed = service.search_content(root, "hello")
+            return linear, indexed
+
+        linear, indexed = self._run(tmp_path, scenario)
+        assert indexed == linear
+        assert [(m['line'], m['column']) for m in indexed] == [(3, 1), (4, 12)]
+
+    def test_search_files_uses_index_and_tracks_writes(self, tmp_path):
+        """search_filesの内容検索はインデックスで絞り込み、書き込みも反映する"""
+        root = tmp_path / "project"
+        build_tree(root)
+
+        async def scenario(service):
+            service.enable_content_index(root)
+            await service.write_file(root / "added.py", "token_from_write = 1\n", backup=False)
+            found = service.search_files(root, pattern="*.py", content_search="TOKEN_FROM_WRITE", fields=())
+            helpers = service.search_files(root, pattern="*.py", content_search="helper", fields=())
+            return [info.name for info in found], [info.name for info in helpers]
+
+        found, helpers = self._run(tmp_path, scenario)
+        assert found == ["added.py"]
+        assert helpers == ["util.py"]
+
+    def test_unindexed_files_fall_back_to_scan(self, tmp_path):
+        """サイズ超過・変更後未反映のファイルは直接走査し、インデックスなしと同じ結果を返す"""
+        root = tmp_path / "project"
+        build_tree(root)
+        (root / "large.txt").write_text("needle in a large file\n" * 10, encoding='utf-8')
+
+        def search(service):
+            files = service.search_files(root, content_search="needle", fields=())
+            matches = service.search_content(root, "needle", exclude_dirs={'node_modules'})
+            return sorted(info.name for info in files if not info.is_directory), matches
+
+        async def scenario(service):
+            service.enable_content_index(root, FakeEventSystem())
+            service.content_index.max_file_size = 100
+            service.content_index.sync(str(root))
+            stale = root / "pkg" / "util.py"
+            stale.write_text("needle = 1\n", encoding='utf-8')
+            bump_mtime(stale)
+            indexed = search(service)
+            service._indexed_roots.clear()
+            return indexed, search(service)
+
+        (files, matches), linear = self._run(tmp_path, scenario)
+        assert files == ["large.txt", "util.py"]
+        assert len(matches) == 11
+        assert (files, matches) == linear
+
+    def test_enable_content_index_follows_file_watcher(self, tmp_path):
+        """FileWatcherの変更バッチでインデックスを更新する"""
+        root = tmp_path / "project"
+        build_tree(root)
+        events = FakeEventSystem()
+
+        async def scenario(service):
+            service.enable_content_index(root, events)
+            added = root / "watched.py"
+            added.write_text("watched_token = 1\n", encoding='utf-8')
+            events.emit(FILE_CHANGES_EVENT, {'changes': [FileChange(CHANGE_CREATED, str(added)).to_dict()]})
+            return service.content_index.candidates("watched_token")
+
+        assert relative(root, self._run(tmp_path, scenario)) == ["watched.py"]
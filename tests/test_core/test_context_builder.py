@@ -0,0 +1,149 @@
+# tests/test_core/test_context_builder.py
+"""
+ContextBuilderのテストモジュール
+ステージパイプラインの並行実行・キャッシュ・ファイル変更による無効化を検証
+"""
+
+import pytest
+from unittest.mock import patch
+
+from src.core.context_builder import ContextBuilder, ContextType, FILE_CHANGE_EVENTS
+from src.core.event_system import Event
+from src.core.file_watcher import FileChange, FILE_CHANGES_EVENT, CHANGE_CREATED
+from src.core.vector_store import SearchResult
+
+
+class FakeEventSystem:
+    """購読内容を記録するテスト用イベントシステム"""
+
+    def __init__(self):
+        self.callbacks = {}
+
+    def subscribe(self, event_name, callback, **kwargs):
+        self.callbacks[event_name] = callback
+        return kwargs.get('subscriber_id', '')
+
+    def unsubscribe_all(self, subscriber_id):
+        count = len(self.callbacks)
+        self.callbacks.clear()
+        return count
+
+    def emit(self, name, data):
+        self.callbacks[name](Event(name=name, data=data))
+
+
+@pytest.fixture
+def project(tmp_path):
+    """小さなプロジェクトを作成"""
+    (tmp_path / "setup.py").write_text("")
+    package = tmp_path / "pkg"
+    package.mkdir()
+    (package / "module.py").write_text("def foo():\n    return 1\n")
+    return tmp_path
+
+
+def create_search_result(file_path):
+    """テスト用の検索結果"""
+    return SearchResult(
+        chunk_id="chunk_1",
+        content="def foo():\n    return 1\n",
+        file_path=str(file_path),
+        line_start=1,
+        line_end=2,
+        similarity_score=0.9,
+        metadata={'function_name': 'foo'}
+    )
+
+
+class TestContextBuilderPipeline:
+    """ContextBuilderのパイプラインテストクラス"""
+
+    def setup_method(self):
+        """各テスト前の初期化"""
+        self.event_system = FakeEventSystem()
+        self.builder = ContextBuilder(event_system=self.event_system)
+
+    def teardown_method(self):
+        """各テスト後のクリーンアップ"""
+        self.builder.close()
+
+    def test_stage_timings_are_exposed(self, project):
+        """ステージ別の所要時間をメタデータと統計に記録"""
+        current_file = str(project / "pkg" / "module.py")
+        bundle = self.builder.build_context(
+            "foo",
+            search_results=[create_search_result(current_file)],
+            current_file_path=current_file,
+            error_context="Traceback (most recent call last):\nValueError: bad"
+        )
+
+        timings = bundle.metadata['stage_timings_ms']
+        for stage in ('error_context', 'search_results', 'file_structure', 'related_files', 'optimize', 'total'):
+            assert stage in timings
+        assert bundle.metadata['packing']['method'] == "dp"
+
+        stats = self.builder.get_pipeline_stats()
+        assert stats['stages']['file_structure']['calls'] == 1
+
+    def test_parallel_and_sequential_results_match(self, project):
+        """並行実行でもアイテムの内容と順序は変わらない"""
+        current_file = str(project / "pkg" / "module.py")
+        kwargs = dict(
+            search_results=[create_search_result(current_file)],
+            current_file_path=current_file,
+            additional_context={'notes': 'remember foo'}
+        )
+        sequential = ContextBuilder(parallel_stages=False)
+
+        parallel_items = self.builder.build_context("foo", **kwargs).items
+        sequential_items = sequential.build_context("foo", **kwargs).items
+
+        assert [(i.type, i.content) for i in parallel_items] == [(i.type, i.content) for i in sequential_items]
+
+    def test_file_structure_is_cached(self, project):
+        """ファイル構造の走査はキャッシュされる"""
+        current_file = str(project / "pkg" / "module.py")
+        with patch.object(self.builder, '_scan_file_structure', wraps=self.builder._scan_file_structure) as scan:
+            self.builder.build_context("foo", current_file_path=current_file)
+            self.builder.build_context("bar", current_file_path=current_file)
+        assert scan.call_count == 1
+        assert self.builder.get_pipeline_stats()['cache']['hits'] >= 1
+
+    def test_file_change_event_invalidates_structure(self, project):
+        """ファイル作成通知でファイル構造を再走査する"""
+        current_file = str(project / "pkg" / "module.py")
+        self.builder.build_context("foo", current_file_path=current_file)
+
+        new_file = project / "pkg" / "new_module.py"
+        new_file.write_text("")
+        assert set(FILE_CHANGE_EVENTS) <= set(self.event_system.callbacks)
+        self.event_system.emit('file_created', {'file_path': str(new_file)})
+
+        bundle = self.builder.build_context("foo", current_file_path=current_file)
+        structure = bundle.get_by_type(ContextType.FILE_STRUCTURE)[0].content
+        assert "new_module.py" in structure
+        assert "**module.py** (current)" in structure
+
+    def test_unrelated_change_keeps_cache(self, project, tmp_path_factory):
+        """プロジェクト外の変更ではキャッシュを維持する"""
+        current_file = str(project / "pkg" / "module.py")
+        self.builder.build_context("foo", current_file_path=current_file)
+
+        outside = tmp_path_factory.mktemp("other") / "x.py"
+        assert self.builder.invalidate_cache(str(outside)) == 0
+
+    def test_file_change_batch_invalidates_structure(self, project):
+        """ファイル監視の変更バッチでもファイル構造を再走査する"""
+        current_file = str(project / "pkg" / "module.py")
+        self.builder.build_context("foo", current_file_path=current_file)
+
+        new_file = project / "pkg" / "batched.py"
+        new_file.write_text("")
+        self.event_system.emit(FILE_CHANGES_EVENT, {
+            'root': str(project),
+            'changes': [FileChange(CHANGE_CREATED, str(new_file)).to_dict()]
+        })
+
+        bundle = self.builder.build_context("foo", current_file_path=current_file)
+        structure = bundle.get_by_type(ContextType.FILE_STRUCTURE)[0].content
+        assert "batched.py" in structure
@@ -0,0 +1,224 @@
+# tests/test_core/test_file_watcher.py
+"""
+FileWatcherのテストモジュール
+変更の集約・デバウンス・検出バックエンドと購読側の差分更新を検証
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import pytest
+
+from src.core.file_watcher import (
+    ChangeCoalescer, FileChange, FileWatcher, FILE_CHANGES_EVENT, iter_changes,
+    CHANGE_CREATED, CHANGE_DELETED, CHANGE_MODIFIED, CHANGE_MOVED
+)
+from src.core.event_system import Event
+from src.core.project_manager import ProjectInfo, ProjectManager
+
+
+class RecordingEventSystem:
+    """発行されたイベントを記録し、購読者へ同期的に配信するテスト用イベントシステム"""
+
+    def __init__(self):
+        self.events = []
+        self.callbacks = {}
+        self.emitted = threading.Event()
+
+    def emit(self, name, data=None, **kwargs):
+        event = Event(name=name, data=data, **kwargs)
+        self.events.append(event)
+        for callback in self.callbacks.get(name, []):
+            callback(event)
+        self.emitted.set()
+
+    def subscribe(self, event_name, callback, **kwargs):
+        self.callbacks.setdefault(event_name, []).append(callback)
+        return kwargs.get('subscriber_id', '')
+
+    def unsubscribe_all(self, subscriber_id):
+        count = sum(len(callbacks) for callbacks in self.callbacks.values())
+        self.callbacks.clear()
+        return count
+
+    def changes(self):
+        return [change for event in self.events for change in iter_changes(event)]
+
+
+def open_project(db_path, project_path):
+    """プロジェクトを登録して分析済みのProjectManagerを返す"""
+    manager = ProjectManager(db_path=str(db_path))
+    manager.current_project = ProjectInfo(name=project_path.name, path=str(project_path))
+    manager.database.save_project(manager.current_project)
+    assert manager.analyze_project()
+    return manager
+
+
+def wait_for(condition, timeout=5.0):
+    """条件が満たされるまで待機"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def summarize(changes):
+    """(種別, ファイル名) の集合"""
+    return {(change.change_type, os.path.basename(change.file_path)) for change in changes}
+
+
+class TestChangeCoalescer:
+    """ChangeCoalescerのテストクラス"""
+
+    def setup_method(self):
+        """各テスト前の初期化"""
+        self.coalescer = ChangeCoalescer()
+
+    def test_create_then_modify_is_created(self):
+        """作成後の変更は作成1件にまとめる"""
+        self.coalescer.record(CHANGE_CREATED, "/p/a.py")
+        self.coalescer.record(CHANGE_MODIFIED, "/p/a.py")
+        self.coalescer.record(CHANGE_MODIFIED, "/p/a.py")
+        assert self.coalescer.drain() == [FileChange(CHANGE_CREATED, "/p/a.py")]
+
+    def test_create_then_delete_cancels_out(self):
+        """作成して削除した一時ファイルは通知しない"""
+        self.coalescer.record(CHANGE_CREATED, "/p/.tmp123")
+        self.coalescer.record(CHANGE_DELETED, "/p/.tmp123")
+        assert self.coalescer.drain() == []
+
+    def test_delete_then_create_is_modified(self):
+        """削除して作り直した（アトミック保存）ファイルは変更として扱う"""
+        self.coalescer.record(CHANGE_DELETED, "/p/a.py")
+        self.coalescer.record(CHANGE_CREATED, "/p/a.py")
+        assert self.coalescer.drain() == [FileChange(CHANGE_MODIFIED, "/p/a.py")]
+
+    def test_chained_moves_collapse(self):
+        """連続した移動は最初の移動元から最後の移動先への1件にまとめる"""
+        self.coalescer.record(CHANGE_MOVED, "/p/b.py", old_path="/p/a.py")
+        self.coalescer.record(CHANGE_MOVED, "/p/c.py", old_path="/p/b.py")
+        assert self.coalescer.drain() == [FileChange(CHANGE_MOVED, "/p/c.py", "/p/a.py")]
+
+    def test_move_then_delete_is_delete_of_source(self):
+        """移動後に削除された場合は移動元の削除として扱う"""
+        self.coalescer.record(CHANGE_MOVED, "/p/b.py", old_path="/p/a.py")
+        self.coalescer.record(CHANGE_DELETED, "/p/b.py")
+        assert self.coalescer.drain() == [FileChange(CHANGE_DELETED, "/p/a.py")]
+
+    def test_directory_modified_is_ignored(self):
+        """ディレクトリ自体の変更通知は出さない"""
+        self.coalescer.record(CHANGE_MODIFIED, "/p/pkg", is_directory=True)
+        self.coalescer.record(CHANGE_CREATED, "/p/new_pkg", is_directory=True)
+        assert self.coalescer.drain() == [FileChange(CHANGE_CREATED, "/p/new_pkg", None, True)]
+
+
+@pytest.fixture(params=["polling", "watchdog"])
+def watcher_backend(request):
+    """検出バックエンド"""
+    if request.param == "watchdog":
+        pytest.importorskip("watchdog")
+    return request.param
+
+
+class TestFileWatcher:
+    """FileWatcherのテストクラス"""
+
+    def test_changes_are_debounced_into_one_batch(self, tmp_path, watcher_backend):
+        """短時間の複数の変更を1つのバッチとして発行する"""
+        (tmp_path / "existing.py").write_text("x = 1\n")
+        (tmp_path / "node_modules").mkdir()
+        events = RecordingEventSystem()
+        watcher = FileWatcher(
+            str(tmp_path), event_system=events, debounce=0.3, max_delay=3.0,
+            poll_interval=0.05, use_polling=watcher_backend == "polling"
+        )
+
+        with watcher:
+            assert watcher.backend == watcher_backend
+            (tmp_path / "new.py").write_text("a = 1\n")
+            (tmp_path / "new.py").write_text("a = 2\n")
+            (tmp_path / "existing.py").unlink()
+            (tmp_path / "node_modules" / "ignored.js").write_text("1")
+            assert wait_for(lambda: events.events)
+            time.sleep(0.2)
+
+        assert len(events.events) == 1
+        batch = events.events[0]
+        assert batch.name == FILE_CHANGES_EVENT
+        assert batch.data['root'] == str(tmp_path)
+        assert summarize(events.changes()) == {(CHANGE_CREATED, "new.py"), (CHANGE_DELETED, "existing.py")}
+
+    def test_max_delay_bounds_latency(self, tmp_path):
+        """変更が続いても最大待ち時間で発行する"""
+        events = RecordingEventSystem()
+        watcher = FileWatcher(str(tmp_path), event_system=events, debounce=10.0, max_delay=0.2)
+
+        with watcher:
+            watcher.notify(CHANGE_MODIFIED, str(tmp_path / "a.py"))
+            assert wait_for(lambda: events.events, timeout=2.0)
+
+    def test_notify_outside_root_is_ignored(self, tmp_path, tmp_path_factory):
+        """監視対象外のパスは記録しない"""
+        events = RecordingEventSystem()
+        watcher = FileWatcher(str(tmp_path), event_system=events)
+        watcher.notify(CHANGE_MODIFIED, str(tmp_path_factory.mktemp("other") / "a.py"))
+        assert watcher.flush() == []
+
+    def test_iter_changes_filters_by_root(self, tmp_path):
+        """購読側はルート配下の変更だけを取り出せる"""
+        data = {'changes': [
+            FileChange(CHANGE_MODIFIED, str(tmp_path / "a.py")).to_dict(),
+            FileChange(CHANGE_MODIFIED, str(tmp_path) + "_other/b.py").to_dict(),
+        ]}
+        assert [c.file_path for c in iter_changes(Event(name=FILE_CHANGES_EVENT, data=data), str(tmp_path))] == [
+            str(tmp_path / "a.py")
+        ]
+
+
+class TestProjectManagerFileChanges:
+    """ProjectManagerの差分更新のテストクラス"""
+
+    def setup_method(self):
+        """各テスト前の初期化"""
+        self.events = RecordingEventSystem()
+
+    def test_file_changes_update_file_info(self, tmp_path):
+        """変更バッチでファイル情報を差分更新する"""
+        project = tmp_path / "project"
+        (project / "pkg").mkdir(parents=True)
+        (project / "main.py").write_text("print('hello')\n")
+        (project / "pkg" / "old.py").write_text("x = 1\n")
+        manager = open_project(tmp_path / "projects.db", project)
+        manager.attach_event_system(self.events)
+
+        (project / "pkg" / "old.py").rename(project / "pkg" / "renamed.py")
+        (project / "main.py").write_text("print('hello')\nprint('world')\n")
+        self.events.emit(FILE_CHANGES_EVENT, {'changes': [
+            FileChange(CHANGE_MOVED, str(project / "pkg" / "renamed.py"), str(project / "pkg" / "old.py")).to_dict(),
+            FileChange(CHANGE_MODIFIED, str(project / "main.py")).to_dict(),
+        ]})
+
+        files = {file_info.path: file_info for file_info in manager.current_files}
+        assert set(files) == {"main.py", os.path.join("pkg", "renamed.py")}
+        assert files["main.py"].line_count == 3
+
+        with sqlite3.connect(str(tmp_path / "projects.db")) as conn:
+            rows = dict(conn.execute("SELECT path, line_count FROM files").fetchall())
+        assert rows == {"main.py": 3, os.path.join("pkg", "renamed.py"): 2}
+
+    def test_deleted_directory_removes_descendants(self, tmp_path):
+        """削除されたディレクトリ配下のファイル情報を削除する"""
+        project = tmp_path / "project"
+        (project / "pkg" / "sub").mkdir(parents=True)
+        (project / "pkg" / "sub" / "a.py").write_text("a = 1\n")
+        (project / "pkg_other.py").write_text("b = 1\n")
+        manager = open_project(tmp_path / "projects.db", project)
+
+        for path in (project / "pkg" / "sub" / "a.py", project / "pkg" / "sub", project / "pkg"):
+            path.unlink() if path.is_file() else path.rmdir()
+        assert manager.apply_file_changes([FileChange(CHANGE_DELETED, str(project / "pkg"), None, True)])
+
+        assert [file_info.path for file_info in manager.current_files] == ["pkg_other.py"]
@@ -0,0 +1,170 @@
+# tests/test_core/test_project_analysis.py
+"""
+ProjectManager.analyze_projectのテストモジュール
+stat情報による分析キャッシュと1回読み込みのファイル分析を検証
+"""
+
+import os
+import sqlite3
+
+from src.core.project_manager import ProjectDatabase, ProjectInfo, ProjectManager
+
+
+def create_manager(db_path, project_path):
+    """プロジェクトを登録したProjectManagerを返す"""
+    manager = ProjectManager(db_path=str(db_path))
+    manager.current_project = ProjectInfo(name=project_path.name, path=str(project_path))
+    manager.database.save_project(manager.current_project)
+    return manager
+
+
+def bump_mtime(path, seconds=10):
+    """更新時刻を進める（同一秒内の書き込みでも変更を検出させる）"""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 10 ** 9))
+
+
+class TestAnalysisCache:
+    """分析キャッシュのテストクラス"""
+
+    def setup_method(self):
+        """各テスト前の初期化"""
+        self.analyzed = []
+
+    def _track(self, manager):
+        """_analyze_fileの呼び出しを記録"""
+        original = manager._analyze_file
+
+        def tracking(file_path, project_path, stat=None):
+            self.analyzed.append(file_path.name)
+            return original(file_path, project_path, stat)
+
+        manager._analyze_file = tracking
+        return manager
+
+    def _project(self, tmp_path):
+        project = tmp_path / "project"
+        (project / "pkg").mkdir(parents=True)
+        (project / "main.py").write_text("import os\n\nprint('hello')\n", encoding='utf-8')
+        (project / "pkg" / "util.py").write_text("def f():\n    return 1\n", encoding='utf-8')
+        (project / "README.md").write_text("# タイトル\n本文\n", encoding='utf-8')
+        return project
+
+    def test_unchanged_files_are_not_reanalyzed(self, tmp_path):
+        """2回目の分析では変更のないファイルを読み込まない"""
+        project = self._project(tmp_path)
+        manager = self._track(create_manager(tmp_path / "projects.db", project))
+
+        assert manager.analyze_project()
+        first = {info.path: info for info in manager.current_files}
+        assert sorted(self.analyzed) == ["README.md", "main.py", "util.py"]
+
+        self.analyzed.clear()
+        assert manager.analyze_project()
+        assert self.analyzed == []
+        assert manager.last_analysis == {'files': 3, 'analyzed': 0, 'unchanged': 3}
+        assert {info.path: info for info in manager.current_files} == first
+
+    def test_modified_file_is_reanalyzed(self, tmp_path):
+        """サイズ・更新時刻が変わったファイルだけを再分析する"""
+        project = self._project(tmp_path)
+        manager = self._track(create_manager(tmp_path / "projects.db", project))
+        manager.analyze_project()
+
+        target = project / "main.py"
+        target.write_text("import os\nimport sys\n\nprint('hello')\n", encoding='utf-8')
+        bump_mtime(target)
+        (project / "new.py").write_text("x = 1\n", encoding='utf-8')
+
+        self.analyzed.clear()
+        manager.analyze_project()
+        assert sorted(self.analyzed) == ["main.py", "new.py"]
+
+        files = {info.path: info for info in manager.current_files}
+        assert files["main.py"].line_count == 5
+        assert files["main.py"].mtime_ns == target.stat().st_mtime_ns
+        assert "new.py" in files
+
+    def test_cache_persists_in_database(self, tmp_path):
+        """分析結果は別インスタンスからもキャッシュとして利用される"""
+        project = self._project(tmp_path)
+        create_manager(tmp_path / "projects.db", project).analyze_project()
+
+        manager = self._track(create_manager(tmp_path / "projects.db", project))
+        manager.analyze_project()
+        assert self.analyzed == []
+        assert len(manager.current_files) == 3
+
+    def test_deleted_files_are_dropped(self, tmp_path):
+        """削除されたファイルはキャッシュから除外される"""
+        project = self._project(tmp_path)
+        manager = create_manager(tmp_path / "projects.db", project)
+        manager.analyze_project()
+
+        (project / "pkg" / "util.py").unlink()
+        manager.analyze_project()
+        assert sorted(info.name for info in manager.current_files) == ["README.md", "main.py"]
+        assert len(manager.database.load_files(str(project))) == 2
+
+
+class TestFileAnalysis:
+    """ファイル分析のテストクラス"""
+
+    def _analyze(self, tmp_path, name, data):
+        path = tmp_path / name
+        path.write_bytes(data)
+        manager = ProjectManager(db_path=str(tmp_path / "projects.db"))
+        return manager._analyze_file(path, tmp_path)
+
+    def test_preview_and_line_count(self, tmp_path):
+        """行数と先頭5行のプレビュー"""
+        content = "".join(f"line {i}\r\n" for i in range(10))
+        info = self._analyze(tmp_path, "a.txt", content.encode('utf-8'))
+
+        assert info.line_count == 11
+        assert info.content_preview == "line 0\nline 1\nline 2\nline 3\nline 4"
+        assert not info.is_binary
+
+    def test_hash_covers_whole_file(self, tmp_path):
+        """読み込み単位を超えるファイルも全体のハッシュを計算する"""
+        data = b"a" * (ProjectManager.READ_BLOCK_SIZE + 123)
+        info = self._analyze(tmp_path, "big.txt", data)
+
+        expected = ProjectManager._new_hasher()
+        expected.update(data)
+        assert info.hash == expected.hexdigest()
+        assert info.line_count == 0
+
+    def test_binary_file(self, tmp_path):
+        """NULバイトを含むファイルはバイナリとして扱う"""
+        info = self._analyze(tmp_path, "data.bin", b"\x00\x01\x02" * 100)
+        assert info.is_binary
+        assert info.content_preview == ""
+        assert info.hash
+
+    def test_stat_fields(self, tmp_path):
+        """キャッシュキーとなるstat情報を保持する"""
+        info = self._analyze(tmp_path, "a.py", b"x = 1\n")
+        stat = (tmp_path / "a.py").stat()
+        assert (info.size, info.mtime_ns, info.inode) == (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+
+class TestProjectDatabaseMigration:
+    """旧スキーマからの移行のテストクラス"""
+
+    def test_adds_cache_columns(self, tmp_path):
+        """キャッシュ用の列がない既存DBに列を追加する"""
+        db_path = tmp_path / "old.db"
+        with sqlite3.connect(db_path) as conn:
+            conn.execute('''
+                CREATE TABLE files (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, project_id INTEGER, path TEXT NOT NULL,
+                    name TEXT NOT NULL, extension TEXT, size INTEGER, modified TEXT, encoding TEXT,
+                    language TEXT, hash TEXT, content_preview TEXT, line_count INTEGER, is_binary BOOLEAN
+                )
+            ''')
+
+        ProjectDatabase(str(db_path))
+        with sqlite3.connect(db_path) as conn:
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(files)')}
+        assert {'mtime_ns', 'inode'} <= columns
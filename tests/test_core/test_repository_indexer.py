@@ -0,0 +1,234 @@
+# tests/test_core/test_repository_indexer.py
+"""
+RepositoryIndexerのテストモジュール
+ファイル探索・並列チャンク分割・一括書き込み・増分インデックス・変更バッチの反映を検証
+"""
+
+import os
+import pytest
+from unittest.mock import patch
+
+from src.core.file_watcher import FileChange, CHANGE_CREATED, CHANGE_DELETED, CHANGE_MODIFIED, CHANGE_MOVED
+from src.core.repository_indexer import RepositoryIndexer, _parse_files
+from src.core.vector_store import VectorStore
+
+
+@pytest.fixture
+def repository(tmp_path):
+    """小さなリポジトリを作成"""
+    root = tmp_path / "repo"
+    (root / "pkg").mkdir(parents=True)
+    (root / "node_modules" / "lib").mkdir(parents=True)
+    (root / "__pycache__").mkdir()
+
+    for i in range(20):
+        (root / "pkg" / f"module_{i}.py").write_text(
+            f"import os\n\n\nclass Service{i}:\n    def run(self):\n        return {i}\n\n\n"
+            f"def helper_{i}(value):\n    return value * {i}\n"
+        )
+    (root / "README.md").write_text("# Sample\n\nDocumentation for the sample project.\n")
+    (root / "node_modules" / "lib" / "index.js").write_text("function ignored() { return 1; }\n")
+    (root / "__pycache__" / "cached.py").write_text("def ignored():\n    pass\n")
+    (root / "pkg" / "binary.py").write_bytes(b"\x00\x01\x02 not text")
+    (root / "pkg" / "data.bin").write_bytes(b"\x00" * 16)
+    return root
+
+
+@pytest.fixture
+def vector_store(tmp_path):
+    """一時データベースのVectorStore"""
+    store = VectorStore(store_path=str(tmp_path / "store.db"))
+    yield store
+    store.close()
+
+
+def bump_mtime(path):
+    """更新時刻を確実に進める"""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def file_contents(vector_store, path):
+    """ファイルに属するチャンクの内容"""
+    cursor = vector_store.db_connection.cursor()
+    cursor.execute("SELECT content FROM chunks WHERE file_path = ? ORDER BY line_start", (str(path),))
+    return [row['content'] for row in cursor.fetchall()]
+
+
+class TestRepositoryIndexer:
+    """RepositoryIndexerのテストクラス"""
+
+    def test_discover_files_honors_exclude_dirs(self, repository, vector_store):
+        """除外ディレクトリと未対応拡張子を探索しない"""
+        indexer = RepositoryIndexer(vector_store, use_processes=False)
+        files = {path.replace(str(repository), "").replace("\\", "/")
+                 for path in indexer.discover_files(repository)}
+
+        assert "/pkg/module_0.py" in files
+        assert "/README.md" in files
+        assert not any("node_modules" in path or "__pycache__" in path for path in files)
+        assert "/pkg/data.bin" not in files
+
+    @pytest.mark.parametrize("use_processes", [False, True])
+    def test_index_repository_writes_all_chunks(self, repository, vector_store, use_processes):
+        """並列に分割したチャンクをすべて書き込む"""
+        reports = []
+        indexer = RepositoryIndexer(
+            vector_store, max_workers=2, use_processes=use_processes,
+            files_per_task=3, batch_size=10, queue_size=2,
+            progress_callback=reports.append, progress_interval=0.0
+        )
+
+        progress = indexer.index_repository(str(repository))
+
+        assert progress.discovery_complete
+        assert progress.files_discovered == 22
+        assert progress.files_parsed == 21
+        assert progress.files_skipped == 1
+        assert progress.files_failed == 0
+        assert progress.chunks_written == progress.chunks_parsed > 0
+        assert reports[-1]['chunks_written'] == progress.chunks_written
+
+        stats = vector_store.get_statistics()
+        assert stats['total_chunks'] == progress.chunks_written
+        assert stats['language_distribution']['python'] > 0
+
+    def test_reindex_skips_unchanged_files(self, repository, vector_store):
+        """変更のないファイルは読み込まずにスキップする"""
+        indexer = RepositoryIndexer(vector_store, use_processes=False)
+        first = indexer.index_repository(str(repository))
+
+        with patch('src.core.repository_indexer._parse_files', wraps=_parse_files) as parse:
+            second = indexer.index_repository(str(repository))
+
+        assert first.chunks_written > 0
+        assert parse.call_count == 0
+        assert second.files_unchanged == 22
+        assert second.files_parsed == second.chunks_written == 0
+        assert vector_store.get_statistics()['total_chunks'] == first.chunks_written
+
+    def test_changed_file_replaces_old_chunks(self, repository, vector_store):
+        """変更されたファイルは旧チャンクを置き換える"""
+        indexer = RepositoryIndexer(vector_store, use_processes=False)
+        indexer.index_repository(str(repository))
+        target = repository / "pkg" / "module_3.py"
+
+        target.write_text("def replaced():\n    return 'new'\n")
+        bump_mtime(target)
+        progress = indexer.index_repository(str(repository))
+
+        assert progress.files_parsed == 1
+        assert progress.files_unchanged == 21
+        contents = file_contents(vector_store, target)
+        assert len(contents) == 1 and "replaced" in contents[0]
+
+        manifest = vector_store.get_file_manifest(str(repository))
+        assert manifest[str(target)]['size'] == target.stat().st_size
+        assert len(manifest[str(target)]['chunk_ids']) == 1
+
+    def test_touched_file_with_same_content_is_not_reparsed(self, repository, vector_store):
+        """更新時刻だけ変わったファイルは内容ハッシュで判定して分割しない"""
+        indexer = RepositoryIndexer(vector_store, use_processes=False)
+        first = indexer.index_repository(str(repository))
+        target = repository / "pkg" / "module_5.py"
+        bump_mtime(target)
+
+        progress = indexer.index_repository(str(repository))
+
+        assert progress.files_parsed == 0
+        assert progress.files_unchanged == 22
+        manifest = vector_store.get_file_manifest(str(repository))
+        assert manifest[str(target)]['mtime_ns'] == target.stat().st_mtime_ns
+        assert vector_store.get_statistics()['total_chunks'] == first.chunks_written
+
+    def test_deleted_files_are_purged(self, repository, vector_store):
+        """削除されたファイルと対象外になったファイルのチャンクを削除する"""
+        indexer = RepositoryIndexer(vector_store, use_processes=False)
+        indexer.index_repository(str(repository))
+        deleted = repository / "pkg" / "module_1.py"
+        became_binary = repository / "pkg" / "module_2.py"
+
+        deleted.unlink()
+        became_binary.write_bytes(b"\x00\x01binary")
+        bump_mtime(became_binary)
+        progress = indexer.index_repository(str(repository))
+
+        assert progress.files_removed == 1
+        assert progress.files_skipped == 1
+        manifest = vector_store.get_file_manifest(str(repository))
+        assert str(deleted) not in manifest
+        assert manifest[str(became_binary)]['chunk_ids'] == []
+        assert file_contents(vector_store, deleted) == []
+        assert file_contents(vector_store, became_binary) == []
+
+    def test_failed_replace_keeps_previous_chunks(self, repository, vector_store):
+        """書き込みに失敗した場合は旧チャンクとマニフェストを維持する"""
+        indexer = RepositoryIndexer(vector_store, use_processes=False)
+        indexer.index_repository(str(repository))
+        target = repository / "pkg" / "module_4.py"
+        before = file_contents(vector_store, target)
+        manifest_before = vector_store.get_file_manifest(str(repository))[str(target)]
+
+        target.write_text("def broken_write():\n    return 0\n")
+        bump_mtime(target)
+        with patch.object(vector_store, '_insert_chunk', side_effect=RuntimeError("disk full")):
+            progress = indexer.index_repository(str(repository))
+
+        assert progress.files_failed == 1
+        assert file_contents(vector_store, target) == before
+        assert vector_store.get_file_manifest(str(repository))[str(target)] == manifest_before
+
+    def test_cancel_stops_indexing(self, repository, vector_store):
+        """中断した場合は再訓練せずに終了する"""
+        indexer = RepositoryIndexer(vector_store, use_processes=False, files_per_task=1)
+        indexer.progress_callback = lambda progress: indexer.cancel()
+        indexer.progress_interval = 0.0
+
+        progress = indexer.index_repository(str(repository))
+
+        assert progress.cancelled
+        assert progress.files_parsed < 21
+
+    def test_file_change_batch_updates_only_affected_files(self, repository, vector_store):
+        """ファイル監視の変更バッチで該当ファイルだけを再分割する"""
+        indexer = RepositoryIndexer(vector_store, use_processes=False)
+        indexer.index_repository(str(repository))
+        modified = repository / "pkg" / "module_6.py"
+        created = repository / "pkg" / "extra" / "added.py"
+        created.parent.mkdir()
+
+        modified.write_text("def changed():\n    return 6\n")
+        bump_mtime(modified)
+        created.write_text("def added():\n    return 1\n")
+        (repository / "pkg" / "module_8.py").rename(repository / "pkg" / "module_8_renamed.py")
+
+        with patch('src.core.repository_indexer._parse_files', wraps=_parse_files) as parse:
+            progress = indexer.apply_file_changes([
+                FileChange(CHANGE_MODIFIED, str(modified)),
+                FileChange(CHANGE_CREATED, str(created.parent), None, True),
+                FileChange(CHANGE_MOVED, str(repository / "pkg" / "module_8_renamed.py"),
+                           str(repository / "pkg" / "module_8.py")),
+            ])
+
+        parsed = {os.path.basename(task[0]) for call in parse.call_args_list for task in call.args[0]}
+        assert parsed == {"module_6.py", "added.py", "module_8_renamed.py"}
+        assert progress.files_removed == 1
+        assert "changed" in file_contents(vector_store, modified)[0]
+        assert file_contents(vector_store, repository / "pkg" / "module_8.py") == []
+
+        manifest = vector_store.get_file_manifest(str(repository))
+        assert str(created) in manifest
+        assert str(repository / "pkg" / "module_8_renamed.py") in manifest
+
+    def test_deleted_directory_purges_indexed_files(self, repository, vector_store):
+        """削除されたディレクトリ配下のチャンクを削除する"""
+        indexer = RepositoryIndexer(vector_store, use_processes=False)
+        indexer.index_repository(str(repository))
+
+        for path in (repository / "pkg").iterdir():
+            path.unlink()
+        (repository / "pkg").rmdir()
+        progress = indexer.apply_file_changes([FileChange(CHANGE_DELETED, str(repository / "pkg"), None, True)])
+
+        assert progress.files_removed == 21
+        assert list(vector_store.get_file_manifest(str(repository))) == [str(repository / "README.md")]
@@ -0,0 +1,84 @@
+# tests/test_core/test_token_counter.py
+"""
+TokenCounterのテストモジュール
+較正済み推定・メモ化・切り詰めと利用箇所での共有を検証
+"""
+
+import pytest
+
+from src.core.token_counter import (
+    TokenCounter,
+    estimate_tokens,
+    encoding_for_model,
+    get_token_counter
+)
+from src.core.prompt_builder import PromptBuilder
+
+
+class TestEstimateTokens:
+    """推定ロジックのテストクラス"""
+
+    @pytest.mark.parametrize("text,expected", [
+        ("", 0),
+        ("Hello, world! This is a test of the tokenizer.", 12),
+        ("こんにちは世界", 7),
+    ])
+    def test_estimate_is_close_to_bpe(self, text, expected):
+        """cl100k_baseの実測値に近い推定値を返す"""
+        assert abs(estimate_tokens(text) - expected) <= max(1, expected * 0.15)
+
+    def test_code_is_not_undercounted(self):
+        """空白区切りの単語数ではなく記号も数える"""
+        code = "def foo(bar):\n    return bar[0] + baz(1, 2)\n"
+        assert estimate_tokens(code) > len(code.split()) * 1.3
+
+    def test_encoding_for_model(self):
+        """モデル名からエンコーディングを選択"""
+        assert encoding_for_model("gpt-4o-mini") == "o200k_base"
+        assert encoding_for_model("gpt-4-turbo") == "cl100k_base"
+        assert encoding_for_model(None) == "cl100k_base"
+
+
+class TestTokenCounter:
+    """TokenCounterのテストクラス"""
+
+    def setup_method(self):
+        """各テスト前の初期化"""
+        self.counter = TokenCounter(cache_size=2)
+
+    def test_memoizes_by_content(self):
+        """同一内容はキャッシュから返す"""
+        self.counter.count("same text")
+        self.counter.count("same text")
+        stats = self.counter.get_stats()
+        assert stats['cache_hits'] == 1
+        assert stats['cache_misses'] == 1
+
+    def test_cache_is_bounded(self):
+        """キャッシュはcache_sizeを超えない"""
+        for text in ("a", "b", "c"):
+            self.counter.count(text)
+        assert self.counter.get_stats()['cache_entries'] == 2
+
+    def test_count_batch_matches_count(self):
+        """一括計測は個別計測と一致し、重複は1回だけ計測する"""
+        texts = ["alpha beta", "", "alpha beta", "gamma"]
+        assert self.counter.count_batch(texts) == [self.counter.count(t) for t in texts]
+
+    def test_truncate_fits_budget(self):
+        """切り詰め後は指定トークン数以内"""
+        text = "word " * 500
+        truncated = self.counter.truncate(text, 50)
+        assert self.counter.count(truncated) <= 50
+        assert text.startswith(truncated)
+        assert self.counter.truncate("short", 50) == "short"
+
+
+class TestSharedCounter:
+    """利用箇所での共有カウンターのテストクラス"""
+
+    def test_prompt_statistics_use_shared_counter(self):
+        """プロンプト統計のトークン数は共有カウンターの値"""
+        prompt = "## Task\nclass Foo:\n    pass\n"
+        stats = PromptBuilder().get_prompt_statistics(prompt)
+        assert stats['estimated_tokens'] == get_token_counter().count(prompt)
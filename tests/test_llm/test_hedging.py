@@ -0,0 +1,267 @@
+# tests/test_llm/test_hedging.py
+"""
+ヘッジリクエストのテスト
+ポリシーの待機時間算出とLLMServiceCoreでの競争実行を検証
+"""
+
+import asyncio
+import pytest
+from unittest.mock import Mock, patch
+
+from openai.types.chat import ChatCompletionChunk
+from openai.types.chat.chat_completion_chunk import Choice, ChoiceDelta
+from openai.types.completion_usage import CompletionUsage
+
+from src.llm.base_llm import LLMMessage, LLMConfig, LLMRole
+from src.llm.hedging import HedgingPolicy, HedgeTarget, LatencyTracker, HedgeStats
+from src.llm.llm_service import LLMServiceCore, TaskType
+from src.llm.openai_client import OpenAIClient
+from src.llm.rate_limiter import ProviderRateLimiter
+
+
+class FakeRateLimitError(Exception):
+    """429応答を模した例外"""
+
+    def __init__(self, headers):
+        super().__init__("rate limited")
+        self.status_code = 429
+        self.headers = headers
+
+
+class FakeSdkStream:
+    """AsyncOpenAIのストリーム応答（レスポンスヘッダーとチャンク）を模したオブジェクト"""
+
+    def __init__(self, chunks, headers):
+        self.chunks = chunks
+        self.response = Mock(headers=headers)
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+def make_chunk(content=None, finish_reason=None, usage=None):
+    """SDKのストリーミングチャンクを作成"""
+    choices = [] if usage else [Choice(index=0, delta=ChoiceDelta(content=content), finish_reason=finish_reason)]
+    return ChatCompletionChunk(
+        id="chunk", choices=choices, created=0, model="gpt", object="chat.completion.chunk", usage=usage
+    )
+
+
+def create_client(model, first_token_delay=0.0, chunks=("hello", " world"), error=None,
+                  finish_reason="stop", headers=None):
+    """SDK呼び出しだけを差し替えた実際のOpenAIClientを作成"""
+    client = OpenAIClient(api_key="test-key", config=LLMConfig(model=model))
+    client.cancelled = False
+    client.requests = []
+
+    async def create(**params):
+        client.requests.append(params)
+        try:
+            await asyncio.sleep(first_token_delay)
+        except asyncio.CancelledError:
+            client.cancelled = True
+            raise
+        if error:
+            raise error
+        sdk_chunks = [make_chunk(content) for content in chunks]
+        sdk_chunks.append(make_chunk(finish_reason=finish_reason))
+        if params.get('stream_options', {}).get('include_usage'):
+            sdk_chunks.append(make_chunk(usage=CompletionUsage(
+                prompt_tokens=3, completion_tokens=len(chunks), total_tokens=3 + len(chunks)
+            )))
+        return FakeSdkStream(sdk_chunks, headers or {})
+
+    client.client.chat.completions.create = create
+    return client
+
+
+def create_service(clients, config=None):
+    """モックファクトリーを使うLLMServiceCoreを作成（clientsのキーは「プロバイダー:モデル」）"""
+    factory = Mock()
+    factory.get_provider_info.side_effect = lambda name: Mock(supports_streaming=True)
+    factory.get_rate_limiter.return_value = Mock(blocked_for=Mock(return_value=0.0))
+    factory.get_default_provider.return_value = "openai"
+
+    async def create_client_async(provider, config):
+        return clients[f"{provider}:{config.model}"]
+
+    factory.create_client_async.side_effect = create_client_async
+
+    with patch('src.llm.llm_service.get_llm_factory', return_value=factory):
+        service = LLMServiceCore(config=config if config is not None else {'hedging': {'enabled': False}})
+    return service
+
+
+class TestHedgingPolicy:
+    """HedgingPolicyのテストクラス"""
+
+    def test_initial_delay_until_enough_samples(self):
+        """サンプル不足の間はinitial_delayを使用"""
+        policy = HedgingPolicy(enabled=True, initial_delay=1.5, min_samples=3)
+        tracker = LatencyTracker()
+        tracker.record("openai:default", 0.1)
+        assert policy.compute_delay(tracker, "openai:default") == 1.5
+
+    def test_percentile_delay_is_clamped(self):
+        """パーセンタイル値をmin/maxで制限"""
+        policy = HedgingPolicy(enabled=True, percentile=90, min_delay=0.5, max_delay=2.0, min_samples=1)
+        tracker = LatencyTracker()
+        for value in (0.1, 0.2, 0.3):
+            tracker.record("k", value)
+        assert policy.compute_delay(tracker, "k") == 0.5
+
+        for value in (5.0, 6.0, 7.0, 8.0, 9.0, 10.0):
+            tracker.record("k", value)
+        assert policy.compute_delay(tracker, "k") == 2.0
+
+    def test_from_dict_builds_targets(self):
+        """辞書からヘッジ先を含むポリシーを作成"""
+        policy = HedgingPolicy.from_dict({
+            'enabled': True,
+            'secondaries': [{'provider': 'local', 'model': 'codellama:7b'}],
+            'unknown_key': 1
+        })
+        assert policy.secondaries == [HedgeTarget('local', 'codellama:7b')]
+
+    def test_disabled_unless_configured(self):
+        """設定で有効にしない限りヘッジせず、ヘッジ先は設定で指定する"""
+        service = create_service({}, config={})
+        assert not service.get_hedging_policy(TaskType.CHAT).enabled
+
+        service = create_service({}, config={'hedging': {'enabled': True}})
+        policy = service.get_hedging_policy(TaskType.CHAT)
+        assert policy.enabled and policy.secondaries == []
+
+        service = create_service({}, config={
+            'hedging': {'enabled': True, 'secondaries': [{'provider': 'claude'}]}
+        })
+        assert service.get_hedging_policy(TaskType.CHAT).secondaries == [HedgeTarget('claude')]
+
+    def test_stats_win_rate(self):
+        """勝率の集計"""
+        stats = HedgeStats()
+        stats.record('chat', hedged=True, winner='secondary')
+        stats.record('chat', hedged=True, winner='primary')
+        stats.record('chat', hedged=False)
+        result = stats.get_stats()
+        assert result['hedged'] == 2
+        assert result['secondary_win_rate'] == 0.5
+        assert result['by_task_type']['chat']['hedge_rate'] == pytest.approx(2 / 3)
+
+
+class TestServiceHedging:
+    """LLMServiceCoreのヘッジ実行テストクラス"""
+
+    def setup_method(self):
+        """各テスト前の初期化"""
+        self.messages = [LLMMessage(role=LLMRole.USER, content="hi")]
+        self.policy = HedgingPolicy(
+            enabled=True, initial_delay=0.05, min_delay=0.01,
+            secondaries=[HedgeTarget('openai', 'gpt-4o-mini')]
+        )
+
+    @pytest.mark.asyncio
+    async def test_fast_primary_is_not_hedged(self):
+        """最初のトークンが早ければヘッジしない"""
+        primary = create_client('gpt-4o')
+        secondary = create_client('gpt-4o-mini')
+        service = create_service({'openai:gpt-4o-mini': secondary})
+        task = service.create_task(TaskType.CHAT, "hi", provider='openai')
+
+        response = await service._generate_with_hedging(task, primary, self.messages, self.policy)
+
+        assert response.content == "hello world"
+        assert 'hedge' not in response.metadata
+        assert not secondary.requests
+        assert service.hedge_stats.get_stats()['hedged'] == 0
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_loses_and_is_cancelled(self):
+        """プライマリが遅い場合はセカンダリが勝ち、プライマリはキャンセルされる"""
+        primary = create_client('gpt-4o', first_token_delay=1.0)
+        secondary = create_client('gpt-4o-mini', chunks=("mini",))
+        service = create_service({'openai:gpt-4o-mini': secondary})
+        task = service.create_task(TaskType.CHAT, "hi", provider='openai')
+
+        response = await service._generate_with_hedging(task, primary, self.messages, self.policy)
+        await asyncio.sleep(0)
+
+        assert response.content == "mini"
+        assert response.metadata['hedge']['winner'] == 'secondary'
+        assert primary.cancelled
+        assert service.hedge_stats.get_stats()['secondary_wins'] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_primary_falls_over_to_secondary(self):
+        """プライマリが失敗した場合はセカンダリの結果を採用"""
+        primary = create_client('gpt-4o', error=RuntimeError("boom"))
+        secondary = create_client('gpt-4o-mini', chunks=("ok",))
+        service = create_service({'openai:gpt-4o-mini': secondary})
+        task = service.create_task(TaskType.CHAT, "hi", provider='openai')
+
+        response = await service._generate_with_hedging(task, primary, self.messages, self.policy)
+        assert response.content == "ok"
+
+    @pytest.mark.asyncio
+    async def test_streamed_winner_keeps_usage_and_finish_reason(self):
+        """ストリーミングで勝った応答は使用量・終了理由を引き継ぐ"""
+        primary = create_client('gpt-4o', first_token_delay=1.0)
+        secondary = create_client('gpt-4o-mini', chunks=("a", "b"), finish_reason="length")
+        service = create_service({'openai:gpt-4o-mini': secondary})
+        task = service.create_task(TaskType.CHAT, "hi", provider='openai')
+
+        response = await service._generate_with_hedging(task, primary, self.messages, self.policy)
+        assert response.finish_reason == "length"
+        assert response.usage.total_tokens == 5
+        assert response.model == "gpt-4o-mini"
+
+    @pytest.mark.asyncio
+    async def test_secondary_client_error_keeps_primary(self):
+        """ヘッジ先のクライアントを作れない場合もプライマリの結果を返す"""
+        primary = create_client('gpt-4o', first_token_delay=0.2)
+        service = create_service({})
+        service._get_client_for = Mock(side_effect=RuntimeError("no local server"))
+        task = service.create_task(TaskType.CHAT, "hi", provider='openai')
+
+        response = await service._generate_with_hedging(task, primary, self.messages, self.policy)
+        assert response.content == "hello world"
+        assert not primary.cancelled
+        assert service.hedge_stats.get_stats()['hedged'] == 0
+
+    @pytest.mark.asyncio
+    async def test_streamed_request_uses_rate_limiter(self):
+        """ストリーミングのリクエストもレート制限枠を取得し、使用量・ヘッダーを反映する"""
+        client = create_client('gpt-4o', headers={
+            'x-ratelimit-limit-requests': '60',
+            'x-ratelimit-remaining-requests': '3',
+        })
+        client.rate_limiter = ProviderRateLimiter("openai")
+        service = create_service({})
+
+        response = await service._race_request(
+            client, self.messages, None, HedgeTarget('openai', 'gpt-4o'), asyncio.Event()
+        )
+
+        stats = client.rate_limiter.get_stats()
+        assert response.content == "hello world"
+        assert stats['requests'] == 1 and stats['successes'] == 1
+        assert stats['tokens_actual'] == 5
+        assert stats['in_flight'] == 0
+        assert client.rate_limiter.request_bucket.available == pytest.approx(3, abs=0.1)
+
+    @pytest.mark.asyncio
+    async def test_streamed_rate_limit_error_blocks_limiter(self):
+        """ストリーミングのリクエストが429で失敗した場合はリミッターに反映する"""
+        client = create_client('gpt-4o', error=FakeRateLimitError({'retry-after': '2'}))
+        client.rate_limiter = ProviderRateLimiter("openai")
+        service = create_service({})
+
+        with pytest.raises(FakeRateLimitError):
+            await service._race_request(
+                client, self.messages, None, HedgeTarget('openai', 'gpt-4o'), asyncio.Event()
+            )
+
+        assert client.rate_limiter.get_stats()['throttled'] == 1
+        assert client.rate_limiter.blocked_for() > 1.5
+        assert client.rate_limiter.concurrency.in_flight == 0
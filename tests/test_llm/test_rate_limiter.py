@@ -0,0 +1,238 @@
+# tests/test_llm/test_rate_limiter.py
+"""
+レート制限モジュールのテスト
+トークンバケット・AIMD同時実行制御・ヘッダー解析を検証
+"""
+
+import asyncio
+import pytest
+
+from src.llm.rate_limiter import (
+    TokenBucket,
+    AdaptiveConcurrencyLimiter,
+    ProviderRateLimiter,
+    RateLimitConfig,
+    RateLimiterRegistry,
+    is_rate_limit_error,
+    parse_duration,
+    parse_rate_limit_headers,
+    estimate_request_tokens,
+    record_response_headers
+)
+from src.core.token_counter import get_token_counter
+
+
+class FakeClock:
+    """テスト用の手動時計"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+class FakeRateLimitError(Exception):
+    """429応答を模した例外"""
+
+    def __init__(self, headers):
+        super().__init__("rate limited")
+        self.status_code = 429
+        self.headers = headers
+
+
+class TestTokenBucket:
+    """TokenBucketのテストクラス"""
+
+    def test_reserve_within_capacity(self):
+        """容量内の予約は待機なし"""
+        clock = FakeClock()
+        bucket = TokenBucket(rate_per_second=10, capacity=10, clock=clock)
+        assert bucket.reserve(10) == 0.0
+
+    def test_reserve_returns_deficit_wait(self):
+        """不足分は補充レートから待機時間を算出"""
+        clock = FakeClock()
+        bucket = TokenBucket(rate_per_second=10, capacity=10, clock=clock)
+        bucket.reserve(10)
+        assert bucket.reserve(5) == pytest.approx(0.5)
+
+        clock.advance(0.5)
+        assert bucket.available == pytest.approx(0.0)
+
+    def test_refund_caps_at_capacity(self):
+        """返却は容量を超えない"""
+        clock = FakeClock()
+        bucket = TokenBucket(rate_per_second=1, capacity=5, clock=clock)
+        bucket.refund(100)
+        assert bucket.available == 5
+
+    def test_sync_adopts_stricter_remaining(self):
+        """サーバー側の残量がより少ない場合は同期する"""
+        clock = FakeClock()
+        bucket = TokenBucket(rate_per_second=1, capacity=60, clock=clock)
+        bucket.sync(remaining=3, limit=60, reset_seconds=57)
+        assert bucket.available == 3
+
+
+class TestAdaptiveConcurrencyLimiter:
+    """AdaptiveConcurrencyLimiterのテストクラス"""
+
+    def test_additive_increase(self):
+        """成功が約1ウィンドウ分続くと上限が1増える"""
+        limiter = AdaptiveConcurrencyLimiter(initial=4, maximum=10)
+        for _ in range(5):
+            limiter.on_success()
+        assert limiter.limit == 5
+
+    def test_multiplicative_decrease_with_cooldown(self):
+        """レート制限で半減し、クールダウン中は再減少しない"""
+        clock = FakeClock()
+        limiter = AdaptiveConcurrencyLimiter(initial=8, decrease_cooldown=1.0, clock=clock)
+        assert limiter.on_throttled()
+        assert limiter.limit == 4
+        assert not limiter.on_throttled()
+        assert limiter.limit == 4
+
+        clock.advance(1.0)
+        assert limiter.on_throttled()
+        assert limiter.limit == 2
+
+    @pytest.mark.asyncio
+    async def test_limits_in_flight(self):
+        """同時実行数が上限を超えない"""
+        limiter = AdaptiveConcurrencyLimiter(initial=2, maximum=2)
+        peak = 0
+
+        async def worker():
+            nonlocal peak
+            await limiter.acquire()
+            try:
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.01)
+            finally:
+                limiter.release()
+
+        await asyncio.gather(*(worker() for _ in range(8)))
+        assert peak == 2
+        assert limiter.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_leak_slot(self):
+        """待機中にキャンセルされても枠が失われない"""
+        limiter = AdaptiveConcurrencyLimiter(initial=1, maximum=1)
+        await limiter.acquire()
+
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        limiter.release()
+        await asyncio.wait_for(limiter.acquire(), timeout=1)
+        assert limiter.in_flight == 1
+
+
+class TestProviderRateLimiter:
+    """ProviderRateLimiterのテストクラス"""
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_error_blocks_and_decreases(self):
+        """429応答のRetry-Afterでブロックし同時実行数を減らす"""
+        limiter = ProviderRateLimiter("openai", RateLimitConfig(initial_concurrency=8))
+
+        with pytest.raises(FakeRateLimitError):
+            async with limiter.limit(10):
+                raise FakeRateLimitError({'retry-after': '2'})
+
+        assert limiter.blocked_for() > 1.5
+        assert limiter.concurrency.limit == 4
+        assert limiter.concurrency.in_flight == 0
+        assert limiter.get_stats()['throttled'] == 1
+
+    @pytest.mark.asyncio
+    async def test_usage_refunds_estimate(self):
+        """実績トークン数で推定値を補正"""
+        limiter = ProviderRateLimiter("claude", RateLimitConfig(tokens_per_minute=600))
+
+        async with limiter.limit(500) as permit:
+            permit.record_usage({'usage': {'input_tokens': 50, 'output_tokens': 50}})
+
+        assert limiter.token_bucket.available == pytest.approx(500, abs=1)
+        assert limiter.get_stats()['tokens_actual'] == 100
+
+    @pytest.mark.asyncio
+    async def test_success_headers_sync_remaining_quota(self):
+        """成功した呼び出しのヘッダーから残りのリクエスト数を反映（429を待たない）"""
+        limiter = ProviderRateLimiter("openai")
+
+        async def call_api():
+            record_response_headers({
+                'x-ratelimit-limit-requests': '60',
+                'x-ratelimit-remaining-requests': '3',
+            })
+            return {'usage': {'total_tokens': 10}}
+
+        record_response_headers({'x-ratelimit-remaining-requests': '0'})
+        async with limiter.limit(10) as permit:
+            permit.record_usage(await call_api())
+
+        assert limiter.request_bucket is not None
+        assert limiter.request_bucket.available == pytest.approx(3, abs=0.1)
+        assert limiter.blocked_for() == 0
+
+
+class TestRegistryAndParsing:
+    """レジストリとヘッダー解析のテストクラス"""
+
+    def test_registry_shares_limiter_across_aliases(self):
+        """anthropicとclaudeは同じリミッターを共有"""
+        registry = RateLimiterRegistry()
+        assert registry.get_limiter("anthropic") is registry.get_limiter("claude")
+
+    def test_registry_configure_overrides_defaults(self):
+        """設定でデフォルト値を上書き"""
+        registry = RateLimiterRegistry()
+        registry.configure("openai", {'requests_per_minute': 30, 'max_concurrency': 3})
+        limiter = registry.get_limiter("openai")
+        assert limiter.config.requests_per_minute == 30
+        assert limiter.config.tokens_per_minute == 200000
+        assert limiter.concurrency.maximum == 3
+
+    @pytest.mark.parametrize("value,expected", [
+        ("1.5", 1.5),
+        ("6m0s", 360.0),
+        ("20ms", 0.02),
+        ("1h2m3s", 3723.0),
+    ])
+    def test_parse_duration(self, value, expected):
+        """リセット時間表記の解析"""
+        assert parse_duration(value) == pytest.approx(expected)
+
+    def test_parse_openai_headers(self):
+        """OpenAI形式のヘッダー解析"""
+        state = parse_rate_limit_headers({
+            'x-ratelimit-limit-requests': '500',
+            'x-ratelimit-remaining-requests': '0',
+            'x-ratelimit-reset-requests': '120ms',
+            'retry-after-ms': '250',
+        })
+        assert state.limit_requests == 500
+        assert state.remaining_requests == 0
+        assert state.reset_requests == pytest.approx(0.12)
+        assert state.retry_after == pytest.approx(0.25)
+
+    def test_is_rate_limit_error(self):
+        """例外種別・ステータスコードによる判定"""
+        assert is_rate_limit_error(FakeRateLimitError({}))
+        assert not is_rate_limit_error(ValueError("x"))
+
+    def test_estimate_request_tokens(self):
+        """メッセージのトークン数とmax_tokensから概算"""
+        content = "Summarize the following text in one sentence."
+        params = {'messages': [{'role': 'user', 'content': content}], 'max_tokens': 50}
+        assert estimate_request_tokens(params) == get_token_counter().count(content) + 50
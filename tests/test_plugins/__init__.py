@@ -0,0 +1,5 @@
+# tests/test_plugins/__init__.py
+"""
+プラグインテストパッケージ
+プラグインのテストモジュールを提供
+"""
@@ -0,0 +1,141 @@
+# tests/test_plugins/test_export_formats.py
+"""
+export_formatsのテストモジュール
+逐次エクスポート（HTML・Markdown・ZIP・TAR）の出力内容と、並列描画の順序を検証
+"""
+
+import os
+import tarfile
+import threading
+import time
+import zipfile
+
+import pytest
+
+from src.plugins.export_tools.export_formats import (
+    HTMLExporter,
+    MarkdownExporter,
+    TarExporter,
+    ZipExporter,
+    iter_rendered
+)
+
+
+def iter_file_infos(root):
+    """エクスポートプラグインと同じ形式のファイル情報を走査順に返す"""
+    for current, dirs, files in os.walk(root):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(current, name)
+            yield {
+                'path': path,
+                'relative_path': os.path.relpath(path, root),
+                'name': name,
+                'size': os.path.getsize(path),
+                'language': 'python' if name.endswith('.py') else 'text',
+            }
+
+
+class TestIterRendered:
+    """iter_renderedのテストクラス"""
+
+    def test_keeps_order_and_bounds_read_ahead(self):
+        """描画の完了順によらず元の順序で返し、先読みはスレッド数の2倍まで"""
+        consumed = []
+
+        def items():
+            for i in range(50):
+                consumed.append(i)
+                yield i
+
+        def render(i):
+            time.sleep(0.001 * (i % 3))
+            return f"{i}:{threading.current_thread().name}"
+
+        results = []
+        for result in iter_rendered(items(), render, workers=3):
+            results.append(int(result.split(':')[0]))
+            assert len(consumed) - len(results) <= 6
+        assert results == list(range(50))
+
+
+class TestStreamingExport:
+    """逐次エクスポートのテストクラス"""
+
+    def setup_method(self):
+        """各テスト前の初期化"""
+        self.files = {
+            "main.py": "print('<main>')\n",
+            "pkg/util.py": "x = 1 & 2\n```\n",
+            "pkg/data/readme.txt": "hello\n",
+        }
+        self.options = {'include_content': True, 'workers': 2}
+
+    def make_project(self, tmp_path):
+        """テスト用プロジェクトとプロジェクト情報を作成"""
+        root = tmp_path / "project"
+        for name, content in self.files.items():
+            (root / name).parent.mkdir(parents=True, exist_ok=True)
+            (root / name).write_text(content, encoding='utf-8')
+        info = {
+            'name': 'project',
+            'path': str(root),
+            'metadata': {'export_time': 'now', 'total_files': len(self.files), 'total_size': 0},
+        }
+        return root, info
+
+    def test_html_sections_are_escaped_and_ordered(self, tmp_path):
+        """ファイル毎の節を走査順に書き、内容はエスケープする"""
+        root, info = self.make_project(tmp_path)
+        output = tmp_path / "out" / "project.html"
+        assert HTMLExporter().export_project_stream(info, iter_file_infos(root), str(output), self.options)
+
+        html = output.read_text(encoding='utf-8')
+        positions = [html.index(f'{name} (') for name in ("main.py", "pkg/util.py", "pkg/data/readme.txt")]
+        assert positions == sorted(positions)
+        assert "print('&lt;main&gt;')" in html
+        assert html.count('<div class="code">') == 3
+        assert html.endswith('</body>\n</html>')
+
+    def test_markdown_fence_is_longer_than_content(self, tmp_path):
+        """内容にフェンスが含まれていても閉じない"""
+        root, info = self.make_project(tmp_path)
+        output = tmp_path / "project.md"
+        assert MarkdownExporter().export_project_stream(info, iter_file_infos(root), str(output), self.options)
+
+        markdown = output.read_text(encoding='utf-8')
+        assert "````python\nx = 1 & 2\n```\n\n````" in markdown
+
+    def test_content_is_truncated_without_reading_whole_file(self, tmp_path):
+        """上限を超える内容は省略する"""
+        root, info = self.make_project(tmp_path)
+        (root / "main.py").write_text("a" * 1000, encoding='utf-8')
+        output = tmp_path / "project.html"
+        options = dict(self.options, max_content_length=10)
+        assert HTMLExporter().export_project_stream(info, iter_file_infos(root), str(output), options)
+        assert "a" * 10 + "\n... (省略)" in output.read_text(encoding='utf-8')
+
+    @pytest.mark.parametrize("compression", ["gz", "bz2", "xz", ""])
+    def test_tar_archive(self, tmp_path, compression):
+        """ファイルとプロジェクト情報をTARに書き込む"""
+        root, info = self.make_project(tmp_path)
+        output = tmp_path / "project.tar"
+        options = dict(self.options, compression=compression)
+        assert TarExporter().export_project_stream(info, iter_file_infos(root), str(output), options)
+
+        with tarfile.open(output, 'r:*') as tar:
+            assert tar.getnames() == [*self.files, 'project_info.json']
+            for name, content in self.files.items():
+                assert tar.extractfile(name).read().decode('utf-8') == content
+
+    def test_zip_archive(self, tmp_path):
+        """ファイルとプロジェクト情報をZIPに書き込み、読めないファイルは飛ばす"""
+        root, info = self.make_project(tmp_path)
+        files = [*iter_file_infos(root), {'path': str(root / "missing.py"), 'relative_path': "missing.py"}]
+        output = tmp_path / "project.zip"
+        assert ZipExporter().export_project_stream(info, iter(files), str(output), self.options)
+
+        with zipfile.ZipFile(output) as zipf:
+            assert zipf.testzip() is None
+            assert zipf.namelist() == [*self.files, 'project_info.json']
+            assert zipf.read("pkg/util.py").decode('utf-8') == self.files["pkg/util.py"]
@@ -0,0 +1,5 @@
+# tests/test_services/__init__.py
+"""
+サービステストパッケージ
+サービス層のテストモジュールを提供
+"""
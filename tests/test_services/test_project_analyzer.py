@@ -0,0 +1,187 @@
+# tests/test_services/test_project_analyzer.py
+"""
+project_analyzerのテストモジュール
+1回の走査によるシグナル収集、マニフェスト・importのキャッシュ、ProjectServiceの逐次解析を検証
+"""
+
+import asyncio
+import os
+import threading
+
+from src.services.file_service import FileService, FileType
+from src.services.project_analyzer import ProjectScanner, parse_manifest
+
+
+OLD_MTIME = 1_000_000_000
+
+
+def file_type(name):
+    """FileService.get_file_type（インスタンスの状態は使わない）"""
+    return FileService.get_file_type(None, name)
+
+
+def make_project(root):
+    """テスト用のPythonプロジェクトを作成（キャッシュされるよう更新時刻は過去にする）"""
+    files = {
+        "requirements.txt": "Flask==2.0\nrequests>=2.31\n# comment\n",
+        "README.md": "# project\n",
+        ".gitignore": "*.pyc\n",
+        "app/main.py": "import os\nfrom pandas import DataFrame\n",
+        "app/views.py": "def index():\n    return 'import torch'\n",
+        "tests/test_main.py": "import pytest\n",
+        "static/site.css": "/* Bootstrap v5 */\n",
+        "templates/index.html": "<html></html>\n",
+        "docs/guide.md": "guide\n",
+        ".git/config": "[core]\n",
+        "node_modules/react/index.js": "module.exports = {}\n",
+    }
+    for name, content in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+        os.utime(path, (OLD_MTIME, OLD_MTIME))
+    return root
+
+
+class TestParseManifest:
+    """parse_manifestのテストクラス"""
+
+    def test_package_json(self):
+        """dependencies・devDependenciesとフレームワーク"""
+        result = parse_manifest('package.json', b'{"dependencies": {"react": "^18"}, '
+                                                b'"devDependencies": {"@angular/core": "1", "jest": "2"}}')
+        assert sorted(result['dependencies']) == ['@angular/core', 'jest', 'react']
+        assert result['frameworks'] == ['Angular', 'React']
+
+    def test_pyproject(self):
+        """[project]とpoetryの依存関係"""
+        data = (b'[project]\ndependencies = ["fastapi>=0.100", "numpy[extra]"]\n'
+                b'[tool.poetry.dependencies]\npython = "^3.11"\ntorch = "*"\n')
+        result = parse_manifest('pyproject.toml', data)
+        assert result['dependencies'] == ['fastapi', 'numpy', 'torch']
+        assert result['frameworks'] == ['FastAPI', 'NumPy', 'PyTorch']
+
+
+class TestProjectScanner:
+    """ProjectScannerのテストクラス"""
+
+    def test_collects_signals_in_one_scan(self, tmp_path):
+        """集計・マニフェスト・import・CSSを収集し、隠し・除外ディレクトリは走査しない"""
+        project = make_project(tmp_path / "project")
+        signals = ProjectScanner(file_type, workers=2).scan(project)
+
+        assert signals.complete
+        assert signals.total_files == 8
+        assert signals.file_types[FileType.PYTHON] == 3
+        assert signals.code_files == 2 and signals.test_code_files == 1
+        assert signals.doc_files == 2 and signals.has_readme
+        assert signals.tracked_names == {'.gitignore', 'README.md', 'requirements.txt'}
+        assert signals.dependencies == {'Flask', 'requests'}
+        assert signals.manifest_frameworks == {'Flask'}
+        assert signals.import_frameworks == {'Pandas'}
+        assert signals.css_frameworks == {'Bootstrap'}
+
+    def test_cache_skips_unchanged_files(self, tmp_path):
+        """変わっていないマニフェスト・ファイルは読まず、変更されたファイルだけ読み直す"""
+        project = make_project(tmp_path / "project")
+        cache_path = tmp_path / "cache.db"
+        first = ProjectScanner(file_type, cache_path=cache_path).scan(project)
+
+        scanner = ProjectScanner(file_type, cache_path=cache_path)
+        assert scanner.scan(project) == first
+        assert scanner.statistics == {'manifest_hits': 1, 'file_hits': 4, 'files_read': 0}
+
+        main = project / "app" / "main.py"
+        main.write_text("import numpy\n", encoding='utf-8')
+        os.utime(main, (OLD_MTIME + 10, OLD_MTIME + 10))
+        assert scanner.scan(project).import_frameworks == {'NumPy'}
+        assert scanner.statistics['files_read'] == 1
+
+    def test_updates_are_incremental(self, tmp_path):
+        """マニフェストの結果を最初に通知し、最後に完了を通知する"""
+        project = make_project(tmp_path / "project")
+        updates = []
+        ProjectScanner(file_type).scan(
+            project, lambda stage, signals: updates.append((stage, signals)), update_interval=0
+        )
+
+        stages = [stage for stage, _ in updates]
+        assert stages[0] == 'manifests' and stages[-1] == 'complete'
+        assert 'files' in stages
+        first = updates[0][1]
+        assert first.total_files == 0 and first.manifest_frameworks == {'Flask'}
+        counts = [signals.total_files for _, signals in updates]
+        assert counts == sorted(counts)
+
+    def test_cancel(self, tmp_path):
+        """中断すると完了を通知しない"""
+        project = make_project(tmp_path / "project")
+        cancel_event = threading.Event()
+        cancel_event.set()
+        stages = []
+        signals = ProjectScanner(file_type).scan(
+            project, lambda stage, signals: stages.append(stage), cancel_event
+        )
+        assert not signals.complete
+        assert stages == ['manifests']
+
+
+class TestProjectServiceAnalysis:
+    """ProjectService.analyze_projectのテストクラス"""
+
+    def _run(self, tmp_path, scenario):
+        """ProjectServiceを作成してシナリオを実行"""
+        from src.services.project_service import ProjectService
+
+        async def main():
+            file_service = FileService({'file_management': {
+                'backup': {'enabled': False, 'path': str(tmp_path / "backups")},
+                'auto_save': {'enabled': False},
+                'temp_files': {'path': str(tmp_path / "temp")},
+            }})
+            service = ProjectService({
+                'project_management': {
+                    'templates': {'path': str(tmp_path / "templates")},
+                    'analysis': {'cache_path': str(tmp_path / "analysis.db"), 'max_workers': 2},
+                },
+                'paths': {'user_data_dir': str(tmp_path / "user_data")},
+            }, file_service)
+            try:
+                return await scenario(service)
+            finally:
+                await service.close()
+                await file_service.close()
+
+        return asyncio.run(main())
+
+    def test_analyze_project(self, tmp_path):
+        """解析結果と、マニフェストだけの途中経過から始まる進捗"""
+        from src.services.project_service import ProjectType
+
+        project = make_project(tmp_path / "project")
+        progress = []
+
+        async def scenario(service):
+            return await service.analyze_project(project, progress.append)
+
+        analysis = self._run(tmp_path, scenario)
+        assert analysis.project_type == ProjectType.PYTHON
+        assert analysis.main_language == "Python"
+        assert analysis.frameworks == ['Bootstrap', 'Flask', 'Pandas']
+        assert analysis.dependencies == ['Flask', 'requests']
+        assert analysis.test_coverage == 0.5
+        assert analysis.maintainability_score == 1.0
+        assert analysis.documentation_score == 0.8
+        assert ".gitignoreファイルが見つかりません" not in analysis.issues
+        assert progress[0].frameworks == ['Flask'] and progress[0].file_types == {}
+        assert progress[-1] == analysis
+
+    def test_stop_iteration_early(self, tmp_path):
+        """最初の途中経過で反復をやめても問題なく終了する"""
+        project = make_project(tmp_path / "project")
+
+        async def scenario(service):
+            async for analysis in service.iter_project_analysis(project):
+                return analysis
+
+        assert self._run(tmp_path, scenario).dependencies == ['Flask', 'requests']
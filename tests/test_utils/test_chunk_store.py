@@ -0,0 +1,219 @@
+# tests/test_utils/test_chunk_store.py
+"""
+chunk_storeのテストモジュール
+コンテンツ定義チャンク分割・重複排除スナップショット・復元・整理を検証
+"""
+
+import io
+import os
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.utils.backup_utils import BackupConfig, BackupUtils, CompressionType
+from src.utils.chunk_store import ChunkStore, ContentDefinedChunker, chunk_hash
+
+
+def random_bytes(size: int, seed: int) -> bytes:
+    """再現可能な乱数バイト列"""
+    return random.Random(seed).randbytes(size)
+
+
+def small_chunker() -> ContentDefinedChunker:
+    """テスト用の小さなチャンク分割器"""
+    return ContentDefinedChunker(min_size=1024, avg_bits=11, max_size=16 * 1024, read_size=8 * 1024)
+
+
+class TestContentDefinedChunker:
+    """ContentDefinedChunkerのテストクラス"""
+
+    def test_chunks_cover_input(self):
+        """チャンクを連結すると元のデータになり、サイズは上下限内"""
+        chunker = small_chunker()
+        data = random_bytes(200 * 1024, 1)
+        chunks = list(chunker.iter_chunks(io.BytesIO(data)))
+
+        assert b"".join(chunks) == data
+        assert all(len(chunk) <= chunker.max_size for chunk in chunks)
+        assert all(len(chunk) >= chunker.min_size for chunk in chunks[:-1])
+
+    def test_boundaries_survive_insertion(self):
+        """途中に挿入しても変更箇所以外のチャンクは同じ"""
+        chunker = small_chunker()
+        data = random_bytes(300 * 1024, 2)
+        edited = data[:150 * 1024] + b"inserted bytes" + data[150 * 1024:]
+
+        before = {chunk_hash(chunk) for chunk in chunker.iter_chunks(io.BytesIO(data))}
+        after = [chunk_hash(chunk) for chunk in chunker.iter_chunks(io.BytesIO(edited))]
+        changed = [digest for digest in after if digest not in before]
+        assert len(changed) <= 2
+        assert len(after) - len(changed) > len(after) // 2
+
+    def test_small_and_empty_input(self):
+        """最小サイズ以下の入力は1チャンク、空入力はチャンクなし"""
+        chunker = small_chunker()
+        assert list(chunker.iter_chunks(io.BytesIO(b"abc"))) == [b"abc"]
+        assert list(chunker.iter_chunks(io.BytesIO(b""))) == []
+
+
+class TestChunkStore:
+    """ChunkStoreのテストクラス"""
+
+    def setup_method(self):
+        """各テスト前の初期化"""
+        self.store = None
+
+    def teardown_method(self):
+        """各テスト後のクリーンアップ"""
+        if self.store is not None:
+            self.store.close()
+
+    def create_source(self, root):
+        """スナップショット対象のファイルを作成"""
+        source = root / "src"
+        (source / "pkg").mkdir(parents=True)
+        (source / "big.bin").write_bytes(random_bytes(256 * 1024, 3))
+        (source / "pkg" / "a.txt").write_text("hello\n" * 1000, encoding='utf-8')
+        (source / "pkg" / "empty").write_bytes(b"")
+        return source
+
+    def snapshot(self, source, snapshot_id):
+        """ディレクトリ以下のスナップショットを作成"""
+        files = sorted(path for path in source.rglob("*") if path.is_file())
+        return self.store.create_snapshot(snapshot_id, [(path, path.relative_to(source)) for path in files])
+
+    def test_snapshot_and_restore(self, tmp_path):
+        """スナップショットを作成して復元できる"""
+        source = self.create_source(tmp_path)
+        self.store = ChunkStore(tmp_path / "store", chunker=small_chunker())
+
+        info = self.snapshot(source, "s1")
+        assert info.file_count == 3
+        assert info.new_chunks > 0
+        assert self.store.verify_snapshot("s1")
+
+        restored = self.store.restore_snapshot("s1", tmp_path / "out")
+        assert restored == 3
+        for path in source.rglob("*"):
+            if path.is_file():
+                target = tmp_path / "out" / path.relative_to(source)
+                assert target.read_bytes() == path.read_bytes()
+                assert target.stat().st_mtime_ns == path.stat().st_mtime_ns
+
+    def test_unchanged_snapshot_writes_nothing(self, tmp_path):
+        """変更がなければファイルを読まずにチャンクを引き継ぐ"""
+        source = self.create_source(tmp_path)
+        self.store = ChunkStore(tmp_path / "store", chunker=small_chunker())
+        self.snapshot(source, "s1")
+
+        info = self.snapshot(source, "s2")
+        assert info.reused_files == 3
+        assert info.new_chunks == 0 and info.stored_bytes == 0
+
+    def test_change_costs_only_new_chunks(self, tmp_path):
+        """変更したファイルの変更箇所だけが追加される"""
+        source = self.create_source(tmp_path)
+        self.store = ChunkStore(tmp_path / "store", chunker=small_chunker())
+        first = self.snapshot(source, "s1")
+
+        big = source / "big.bin"
+        data = big.read_bytes()
+        big.write_bytes(data[:100 * 1024] + b"patch" + data[100 * 1024:])
+        os.utime(big, ns=(1, 1))
+        second = self.snapshot(source, "s2")
+
+        assert second.reused_files == 2
+        assert 0 < second.new_chunks < first.new_chunks
+        assert second.stored_bytes < first.stored_bytes / 2
+
+        # どちらのスナップショットからも復元できる
+        self.store.restore_snapshot("s1", tmp_path / "old")
+        self.store.restore_snapshot("s2", tmp_path / "new")
+        assert (tmp_path / "old" / "big.bin").read_bytes() == data
+        assert (tmp_path / "new" / "big.bin").read_bytes() == big.read_bytes()
+
+    def test_duplicate_snapshot_id(self, tmp_path):
+        """同じIDのスナップショットは作成できない"""
+        source = self.create_source(tmp_path)
+        self.store = ChunkStore(tmp_path / "store", chunker=small_chunker())
+        self.snapshot(source, "s1")
+        with pytest.raises(ValueError):
+            self.snapshot(source, "s1")
+
+    def test_prune_reclaims_unreferenced_chunks(self, tmp_path):
+        """削除したスナップショットだけが参照するチャンクを回収する"""
+        source = self.create_source(tmp_path)
+        self.store = ChunkStore(tmp_path / "store", chunker=small_chunker())
+        self.snapshot(source, "s1")
+        (source / "big.bin").write_bytes(b"replaced")
+        self.snapshot(source, "s2")
+        before = self.store.get_statistics()
+
+        assert self.store.delete_snapshot("s1")
+        stats = self.store.prune()
+        after = self.store.get_statistics()
+
+        assert stats['removed_chunks'] > 0
+        assert after['chunks'] < before['chunks']
+        assert after['pack_bytes'] < before['pack_bytes']
+        assert self.store.verify_snapshot("s2")
+        self.store.restore_snapshot("s2", tmp_path / "out")
+        assert (tmp_path / "out" / "big.bin").read_bytes() == (source / "big.bin").read_bytes()
+
+    def test_copy_snapshot_transfers_missing_chunks(self, tmp_path):
+        """複製先にないチャンクだけを転送する"""
+        source = self.create_source(tmp_path)
+        self.store = ChunkStore(tmp_path / "store", chunker=small_chunker())
+        self.snapshot(source, "s1")
+        (source / "pkg" / "a.txt").write_text("changed\n", encoding='utf-8')
+        self.snapshot(source, "s2")
+
+        target = ChunkStore(tmp_path / "mirror", chunker=small_chunker())
+        try:
+            first = self.store.copy_snapshot_to(target, "s1")
+            second = self.store.copy_snapshot_to(target, "s2")
+            assert first > 0 and 0 < second < first
+            assert target.list_snapshots() == ["s1", "s2"]
+            assert target.verify_snapshot("s2")
+        finally:
+            target.close()
+
+
+class TestDedupBackup:
+    """BackupUtilsの重複排除バックアップのテストクラス"""
+
+    def setup_method(self):
+        """各テスト前の初期化"""
+        self.backup_utils = BackupUtils()
+
+    def test_round_trip_and_incremental(self, tmp_path):
+        """バックアップ・増分バックアップ・復元・削除"""
+        source = tmp_path / "project"
+        source.mkdir()
+        (source / "main.py").write_text("print('hello')\n" * 500, encoding='utf-8')
+        (source / "data.bin").write_bytes(random_bytes(64 * 1024, 5))
+        backup_dir = str(tmp_path / "backups")
+        config = BackupConfig(source_paths=[str(source)], backup_directory=backup_dir,
+                              compression_type=CompressionType.DEDUP)
+
+        full = self.backup_utils.create_backup(config)
+        assert full.file_count == 2
+        assert self.backup_utils.verify_backup(full)
+
+        before_change = datetime.now() - timedelta(seconds=1)
+        (source / "main.py").write_text("print('changed')\n", encoding='utf-8')
+        incremental = self.backup_utils.create_incremental_backup(config, before_change)
+        assert incremental.backup_id != full.backup_id
+        assert incremental.file_count == 2
+        assert incremental.metadata['dedup']['reused_files'] == 1
+
+        # 増分バックアップ単体から全ファイルを復元できる
+        assert self.backup_utils.restore_backup(incremental, str(tmp_path / "restored"))
+        assert (tmp_path / "restored" / "main.py").read_text(encoding='utf-8') == "print('changed')\n"
+        assert (tmp_path / "restored" / "data.bin").read_bytes() == (source / "data.bin").read_bytes()
+
+        assert self.backup_utils.delete_backup(backup_dir, full.backup_id)
+        history = self.backup_utils.list_backups(backup_dir)
+        assert [b.backup_id for b in history] == [incremental.backup_id]
+        assert self.backup_utils.verify_backup(history[0])
@@ -0,0 +1,220 @@
+# tests/test_utils/test_code_parser.py
+"""
+CodeParserのテストモジュール
+単一走査のPythonチャンク分割と行オフセットによる抽出・分割を検証
+"""
+
+import ast
+
+from src.utils.code_parser import ChunkSplitter, CodeParser, SourceIndex, line_offsets
+
+
+SAMPLE_SOURCE = '''import os
+from typing import List
+
+@dataclass
+class User:
+    """ユーザー"""
+    name: str = "名無し"
+
+    @property
+    def label(self) -> str:
+        return f"{self.name}さん"
+
+    async def save(self, path):
+        def _inner():
+            import json
+            return json.dumps({})
+        return _inner()
+
+    class Meta:
+        def describe(self):
+            return "meta"
+
+async def fetch(url, timeout=10):
+    """取得"""
+    return url
+
+if True:
+    def conditional():
+        return 1
+'''
+
+
+class TestSourceIndex:
+    """SourceIndexのテストクラス"""
+
+    def test_segments_match_get_source_segment(self):
+        """全ノードでast.get_source_segmentと同じ範囲を返す"""
+        tree = ast.parse(SAMPLE_SOURCE)
+        index = SourceIndex(SAMPLE_SOURCE)
+        for node in ast.walk(tree):
+            if hasattr(node, 'end_col_offset') and hasattr(node, 'lineno'):
+                assert index.segment(node) == ast.get_source_segment(SAMPLE_SOURCE, node)
+
+    def test_segment_with_decorators(self):
+        """デコレーターを含めて抽出"""
+        tree = ast.parse(SAMPLE_SOURCE)
+        class_node = next(node for node in tree.body if isinstance(node, ast.ClassDef))
+        segment = SourceIndex(SAMPLE_SOURCE).segment(class_node, include_decorators=True)
+        assert segment.startswith("@dataclass\nclass User:")
+
+
+class TestPythonChunking:
+    """Pythonチャンク分割のテストクラス"""
+
+    def setup_method(self):
+        """各テスト前の初期化"""
+        self.parser = CodeParser(max_chunk_size=100000)
+        self.chunks = self.parser._parse_python(SAMPLE_SOURCE, "sample.py")
+
+    def _chunk(self, qualified_name):
+        return next(chunk for chunk in self.chunks if chunk.get('qualified_name') == qualified_name)
+
+    def test_emits_classes_methods_and_functions_in_source_order(self):
+        """クラス・メソッド・関数を出現順に出力"""
+        names = [chunk.get('qualified_name') for chunk in self.chunks if chunk['type'] != 'imports']
+        assert names == [
+            'User', 'User.label', 'User.save', 'User.Meta', 'User.Meta.describe',
+            'fetch', 'conditional'
+        ]
+
+    def test_method_and_async_metadata(self):
+        """メソッド・async関数のメタデータ"""
+        save = self._chunk('User.save')
+        assert save['type'] == 'method'
+        assert save['class_name'] == 'User'
+        assert save['is_async']
+        assert save['parameters'] == ['self', 'path']
+
+        fetch = self._chunk('fetch')
+        assert fetch['type'] == 'function'
+        assert fetch['is_async']
+        assert fetch['docstring'] == "取得"
+
+    def test_decorators_are_included(self):
+        """デコレーターを含めた内容と開始行"""
+        label = self._chunk('User.label')
+        assert label['decorators'] == ['property']
+        assert label['content'].startswith("@property\n    def label")
+        assert label['line_start'] == 9
+
+    def test_nested_functions_are_not_separate_chunks(self):
+        """関数内の定義は親関数のチャンクに含める"""
+        assert all(chunk.get('function_name') != '_inner' for chunk in self.chunks)
+        assert "_inner" in self._chunk('User.save')['content']
+
+    def test_imports_include_nested_imports(self):
+        """関数内のimportもインポートチャンクに含める"""
+        imports = self.chunks[0]
+        assert imports['type'] == 'imports'
+        assert imports['content'].splitlines() == ["import os", "from typing import List", "import json"]
+
+    def test_syntax_error_falls_back_to_generic(self):
+        """構文エラーの場合は汎用パーサーを使用"""
+        chunks = self.parser._parse_python("def broken(:\n    pass\n", "broken.py")
+        assert chunks
+        assert all(chunk['type'] != 'function' for chunk in chunks)
+
+
+def _large_class(methods: int = 10) -> str:
+    """メソッドを多数含むクラス"""
+    parts = ["class Big:"]
+    for i in range(methods):
+        parts.append(f"    def method_{i}(self):")
+        parts.extend(f"        value_{j} = {j}" for j in range(8))
+        parts.append("")
+    return "\n".join(parts) + "\n"
+
+
+class TestChunkSplitter:
+    """ChunkSplitterのテストクラス"""
+
+    def _chunk(self, content, line_start=1):
+        return {'content': content, 'type': 'file', 'file_path': 'a.txt', 'line_start': line_start,
+                'line_end': line_start + content.count('\n'), 'language': 'text'}
+
+    def test_line_offsets(self):
+        """行頭オフセットは末尾に番兵を持つ"""
+        assert line_offsets("ab\ncd\n") == [0, 3, 6, 7]
+        assert line_offsets("") == [0, 1]
+
+    def test_pieces_cover_content_without_overlap(self):
+        """オーバーラップなしでは分割結果を連結すると元の内容になる"""
+        content = "\n".join(f"row {i} " + "x" * (i % 37) for i in range(200))
+        parts = list(ChunkSplitter(500, 0).iter_split(self._chunk(content)))
+
+        assert "".join(part['content'] for part in parts) == content
+        assert all(len(part['content']) <= 500 for part in parts)
+        assert [part['split_index'] for part in parts] == list(range(len(parts)))
+
+    def test_line_numbers_match_content(self):
+        """サブチャンクの行番号は元の内容の位置と一致する"""
+        lines = [f"line {i}" for i in range(100)]
+        parts = ChunkSplitter(120, 0).iter_split(self._chunk("\n".join(lines), line_start=11))
+        for part in parts:
+            first = part['content'].split("\n")[0]
+            assert first == lines[part['line_start'] - 11]
+            assert part['content'].rstrip("\n").split("\n")[-1] == lines[part['line_end'] - 11]
+
+    def test_prefers_blank_lines(self):
+        """行末より空行での分割を優先する"""
+        paragraph = "\n".join("word " * 8 for _ in range(4))
+        content = "\n\n".join(paragraph for _ in range(6))
+        parts = list(ChunkSplitter(400, 0).iter_split(self._chunk(content)))
+        assert all(part['content'].endswith("\n\n") for part in parts[:-1])
+
+    def test_prefers_syntax_boundaries(self):
+        """大きなクラスはメソッドの開始行で分割する"""
+        parser = CodeParser(max_chunk_size=400, overlap_size=0)
+        chunks = parser.parse_and_chunk(_large_class(), "big.py")
+        class_parts = [chunk for chunk in chunks if chunk['type'] == 'class']
+
+        assert len(class_parts) > 1
+        assert all(part['is_split'] for part in class_parts)
+        for part in class_parts[1:]:
+            assert part['content'].startswith("    def method_")
+
+    def test_long_single_line_is_split_inside_line(self):
+        """1行が上限を超える場合は行内の区切り文字で分割する"""
+        content = "var a=1;" * 500
+        parts = list(ChunkSplitter(300, 0).iter_split(self._chunk(content)))
+
+        assert "".join(part['content'] for part in parts) == content
+        assert all(len(part['content']) <= 300 for part in parts)
+        assert all(part['content'][-1] in " ;" for part in parts)
+        assert all(part['line_start'] == part['line_end'] == 1 for part in parts)
+
+    def test_overlap_repeats_previous_lines(self):
+        """オーバーラップ指定時は前のサブチャンク末尾の行から始める"""
+        content = "\n".join(f"line {i:03d}" for i in range(60))
+        parts = list(ChunkSplitter(200, 20).iter_split(self._chunk(content)))
+        for previous, current in zip(parts, parts[1:]):
+            assert current['line_start'] <= previous['line_end']
+            assert current['content'].split("\n")[0] in previous['content'].split("\n")
+
+    def test_token_budget(self):
+        """トークン数の上限を超えないよう分割する"""
+        content = "\n".join("a b c d e f g h" for _ in range(100))
+        count = lambda text: len(text.split())
+        parts = list(ChunkSplitter(10 ** 6, 0, max_tokens=50, count_tokens=count).iter_split(self._chunk(content)))
+
+        assert len(parts) > 1
+        assert all(count(part['content']) <= 50 for part in parts)
+        assert "".join(part['content'] for part in parts) == content
+
+    def test_split_is_lazy(self):
+        """サブチャンクは要求された分だけ生成する"""
+        content = "x\n" * 10000
+        iterator = ChunkSplitter(100, 0).iter_split(self._chunk(content))
+        first = next(iterator)
+        assert first['split_index'] == 0
+        assert first['line_start'] == 1
+
+    def test_metadata_is_preserved(self):
+        """元のチャンクのメタデータを引き継ぐ"""
+        chunk = dict(self._chunk("y\n" * 500), function_name='f', class_name='C')
+        part = next(ChunkSplitter(100, 0).iter_split(chunk))
+        assert part['function_name'] == 'f'
+        assert part['class_name'] == 'C'
+        assert part['file_path'] == 'a.txt'
@@ -0,0 +1,155 @@
+# tests/test_utils/test_delta_sync.py
+"""
+delta_syncのテストモジュール
+同期先に存在しないチャンクだけの転送、追記ファイルの末尾転送、バックアップの差分同期を検証
+"""
+
+import os
+import random
+from pathlib import Path
+
+import pytest
+
+from src.utils.backup_utils import BackupConfig, BackupUtils, CompressionType
+from src.utils.chunk_store import ContentDefinedChunker
+from src.utils.delta_sync import DeltaSync
+
+
+def random_bytes(size: int, seed: int) -> bytes:
+    """再現可能なランダムデータ"""
+    return random.Random(seed).randbytes(size)
+
+
+class TestDeltaSync:
+    """DeltaSyncのテストクラス"""
+
+    def setup_method(self):
+        """各テスト前の初期化"""
+        self.chunker = ContentDefinedChunker(min_size=1024, avg_bits=12, max_size=16384)
+
+    def open(self, target: Path) -> DeltaSync:
+        """小さいチャンクで差分同期を開く"""
+        return DeltaSync(target, chunker=self.chunker, workers=2)
+
+    def test_copy_and_skip(self, tmp_path):
+        """初回は全量を書き込み、変更がなければ何も書き込まない"""
+        source = tmp_path / "a.bin"
+        source.write_bytes(random_bytes(100000, 1))
+        sync = self.open(tmp_path / "target")
+
+        stats = sync.sync_file(source, "a.bin")
+        assert (tmp_path / "target" / "a.bin").read_bytes() == source.read_bytes()
+        assert stats.written_bytes == 100000
+        assert os.stat(tmp_path / "target" / "a.bin").st_mtime_ns == os.stat(source).st_mtime_ns
+
+        stats = sync.sync_file(source, "a.bin")
+        assert stats.skipped_files == 1 and stats.written_bytes == 0
+        sync.close()
+
+    def test_new_file_reuses_existing_chunks(self, tmp_path):
+        """別名の新しいファイルでも同期先にあるチャンクは転送しない"""
+        base = random_bytes(200000, 2)
+        (tmp_path / "v1.bin").write_bytes(base)
+        edited = base[:100000] + b"inserted" + base[100000:]
+        (tmp_path / "v2.bin").write_bytes(edited)
+
+        sync = self.open(tmp_path / "target")
+        sync.sync_file(tmp_path / "v1.bin", "v1.bin")
+        stats = sync.sync_file(tmp_path / "v2.bin", "v2.bin")
+        sync.close()
+
+        assert (tmp_path / "target" / "v2.bin").read_bytes() == edited
+        assert stats.written_bytes < 40000
+        assert stats.reused_bytes + stats.written_bytes == len(edited)
+
+    def test_appended_file_transfers_tail(self, tmp_path):
+        """追記されたファイルは同期先を切り詰めて末尾だけを書き込む"""
+        source = tmp_path / "pack.bin"
+        source.write_bytes(random_bytes(150000, 3))
+        target = tmp_path / "target"
+        sync = self.open(target)
+        sync.sync_file(source, "pack.bin")
+        inode = os.stat(target / "pack.bin").st_ino
+
+        with open(source, 'ab') as f:
+            f.write(random_bytes(30000, 4))
+        stats = sync.sync_file(source, "pack.bin")
+
+        assert (target / "pack.bin").read_bytes() == source.read_bytes()
+        assert stats.appended_files == 1
+        assert stats.written_bytes < 30000 + 16384
+        assert os.stat(target / "pack.bin").st_ino == inode
+        sync.close()
+
+    def test_index_survives_reopen_and_detects_outside_changes(self, tmp_path):
+        """署名は再オープン後も使われ、同期先が外部で変更された場合は使わない"""
+        source = tmp_path / "a.bin"
+        source.write_bytes(random_bytes(80000, 5))
+        target = tmp_path / "target"
+        self.open(target).sync_file(source, "a.bin")
+
+        sync = self.open(target)
+        assert sync.sync_file(source, "a.bin").skipped_files == 1
+
+        (target / "a.bin").write_bytes(b"changed outside")
+        stats = sync.sync_file(source, "a.bin")
+        assert stats.skipped_files == 0 and stats.written_bytes == 80000
+        assert (target / "a.bin").read_bytes() == source.read_bytes()
+        sync.close()
+
+    def test_sync_tree_and_forget(self, tmp_path):
+        """ディレクトリを並行して同期し、削除したファイルの署名を消す"""
+        source = tmp_path / "dir"
+        for index in range(6):
+            (source / f"sub{index % 2}").mkdir(parents=True, exist_ok=True)
+            (source / f"sub{index % 2}" / f"{index}.bin").write_bytes(random_bytes(20000, index))
+
+        sync = self.open(tmp_path / "target")
+        stats = sync.sync_tree(source, "copy")
+        assert stats.files == 6
+        for path in source.rglob("*.bin"):
+            assert (tmp_path / "target" / "copy" / path.relative_to(source)).read_bytes() == path.read_bytes()
+
+        sync.forget("copy/sub0")
+        assert sync.sync_tree(source, "copy").skipped_files == 3
+        sync.close()
+
+
+class TestDeltaSyncBackups:
+    """BackupUtils.sync_backupsの差分同期のテストクラス"""
+
+    def setup_method(self):
+        """各テスト前の初期化"""
+        self.backup_utils = BackupUtils()
+
+    @pytest.mark.parametrize("compression_type", [CompressionType.ZIP, CompressionType.NONE])
+    def test_delta_sync_backups(self, tmp_path, compression_type):
+        """差分同期したバックアップを同期先から検証・復元でき、履歴のパスが同期先になる"""
+        project = tmp_path / "project"
+        project.mkdir()
+        for index in range(5):
+            (project / f"file{index}.bin").write_bytes(random_bytes(60000, index))
+        source_dir = tmp_path / "backups"
+        target_dir = tmp_path / "mirror"
+        config = BackupConfig(source_paths=[str(project)], backup_directory=str(source_dir),
+                              compression_type=compression_type, compression_level=0)
+
+        first = self.backup_utils.create_backup(config)
+        assert self.backup_utils.sync_backups(str(source_dir), str(target_dir), delta=True, workers=2)
+
+        (project / "file2.bin").write_bytes(random_bytes(60000, 99))
+        second = self.backup_utils.create_backup(config)
+        assert self.backup_utils.sync_backups(str(source_dir), str(target_dir), delta=True, workers=2)
+
+        mirrored = self.backup_utils.list_backups(str(target_dir))
+        assert [info.backup_id for info in mirrored] == [first.backup_id, second.backup_id]
+        for info in mirrored:
+            assert Path(info.backup_path).parent == target_dir
+            assert self.backup_utils.verify_backup(info)
+
+        assert self.backup_utils.restore_backup(mirrored[-1], str(tmp_path / "restored"))
+        assert (tmp_path / "restored" / "file2.bin").read_bytes() == random_bytes(60000, 99)
+
+        # 同期を繰り返しても履歴は重複しない
+        assert self.backup_utils.sync_backups(str(source_dir), str(target_dir), delta=True)
+        assert len(self.backup_utils.list_backups(str(target_dir))) == 2
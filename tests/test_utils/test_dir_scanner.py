@@ -0,0 +1,153 @@
+# tests/test_utils/test_dir_scanner.py
+"""
+DirectoryScannerのテストモジュール
+os.scandirによる走査・枝刈り・並列走査とファイルユーティリティからの利用を検証
+"""
+
+import os
+
+import pytest
+
+from src.utils.dir_scanner import DirectoryScanner
+from src.utils.file_utils import FileUtils
+
+
+def build_tree(root):
+    """テスト用のディレクトリ構造を作成"""
+    files = {
+        "main.py": "print('main')\n",
+        "README.md": "# readme\n",
+        "pkg/__init__.py": "# package\n",
+        "pkg/util.py": "def f():\n    return 1\n",
+        "pkg/sub/deep.py": "x = 1\n",
+        "pkg/sub/data.JSON": "{}\n",
+        "node_modules/lib/index.js": "module.exports = {};\n",
+        ".git/config": "[core]\n",
+        ".hidden.txt": "secret\n",
+    }
+    for relative, content in files.items():
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+    return files
+
+
+def relative_paths(root, entries):
+    return sorted(os.path.relpath(entry.path, root).replace(os.sep, '/') for entry in entries)
+
+
+class TestDirectoryScanner:
+    """DirectoryScannerのテストクラス"""
+
+    def test_lists_all_files_recursively(self, tmp_path):
+        """既定では隠しファイルも含めてすべてのファイルを列挙する"""
+        files = build_tree(tmp_path)
+        assert relative_paths(tmp_path, DirectoryScanner().scan(tmp_path)) == sorted(files)
+
+    def test_excluded_and_hidden_directories_are_pruned(self, tmp_path):
+        """除外・隠しディレクトリ配下は走査しない"""
+        build_tree(tmp_path)
+        scanned = []
+        scanner = DirectoryScanner(exclude_dirs={'node_modules'}, include_hidden=False,
+                                   dir_filter=lambda entry: scanned.append(entry.name) or True)
+
+        paths = relative_paths(tmp_path, scanner.scan(tmp_path))
+        assert paths == ["README.md", "main.py", "pkg/__init__.py", "pkg/sub/data.JSON",
+                         "pkg/sub/deep.py", "pkg/util.py"]
+        assert 'node_modules' not in scanned and '.git' not in scanned
+
+    def test_pattern_and_directories(self, tmp_path):
+        """パターンは名前に適用し、ディレクトリも返せる"""
+        build_tree(tmp_path)
+        scanner = DirectoryScanner(exclude_dirs={'node_modules', '.git'})
+
+        assert relative_paths(tmp_path, scanner.scan(tmp_path, pattern="*.json", case_sensitive=False)) == [
+            "pkg/sub/data.JSON"
+        ]
+        assert relative_paths(tmp_path, scanner.scan(tmp_path, pattern="*.json", case_sensitive=True)) == []
+        assert relative_paths(tmp_path, scanner.scan(tmp_path, include_files=False, include_dirs=True)) == [
+            "pkg", "pkg/sub"
+        ]
+
+    def test_non_recursive_and_max_depth(self, tmp_path):
+        """非再帰・深さ制限"""
+        build_tree(tmp_path)
+        scanner = DirectoryScanner(exclude_dirs={'node_modules', '.git'}, include_hidden=False)
+
+        assert relative_paths(tmp_path, scanner.scan(tmp_path, recursive=False)) == ["README.md", "main.py"]
+        assert relative_paths(tmp_path, scanner.scan(tmp_path, max_depth=1)) == [
+            "README.md", "main.py", "pkg/__init__.py", "pkg/util.py"
+        ]
+
+    def test_parallel_scan_matches_serial(self, tmp_path):
+        """並列走査は逐次走査と同じエントリを返す"""
+        build_tree(tmp_path)
+        for i in range(20):
+            (tmp_path / f"dir{i}" / "nested").mkdir(parents=True)
+            (tmp_path / f"dir{i}" / "nested" / f"file{i}.txt").write_text("x", encoding='utf-8')
+
+        serial = relative_paths(tmp_path, DirectoryScanner().scan(tmp_path, include_dirs=True))
+        parallel = relative_paths(tmp_path, DirectoryScanner(max_workers=4).scan(tmp_path, include_dirs=True))
+        assert parallel == serial
+
+    def test_symlinked_directories_are_not_followed(self, tmp_path):
+        """シンボリックリンクのディレクトリは既定では辿らない"""
+        build_tree(tmp_path)
+        try:
+            os.symlink(tmp_path / "pkg", tmp_path / "link", target_is_directory=True)
+        except (OSError, NotImplementedError):
+            pytest.skip("シンボリックリンクを作成できない環境")
+
+        scanner = DirectoryScanner(exclude_dirs={'node_modules', '.git'}, include_hidden=False)
+        paths = relative_paths(tmp_path, scanner.scan(tmp_path, include_dirs=True))
+        assert "link" in paths
+        assert not any(path.startswith("link/") for path in paths)
+
+        following = DirectoryScanner(exclude_dirs={'node_modules', '.git'}, follow_symlinks=True)
+        assert "link/util.py" in relative_paths(tmp_path, following.scan(tmp_path))
+
+    def test_missing_directory_yields_nothing(self, tmp_path):
+        """存在しないディレクトリは空の結果"""
+        assert list(DirectoryScanner().scan(tmp_path / "missing")) == []
+
+    def test_total_size(self, tmp_path):
+        """ファイルサイズの合計"""
+        files = build_tree(tmp_path)
+        expected = sum(len(content.encode('utf-8')) for content in files.values())
+        assert DirectoryScanner().total_size(tmp_path) == expected
+
+
+class TestFileUtilsScanning:
+    """FileUtilsの走査系メソッドのテストクラス"""
+
+    def setup_method(self):
+        """各テスト前の初期化"""
+        self.file_utils = FileUtils()
+
+    def test_list_files(self, tmp_path):
+        """list_filesは名前順のパスを返す"""
+        build_tree(tmp_path)
+        top = self.file_utils.list_files(str(tmp_path))
+        assert [os.path.basename(path) for path in top] == [
+            ".git", ".hidden.txt", "README.md", "main.py", "node_modules", "pkg"
+        ]
+
+        python_files = self.file_utils.list_files(str(tmp_path), recursive=True, pattern="*.PY")
+        assert [os.path.relpath(path, tmp_path).replace(os.sep, '/') for path in python_files] == [
+            "main.py", "pkg/__init__.py", "pkg/sub/deep.py", "pkg/util.py"
+        ]
+
+    def test_find_files(self, tmp_path):
+        """拡張子・内容での検索"""
+        build_tree(tmp_path)
+        found = self.file_utils.find_files(str(tmp_path), extensions=['.PY'], content_pattern="return")
+        assert [os.path.relpath(path, tmp_path).replace(os.sep, '/') for path in found] == ["pkg/util.py"]
+
+        top_only = self.file_utils.find_files(str(tmp_path), extensions=['.py'], recursive=False)
+        assert [os.path.basename(path) for path in top_only] == ["main.py"]
+
+    def test_get_directory_size(self, tmp_path):
+        """ディレクトリサイズ"""
+        files = build_tree(tmp_path)
+        expected = sum(len(content.encode('utf-8')) for content in files.values())
+        assert self.file_utils.get_directory_size(str(tmp_path)) == expected
@@ -0,0 +1,171 @@
+# tests/test_utils/test_encryption_utils.py
+"""
+encryption_utilsのテストモジュール
+セグメント単位のストリーム暗号化と、暗号化バックアップの逐次復号による復元・検証を検証
+"""
+
+import io
+import os
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from src.utils.backup_utils import BackupConfig, BackupUtils, CompressionType
+from src.utils.encryption_utils import (
+    EncryptedStreamReader, EncryptedStreamWriter, EncryptionMethod, EncryptionUtils, STREAM_MAGIC
+)
+
+SEGMENT = 1024
+
+
+class TestEncryptedStream:
+    """EncryptedStreamWriter/EncryptedStreamReaderのテストクラス"""
+
+    def setup_method(self):
+        """各テスト前の初期化"""
+        self.key = os.urandom(32)
+
+    def encrypt(self, data: bytes, writes: int = 7) -> bytes:
+        """データをストリーム暗号化"""
+        raw = io.BytesIO()
+        raw.close = lambda: None
+        writer = EncryptedStreamWriter(raw, self.key, b"s" * 16, 1000, segment_size=SEGMENT)
+        step = max(1, len(data) // writes)
+        for offset in range(0, len(data), step):
+            writer.write(data[offset:offset + step])
+        writer.close()
+        return raw.getvalue()
+
+    def decrypt(self, encrypted: bytes) -> bytes:
+        """ストリーム暗号化を復号"""
+        with EncryptedStreamReader(io.BytesIO(encrypted), self.key) as reader:
+            return reader.read()
+
+    @pytest.mark.parametrize("size", [0, 1, SEGMENT - 1, SEGMENT, SEGMENT + 1, SEGMENT * 3, SEGMENT * 3 + 17])
+    def test_round_trip(self, size):
+        """セグメント境界の前後を含む各サイズで復号できる"""
+        data = os.urandom(size)
+        encrypted = self.encrypt(data)
+        assert encrypted.startswith(STREAM_MAGIC)
+        assert self.decrypt(encrypted) == data
+
+    def test_seek_and_partial_read(self):
+        """任意の位置から読める"""
+        data = os.urandom(SEGMENT * 4 + 100)
+        with EncryptedStreamReader(io.BytesIO(self.encrypt(data)), self.key) as reader:
+            assert reader.seek(0, io.SEEK_END) == len(data)
+            reader.seek(SEGMENT * 2 - 10)
+            assert reader.read(30) == data[SEGMENT * 2 - 10:SEGMENT * 2 + 20]
+            reader.seek(-5, io.SEEK_END)
+            assert reader.read() == data[-5:]
+
+    def test_tampering_is_detected(self):
+        """改ざん・並べ替え・切り詰めは認証エラー"""
+        data = os.urandom(SEGMENT * 3 + 5)
+        encrypted = bytearray(self.encrypt(data))
+        header = len(encrypted) - (SEGMENT + 16) * 3 - (5 + 16)
+
+        tampered = bytearray(encrypted)
+        tampered[header + 10] ^= 1
+        with pytest.raises(ValueError):
+            self.decrypt(bytes(tampered))
+
+        stride = SEGMENT + 16
+        swapped = (encrypted[:header] + encrypted[header + stride:header + 2 * stride]
+                   + encrypted[header:header + stride] + encrypted[header + 2 * stride:])
+        with pytest.raises(ValueError):
+            self.decrypt(bytes(swapped))
+
+        # セグメント境界での切り詰め（最終セグメントの欠落）
+        with pytest.raises(ValueError):
+            self.decrypt(bytes(encrypted[:header + 2 * stride]))
+
+    def test_wrong_key(self):
+        """異なる鍵では復号できない"""
+        encrypted = self.encrypt(b"secret")
+        with pytest.raises(ValueError):
+            with EncryptedStreamReader(io.BytesIO(encrypted), os.urandom(32)) as reader:
+                reader.read()
+
+
+class TestEncryptionUtilsStream:
+    """EncryptionUtilsのストリーム暗号化のテストクラス"""
+
+    def setup_method(self):
+        """各テスト前の初期化"""
+        self.encryption_utils = EncryptionUtils()
+
+    def test_encrypt_and_decrypt_file(self, tmp_path):
+        """ファイルのストリーム暗号化・復号化"""
+        source = tmp_path / "data.bin"
+        data = os.urandom(3 * 1024 * 1024 + 123)
+        source.write_bytes(data)
+
+        encrypted = self.encryption_utils.encrypt_file(source, "pass", method=EncryptionMethod.AES_256_GCM_STREAM)
+        assert self.encryption_utils.is_stream_encrypted(encrypted)
+        source.unlink()
+
+        decrypted = self.encryption_utils.decrypt_file(encrypted, "pass")
+        assert decrypted == source
+        assert decrypted.read_bytes() == data
+
+    def test_wrong_password_leaves_no_output(self, tmp_path):
+        """パスワードが誤っている場合は出力を残さない"""
+        source = tmp_path / "data.txt"
+        source.write_bytes(b"plain")
+        encrypted = self.encryption_utils.encrypt_file(source, "right", method=EncryptionMethod.AES_256_GCM_STREAM)
+
+        with pytest.raises(ValueError):
+            self.encryption_utils.decrypt_file(encrypted, "wrong", output_path=tmp_path / "out.txt")
+        assert not (tmp_path / "out.txt").exists()
+
+    def test_legacy_format_still_decrypts(self, tmp_path):
+        """旧形式（JSON）の暗号化ファイルも復号できる"""
+        source = tmp_path / "legacy.txt"
+        source.write_bytes(b"legacy content")
+        encrypted = self.encryption_utils.encrypt_file(source, "pass")
+        assert not self.encryption_utils.is_stream_encrypted(encrypted)
+        source.unlink()
+        assert self.encryption_utils.decrypt_file(encrypted, "pass").read_bytes() == b"legacy content"
+
+
+class TestEncryptedBackup:
+    """BackupUtilsの暗号化バックアップのテストクラス"""
+
+    def setup_method(self):
+        """各テスト前の初期化"""
+        self.backup_utils = BackupUtils()
+
+    @pytest.mark.parametrize("compression_type", [CompressionType.ZIP, CompressionType.TAR_GZ])
+    def test_encrypted_round_trip(self, tmp_path, compression_type):
+        """暗号化バックアップを平文の一時ファイルなしで検証・復元できる"""
+        source = tmp_path / "project"
+        source.mkdir()
+        (source / "main.py").write_text("print('secret')\n" * 1000, encoding='utf-8')
+        (source / "data.bin").write_bytes(os.urandom(200000))
+        backup_dir = tmp_path / "backups"
+        config = BackupConfig(source_paths=[str(source)], backup_directory=str(backup_dir),
+                              compression_type=compression_type, encrypt_backup=True,
+                              encryption_password="pass", compression_workers=2)
+
+        info = self.backup_utils.create_backup(config)
+        assert info.encrypted
+        assert info.backup_path.endswith(".encrypted")
+        assert info.compressed_size == Path(info.backup_path).stat().st_size
+        assert b"print('secret')" not in Path(info.backup_path).read_bytes()
+        if compression_type == CompressionType.ZIP:
+            assert not zipfile.is_zipfile(info.backup_path)
+
+        assert self.backup_utils.verify_backup(info, password="pass")
+        assert not self.backup_utils.verify_backup(info, password="wrong")
+        assert not self.backup_utils.verify_backup(info)
+
+        assert self.backup_utils.restore_backup(info, str(tmp_path / "restored"), password="pass")
+        assert (tmp_path / "restored" / "main.py").read_text(encoding='utf-8') == "print('secret')\n" * 1000
+        assert (tmp_path / "restored" / "data.bin").read_bytes() == (source / "data.bin").read_bytes()
+        assert not self.backup_utils.restore_backup(info, str(tmp_path / "other"), password="wrong")
+
+        # 平文のアーカイブがバックアップディレクトリに作られていない
+        names = {path.name for path in backup_dir.iterdir()}
+        assert names == {Path(info.backup_path).name, "backup_history.json"}
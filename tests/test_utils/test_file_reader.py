@@ -0,0 +1,169 @@
+# tests/test_utils/test_file_reader.py
+"""
+file_readerのテストモジュール
+先頭のみでのエンコーディング検出・ストリーミング読み込み・mmapビューを検証
+"""
+
+import codecs
+import hashlib
+
+import pytest
+
+from src.utils import file_reader
+from src.utils.file_reader import MappedFile
+from src.utils.file_utils import FileUtils
+
+
+class TestEncodingDetection:
+    """エンコーディング検出のテストクラス"""
+
+    def test_bom(self):
+        """BOMによる判定"""
+        assert file_reader.detect_encoding_from_bytes(codecs.BOM_UTF8 + b"abc") == 'utf-8-sig'
+        assert file_reader.detect_encoding_from_bytes(codecs.BOM_UTF32_LE + b"a\x00\x00\x00") == 'utf-32'
+        assert file_reader.detect_encoding_from_bytes(codecs.BOM_UTF16_LE + b"a\x00") == 'utf-16'
+
+    def test_utf8_with_truncated_character(self):
+        """先頭の切れ目でマルチバイト文字が途切れてもUTF-8と判定する"""
+        sample = "日本語".encode('utf-8')[:-1]
+        assert file_reader.detect_encoding_from_bytes(sample) == 'utf-8'
+
+    def test_ascii_prefix_reads_later_utf8(self, tmp_path):
+        """先頭がASCIIのみでも後半のUTF-8を正しく読む"""
+        path = tmp_path / "log.txt"
+        path.write_text("a" * (file_reader.ENCODING_SAMPLE_SIZE * 2) + "\n日本語\n", encoding='utf-8')
+
+        assert file_reader.detect_file_encoding(path) == 'utf-8'
+        content, encoding = file_reader.read_text(path)
+        assert encoding == 'utf-8'
+        assert content.endswith("日本語\n")
+
+    def test_only_prefix_is_read(self, tmp_path, monkeypatch):
+        """検出ではファイル先頭の一定範囲しか読まない"""
+        path = tmp_path / "big.txt"
+        path.write_bytes(b"x" * 100000)
+        sizes = []
+        original = file_reader.read_prefix
+        monkeypatch.setattr(file_reader, 'read_prefix',
+                            lambda file_path, size=file_reader.ENCODING_SAMPLE_SIZE: sizes.append(size)
+                            or original(file_path, size))
+
+        file_reader.detect_file_encoding(path)
+        assert sizes == [file_reader.ENCODING_SAMPLE_SIZE]
+
+
+class TestStreaming:
+    """ストリーミング読み込みのテストクラス"""
+
+    def test_iter_lines(self, tmp_path):
+        """改行を除いた行を返す"""
+        path = tmp_path / "a.txt"
+        path.write_bytes("first\r\nsecond\nサード".encode('utf-8'))
+
+        assert list(file_reader.iter_lines(path)) == ["first", "second", "サード"]
+        assert list(file_reader.iter_lines(path, keepends=True)) == ["first\n", "second\n", "サード"]
+
+    def test_iter_lines_with_explicit_encoding(self, tmp_path):
+        """指定したエンコーディングで読む"""
+        path = tmp_path / "sjis.txt"
+        path.write_bytes("こんにちは\n".encode('cp932'))
+        assert list(file_reader.iter_lines(path, encoding='cp932')) == ["こんにちは"]
+
+    def test_iter_line_chunks(self, tmp_path):
+        """行をまとめたチャンクと行番号"""
+        path = tmp_path / "a.log"
+        path.write_text("aaaa\nbbbb\ncccc\n" + "x" * 23 + "\ndd\n", encoding='utf-8')
+
+        chunks = list(file_reader.iter_line_chunks(path, max_chars=10))
+        assert chunks == [
+            (1, 2, "aaaa\nbbbb\n"),
+            (3, 3, "cccc\n"),
+            (4, 4, "x" * 10),
+            (4, 4, "x" * 10),
+            (4, 5, "xxx\ndd\n"),
+        ]
+        assert "".join(chunk for _, _, chunk in chunks) == path.read_text(encoding='utf-8')
+
+    def test_read_range(self, tmp_path):
+        """指定範囲のバイト列"""
+        path = tmp_path / "a.bin"
+        path.write_bytes(bytes(range(256)))
+        assert file_reader.read_range(path, 10, 5) == bytes(range(10, 15))
+        assert file_reader.read_range(path, 250, 100) == bytes(range(250, 256))
+
+
+class TestMappedFile:
+    """MappedFileのテストクラス"""
+
+    def test_view_and_range(self, tmp_path):
+        """memoryviewと範囲読み込み・検索"""
+        path = tmp_path / "data.bin"
+        data = b"header" + b"\x00" * 1000 + b"needle" + b"tail"
+        path.write_bytes(data)
+
+        with MappedFile(path) as mapped:
+            assert mapped.size == len(data)
+            assert bytes(mapped.view[:6]) == b"header"
+            assert mapped.read_range(1006, 6) == b"needle"
+            assert mapped.find(b"needle") == 1006
+            assert mapped.find(b"missing") == -1
+
+    def test_empty_file(self, tmp_path):
+        """空ファイルも扱える"""
+        path = tmp_path / "empty"
+        path.write_bytes(b"")
+        with MappedFile(path) as mapped:
+            assert mapped.size == 0
+            assert list(mapped.iter_blocks()) == []
+            assert mapped.find(b"a") == -1
+
+    def test_hash_file_matches_hashlib(self, tmp_path):
+        """ブロック単位の入力でも全体のハッシュと一致する"""
+        path = tmp_path / "big.bin"
+        data = bytes(range(256)) * 40000
+        path.write_bytes(data)
+
+        assert file_reader.hash_file(path, hashlib.sha256()).hexdigest() == hashlib.sha256(data).hexdigest()
+        with MappedFile(path) as mapped:
+            blocks = [len(block) for block in mapped.iter_blocks(block_size=4096 * 1000)]
+        assert sum(blocks) == len(data) and len(blocks) == 3
+
+    def test_close_with_exported_slice(self, tmp_path):
+        """スライスを保持したままでも閉じられる"""
+        path = tmp_path / "a.bin"
+        path.write_bytes(b"abcdef")
+        mapped = MappedFile(path)
+        kept = mapped.view[:3]
+        mapped.close()
+        assert bytes(kept) == b"abc"
+
+
+class TestFileUtilsReading:
+    """FileUtilsの読み込み系メソッドのテストクラス"""
+
+    def setup_method(self):
+        """各テスト前の初期化"""
+        self.file_utils = FileUtils()
+
+    def test_read_file_and_lines(self, tmp_path):
+        """読み込み・行単位読み込み・範囲読み込み"""
+        path = tmp_path / "a.py"
+        path.write_text("print('a')\n# コメント\n", encoding='utf-8')
+
+        assert self.file_utils.read_file(str(path)) == "print('a')\n# コメント\n"
+        assert list(self.file_utils.iter_lines(str(path))) == ["print('a')", "# コメント"]
+        assert self.file_utils.read_range(str(path), 0, 5) == b"print"
+
+    def test_calculate_file_hashes_single_pass(self, tmp_path):
+        """複数のハッシュを1回の走査で計算する"""
+        path = tmp_path / "a.txt"
+        path.write_bytes(b"content" * 1000)
+
+        hashes = self.file_utils.calculate_file_hashes(str(path), ('md5', 'sha256'))
+        assert hashes == {
+            'md5': hashlib.md5(b"content" * 1000).hexdigest(),
+            'sha256': hashlib.sha256(b"content" * 1000).hexdigest(),
+        }
+        assert self.file_utils.calculate_file_hash(str(path), 'sha1') == hashlib.sha1(b"content" * 1000).hexdigest()
+        with pytest.raises(ValueError):
+            self.file_utils.calculate_file_hash(str(path), 'crc32')
@@ -0,0 +1,286 @@
+# tests/test_utils/test_file_transfer.py
+"""
+file_transferのテストモジュール
+カーネル内コピーとフォールバック、非同期のコピー・移動・キャンセル、FileServiceのエクスポートを検証
+"""
+
+import asyncio
+import errno
+import os
+import shutil
+import threading
+import zipfile
+
+import pytest
+
+from src.utils import file_transfer
+from src.utils.file_transfer import FileTransferEngine, TransferCancelled, copy_file_sync
+
+
+class TestCopyFileSync:
+    """copy_file_syncのテストクラス"""
+
+    def setup_method(self):
+        """各テスト前の初期化"""
+        self.data = os.urandom(3 * 1024 * 1024 + 11)
+
+    def test_copy_preserves_content_and_metadata(self, tmp_path):
+        """内容・パーミッション・更新時刻を保持し、進捗の合計はファイルサイズ"""
+        source = tmp_path / "source.bin"
+        source.write_bytes(self.data)
+        os.chmod(source, 0o640)
+        os.utime(source, (1_000_000_000, 1_000_000_000))
+
+        chunks = []
+        assert copy_file_sync(source, tmp_path / "copy.bin", chunks.append) == len(self.data)
+        target = tmp_path / "copy.bin"
+        assert target.read_bytes() == self.data
+        assert sum(chunks) == len(self.data)
+        assert target.stat().st_mode & 0o777 == 0o640
+        assert target.stat().st_mtime == 1_000_000_000
+
+    def test_fallback_when_kernel_copy_is_unsupported(self, tmp_path, monkeypatch):
+        """copy_file_range・sendfileが使えない場合はバッファ読み書きでコピー"""
+        def unsupported(*args):
+            raise OSError(errno.ENOSYS, "not supported")
+
+        monkeypatch.setattr(file_transfer.os, 'copy_file_range', unsupported, raising=False)
+        monkeypatch.setattr(file_transfer.os, 'sendfile', unsupported, raising=False)
+        source = tmp_path / "source.bin"
+        source.write_bytes(self.data)
+        assert copy_file_sync(source, tmp_path / "copy.bin") == len(self.data)
+        assert (tmp_path / "copy.bin").read_bytes() == self.data
+
+    def test_cancel_removes_partial_copy(self, tmp_path, monkeypatch):
+        """キャンセルされるとコピー先を削除する"""
+        monkeypatch.setattr(file_transfer, 'TRANSFER_CHUNK_SIZE', 1024 * 1024)
+        source = tmp_path / "source.bin"
+        source.write_bytes(self.data)
+        cancel_event = threading.Event()
+        with pytest.raises(TransferCancelled):
+            copy_file_sync(source, tmp_path / "copy.bin", lambda count: cancel_event.set(), cancel_event)
+        assert not (tmp_path / "copy.bin").exists()
+
+
+class TestFileTransferEngine:
+    """FileTransferEngineのテストクラス"""
+
+    def setup_method(self):
+        """各テスト前の初期化"""
+        self.files = {
+            "a.txt": b"alpha\n",
+            "sub/b.bin": os.urandom(200_000),
+            "sub/deep/c.txt": b"",
+        }
+
+    def make_tree(self, root):
+        """テスト用のディレクトリを作成"""
+        for name, content in self.files.items():
+            path = root / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content)
+        (root / "empty").mkdir()
+        return root
+
+    def test_copy_tree_reports_progress_on_loop_thread(self, tmp_path):
+        """ディレクトリを並行してコピーし、進捗はイベントループのスレッドで通知する"""
+        source = self.make_tree(tmp_path / "source")
+        target = tmp_path / "target"
+        reports = []
+
+        def on_progress(progress):
+            reports.append((threading.current_thread(), progress.done_bytes, progress.done_files))
+
+        async def scenario():
+            engine = FileTransferEngine(max_workers=2)
+            try:
+                return await engine.copy_tree(source, target, on_progress)
+            finally:
+                engine.shutdown()
+
+        total = sum(len(content) for content in self.files.values())
+        assert asyncio.run(scenario()) == total
+        for name, content in self.files.items():
+            assert (target / name).read_bytes() == content
+        assert (target / "empty").is_dir()
+        assert all(thread is threading.main_thread() for thread, _, _ in reports)
+        assert reports[-1][1:] == (total, len(self.files))
+
+    def test_copy_file_onto_itself_is_rejected(self, tmp_path):
+        """同じファイルへのコピーはエラーにし、内容を消さない"""
+        source = tmp_path / "a.txt"
+        source.write_bytes(b"alpha\n")
+        os.symlink(source, tmp_path / "alias.txt")
+
+        async def scenario(target):
+            engine = FileTransferEngine()
+            try:
+                await engine.copy_file(source, target)
+            finally:
+                engine.shutdown()
+
+        for target in (source, tmp_path / "alias.txt", tmp_path):
+            with pytest.raises(shutil.SameFileError):
+                asyncio.run(scenario(target))
+        assert source.read_bytes() == b"alpha\n"
+
+    def test_copy_file_into_directory(self, tmp_path):
+        """既存のディレクトリへのコピーはその中に同じ名前で作成する"""
+        source = tmp_path / "a.txt"
+        source.write_bytes(b"alpha\n")
+        directory = tmp_path / "out"
+        directory.mkdir()
+
+        async def scenario():
+            engine = FileTransferEngine()
+            try:
+                return await engine.copy_file(source, directory)
+            finally:
+                engine.shutdown()
+
+        assert asyncio.run(scenario()) == 6
+        assert (directory / "a.txt").read_bytes() == b"alpha\n"
+
+    def test_event_loop_keeps_running_during_copy(self, tmp_path):
+        """コピー中も他のタスクが動く"""
+        source = tmp_path / "large.bin"
+        source.write_bytes(os.urandom(8 * 1024 * 1024))
+        ticks = []
+
+        async def ticker(stop):
+            while not stop.is_set():
+                ticks.append(1)
+                await asyncio.sleep(0)
+
+        async def scenario():
+            engine = FileTransferEngine(max_workers=1)
+            stop = asyncio.Event()
+            task = asyncio.ensure_future(ticker(stop))
+            try:
+                await engine.copy_file(source, tmp_path / "out" / "large.bin")
+            finally:
+                stop.set()
+                await task
+                engine.shutdown()
+
+        asyncio.run(scenario())
+        assert (tmp_path / "out" / "large.bin").read_bytes() == source.read_bytes()
+        assert len(ticks) > 1
+
+    def test_move_file_and_directory(self, tmp_path):
+        """ファイルの移動と、既存ディレクトリへの移動"""
+        source = self.make_tree(tmp_path / "source")
+        destination = tmp_path / "destination"
+        destination.mkdir()
+
+        async def scenario():
+            engine = FileTransferEngine()
+            try:
+                await engine.move(source / "a.txt", tmp_path / "moved" / "a.txt")
+                await engine.move(source, destination)
+            finally:
+                engine.shutdown()
+
+        asyncio.run(scenario())
+        assert (tmp_path / "moved" / "a.txt").read_bytes() == b"alpha\n"
+        assert (destination / "source" / "sub" / "b.bin").read_bytes() == self.files["sub/b.bin"]
+        assert not source.exists()
+
+    def test_move_across_filesystems_copies(self, tmp_path, monkeypatch):
+        """renameできない場合はコピーして削除"""
+        source = self.make_tree(tmp_path / "source")
+
+        def cross_device(src, dst):
+            raise OSError(errno.EXDEV, "cross-device")
+
+        monkeypatch.setattr(file_transfer.os, 'rename', cross_device)
+
+        async def scenario():
+            engine = FileTransferEngine()
+            try:
+                await engine.move(source, tmp_path / "moved")
+            finally:
+                engine.shutdown()
+
+        asyncio.run(scenario())
+        assert not source.exists()
+        for name, content in self.files.items():
+            assert (tmp_path / "moved" / name).read_bytes() == content
+
+    def test_move_across_filesystems_keeps_symlinks(self, tmp_path, monkeypatch):
+        """コピーして削除する場合もシンボリックリンクをリンクとして移動し、リンク先を失わない"""
+        source = self.make_tree(tmp_path / "source")
+        outside = tmp_path / "outside"
+        outside.mkdir()
+        (outside / "data.txt").write_bytes(b"outside\n")
+        os.symlink("a.txt", source / "link.txt")
+        os.symlink(str(outside), source / "sub" / "linked_dir", target_is_directory=True)
+        os.symlink(str(outside / "data.txt"), tmp_path / "single_link")
+
+        def cross_device(src, dst):
+            raise OSError(errno.EXDEV, "cross-device")
+
+        monkeypatch.setattr(file_transfer.os, 'rename', cross_device)
+
+        async def scenario():
+            engine = FileTransferEngine()
+            try:
+                await engine.move(source, tmp_path / "moved")
+                await engine.move(tmp_path / "single_link", tmp_path / "moved_link")
+            finally:
+                engine.shutdown()
+
+        asyncio.run(scenario())
+        moved = tmp_path / "moved"
+        assert not source.exists()
+        assert os.readlink(moved / "link.txt") == "a.txt"
+        assert (moved / "link.txt").read_bytes() == b"alpha\n"
+        assert os.readlink(moved / "sub" / "linked_dir") == str(outside)
+        assert os.readlink(tmp_path / "moved_link") == str(outside / "data.txt")
+        assert not os.path.lexists(tmp_path / "single_link")
+        assert (outside / "data.txt").read_bytes() == b"outside\n"
+
+
+class TestFileServiceTransfer:
+    """FileServiceのコピー・エクスポートのテストクラス"""
+
+    def _run(self, tmp_path, scenario):
+        """FileServiceを作成してシナリオを実行"""
+        from src.services.file_service import FileService
+
+        async def main():
+            config = {'file_management': {
+                'backup': {'enabled': False, 'path': str(tmp_path / "backups")},
+                'auto_save': {'enabled': False},
+                'temp_files': {'path': str(tmp_path / "temp")},
+                'transfer': {'max_workers': 2},
+            }}
+            service = FileService(config)
+            try:
+                return await scenario(service)
+            finally:
+                await service.close()
+
+        return asyncio.run(main())
+
+    def test_export_keeps_paths_relative_to_base(self, tmp_path):
+        """base_pathからの相対パスでアーカイブし、進捗を通知する"""
+        project = tmp_path / "project"
+        (project / "src").mkdir(parents=True)
+        (project / "src" / "main.py").write_text("print(1)\n")
+        (project / "README.md").write_text("# project\n")
+        reports = []
+
+        async def scenario(service):
+            await service.copy_file(project, tmp_path / "copy")
+            return await service.export_files(
+                [project / "src" / "main.py", project / "README.md"], tmp_path / "exports",
+                base_path=tmp_path, progress_callback=lambda p: reports.append(p.done_files)
+            )
+
+        archive = self._run(tmp_path, scenario)
+        with zipfile.ZipFile(archive) as zipf:
+            assert sorted(zipf.namelist()) == ["project/README.md", "project/src/main.py"]
+            assert zipf.read("project/src/main.py") == b"print(1)\n"
+        assert (tmp_path / "copy" / "src" / "main.py").read_text() == "print(1)\n"
+        assert reports[-1] == 2
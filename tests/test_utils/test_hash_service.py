@@ -0,0 +1,208 @@
+# tests/test_utils/test_hash_service.py
+"""
+hash_serviceのテストモジュール
+ハッシュ値の正しさ、並列計算、永続キャッシュの再利用と無効化、利用側のキャッシュの使い分けを検証
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+
+import pytest
+
+from src.utils import hash_service
+from src.utils.hash_service import HashService, new_hasher
+
+
+def set_old_mtime(path, seconds_ago: float = 60):
+    """更新時刻を過去にする（更新直後のファイルはキャッシュされないため）"""
+    mtime = time.time() - seconds_ago
+    os.utime(path, (mtime, mtime))
+
+
+class TestHashService:
+    """HashServiceのテストクラス"""
+
+    def setup_method(self):
+        """各テスト前の初期化"""
+        self.data = {
+            "small.txt": b"hello world\n" * 10,
+            "empty.bin": b"",
+            "large.bin": os.urandom(3 * 1024 * 1024 + 7),
+        }
+
+    def write_files(self, root):
+        """テスト用ファイルを作成"""
+        paths = {}
+        for name, content in self.data.items():
+            path = root / name
+            path.write_bytes(content)
+            set_old_mtime(path)
+            paths[name] = path
+        return paths
+
+    def test_digests_match_hashlib(self, tmp_path):
+        """小さいファイル・空ファイル・mmapで読む大きいファイルのハッシュが一致する"""
+        service = HashService(workers=2)
+        for name, path in self.write_files(tmp_path).items():
+            assert service.hash_file(path, 'sha256') == hashlib.sha256(self.data[name]).hexdigest()
+            assert service.hash_file_multi(path, ('md5', 'SHA1')) == {
+                'md5': hashlib.md5(self.data[name]).hexdigest(),
+                'SHA1': hashlib.sha1(self.data[name]).hexdigest(),
+            }
+        service.close()
+
+    def test_hash_files_in_parallel(self, tmp_path):
+        """複数ファイルを並列に計算し、読めないファイルはNone"""
+        paths = self.write_files(tmp_path)
+        service = HashService(workers=3)
+        results = service.hash_files([*paths.values(), tmp_path / "missing"], 'md5')
+        for name, path in paths.items():
+            assert results[str(path)] == hashlib.md5(self.data[name]).hexdigest()
+        assert results[str(tmp_path / "missing")] is None
+        with pytest.raises(ValueError):
+            service.hash_files(paths.values(), 'crc32')
+        service.close()
+
+    def test_persistent_cache(self, tmp_path):
+        """変更のないファイルは再オープン後もキャッシュから返し、変更されたら再計算する"""
+        path = self.write_files(tmp_path)["large.bin"]
+        cache = tmp_path / "cache" / "hashes.db"
+
+        service = HashService(cache)
+        expected = service.hash_file(path, 'sha256')
+        service.close()
+
+        service = HashService(cache)
+        assert service.hash_file(path, 'sha256') == expected
+        assert service.statistics == {'hits': 1, 'misses': 0}
+
+        path.write_bytes(b"changed")
+        set_old_mtime(path, 30)
+        assert service.hash_file(path, 'sha256') == hashlib.sha256(b"changed").hexdigest()
+        assert service.statistics['misses'] == 1
+        service.close()
+
+    def test_recently_modified_files_are_not_cached(self, tmp_path):
+        """更新直後のファイルは同じ更新時刻で再変更され得るためキャッシュしない"""
+        path = tmp_path / "fresh.txt"
+        path.write_bytes(b"fresh")
+        service = HashService()
+        service.hash_file(path, 'md5')
+        service.hash_file(path, 'md5')
+        assert service.statistics['hits'] == 0
+
+        set_old_mtime(path)
+        service.hash_file(path, 'md5')
+        service.hash_file(path, 'md5')
+        assert service.statistics['hits'] == 1
+        service.close()
+
+    def test_invalidate_and_prune(self, tmp_path):
+        """キャッシュの削除と、存在しないファイルの整理"""
+        paths = self.write_files(tmp_path)
+        service = HashService()
+        service.hash_files(paths.values(), 'md5')
+        service.invalidate(paths["small.txt"])
+        service.hash_file(paths["small.txt"], 'md5')
+        assert service.statistics['hits'] == 0
+
+        paths["empty.bin"].unlink()
+        assert service.prune() == 1
+        service.close()
+
+    def test_new_hasher(self):
+        """独自のアルゴリズム名"""
+        hasher = new_hasher('blake2b_128')
+        hasher.update(b"data")
+        assert hasher.hexdigest() == hashlib.blake2b(b"data", digest_size=16).hexdigest()
+        if not hash_service.XXHASH_AVAILABLE:
+            with pytest.raises(ValueError):
+                new_hasher('xxh3_128')
+        with pytest.raises(ValueError):
+            new_hasher('unknown')
+
+
+class TestHashServiceCallers:
+    """ハッシュ計算サービスの利用側のテストクラス"""
+
+    @pytest.fixture(autouse=True)
+    def service(self, monkeypatch):
+        """グローバルのハッシュ計算サービスをメモリ上のキャッシュに差し替える"""
+        service = HashService()
+        monkeypatch.setattr(hash_service, "_hash_service", service)
+        yield service
+        service.close()
+
+    def test_verification_bypasses_cache(self, tmp_path):
+        """サイズ・更新時刻を保ったまま改変されても、キャッシュを使わない計算は検出する"""
+        from src.utils.file_utils import FileUtils
+
+        path = tmp_path / "backup.zip"
+        path.write_bytes(b"original")
+        set_old_mtime(path)
+        file_utils = FileUtils()
+        original = file_utils.calculate_file_hash(str(path))
+
+        stat = path.stat()
+        path.write_bytes(b"tampered")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert file_utils.calculate_file_hash(str(path)) == original
+        assert file_utils.calculate_file_hash(str(path), use_cache=False) == hashlib.md5(b"tampered").hexdigest()
+
+    def test_listing_hashes_in_bulk(self, tmp_path, service, monkeypatch):
+        """ディレクトリ一覧のハッシュはhash_filesでまとめて計算する"""
+        from src.services.file_service import FileService
+
+        root = tmp_path / "project"
+        root.mkdir()
+        for index in range(3):
+            (root / f"file_{index}.txt").write_bytes(f"content {index}".encode())
+        calls = []
+        hash_files = service.hash_files
+        monkeypatch.setattr(service, "hash_files", lambda paths, *args: calls.append(paths) or hash_files(paths, *args))
+
+        async def main():
+            file_service = FileService({'file_management': {
+                'backup': {'enabled': False, 'path': str(tmp_path / "backups")},
+                'auto_save': {'enabled': False},
+                'temp_files': {'path': str(tmp_path / "temp")},
+            }})
+            try:
+                return file_service.list_directory(root, fields=('hash',))
+            finally:
+                await file_service.close()
+
+        files = asyncio.run(main())
+        assert len(calls) == 1
+        assert {info.name: info.hash_md5 for info in files} == {
+            f"file_{index}.txt": hashlib.md5(f"content {index}".encode()).hexdigest() for index in range(3)
+        }
+
+    def test_encryption_hash_bypasses_cache_by_default(self, tmp_path):
+        """EncryptionUtilsのハッシュは既定でキャッシュを使わず改変を検出する"""
+        from src.utils.encryption_utils import EncryptionUtils
+
+        path = tmp_path / "signed.bin"
+        path.write_bytes(b"original")
+        set_old_mtime(path)
+        encryption_utils = EncryptionUtils()
+        encryption_utils.calculate_file_hash(path, use_cache=True)
+
+        stat = path.stat()
+        path.write_bytes(b"tampered")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert encryption_utils.calculate_file_hash(path) == hashlib.sha256(b"tampered").hexdigest()
+        assert encryption_utils.calculate_file_hash(path, use_cache=True) == hashlib.sha256(b"original").hexdigest()
+
+    def test_global_cache_in_configured_data_dir(self, tmp_path, monkeypatch):
+        """グローバルのキャッシュは設定のデータディレクトリに置く"""
+        monkeypatch.setattr(hash_service, "_hash_service", None)
+        monkeypatch.setattr(hash_service, "get_config", lambda *args: str(tmp_path / "data"))
+
+        service = hash_service.get_hash_service()
+        try:
+            assert service.cache_path == tmp_path / "data" / "hash_cache.db"
+        finally:
+            service.close()
@@ -0,0 +1,178 @@
+# tests/test_utils/test_parallel_compress.py
+"""
+parallel_compressのテストモジュール
+並列圧縮したZIP・gzip・bz2が標準ライブラリで読めること、書き込み時のハッシュを検証
+"""
+
+import bz2
+import gzip
+import hashlib
+import random
+import zipfile
+import zlib
+from pathlib import Path
+
+import pytest
+
+from src.utils.backup_utils import BackupConfig, BackupUtils, CompressionType
+from src.utils.parallel_compress import ParallelStreamWriter, ParallelZipWriter, deflate_block, verify_zip_parallel
+
+
+def sample_data(size: int, seed: int = 0) -> bytes:
+    """圧縮が効く程度に繰り返しを含むデータ"""
+    rng = random.Random(seed)
+    words = [bytes(rng.choices(range(97, 123), k=rng.randrange(3, 10))) for _ in range(200)]
+    out = bytearray()
+    while len(out) < size:
+        out += rng.choice(words) + b" "
+    return bytes(out[:size])
+
+
+def zlib_decompress_raw(data: bytes) -> bytes:
+    """raw deflateを展開"""
+    return zlib.decompress(data, -zlib.MAX_WBITS)
+
+
+class TestDeflateBlock:
+    """deflate_blockのテストクラス"""
+
+    def test_concatenated_blocks_form_one_stream(self):
+        """ブロック毎の出力を連結すると1つのdeflateストリームになる"""
+        data = sample_data(300000)
+        blocks = [data[i:i + 65536] for i in range(0, len(data), 65536)]
+        compressed = b"".join(
+            deflate_block(block, 6, blocks[index - 1][-32768:] if index else b'', index == len(blocks) - 1)
+            for index, block in enumerate(blocks)
+        )
+        assert zlib_decompress_raw(compressed) == data
+
+    def test_empty_input(self):
+        """空データも有効なストリームになる"""
+        assert zlib_decompress_raw(deflate_block(b'', 6)) == b''
+
+
+class TestParallelZipWriter:
+    """ParallelZipWriterのテストクラス"""
+
+    def test_round_trip(self, tmp_path):
+        """複数ブロックのファイル・空ファイルを含むZIPをzipfileで読める"""
+        files = {
+            "big.txt": sample_data(200000, 1),
+            "dir/small.txt": b"hello",
+            "dir/empty": b"",
+        }
+        for name, content in files.items():
+            (tmp_path / "src" / name).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / "src" / name).write_bytes(content)
+
+        archive = tmp_path / "out.zip"
+        with ParallelZipWriter(archive, level=6, workers=3, block_size=32768) as writer:
+            for name in files:
+                assert writer.add_file(tmp_path / "src" / name, name) == len(files[name])
+        size, checksum = writer.close()
+
+        assert size == archive.stat().st_size
+        assert checksum == hashlib.md5(archive.read_bytes()).hexdigest()
+        with zipfile.ZipFile(archive) as zipf:
+            assert zipf.testzip() is None
+            assert sorted(zipf.namelist()) == sorted(files)
+            for name, content in files.items():
+                assert zipf.read(name) == content
+        assert verify_zip_parallel(archive, workers=2) is None
+
+    def test_add_bytes(self, tmp_path):
+        """メモリ上のデータをファイルと同じように追加できる"""
+        content = sample_data(100000, 3)
+        archive = tmp_path / "out.zip"
+        with ParallelZipWriter(archive, workers=2, block_size=32768, hash_algorithm=None) as writer:
+            assert writer.add_bytes(content, "data/info.json") == len(content)
+            writer.add_bytes(b"", "empty.json")
+
+        with zipfile.ZipFile(archive) as zipf:
+            assert zipf.testzip() is None
+            assert zipf.read("data/info.json") == content
+            assert zipf.read("empty.json") == b""
+
+    def test_detects_corruption(self, tmp_path):
+        """破損したエントリを検出する"""
+        (tmp_path / "a.txt").write_bytes(sample_data(50000, 2))
+        archive = tmp_path / "out.zip"
+        with ParallelZipWriter(archive, workers=2) as writer:
+            writer.add_file(tmp_path / "a.txt", "a.txt")
+
+        data = bytearray(archive.read_bytes())
+        data[100] ^= 0xFF
+        archive.write_bytes(bytes(data))
+        assert verify_zip_parallel(archive) == "a.txt"
+
+
+class TestParallelStreamWriter:
+    """ParallelStreamWriterのテストクラス"""
+
+    @pytest.mark.parametrize("codec, opener", [("gzip", gzip.decompress), ("bz2", bz2.decompress)])
+    def test_round_trip(self, tmp_path, codec, opener):
+        """複数ブロックの出力を標準ライブラリで展開できる"""
+        data = sample_data(250000, 3)
+        path = tmp_path / f"out.{codec}"
+        with ParallelStreamWriter(path, codec, level=5, workers=2, block_size=65536) as writer:
+            for offset in range(0, len(data), 10000):
+                writer.write(data[offset:offset + 10000])
+        size, checksum = writer.close()
+
+        assert opener(path.read_bytes()) == data
+        assert size == path.stat().st_size
+        assert checksum == hashlib.md5(path.read_bytes()).hexdigest()
+
+    def test_empty_stream(self, tmp_path):
+        """何も書かなくても有効なファイルになる"""
+        for codec, opener in (("gzip", gzip.decompress), ("bz2", bz2.decompress)):
+            path = tmp_path / f"empty.{codec}"
+            ParallelStreamWriter(path, codec).close()
+            assert opener(path.read_bytes()) == b''
+
+    def test_unknown_codec(self, tmp_path):
+        """未対応の形式はエラー"""
+        with pytest.raises(ValueError):
+            ParallelStreamWriter(tmp_path / "out.xz", "xz")
+
+
+class TestBackupCompression:
+    """BackupUtilsの並列圧縮バックアップのテストクラス"""
+
+    def setup_method(self):
+        """各テスト前の初期化"""
+        self.backup_utils = BackupUtils()
+
+    @pytest.mark.parametrize("compression_type", [CompressionType.ZIP, CompressionType.TAR_GZ, CompressionType.TAR_BZ2])
+    def test_backup_restore_and_verify(self, tmp_path, compression_type):
+        """作成・検証・復元と、書き込み時に計算したチェックサム"""
+        source = tmp_path / "project"
+        (source / "pkg").mkdir(parents=True)
+        (source / "pkg" / "module.py").write_bytes(sample_data(120000, 4))
+        (source / "README.md").write_text("# readme\n", encoding='utf-8')
+        config = BackupConfig(source_paths=[str(source)], backup_directory=str(tmp_path / "backups"),
+                              compression_type=compression_type, compression_level=3, compression_workers=2)
+
+        info = self.backup_utils.create_backup(config)
+        assert info.checksum == hashlib.md5(Path(info.backup_path).read_bytes()).hexdigest()
+        assert info.compressed_size == Path(info.backup_path).stat().st_size
+        assert self.backup_utils.verify_backup(info)
+
+        assert self.backup_utils.restore_backup(info, str(tmp_path / "restored"))
+        assert (tmp_path / "restored" / "pkg" / "module.py").read_bytes() == (source / "pkg" / "module.py").read_bytes()
+        assert (tmp_path / "restored" / "README.md").read_text(encoding='utf-8') == "# readme\n"
+
+    def test_relative_path_prefers_first_source(self, tmp_path):
+        """ソースパスの対応表は指定順を優先し、単一ファイルはファイル名になる"""
+        outer = tmp_path / "outer"
+        inner = outer / "inner"
+        inner.mkdir(parents=True)
+        (inner / "a.txt").write_text("a", encoding='utf-8')
+        single = tmp_path / "single.txt"
+        single.write_text("s", encoding='utf-8')
+
+        resolve = self.backup_utils._relative_path_resolver([str(outer), str(inner), str(single)])
+        assert resolve(inner / "a.txt") == Path("inner/a.txt")
+        assert resolve(single) == Path("single.txt")
+        resolve = self.backup_utils._relative_path_resolver([str(inner), str(outer)])
+        assert resolve(inner / "a.txt") == Path("a.txt")
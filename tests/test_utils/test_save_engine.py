@@ -0,0 +1,190 @@
+# tests/test_utils/test_save_engine.py
+"""
+save_engineのテストモジュール
+原子的な書き込み、連続した保存の集約、FileServiceの自動保存を検証
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from src.utils.save_engine import SaveEngine, write_atomic
+
+
+class TestWriteAtomic:
+    """write_atomicのテストクラス"""
+
+    def test_replace_keeps_mode_and_leaves_no_temp(self, tmp_path):
+        """置き換えてもパーミッションを保持し、一時ファイルを残さない"""
+        target = tmp_path / "run.sh"
+        target.write_bytes(b"old")
+        os.chmod(target, 0o750)
+        inode = target.stat().st_ino
+
+        write_atomic(target, b"new")
+        assert target.read_bytes() == b"new"
+        assert target.stat().st_mode & 0o777 == 0o750
+        assert target.stat().st_ino != inode
+        assert [p.name for p in tmp_path.iterdir()] == ["run.sh"]
+
+    def test_symlink_replaces_target(self, tmp_path):
+        """シンボリックリンク経由で書き込むとリンク先を置き換え、リンクを残す"""
+        real_dir = tmp_path / "real"
+        real_dir.mkdir()
+        target = real_dir / "config.json"
+        target.write_bytes(b"old")
+        link = tmp_path / "config.json"
+        link.symlink_to(target)
+
+        write_atomic(link, b"new")
+        assert link.is_symlink()
+        assert os.readlink(link) == str(target)
+        assert target.read_bytes() == b"new"
+        assert sorted(p.name for p in real_dir.iterdir()) == ["config.json"]
+
+    def test_failure_keeps_original(self, tmp_path):
+        """書き込みに失敗した場合は元のファイルが残る"""
+        target = tmp_path / "data.txt"
+        target.write_bytes(b"original")
+        with pytest.raises(TypeError):
+            write_atomic(target, "not bytes")
+        assert target.read_bytes() == b"original"
+        assert [p.name for p in tmp_path.iterdir()] == ["data.txt"]
+
+
+class TestSaveEngine:
+    """SaveEngineのテストクラス"""
+
+    def test_burst_is_coalesced(self, tmp_path):
+        """待ち時間内の連続した保存は最後の内容を1回だけ書き込む"""
+        target = tmp_path / "main.py"
+
+        async def scenario():
+            engine = SaveEngine(debounce=0.05, max_delay=5.0)
+            futures = []
+            for index in range(50):
+                futures.append(engine.schedule(target, f"version {index}".encode()))
+                await asyncio.sleep(0.001)
+            assert not target.exists()
+            await asyncio.gather(*futures)
+            return engine.statistics
+
+        statistics = asyncio.run(scenario())
+        assert target.read_bytes() == b"version 49"
+        assert statistics['requests'] == 50
+        assert statistics['writes'] == 1
+
+    def test_max_delay_bounds_continuous_saves(self, tmp_path):
+        """保存が続いてもmax_delay毎に書き込む"""
+        target = tmp_path / "main.py"
+
+        async def scenario():
+            engine = SaveEngine(debounce=0.05, max_delay=0.1)
+            for index in range(30):
+                engine.schedule(target, f"version {index}".encode())
+                await asyncio.sleep(0.01)
+            await engine.close()
+            return engine.statistics
+
+        statistics = asyncio.run(scenario())
+        assert target.read_bytes() == b"version 29"
+        assert 2 <= statistics['writes'] <= 6
+
+    def test_flush_batches_directory_sync(self, tmp_path):
+        """まとめて書き込む場合、ディレクトリのfsyncは1回"""
+        written = []
+
+        async def scenario():
+            engine = SaveEngine(debounce=10.0, on_written=written.extend)
+            for index in range(5):
+                engine.schedule(tmp_path / f"file{index}.txt", b"x")
+            await engine.flush()
+            return engine.statistics
+
+        statistics = asyncio.run(scenario())
+        assert statistics['writes'] == 5
+        assert statistics['directory_syncs'] == 1
+        assert sorted(p.name for p in written) == [f"file{index}.txt" for index in range(5)]
+
+    def test_write_supersedes_pending_and_reports_errors(self, tmp_path):
+        """すぐに書き込む場合は予約中の保存を置き換え、失敗はFutureに伝える"""
+        target = tmp_path / "main.py"
+
+        def fail(path):
+            raise OSError("backup failed")
+
+        async def scenario():
+            engine = SaveEngine(debounce=10.0)
+            pending = engine.schedule(target, b"typed")
+            await engine.write(target, b"saved")
+            assert pending.done() and target.read_bytes() == b"saved"
+            with pytest.raises(OSError):
+                await engine.write(target, b"broken", before_write=fail)
+
+        asyncio.run(scenario())
+        assert target.read_bytes() == b"saved"
+
+
+class TestFileServiceAutoSave:
+    """FileServiceの自動保存のテストクラス"""
+
+    def _run(self, tmp_path, scenario, auto_save=True):
+        """FileServiceを作成してシナリオを実行"""
+        from src.services.file_service import FileService
+
+        async def main():
+            config = {'file_management': {
+                'backup': {'enabled': False, 'path': str(tmp_path / "backups")},
+                'auto_save': {'enabled': auto_save, 'interval': 3600, 'debounce': 0.05},
+                'temp_files': {'path': str(tmp_path / "temp")},
+            }}
+            service = FileService(config)
+            try:
+                return await scenario(service)
+            finally:
+                await service.close()
+
+        return asyncio.run(main())
+
+    def test_typing_is_saved_once_per_window(self, tmp_path):
+        """入力のたびのバッファ更新は待ち時間毎に1回だけ書き込む"""
+        target = tmp_path / "main.py"
+        target.write_text("", encoding='utf-8')
+
+        async def scenario(service):
+            text = ""
+            for char in "print('hello')":
+                text += char
+                service.update_buffer(target, text)
+            assert service.is_dirty(target)
+            await asyncio.sleep(0.3)
+            return service.is_dirty(target), service.save_engine.statistics['writes'], service.list_backups(target)
+
+        dirty, writes, backups = self._run(tmp_path, scenario)
+        assert target.read_text(encoding='utf-8') == "print('hello')"
+        assert not dirty
+        assert writes == 1
+        assert len(backups) == 1
+
+    def test_save_buffer_and_close_flush(self, tmp_path):
+        """明示的な保存とサービス終了時に未保存のバッファを書き込む"""
+        first = tmp_path / "a.py"
+        second = tmp_path / "b.py"
+
+        async def scenario(service):
+            service.update_buffer(first, "a = 1\n")
+            service.update_buffer(second, "b = 2\n")
+            assert await service.save_buffer(first)
+            assert not await service.save_buffer(first)
+            assert first.read_text(encoding='utf-8') == "a = 1\n"
+            assert not second.exists()
+
+        self._run(tmp_path, scenario, auto_save=False)
+        assert not second.exists()
+
+        async def scenario_with_auto_save(service):
+            service.update_buffer(second, "b = 2\n")
+
+        self._run(tmp_path, scenario_with_auto_save)
+        assert second.read_text(encoding='utf-8') == "b = 2\n"
@@ -0,0 +1,192 @@
+# tests/test_utils/test_tree_sitter_parser.py
+"""
+TreeSitterParserのテストモジュール
+構文木によるチャンク抽出・差分再解析・正規表現解析へのフォールバックを検証
+"""
+
+import pytest
+
+pytest.importorskip("tree_sitter")
+
+from src.utils.code_parser import CodeParser
+from src.utils.tree_sitter_parser import TreeSitterParser
+
+
+JS_SOURCE = '''import React from 'react';
+const fs = require('fs');
+
+export class Store extends Base {
+  constructor(name) {
+    super();
+    this.name = name;
+  }
+
+  async load(key, fallback) {
+    const parse = (v) => JSON.parse(v);
+    return parse(key) || fallback;
+  }
+}
+
+export const add = (a, b) => a + b;
+
+function helper(value) {
+  return value * 2;
+}
+'''
+
+GO_SOURCE = '''package main
+
+import "fmt"
+
+type Server struct {
+	Port int
+}
+
+func (s *Server) Start(addr string) error {
+	return nil
+}
+
+func main() {
+	fmt.Println("start")
+}
+'''
+
+
+def _require_grammar(parser, language, file_path=""):
+    """文法パッケージがない場合はスキップ"""
+    if not parser.supports(language, file_path):
+        pytest.skip(f"{language}の文法パッケージが未インストール")
+
+
+class TestTreeSitterChunking:
+    """構文木によるチャンク抽出のテストクラス"""
+
+    def setup_method(self):
+        """各テスト前の初期化"""
+        self.parser = TreeSitterParser()
+
+    def _names(self, chunks):
+        return [chunk.get('qualified_name') for chunk in chunks if chunk['type'] not in ('imports', 'includes')]
+
+    def test_javascript_classes_methods_and_arrow_functions(self):
+        """JSのクラス・メソッド・アロー関数を出現順に抽出"""
+        _require_grammar(self.parser, 'javascript')
+        chunks = self.parser.parse_chunks(JS_SOURCE, "store.js", 'javascript')
+
+        assert self._names(chunks) == ['Store', 'Store.constructor', 'Store.load', 'add', 'helper']
+
+        load = next(chunk for chunk in chunks if chunk.get('qualified_name') == 'Store.load')
+        assert load['type'] == 'method'
+        assert load['class_name'] == 'Store'
+        assert load['is_async']
+        assert load['parameters'] == ['key', 'fallback']
+        assert load['line_start'] == 10
+        assert load['line_end'] == 13
+
+    def test_exported_declaration_includes_export_keyword(self):
+        """export付きの宣言はexportから範囲に含める"""
+        _require_grammar(self.parser, 'javascript')
+        chunks = self.parser.parse_chunks(JS_SOURCE, "store.js", 'javascript')
+
+        store = next(chunk for chunk in chunks if chunk.get('qualified_name') == 'Store')
+        assert store['content'].startswith("export class Store")
+        assert store['line_start'] == 4
+
+    def test_imports_include_require(self):
+        """importとrequireをインポートチャンクにまとめる"""
+        _require_grammar(self.parser, 'javascript')
+        imports = self.parser.parse_chunks(JS_SOURCE, "store.js", 'javascript')[0]
+
+        assert imports['type'] == 'imports'
+        assert imports['content'].splitlines() == [
+            "import React from 'react';", "const fs = require('fs');"
+        ]
+
+    def test_nested_functions_are_not_separate_chunks(self):
+        """関数内の関数は親チャンクに含める"""
+        _require_grammar(self.parser, 'javascript')
+        chunks = self.parser.parse_chunks(JS_SOURCE, "store.js", 'javascript')
+        assert all(chunk.get('function_name') != 'parse' for chunk in chunks)
+
+    def test_go_methods_use_receiver_type(self):
+        """Goのメソッドはレシーバーの型をクラス名とする"""
+        _require_grammar(self.parser, 'go')
+        chunks = self.parser.parse_chunks(GO_SOURCE, "main.go", 'go')
+
+        assert self._names(chunks) == ['Server', 'Server.Start', 'main']
+        start = next(chunk for chunk in chunks if chunk['function_name'] == 'Start')
+        assert start['type'] == 'method'
+        assert start['class_name'] == 'Server'
+        assert start['parameters'] == ['addr']
+
+    def test_c_includes_chunk_type(self):
+        """C/C++のインクルードはincludesチャンク"""
+        _require_grammar(self.parser, 'c')
+        source = "#include <stdio.h>\n\nstatic int *make(int n) {\n    return 0;\n}\n"
+        chunks = self.parser.parse_chunks(source, "make.c", 'c')
+
+        assert chunks[0]['type'] == 'includes'
+        assert chunks[1]['function_name'] == 'make'
+        assert chunks[1]['parameters'] == ['n']
+
+    def test_content_is_exact_source_slice_with_multibyte(self):
+        """マルチバイト文字を含んでも元のソースと一致する範囲を返す"""
+        _require_grammar(self.parser, 'javascript')
+        source = "// 日本語のコメント\nfunction greet(name) {\n  return `こんにちは ${name}`;\n}\n"
+        chunk = self.parser.parse_chunks(source, "greet.js", 'javascript')[0]
+        assert chunk['content'] == source[source.index("function"):source.rindex("}") + 1]
+
+
+class TestIncrementalParsing:
+    """差分再解析のテストクラス"""
+
+    def setup_method(self):
+        """各テスト前の初期化"""
+        self.parser = TreeSitterParser(max_cached_trees=2)
+        _require_grammar(self.parser, 'javascript')
+
+    def test_edit_reuses_previous_tree(self):
+        """同じファイルの再解析は差分再解析になり、新規解析と同じ結果を返す"""
+        self.parser.parse_chunks(JS_SOURCE, "store.js", 'javascript')
+        edited = JS_SOURCE.replace("return value * 2;", "const doubled = value * 2;\n  return doubled;")
+        chunks = self.parser.parse_chunks(edited, "store.js", 'javascript')
+
+        assert self.parser.stats == {'full_parses': 1, 'incremental_parses': 1}
+        assert chunks == TreeSitterParser().parse_chunks(edited, "store.js", 'javascript')
+
+    def test_unchanged_source_is_not_reparsed(self):
+        """内容が同じ場合は再解析しない"""
+        self.parser.parse_chunks(JS_SOURCE, "store.js", 'javascript')
+        self.parser.parse_chunks(JS_SOURCE, "store.js", 'javascript')
+        assert self.parser.stats == {'full_parses': 1, 'incremental_parses': 0}
+
+    def test_tree_cache_is_bounded(self):
+        """保持する構文木数は上限を超えない"""
+        for i in range(4):
+            self.parser.parse_chunks(JS_SOURCE, f"file{i}.js", 'javascript')
+        assert self.parser.get_stats()['cached_trees'] == 2
+
+
+class TestCodeParserIntegration:
+    """CodeParserからの利用のテストクラス"""
+
+    def test_uses_tree_sitter_when_available(self):
+        """文法が利用可能な言語はtree-sitterで解析"""
+        parser = CodeParser(max_chunk_size=100000)
+        _require_grammar(parser.tree_sitter, 'javascript')
+        chunks = parser.parse_and_chunk(JS_SOURCE, "store.js")
+        assert any(chunk.get('qualified_name') == 'Store.load' for chunk in chunks)
+
+    def test_regex_fallback_when_disabled(self):
+        """無効化した場合は正規表現で解析"""
+        parser = CodeParser(max_chunk_size=100000, use_tree_sitter=False)
+        chunks = parser.parse_and_chunk(JS_SOURCE, "store.js")
+        assert parser.tree_sitter is None
+        assert all('qualified_name' not in chunk for chunk in chunks)
+        assert any(chunk['function_name'] == 'helper' for chunk in chunks)
+
+    def test_unsupported_language_uses_existing_parser(self):
+        """tree-sitter対象外の言語は従来の解析"""
+        parser = CodeParser(max_chunk_size=100000)
+        chunks = parser.parse_and_chunk("# 見出し\n本文\n", "README.md")
+        assert chunks[0]['language'] == 'markdown'
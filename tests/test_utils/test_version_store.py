@@ -0,0 +1,221 @@
+# tests/test_utils/test_version_store.py
+"""
+version_storeのテストモジュール
+ハードリンク・差分による版の格納と復元、古い版の整理、FileServiceの保存時バックアップを検証
+"""
+
+import asyncio
+import errno
+import os
+import random
+
+import pytest
+
+from src.utils import version_store
+from src.utils.version_store import KIND_COPY, KIND_DELTA, KIND_LINK, VersionStore
+
+
+def text_content(lines: int, seed: int) -> bytes:
+    """ソースコード風のテキスト"""
+    rng = random.Random(seed)
+    return "".join(f"def func_{i}():\n    return {rng.randrange(1 << 30)}\n\n" for i in range(lines)).encode()
+
+
+class TestVersionStore:
+    """VersionStoreのテストクラス"""
+
+    @pytest.fixture(autouse=True)
+    def no_reflink(self, monkeypatch):
+        """reflink非対応のファイルシステムとして差分格納を検証する"""
+        monkeypatch.setattr(version_store, "_reflink", lambda source, target: False)
+
+    def test_delta_chain_round_trip(self, tmp_path):
+        """前版との差分で格納し、連鎖をたどって各版を復元できる"""
+        store = VersionStore(tmp_path / "store")
+        target = tmp_path / "main.py"
+        contents = []
+        content = text_content(2000, 1)
+        for index in range(12):
+            lines = content.split(b"\n")
+            lines.insert(random.Random(index).randrange(len(lines)), f"# edit {index}".encode())
+            content = b"\n".join(lines)
+            target.write_bytes(content)
+            contents.append(content)
+            store.save_version(target)
+
+        versions = store.list_versions(target)
+        assert [v.version_id for v in versions] == sorted((v.version_id for v in versions), reverse=True)
+        # 連鎖の先頭と上限に達した後はコピー、それ以外は差分
+        assert [v.kind for v in reversed(versions)] == [KIND_COPY] + [KIND_DELTA] * 8 + [KIND_COPY] + [KIND_DELTA] * 2
+        assert versions[0].base_id == versions[1].version_id
+        # 2版目以降は前版との差分なので小さい
+        assert os.path.getsize(versions[0].blob_path) < len(contents[-1]) // 10
+
+        for version, expected in zip(reversed(versions), contents):
+            assert store.read_version(version.version_id) == expected
+        store.close()
+
+    def test_link_when_replacing(self, tmp_path):
+        """置き換える場合はハードリンクで格納し、置き換え後も旧版が残る"""
+        store = VersionStore(tmp_path / "store")
+        target = tmp_path / "data.txt"
+        target.write_bytes(b"old content")
+
+        version = store.save_version(target, replacing=True)
+        assert version.kind == KIND_LINK
+        assert os.stat(version.blob_path).st_ino == os.stat(target).st_ino
+
+        replacement = tmp_path / "data.txt.tmp"
+        replacement.write_bytes(b"new content")
+        os.replace(replacement, target)
+        assert store.read_version(version.version_id) == b"old content"
+
+        store.restore_version(version.version_id)
+        assert target.read_bytes() == b"old content"
+        # 復元は置き換えで行うため、格納した版を書き換えない
+        target.write_bytes(b"edited in place")
+        assert store.read_version(version.version_id) == b"old content"
+        store.close()
+
+    def test_link_modified_in_place_is_detected(self, tmp_path):
+        """ハードリンクの版が書き換えられた場合はエラー"""
+        store = VersionStore(tmp_path / "store")
+        target = tmp_path / "data.txt"
+        target.write_bytes(b"old content")
+        version = store.save_version(target, replacing=True)
+
+        with open(target, 'ab') as f:
+            f.write(b" appended")
+        with pytest.raises(ValueError):
+            store.read_version(version.version_id)
+        store.close()
+
+    def test_unsupported_links_detected_once(self, tmp_path, monkeypatch):
+        """別デバイスでハードリンク・reflinkが作成できない場合は一度だけ試し、以降はコピー・差分で格納する"""
+        calls = {'link': 0, 'reflink': 0}
+
+        def cross_device_link(source, target):
+            calls['link'] += 1
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+        def unsupported_reflink(source, target):
+            calls['reflink'] += 1
+            return False
+
+        monkeypatch.setattr(version_store.os, "link", cross_device_link)
+        monkeypatch.setattr(version_store, "_reflink", unsupported_reflink)
+        store = VersionStore(tmp_path / "store")
+        target = tmp_path / "main.py"
+        contents = []
+        for index in range(3):
+            content = text_content(500, 3) + f"# revision {index}\n".encode()
+            target.write_bytes(content)
+            contents.append(content)
+            store.save_version(target, replacing=True)
+
+        assert calls == {'link': 1, 'reflink': 1}
+        versions = list(reversed(store.list_versions(target)))
+        assert [v.kind for v in versions] == [KIND_COPY, KIND_DELTA, KIND_DELTA]
+        assert open(versions[0].blob_path, 'rb').read() == contents[0]
+        for version, expected in zip(versions, contents):
+            assert store.read_version(version.version_id) == expected
+        store.close()
+
+    def test_prune_rebases_dependents(self, tmp_path):
+        """古い版を削除しても、それを基準にしていた版は復元できる"""
+        store = VersionStore(tmp_path / "store")
+        target = tmp_path / "main.py"
+        contents = []
+        for index in range(6):
+            content = text_content(500, 2) + f"# revision {index}\n".encode()
+            target.write_bytes(content)
+            contents.append(content)
+            store.save_version(target)
+
+        assert store.prune(target, 3) == 3
+        versions = store.list_versions(target)
+        assert len(versions) == 3
+        assert versions[-1].base_id is None
+        for version, expected in zip(reversed(versions), contents[3:]):
+            assert store.read_version(version.version_id) == expected
+        assert len(list(store.blob_path.iterdir())) == 3
+
+        # 他のファイルの版には影響しない
+        other = tmp_path / "other.py"
+        other.write_bytes(b"other")
+        store.save_version(other)
+        assert store.prune(target, 3) == 0
+        assert len(store.list_versions(other)) == 1
+        store.close()
+
+
+class TestFileServiceBackups:
+    """FileServiceの保存時バックアップのテストクラス"""
+
+    def _run(self, tmp_path, scenario, max_backups=3):
+        """FileServiceを作成してシナリオを実行"""
+        from src.services.file_service import FileService
+
+        async def main():
+            config = {'file_management': {
+                'backup': {'enabled': False, 'path': str(tmp_path / "backups"), 'max_backups': max_backups},
+                'auto_save': {'enabled': False},
+                'temp_files': {'path': str(tmp_path / "temp")},
+            }}
+            service = FileService(config)
+            try:
+                return await scenario(service)
+            finally:
+                await service.close()
+
+        return asyncio.run(main())
+
+    def test_write_file_keeps_versions(self, tmp_path):
+        """保存毎に旧版を格納し、上限を超えた版を整理、復元できる"""
+        target = tmp_path / "project" / "main.py"
+
+        async def scenario(service):
+            for index in range(5):
+                await service.write_file(target, f"print({index})\n")
+            backups = service.list_backups(target)
+            restored = await service.restore_backup(backups[-1], tmp_path / "restored.py")
+            return backups, restored
+
+        backups, restored = self._run(tmp_path, scenario)
+        assert target.read_text(encoding='utf-8') == "print(4)\n"
+        assert len(backups) == 3
+        assert [b.version_id for b in backups] == sorted((b.version_id for b in backups), reverse=True)
+        assert all(b.original_path == str(target.absolute()) for b in backups)
+        assert restored.read_text(encoding='utf-8') == "print(1)\n"
+
+    def test_write_file_preserves_mode(self, tmp_path):
+        """置き換えで書き込んでもパーミッションを保持する"""
+        target = tmp_path / "run.sh"
+        target.write_text("echo old\n", encoding='utf-8')
+        os.chmod(target, 0o750)
+
+        async def scenario(service):
+            await service.write_file(target, "echo new\n")
+            return service.list_backups(target)
+
+        backups = self._run(tmp_path, scenario)
+        assert target.stat().st_mode & 0o777 == 0o750
+        assert len(backups) == 1
+        assert open(backups[0].backup_path, encoding='utf-8').read() == "echo old\n"
+
+    def test_write_file_through_symlink(self, tmp_path):
+        """シンボリックリンク経由の保存はリンク先を置き換え、リンクを残す"""
+        real = tmp_path / "real.py"
+        real.write_text("print(0)\n", encoding='utf-8')
+        link = tmp_path / "link.py"
+        link.symlink_to(real)
+
+        async def scenario(service):
+            await service.write_file(link, "print(1)\n")
+            return service.list_backups(link)
+
+        backups = self._run(tmp_path, scenario)
+        assert link.is_symlink()
+        assert real.read_text(encoding='utf-8') == "print(1)\n"
+        assert len(backups) == 1
+        assert backups[0].original_path == str(real)